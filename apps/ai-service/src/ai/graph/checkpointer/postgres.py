@@ -1,8 +1,12 @@
 from langgraph.checkpoint.postgres import PostgresSaver
+from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
+from psycopg.rows import dict_row
+from psycopg_pool import AsyncConnectionPool
 from typing import Union, Optional
 from sqlalchemy import text
 import atexit
 
+from infrastructure.config import EnvConfig
 from infrastructure.database.orm import DatabaseEngine
 from utils import Logger
 
@@ -142,3 +146,67 @@ class PostgresCheckpointer(DatabaseEngine):
         cls._checkpointer = None
         cls._cm = None
         logger.warning("PostgresCheckpointer singleton has been reset")
+
+
+class AsyncPostgresCheckpointer(DatabaseEngine):
+    """
+    Asynchronous PostgreSQL checkpointer backed by a psycopg connection pool.
+
+    Shares the singleton pattern of PostgresCheckpointer, but the saver has to
+    be opened from a running event loop, so creation happens in `open()`.
+    """
+    _checkpointer: Optional[AsyncPostgresSaver] = None
+    _pool: Optional[AsyncConnectionPool] = None
+
+    _mask_url = PostgresCheckpointer._mask_url
+
+    def __init__(self, max_pool_size: Optional[int] = None):
+        super().__init__()
+        self.max_pool_size = max_pool_size or EnvConfig.get_int(
+            "CHECKPOINTER_POOL_MAX_SIZE", 20
+        )
+
+    async def open(self) -> AsyncPostgresSaver:
+        if AsyncPostgresCheckpointer._checkpointer is None:
+            try:
+                pool = AsyncConnectionPool(
+                    conninfo=self.url,
+                    max_size=self.max_pool_size,
+                    open=False,
+                    kwargs={
+                        "autocommit": True,
+                        "prepare_threshold": 0,
+                        "row_factory": dict_row,
+                    },
+                )
+                await pool.open()
+
+                saver = AsyncPostgresSaver(pool)
+                await saver.setup()
+            except Exception as e:
+                logger.error(f"Failed to create AsyncPostgresSaver: {e}")
+                raise
+
+            AsyncPostgresCheckpointer._pool = pool
+            AsyncPostgresCheckpointer._checkpointer = saver
+
+            logger.info(
+                f"AsyncPostgresCheckpointer singleton created with pool size "
+                f"{self.max_pool_size}: {self._mask_url(self.url)}"
+            )
+
+        return AsyncPostgresCheckpointer._checkpointer
+
+    def get_checkpointer(self) -> Optional[AsyncPostgresSaver]:
+        return AsyncPostgresCheckpointer._checkpointer
+
+    @classmethod
+    async def close(cls) -> None:
+        try:
+            if cls._pool is not None:
+                await cls._pool.close()
+                logger.info("AsyncPostgresSaver connection pool closed")
+        except Exception as e:
+            logger.warning(f"Error while closing AsyncPostgresSaver pool: {e}")
+        cls._pool = None
+        cls._checkpointer = None
@@ -0,0 +1,20 @@
+from .features import NgramFeaturizer
+from .model import IntentClassifier
+from .train import (
+    Example,
+    evaluate,
+    load_examples,
+    split_holdout,
+    train
+)
+
+
+__all__ = [
+    "NgramFeaturizer",
+    "IntentClassifier",
+    "Example",
+    "evaluate",
+    "load_examples",
+    "split_holdout",
+    "train"
+]
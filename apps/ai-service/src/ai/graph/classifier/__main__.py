@@ -0,0 +1,89 @@
+"""
+Train and evaluate the local intent classifier (from apps/ai-service/src).
+
+Training data is IntentService responses recorded with LLM_CASSETTE_MODE=record
+and/or JSONL lines of {"text", "label", "verified"}:
+
+    python -m ai.graph.classifier train --data llm_cassette.jsonl --out intent.model.gz --report report.json
+    python -m ai.graph.classifier evaluate --model intent.model.gz --data labelled.jsonl
+
+Serve it with GRAPH_INTENT_CLASSIFIER_PATH=intent.model.gz and set
+GRAPH_INTENT_CLASSIFIER_THRESHOLD from the report's recommended_threshold.
+"""
+import argparse
+import json
+import sys
+from typing import Any, Dict, Optional
+
+from .features import NgramFeaturizer
+from .model import IntentClassifier
+from .train import evaluate, load_examples, split_holdout, train
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Local n-gram intent classifier")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    train_parser = commands.add_parser("train", help="Train on LLM labels and report on a held-out split")
+    train_parser.add_argument("--data", action="append", required=True, help="JSONL file (repeatable)")
+    train_parser.add_argument("--out", required=True, help="Model file to write (gzip JSON)")
+    train_parser.add_argument("--report", default=None, help="Write the evaluation report here as JSON")
+    train_parser.add_argument("--holdout", type=float, default=0.2, help="Share of messages held out for evaluation")
+    train_parser.add_argument("--min-confidence", type=float, default=0.5, help="Ignore LLM labels below this confidence")
+    train_parser.add_argument("--epochs", type=int, default=10)
+    train_parser.add_argument("--learning-rate", type=float, default=0.5)
+    train_parser.add_argument("--l2", type=float, default=1e-5)
+    train_parser.add_argument("--buckets", type=int, default=1 << 18, help="Hashed feature space size")
+    train_parser.add_argument("--target-accuracy", type=float, default=0.98)
+    train_parser.add_argument("--seed", type=int, default=13)
+
+    evaluate_parser = commands.add_parser("evaluate", help="Report a saved model against labelled data")
+    evaluate_parser.add_argument("--model", required=True)
+    evaluate_parser.add_argument("--data", action="append", required=True, help="JSONL file (repeatable)")
+    evaluate_parser.add_argument("--report", default=None)
+    evaluate_parser.add_argument("--min-confidence", type=float, default=0.5)
+    evaluate_parser.add_argument("--target-accuracy", type=float, default=0.98)
+    return parser.parse_args()
+
+
+def write_report(report: Dict[str, Any], path: Optional[str]) -> None:
+    text = json.dumps(report, indent=2)
+    if path:
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(text + "\n")
+    print(text)
+
+
+def main() -> int:
+    args = parse_args()
+    examples = load_examples(args.data, args.min_confidence)
+    if not examples:
+        print("No usable examples in the given data", file=sys.stderr)
+        return 1
+
+    if args.command == "evaluate":
+        model = IntentClassifier.load(args.model)
+        write_report(evaluate(model, examples, target_accuracy=args.target_accuracy), args.report)
+        return 0
+
+    training, holdout = split_holdout(examples, args.holdout)
+    model = train(
+        training,
+        featurizer=NgramFeaturizer(buckets=args.buckets),
+        epochs=args.epochs,
+        learning_rate=args.learning_rate,
+        l2=args.l2,
+        seed=args.seed,
+    )
+    report = evaluate(model, holdout, target_accuracy=args.target_accuracy) if holdout else {}
+    model.metadata["holdout"] = {
+        key: report.get(key) for key in ("examples", "accuracy", "macro_f1", "recommended_threshold")
+    }
+    model.save(args.out)
+    write_report(report, args.report)
+    print(f"Saved {args.out}: {len(model.labels)} labels, {len(model.weights)} features", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,60 @@
+import math
+import re
+import zlib
+from dataclasses import asdict, dataclass
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    List
+)
+
+_TOKEN = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+_DIGITS = re.compile(r"\d")
+
+SparseVector = Dict[int, float]
+
+
+@dataclass(frozen=True)
+class NgramFeaturizer:
+    """
+    Hashed bag of word n-grams and in-word character n-grams, L2-normalised.
+
+    Digits are folded to 0 so phone numbers and dates share features, and a
+    context token marks whether the session is verified (the intent prompt
+    differs). Hashing uses crc32, which is stable across processes, unlike
+    Python's salted hash().
+    """
+    buckets: int = 1 << 18
+    word_ngrams: int = 2
+    char_ngrams: int = 3
+
+    def tokens(self, text: str) -> List[str]:
+        return _TOKEN.findall(_DIGITS.sub("0", (text or "").lower()))
+
+    def grams(self, text: str, is_verified: bool) -> Iterable[str]:
+        words = self.tokens(text)
+        yield f"ctx:{'verified' if is_verified else 'unverified'}"
+        for n in range(1, self.word_ngrams + 1):
+            for start in range(len(words) - n + 1):
+                yield "w:" + " ".join(words[start:start + n])
+        if self.char_ngrams:
+            for word in words:
+                padded = f"<{word}>"
+                for start in range(len(padded) - self.char_ngrams + 1):
+                    yield "c:" + padded[start:start + self.char_ngrams]
+
+    def transform(self, text: str, is_verified: bool) -> SparseVector:
+        counts: SparseVector = {}
+        for gram in self.grams(text, is_verified):
+            index = zlib.crc32(gram.encode("utf-8")) % self.buckets
+            counts[index] = counts.get(index, 0.0) + 1.0
+        norm = math.sqrt(sum(value * value for value in counts.values())) or 1.0
+        return {index: value / norm for index, value in counts.items()}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "NgramFeaturizer":
+        return cls(**data)
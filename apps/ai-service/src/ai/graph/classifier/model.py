@@ -0,0 +1,109 @@
+import gzip
+import json
+import math
+from typing import (
+    Dict,
+    List,
+    Optional,
+    Tuple
+)
+
+from .features import NgramFeaturizer, SparseVector
+
+FORMAT = "intent-ngram-logreg"
+VERSION = 1
+
+
+def softmax(scores: List[float], temperature: float = 1.0) -> List[float]:
+    scaled = [score / temperature for score in scores]
+    top = max(scaled)
+    exps = [math.exp(score - top) for score in scaled]
+    total = sum(exps)
+    return [value / total for value in exps]
+
+
+class IntentClassifier:
+    """
+    Multinomial logistic regression over hashed n-gram features.
+
+    `weights` maps a feature bucket to one weight per label and only holds
+    buckets seen in training, so the model stays small. `temperature` is fitted
+    after training so that predicted probabilities are calibrated and can be
+    compared against a short-circuit threshold.
+
+    File format (gzip-compressed JSON):
+        {"format": "intent-ngram-logreg", "version": 1, "labels": [...],
+         "featurizer": {...}, "temperature": t, "bias": [...],
+         "weights": {"<bucket>": [...]}, "metadata": {...}}
+    """
+    def __init__(
+        self,
+        labels: List[str],
+        featurizer: NgramFeaturizer,
+        weights: Optional[Dict[int, List[float]]] = None,
+        bias: Optional[List[float]] = None,
+        temperature: float = 1.0,
+        metadata: Optional[Dict] = None
+    ) -> None:
+        self.labels = list(labels)
+        self.featurizer = featurizer
+        self.weights: Dict[int, List[float]] = weights if weights is not None else {}
+        self.bias: List[float] = bias if bias is not None else [0.0] * len(self.labels)
+        self.temperature = temperature
+        self.metadata = metadata or {}
+
+    def scores(self, features: SparseVector) -> List[float]:
+        totals = list(self.bias)
+        for index, value in features.items():
+            row = self.weights.get(index)
+            if row is None:
+                continue
+            for label, weight in enumerate(row):
+                totals[label] += weight * value
+        return totals
+
+    def predict_proba(self, text: str, is_verified: bool = False) -> Dict[str, float]:
+        probabilities = softmax(self.scores(self.featurizer.transform(text, is_verified)), self.temperature)
+        return dict(zip(self.labels, probabilities))
+
+    def predict(self, text: str, is_verified: bool = False) -> Tuple[str, float]:
+        """ Most likely label and its calibrated probability. """
+        probabilities = self.predict_proba(text, is_verified)
+        label = max(probabilities, key=probabilities.get)
+        return label, probabilities[label]
+
+    def save(self, path: str, precision: int = 5) -> None:
+        payload = {
+            "format": FORMAT,
+            "version": VERSION,
+            "labels": self.labels,
+            "featurizer": self.featurizer.to_dict(),
+            "temperature": round(self.temperature, 4),
+            "bias": [round(value, precision) for value in self.bias],
+            "weights": {
+                str(index): [round(weight, precision) for weight in row]
+                for index, row in self.weights.items()
+                if any(abs(weight) >= 10 ** -precision for weight in row)
+            },
+            "metadata": self.metadata,
+        }
+        with gzip.open(path, "wt", encoding="utf-8") as file:
+            json.dump(payload, file, separators=(",", ":"))
+
+    @classmethod
+    def load(cls, path: str) -> "IntentClassifier":
+        with gzip.open(path, "rt", encoding="utf-8") as file:
+            payload = json.load(file)
+        if payload.get("format") != FORMAT or payload.get("version") != VERSION:
+            raise ValueError(
+                f"{path} is not a {FORMAT} v{VERSION} model "
+                f"(got {payload.get('format')} v{payload.get('version')})"
+            )
+        return cls(
+            labels=payload["labels"],
+            featurizer=NgramFeaturizer.from_dict(payload["featurizer"]),
+            weights={int(index): row for index, row in payload["weights"].items()},
+            bias=payload["bias"],
+            temperature=payload["temperature"],
+            metadata=payload.get("metadata", {}),
+        )
@@ -0,0 +1,263 @@
+import json
+import math
+import random
+import zlib
+from dataclasses import dataclass
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple
+)
+
+from utils import Logger
+
+from .features import NgramFeaturizer
+from .model import IntentClassifier, softmax
+
+logger = Logger(__name__)
+
+INTENT_SERVICE = "IntentService"
+REPORT_THRESHOLDS: Tuple[float, ...] = (0.5, 0.7, 0.8, 0.9, 0.95, 0.98, 0.99)
+TEMPERATURE_GRID: Tuple[float, ...] = tuple(round(0.25 * step, 2) for step in range(1, 33))
+
+
+@dataclass(frozen=True)
+class Example:
+    text: str
+    label: str
+    is_verified: bool
+
+
+def parse_example(entry: Dict[str, Any], min_confidence: float = 0.0) -> Optional[Example]:
+    """
+    One training example from a JSONL line: either a recorded LLM response
+    from the cassette (LLM_CASSETTE_MODE=record) of IntentService, or a plain
+    {"text", "label", "verified"} line. Returns None for anything else and
+    for LLM labels below `min_confidence`.
+    """
+    if "text" in entry and "label" in entry:
+        return Example(str(entry["text"]), str(entry["label"]), bool(entry.get("verified", False)))
+
+    if entry.get("service") != INTENT_SERVICE:
+        return None
+    response = entry.get("response") or {}
+    intent = response.get("user_intent") or {}
+    if not intent.get("intent_type") or (intent.get("confidence") or 0.0) < min_confidence:
+        return None
+
+    human = [content for kind, content in entry.get("messages", []) if kind == "human"]
+    text = response.get("raw_query") or (human[-1] if human else "")
+    if not str(text).strip():
+        return None
+    is_verified = str(entry.get("variant", "")).startswith("verified")
+    return Example(str(text), str(intent["intent_type"]), is_verified)
+
+
+def load_examples(paths: Sequence[str], min_confidence: float = 0.0) -> List[Example]:
+    """ Examples from JSONL files, de-duplicated by (text, verified) with the latest label winning. """
+    examples: Dict[Tuple[str, bool], Example] = {}
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as file:
+            for number, line in enumerate(file, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    example = parse_example(json.loads(line), min_confidence)
+                except (ValueError, TypeError, AttributeError):
+                    logger.warning(f"[CLASSIFIER] Skipping malformed line {path}:{number}")
+                    continue
+                if example is not None:
+                    examples[(example.text.strip().lower(), example.is_verified)] = example
+    return list(examples.values())
+
+
+def split_holdout(examples: Sequence[Example], fraction: float) -> Tuple[List[Example], List[Example]]:
+    """
+    Deterministic split by text hash, so retraining on a grown log never moves
+    an already held-out message into training.
+    """
+    train: List[Example] = []
+    holdout: List[Example] = []
+    cutoff = int(fraction * 10_000)
+    for example in examples:
+        bucket = zlib.crc32(example.text.strip().lower().encode("utf-8")) % 10_000
+        (holdout if bucket < cutoff else train).append(example)
+    return train, holdout
+
+
+def train(
+    examples: Sequence[Example],
+    featurizer: Optional[NgramFeaturizer] = None,
+    epochs: int = 10,
+    learning_rate: float = 0.5,
+    l2: float = 1e-5,
+    calibration_fraction: float = 0.1,
+    seed: int = 13
+) -> IntentClassifier:
+    """
+    Multinomial logistic regression by SGD with a decaying learning rate,
+    followed by temperature scaling fitted on a calibration slice of the
+    training data (minimum negative log-likelihood over a grid).
+
+    L2 is applied lazily: a feature's weights are shrunk for the steps it
+    missed when it is next touched, so an update costs O(active features).
+    """
+    if not examples:
+        raise ValueError("No training examples")
+    featurizer = featurizer or NgramFeaturizer()
+    labels = sorted({example.label for example in examples})
+    label_index = {label: index for index, label in enumerate(labels)}
+
+    rng = random.Random(seed)
+    shuffled = list(examples)
+    rng.shuffle(shuffled)
+    calibration_size = int(len(shuffled) * calibration_fraction) if len(shuffled) >= 50 else 0
+    calibration, fitting = shuffled[:calibration_size], shuffled[calibration_size:]
+
+    data = [(featurizer.transform(e.text, e.is_verified), label_index[e.label]) for e in fitting]
+    model = IntentClassifier(labels, featurizer)
+    last_step: Dict[int, int] = {}
+    shrink_log: List[float] = [0.0]    # cumulative log of the per-step shrink factor
+    step = 0
+
+    for epoch in range(epochs):
+        rng.shuffle(data)
+        for features, target in data:
+            rate = learning_rate / (1.0 + 0.01 * step)
+            step += 1
+            shrink_log.append(shrink_log[-1] + math.log(max(1e-12, 1.0 - rate * l2)))
+
+            for index in features:
+                row = model.weights.get(index)
+                if row is None:
+                    model.weights[index] = [0.0] * len(labels)
+                    last_step[index] = step
+                elif last_step[index] < step:
+                    factor = math.exp(shrink_log[step] - shrink_log[last_step[index]])
+                    model.weights[index] = [weight * factor for weight in row]
+
+            probabilities = softmax(model.scores(features))
+            for label in range(len(labels)):
+                gradient = probabilities[label] - (1.0 if label == target else 0.0)
+                if gradient == 0.0:
+                    continue
+                model.bias[label] -= rate * gradient
+                for index, value in features.items():
+                    model.weights[index][label] -= rate * gradient * value
+            for index in features:
+                last_step[index] = step
+        logger.info(f"[CLASSIFIER] epoch {epoch + 1}/{epochs} done")
+
+    # Bring every row up to date with the decay it missed since its last update
+    for index, row in model.weights.items():
+        factor = math.exp(shrink_log[step] - shrink_log[last_step[index]])
+        if factor != 1.0:
+            model.weights[index] = [weight * factor for weight in row]
+
+    model.temperature = fit_temperature(model, calibration or fitting)
+    model.metadata = {
+        "examples": len(examples),
+        "calibration_examples": len(calibration),
+        "epochs": epochs,
+        "learning_rate": learning_rate,
+        "l2": l2,
+    }
+    return model
+
+
+def fit_temperature(model: IntentClassifier, examples: Sequence[Example]) -> float:
+    label_index = {label: index for index, label in enumerate(model.labels)}
+    known = [e for e in examples if e.label in label_index]
+    if not known:
+        return 1.0
+    scored = [(model.scores(model.featurizer.transform(e.text, e.is_verified)), label_index[e.label]) for e in known]
+
+    def nll(temperature: float) -> float:
+        return -sum(math.log(max(1e-12, softmax(scores, temperature)[target])) for scores, target in scored)
+
+    return min(TEMPERATURE_GRID, key=nll)
+
+
+def evaluate(
+    model: IntentClassifier,
+    examples: Sequence[Example],
+    thresholds: Iterable[float] = REPORT_THRESHOLDS,
+    target_accuracy: float = 0.98,
+    bins: int = 10
+) -> Dict[str, Any]:
+    """
+    Report against held-out LLM labels: accuracy, macro F1, per-class
+    precision/recall/F1, a confusion matrix (true -> predicted -> count),
+    expected calibration error, and for each probability threshold the share
+    of messages the classifier would answer alone and its accuracy on them.
+    `recommended_threshold` is the lowest threshold meeting `target_accuracy`.
+    """
+    predictions = [
+        (example.label, *model.predict(example.text, example.is_verified))
+        for example in examples
+    ]
+    total = len(predictions)
+    labels = sorted(set(model.labels) | {truth for truth, _, _ in predictions})
+    confusion = {truth: {predicted: 0 for predicted in labels} for truth in labels}
+    for truth, predicted, _ in predictions:
+        confusion[truth][predicted] += 1
+
+    per_class: Dict[str, Dict[str, float]] = {}
+    for label in labels:
+        true_positive = confusion[label][label]
+        predicted_count = sum(confusion[truth][label] for truth in labels)
+        actual_count = sum(confusion[label].values())
+        precision = true_positive / predicted_count if predicted_count else 0.0
+        recall = true_positive / actual_count if actual_count else 0.0
+        f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+        per_class[label] = {
+            "precision": round(precision, 4),
+            "recall": round(recall, 4),
+            "f1": round(f1, 4),
+            "support": actual_count,
+        }
+    supported = [scores["f1"] for scores in per_class.values() if scores["support"]]
+
+    coverage = []
+    for threshold in thresholds:
+        accepted = [(truth, predicted) for truth, predicted, probability in predictions if probability >= threshold]
+        correct = sum(1 for truth, predicted in accepted if truth == predicted)
+        coverage.append({
+            "threshold": threshold,
+            "coverage": round(len(accepted) / total, 4) if total else 0.0,
+            "accuracy": round(correct / len(accepted), 4) if accepted else None,
+        })
+    recommended = next(
+        (row["threshold"] for row in coverage if row["accuracy"] is not None and row["accuracy"] >= target_accuracy),
+        None
+    )
+
+    return {
+        "examples": total,
+        "accuracy": round(sum(1 for t, p, _ in predictions if t == p) / total, 4) if total else None,
+        "macro_f1": round(sum(supported) / len(supported), 4) if supported else None,
+        "expected_calibration_error": round(_calibration_error(predictions, bins), 4) if total else None,
+        "temperature": model.temperature,
+        "per_class": per_class,
+        "confusion": confusion,
+        "coverage": coverage,
+        "target_accuracy": target_accuracy,
+        "recommended_threshold": recommended,
+    }
+
+
+def _calibration_error(predictions: Sequence[Tuple[str, str, float]], bins: int) -> float:
+    grouped: List[List[Tuple[bool, float]]] = [[] for _ in range(bins)]
+    for truth, predicted, probability in predictions:
+        grouped[min(bins - 1, int(probability * bins))].append((truth == predicted, probability))
+    error = 0.0
+    for group in grouped:
+        if group:
+            accuracy = sum(1 for correct, _ in group if correct) / len(group)
+            confidence = sum(probability for _, probability in group) / len(group)
+            error += len(group) / len(predictions) * abs(accuracy - confidence)
+    return error
@@ -0,0 +1,6 @@
+from .session import SessionTurnCoordinator
+
+
+__all__ = [
+	"SessionTurnCoordinator"
+]
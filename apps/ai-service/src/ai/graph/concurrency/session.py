@@ -0,0 +1,121 @@
+import asyncio
+from contextlib import asynccontextmanager
+from time import perf_counter
+from typing import (
+	Any,
+	AsyncIterator,
+	Awaitable,
+	Callable,
+	Dict,
+	Optional,
+	Tuple,
+	TypeVar
+)
+
+from infrastructure.metrics import MetricsRegistry
+
+T = TypeVar("T")
+
+metrics = MetricsRegistry()
+
+
+class _SessionEntry:
+	__slots__ = ("lock", "users", "tail")
+
+	def __init__(self) -> None:
+		self.lock = asyncio.Lock()
+		self.users = 0
+		# Message key and result of the most recently submitted turn, while it is pending
+		self.tail: Optional[Tuple[str, asyncio.Future]] = None
+
+
+class SessionTurnCoordinator:
+	"""
+	Serializes turns per session_id inside one process.
+
+	Two turns for the same session would otherwise both read the checkpoint,
+	update it and invoke the graph, overwriting each other's state. Turns for
+	different sessions are never blocked. With `coalesce` enabled, a turn whose
+	message is identical to the session's last submitted turn, while that turn
+	is still queued or running (double submit, client retry), awaits its result
+	instead of running the graph again. Only the tail of the queue is matched:
+	an equal message behind a different one is a new turn, since the state it
+	runs against has moved on.
+	"""
+	def __init__(self, coalesce: bool = True) -> None:
+		self.coalesce = coalesce
+		self._entries: Dict[str, _SessionEntry] = {}
+
+	@asynccontextmanager
+	async def session(self, session_id: str) -> AsyncIterator[None]:
+		"""Hold the session's turn lock, recording how long it took to get it"""
+		entry = self._acquire_entry(session_id)
+		try:
+			if entry.lock.locked():
+				metrics.increment("graph.session_lock.contended")
+			start = perf_counter()
+			async with entry.lock:
+				metrics.observe("request.graph.session_lock_wait", perf_counter() - start)
+				yield
+		finally:
+			self._release_entry(session_id, entry)
+
+	async def run(
+		self, 
+		session_id: str, 
+		message: str, 
+		turn: Callable[[], Awaitable[T]]
+	) -> T:
+		"""Run `turn` under the session lock, sharing the result with an identical preceding pending turn"""
+		if not self.coalesce:
+			async with self.session(session_id):
+				return await turn()
+
+		key = self._message_key(message)
+		entry = self._acquire_entry(session_id)
+		try:
+			if entry.tail is not None and entry.tail[0] == key:
+				metrics.increment("graph.turns.coalesced")
+				return await asyncio.shield(entry.tail[1])
+
+			future: asyncio.Future = asyncio.get_running_loop().create_future()
+			entry.tail = (key, future)
+			try:
+				async with self.session(session_id):
+					result = await turn()
+				future.set_result(result)
+				return result
+			except asyncio.CancelledError:
+				future.cancel()
+				raise
+			except BaseException as e:
+				future.set_exception(e)
+				# Retrieve it so an un-awaited future does not log "exception never retrieved"
+				future.exception()
+				raise
+			finally:
+				if entry.tail is not None and entry.tail[1] is future:
+					entry.tail = None
+		finally:
+			self._release_entry(session_id, entry)
+
+	def active_sessions(self) -> int:
+		return len(self._entries)
+
+	def _acquire_entry(self, session_id: str) -> _SessionEntry:
+		entry = self._entries.get(session_id)
+		if entry is None:
+			entry = self._entries[session_id] = _SessionEntry()
+		entry.users += 1
+		metrics.set_gauge("graph.session_locks.active", len(self._entries))
+		return entry
+
+	def _release_entry(self, session_id: str, entry: _SessionEntry) -> None:
+		entry.users -= 1
+		if entry.users == 0 and self._entries.get(session_id) is entry:
+			del self._entries[session_id]
+		metrics.set_gauge("graph.session_locks.active", len(self._entries))
+
+	@staticmethod
+	def _message_key(message: Any) -> str:
+		return " ".join(str(message or "").split()).casefold()
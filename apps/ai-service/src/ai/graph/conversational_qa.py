@@ -1,11 +1,18 @@
+import asyncio
+import contextvars
 from pathlib import Path
 from typing import (
 	Any, 
+	AsyncIterator,
 	Dict,
+	Iterator,
 	Optional,
-	List
+	List,
+	Tuple
 )
 
+from langchain_core.runnables import RunnableLambda
+from langgraph.checkpoint.base import BaseCheckpointSaver
 from langgraph.graph import (
 	START,
 	END, 
@@ -13,8 +20,15 @@ from langgraph.graph import (
 ) 
 from langgraph.graph.state import CompiledStateGraph
 
-from .states.qa import QAState
-from .checkpointer.postgres import PostgresCheckpointer
+from .states.conversational_qa import QAState
+from .checkpointer.postgres import PostgresCheckpointer, AsyncPostgresCheckpointer
+from .concurrency import SessionTurnCoordinator
+from .streaming import (
+	StreamEventTypes,
+	GraphEventTranslator,
+	aiter_in_thread
+)
+from .streaming.events import STREAM_MODES
 from .types.conversational_qa import (
 	Nodes,
 	Routes,
@@ -26,8 +40,12 @@ from .services.conversational_qa import (
 	QueryORMService,
 	AppointmentMatchService,
 	ProcessConfirmationService,
-	ClarificationService
+	ClarificationService,
+	TurnUnderstandingService,
+	SpeculativePrefetcher,
+	LocalIntentService
 )
+from .services.usage import TurnUsage, track_turn_usage
 
 from .nodes.conversational_qa import (
 	ConversationManagerNode,
@@ -44,6 +62,8 @@ from .nodes.conversational_qa import (
 )
 
 
+from infrastructure.config import EnvConfig
+from infrastructure.metrics import MetricsRegistry
 from utils import (
 	Logger, 
 	TimeHandler,
@@ -53,13 +73,67 @@ from utils import (
 from .base import BaseGraph
 
 logger = Logger(__name__)
+metrics = MetricsRegistry()
 
 
 class QAGraph(BaseGraph):
-	def __init__(self) -> None:
+	"""
+	Conversational QA graph.
+
+	Runs in one of two execution modes, selected with `async_mode` or the
+	GRAPH_EXECUTION_MODE environment variable ("sync" by default):
+
+	- sync: the graph is compiled on construction against the synchronous
+	  PostgresSaver and every turn runs `invoke`/`get_state`/`update_state`
+	  in a worker thread, so the event loop stays free for other turns.
+	- async: the graph is compiled by `await setup()` against a pooled
+	  AsyncPostgresSaver and every turn runs `ainvoke`/`aget_state`/
+	  `aupdate_state`, with nodes using their async `acall` variants.
+
+	Turns for the same session are serialized in-process; a message identical
+	to the session's last pending turn is coalesced with it unless
+	GRAPH_COALESCE_DUPLICATE_TURNS is disabled.
+
+	Turn understanding runs as a pipeline of per-service LLM calls by default.
+	With `understanding_mode="fused"` (or GRAPH_TURN_UNDERSTANDING=fused) one
+	structured call returns intent, entities, a candidate appointment and a
+	draft clarification that the downstream nodes reuse. Provider calls per
+	turn are reported as `graph.turn.llm_calls.<mode>` in both modes.
+	"""
+	UNDERSTANDING_MODES = ("pipeline", "fused")
+
+	def __init__(
+		self,
+		async_mode: Optional[bool] = None,
+		checkpointer: Optional[BaseCheckpointSaver] = None,
+		understanding_mode: Optional[str] = None
+	) -> None:
 		super().__init__()
-		self._nodes = self._define_nodes()
-		self._graph = self._define_graph()
+		if async_mode is None:
+			async_mode = EnvConfig.get_str("GRAPH_EXECUTION_MODE", "sync").lower() == "async"
+		self.async_mode = async_mode
+		if understanding_mode is None:
+			understanding_mode = EnvConfig.get_str("GRAPH_TURN_UNDERSTANDING", "pipeline").lower()
+		if understanding_mode not in self.UNDERSTANDING_MODES:
+			raise ValueError(
+				f"Unknown turn understanding mode '{understanding_mode}', "
+				f"expected one of {self.UNDERSTANDING_MODES}"
+			)
+		self.understanding_mode = understanding_mode
+		self._checkpointer = checkpointer
+		self._graph: Optional[CompiledStateGraph] = None
+		self._turns = SessionTurnCoordinator(
+			coalesce=EnvConfig.get_bool("GRAPH_COALESCE_DUPLICATE_TURNS", True)
+		)
+
+		metrics.increment("graph.constructions")
+		with metrics.timer("startup.graph.define_nodes"):
+			self._nodes = self._define_nodes()
+		with metrics.timer("startup.graph.prewarm_chains"):
+			self._prewarm_chains()
+		if not self.async_mode or self._checkpointer is not None:
+			with metrics.timer("startup.graph.define_graph"):
+				self._graph = self._define_graph()
 		
 		# mermaid_mmd = self._graph.get_graph().draw_mermaid()
 		# mermaid_mmd_path = Path("/app/images/qa-conversational-graph.mmd")
@@ -71,18 +145,44 @@ class QAGraph(BaseGraph):
 		intent_service = IntentService(model="gpt-4o-mini", temp=0.0)
 		qa_service = QAAnswerService(model="gpt-4o-mini", temp=0.3)
 		query_orm_service = QueryORMService()
+		prefetcher = self.prefetcher = SpeculativePrefetcher(query_orm_service=query_orm_service)
+		local_intent_service = LocalIntentService.from_env()
 		appointment_match_service = AppointmentMatchService(query_orm_service=query_orm_service)
 		process_confirmation_service = ProcessConfirmationService(model="gpt-4o-mini", temp=0.0)
 		clarification_service = ClarificationService()
+		turn_understanding_service = (
+			TurnUnderstandingService(model="gpt-4o-mini", temp=0.0)
+			if self.understanding_mode == "fused"
+			else None
+		)
+
+		self._llm_services = [
+			intent_service,
+			qa_service,
+			appointment_match_service,
+			process_confirmation_service,
+			clarification_service
+		]
+		if turn_understanding_service is not None:
+			self._llm_services.append(turn_understanding_service)
 
 		nodes = {
-			Nodes.CONVERSATION_MANAGER: ConversationManagerNode(intent_service=intent_service),
+			Nodes.CONVERSATION_MANAGER: ConversationManagerNode(
+				intent_service=intent_service,
+				turn_understanding_service=turn_understanding_service,
+				prefetcher=prefetcher,
+				local_intent_service=local_intent_service
+			),
 			Nodes.QA_ANSWER: QAAnswerNode(qa_service=qa_service),
 			Nodes.VERIFICATION_GATE: VerificationGateNode(query_orm_service=query_orm_service),
-			Nodes.VERIFICATION_PATIENT: VerificationPatientNode(query_orm_service=query_orm_service),
+			Nodes.VERIFICATION_PATIENT: VerificationPatientNode(
+				query_orm_service=query_orm_service,
+				prefetcher=prefetcher
+			),
 			Nodes.VERIFICATION_APPOINTMENT: VerificationAppointmentNode(
 				query_orm_service=query_orm_service,
-				appointment_match_service=appointment_match_service
+				appointment_match_service=appointment_match_service,
+				prefetcher=prefetcher
 			),
 			Nodes.CLARIFICATION: ClarificationNode(
 				clarification_service=clarification_service
@@ -98,6 +198,38 @@ class QAGraph(BaseGraph):
 		}
 		return nodes
 	
+	def _prewarm_chains(self) -> None:
+		"""Compile every prompt variant (and load the tokenizer) up front so requests only look them up"""
+		for service in self._llm_services:
+			try:
+				service.prewarm()
+				service.token_counter.count("warm")
+			except Exception as e:
+				logger.warning(f"Chain prewarm failed for {service.service_name}: {e}")
+
+	async def setup(self) -> None:
+		"""Open the async checkpointer and compile the graph (async mode only)"""
+		if self._graph is not None:
+			return
+		with metrics.timer("startup.graph.define_graph"):
+			with metrics.timer("startup.graph.checkpointer"):
+				self._checkpointer = await AsyncPostgresCheckpointer().open()
+			self._graph = self._define_graph()
+
+	def close(self) -> None:
+		"""Release the checkpointer resources held by the compiled graph and the prefetch workers"""
+		self.prefetcher.close()
+		PostgresCheckpointer.reset_singleton()
+		logger.info("QA graph resources released")
+
+	async def aclose(self) -> None:
+		if self.async_mode:
+			self.prefetcher.close()
+			await AsyncPostgresCheckpointer.close()
+			logger.info("QA graph async resources released")
+		else:
+			self.close()
+
 	def _get_interrupt_configuration(self) -> Dict[str, List[str]]:
 		"""Define which nodes should have interrupts"""
 		return {
@@ -112,6 +244,12 @@ class QAGraph(BaseGraph):
 			]
 		}
 	
+	def _as_runnable(self, name: str, node: Any) -> Any:
+		"""In async mode, expose the node's `acall` so it is awaited instead of blocking the loop"""
+		if self.async_mode and hasattr(node, "acall"):
+			return RunnableLambda(node, afunc=node.acall, name=name)
+		return node
+
 	def _fallback_to_normal_flow(self, state: QAState, config: Dict) -> QAState:
 		"""Fallback to normal graph execution"""
 		try:
@@ -119,6 +257,13 @@ class QAGraph(BaseGraph):
 		except Exception as e:
 			logger.error(f"Fallback to normal flow failed: {e}")
 			return state
+
+	async def _afallback_to_normal_flow(self, state: QAState, config: Dict) -> QAState:
+		try:
+			return await self._graph.ainvoke(input=state, config=config)
+		except Exception as e:
+			logger.error(f"Fallback to normal flow failed: {e}")
+			return state
 		
 	def _define_graph(self) -> CompiledStateGraph:
 		"""Define the graph with interrupt configuration"""
@@ -126,7 +271,7 @@ class QAGraph(BaseGraph):
 		graph = StateGraph(QAState)
 		
 		for name, node in self._nodes.items():
-			graph.add_node(name, node)
+			graph.add_node(name, self._as_runnable(name, node))
 
 		graph.set_entry_point(Nodes.CONVERSATION_MANAGER)
 
@@ -196,40 +341,57 @@ class QAGraph(BaseGraph):
 
 		interrupt_config = self._get_interrupt_configuration()
 		
-		checkpointer = PostgresCheckpointer().get_checkpointer()
-
-		compiled = graph.compile(
-			checkpointer=checkpointer,
-			interrupt_before=interrupt_config["interrupt_before"],
-			interrupt_after=interrupt_config["interrupt_after"]
+		checkpointer = self._checkpointer
+		if checkpointer is None:
+			with metrics.timer("startup.graph.checkpointer"):
+				checkpointer = PostgresCheckpointer().get_checkpointer()
+
+		with metrics.timer("startup.graph.compile"):
+			compiled = graph.compile(
+				checkpointer=checkpointer,
+				interrupt_before=interrupt_config["interrupt_before"],
+				interrupt_after=interrupt_config["interrupt_after"]
+			)
+
+		logger.info(
+			f"QA graph compiled ({'async' if self.async_mode else 'sync'} mode) "
+			"with checkpointer and interrupt configuration"
 		)
 
-		logger.info("QA graph compiled with Postgres checkpointer and interrupt configuration")
-
 		return compiled
 
 	def get_current_state(self, session_id: str) -> Optional[QAState]:
 		try:
 			snap = self._graph.get_state(self._cfg(session_id))
-			if snap and getattr(snap, "values", None):
-				logger.info(f"Found existing state for session {session_id}")
-				if hasattr(snap, 'next') and snap.next:
-					logger.info(f"Session {session_id} is at interrupt point, next nodes: {snap.next}")
-				return snap.values
-			logger.info(f"No existing state for session {session_id}")
-			return None
+			return self._values_from_snapshot(snap, session_id)
 		except Exception as e:
 			logger.error(f"get_current_state error: {e}")
 			return None
 
-	def new_state(
+	async def aget_current_state(self, session_id: str) -> Optional[QAState]:
+		try:
+			snap = await self._graph.aget_state(self._cfg(session_id))
+			return self._values_from_snapshot(snap, session_id)
+		except Exception as e:
+			logger.error(f"aget_current_state error: {e}")
+			return None
+
+	def _values_from_snapshot(self, snap: Any, session_id: str) -> Optional[QAState]:
+		if snap and getattr(snap, "values", None):
+			logger.info(f"Found existing state for session {session_id}")
+			if hasattr(snap, 'next') and snap.next:
+				logger.info(f"Session {session_id} is at interrupt point, next nodes: {snap.next}")
+			return snap.values
+		logger.info(f"No existing state for session {session_id}")
+		return None
+
+	def _build_initial_state(
 		self, 
 		request_id: str, 
 		session_id: str, 
 		user_message: str
 	) -> QAState:
-		
-		initial_state = QAState(
+		return QAState(
 			request_id=request_id,
 			session_id=session_id,
 			user_message=user_message,
@@ -255,28 +417,71 @@ class QAGraph(BaseGraph):
 			invalid_menu_attempts=0
 		)
 
+	def new_state(
+		self, 
+		request_id: str, 
+		session_id: str, 
+		user_message: str
+	) -> QAState:
+		
+		initial_state = self._build_initial_state(request_id, session_id, user_message)
+
 		return self._graph.invoke(
 			input=initial_state, 
 			config=self._cfg(session_id)
 		)
+
+	async def anew_state(
+		self, 
+		request_id: str, 
+		session_id: str, 
+		user_message: str
+	) -> QAState:
+		
+		initial_state = self._build_initial_state(request_id, session_id, user_message)
+
+		return await self._graph.ainvoke(
+			input=initial_state, 
+			config=self._cfg(session_id)
+		)
 		
 	def get_interrupt_status(self, session_id: str) -> Dict[str, Any]:
 		"""Get detailed interrupt status for a session"""
 		try:
 			snap = self._graph.get_state(self._cfg(session_id))
-			if not snap:
-				return {"interrupted": False, "message": "No state found"}
-			
-			return {
-				"interrupted": bool(hasattr(snap, 'next') and snap.next),
-				"next_nodes": getattr(snap, 'next', []),
-				"current_state": snap.values if hasattr(snap, 'values') else None,
-				"waiting_for_user": bool(hasattr(snap, 'next') and snap.next)
-			}
+			return self._interrupt_status_from_snapshot(snap)
 		except Exception as e:
 			logger.error(f"Error getting interrupt status: {e}")
 			return {"interrupted": False, "error": str(e)}
 
+	async def aget_interrupt_status(self, session_id: str) -> Dict[str, Any]:
+		"""Async variant of get_interrupt_status"""
+		try:
+			snap = await self._graph.aget_state(self._cfg(session_id))
+			return self._interrupt_status_from_snapshot(snap)
+		except Exception as e:
+			logger.error(f"Error getting interrupt status: {e}")
+			return {"interrupted": False, "error": str(e)}
+
+	async def ais_write_continuation(self, session_id: str) -> bool:
+		"""True when the session is paused waiting for a confirmation answer (the next turn writes)"""
+		if self.async_mode:
+			snap = await self._graph.aget_state(self._cfg(session_id))
+		else:
+			snap = await asyncio.to_thread(self._graph.get_state, self._cfg(session_id))
+		return bool(snap and Nodes.PROCESS_CONFIRMATION in (getattr(snap, "next", None) or ()))
+
+	def _interrupt_status_from_snapshot(self, snap: Any) -> Dict[str, Any]:
+		if not snap:
+			return {"interrupted": False, "message": "No state found"}
+		
+		return {
+			"interrupted": bool(hasattr(snap, 'next') and snap.next),
+			"next_nodes": getattr(snap, 'next', []),
+			"current_state": snap.values if hasattr(snap, 'values') else None,
+			"waiting_for_user": bool(hasattr(snap, 'next') and snap.next)
+		}
+
 	def debug_graph_state(self, session_id: str) -> Dict[str, Any]:
 		"""Debug method to inspect full graph state"""
 		try:
@@ -308,17 +513,13 @@ class QAGraph(BaseGraph):
 		except Exception as e:
 			return {"error": str(e), "has_state": False}
 
-	def resume_state(
+	def _build_resumed_state(
 		self, 
 		request_id: str, 
 		session_id: str, 
 		user_message: str, 
 		retrieved: QAState
 	) -> QAState:
-		"""Resumption using interrupt-based flow control"""
-		
-		config = self._cfg(session_id)
-		
 		existing_messages = retrieved.get("messages") or []
 		updated_state = QAState(**retrieved)
 		updated_state["request_id"] = request_id
@@ -329,6 +530,21 @@ class QAGraph(BaseGraph):
 		phase = retrieved.get("phase", "")
 		
 		logger.info(f"Resume session {session_id}: node={current_node}, phase={phase}")
+
+		return updated_state
+
+	def resume_state(
+		self, 
+		request_id: str, 
+		session_id: str, 
+		user_message: str, 
+		retrieved: QAState
+	) -> QAState:
+		"""Resumption using interrupt-based flow control"""
+		
+		config = self._cfg(session_id)
+		
+		updated_state = self._build_resumed_state(request_id, session_id, user_message, retrieved)
 		
 		# if self._should_auto_verify(updated_state):
 		# 	logger.info("Auto-verification triggered during collection")
@@ -352,6 +568,177 @@ class QAGraph(BaseGraph):
 		logger.info("Non-interrupted session, continuing with normal flow")
 		return self._fallback_to_normal_flow(updated_state, config)
 
+	async def aresume_state(
+		self, 
+		request_id: str, 
+		session_id: str, 
+		user_message: str, 
+		retrieved: QAState
+	) -> QAState:
+		"""Async variant of resume_state"""
+		
+		config = self._cfg(session_id)
+		
+		updated_state = self._build_resumed_state(request_id, session_id, user_message, retrieved)
+		
+		interrupt_status = await self.aget_interrupt_status(session_id)
+		
+		if interrupt_status.get("interrupted"):
+			next_nodes = interrupt_status.get("next_nodes", [])
+			logger.info(f"Resuming from interrupt, next nodes: {next_nodes}")
+			
+			await self._graph.aupdate_state(config=config, values=updated_state)
+			
+			return await self._graph.ainvoke(input=None, config=config)
+		
+		logger.info("Non-interrupted session, continuing with normal flow")
+		return await self._afallback_to_normal_flow(updated_state, config)
+
+	def _run_turn(
+		self, 
+		request_id: str, 
+		session_id: str,
+		user_message: str
+	) -> QAState:
+		with metrics.timer("request.graph.load_state"):
+			existing = self.get_current_state(session_id)
+
+		with metrics.timer("request.graph.execute"):
+			if existing:
+				logger.info(f"Resuming session {session_id}")
+				return self.resume_state(request_id, session_id, user_message, existing)
+			logger.info(f"Starting new session {session_id}")
+			return self.new_state(request_id, session_id, user_message)
+
+	async def _arun_turn(
+		self, 
+		request_id: str, 
+		session_id: str,
+		user_message: str
+	) -> QAState:
+		if self._graph is None:
+			raise RuntimeError("QAGraph is in async mode; call `await setup()` before use")
+
+		with metrics.timer("request.graph.load_state"):
+			existing = await self.aget_current_state(session_id)
+
+		with metrics.timer("request.graph.execute"):
+			if existing:
+				logger.info(f"Resuming session {session_id}")
+				return await self.aresume_state(request_id, session_id, user_message, existing)
+			logger.info(f"Starting new session {session_id}")
+			return await self.anew_state(request_id, session_id, user_message)
+
+	def _prepare_turn_input(
+		self, 
+		request_id: str, 
+		session_id: str, 
+		user_message: str
+	) -> Optional[QAState]:
+		"""Graph input for the next turn; None means resume from the pending interrupt"""
+		existing = self.get_current_state(session_id)
+		if not existing:
+			return self._build_initial_state(request_id, session_id, user_message)
+
+		updated_state = self._build_resumed_state(request_id, session_id, user_message, existing)
+		if self.get_interrupt_status(session_id).get("interrupted"):
+			self._graph.update_state(config=self._cfg(session_id), values=updated_state)
+			return None
+		return updated_state
+
+	async def _aprepare_turn_input(
+		self, 
+		request_id: str, 
+		session_id: str, 
+		user_message: str
+	) -> Optional[QAState]:
+		existing = await self.aget_current_state(session_id)
+		if not existing:
+			return self._build_initial_state(request_id, session_id, user_message)
+
+		updated_state = self._build_resumed_state(request_id, session_id, user_message, existing)
+		if (await self.aget_interrupt_status(session_id)).get("interrupted"):
+			await self._graph.aupdate_state(config=self._cfg(session_id), values=updated_state)
+			return None
+		return updated_state
+
+	def _stream_sync(
+		self, 
+		request_id: str, 
+		session_id: str, 
+		user_message: str
+	) -> Iterator[Tuple[str, Any]]:
+		graph_input = self._prepare_turn_input(request_id, session_id, user_message)
+		yield from self._graph.stream(
+			input=graph_input, 
+			config=self._cfg(session_id), 
+			stream_mode=STREAM_MODES
+		)
+
+	async def _astream_raw(
+		self, 
+		request_id: str, 
+		session_id: str, 
+		user_message: str
+	) -> AsyncIterator[Tuple[str, Any]]:
+		if not self.async_mode:
+			async for item in aiter_in_thread(
+				lambda: self._stream_sync(request_id, session_id, user_message)
+			):
+				yield item
+			return
+
+		if self._graph is None:
+			raise RuntimeError("QAGraph is in async mode; call `await setup()` before use")
+
+		graph_input = await self._aprepare_turn_input(request_id, session_id, user_message)
+		async for item in self._graph.astream(
+			input=graph_input, 
+			config=self._cfg(session_id), 
+			stream_mode=STREAM_MODES
+		):
+			yield item
+
+	async def astream_turn(
+		self, 
+		user_message: str, 
+		request_id: str, 
+		session_id: str
+	) -> AsyncIterator[Dict[str, Any]]:
+		"""
+		Run one turn and yield progress events as they happen: node start/end,
+		LLM text tokens from QA_ANSWER/CLARIFICATION, and a final event
+		carrying the resulting state.
+		"""
+		translator = GraphEventTranslator()
+
+		async with self._turns.session(session_id):
+			with track_turn_usage(session_id) as usage, metrics.timer("request.graph.stream"):
+				async for item in self._astream_raw(request_id, session_id, user_message):
+					for event in translator.translate(item):
+						yield event
+			self._publish_turn_usage(usage)
+
+			if self.async_mode:
+				state = await self.aget_current_state(session_id)
+			else:
+				state = await asyncio.to_thread(self.get_current_state, session_id)
+
+		yield {"type": StreamEventTypes.FINAL.value, "state": state or {}}
+
+	def _publish_turn_usage(self, usage: TurnUsage) -> None:
+		mode = self.understanding_mode
+		metrics.observe(f"graph.turn.llm_calls.{mode}", usage.llm_calls)
+		metrics.observe(f"graph.turn.tokens.input.{mode}", usage.input_tokens)
+		metrics.observe(f"graph.turn.tokens.output.{mode}", usage.output_tokens)
+		for service_name, calls in usage.calls_by_service.items():
+			metrics.increment(f"graph.turn.llm_calls.{mode}.{service_name}", calls)
+		logger.info(
+			f"[TOKENS] session={usage.session_id} mode={mode} calls={usage.llm_calls} "
+			f"input={usage.input_tokens} output={usage.output_tokens} "
+			f"by_node={usage.tokens_by_node} by_service={usage.tokens_by_service}"
+		)
+
 	async def __call__(
 		self, 
 		user_message: str, 
@@ -363,13 +750,21 @@ class QAGraph(BaseGraph):
 			session_id = str(UUIDHandler.new_uuid())
 			logger.info(f"Generated new session_id: {session_id}")
 
-		existing = self.get_current_state(session_id)
-		if existing:
-			logger.info(f"Resuming session {session_id}")
-			state = self.resume_state(request_id, session_id, user_message, existing)
-		else:
-			logger.info(f"Starting new session {session_id}")
-			state = self.new_state(request_id, session_id, user_message)
+		async def turn() -> QAState:
+			with track_turn_usage(session_id) as usage:
+				if self.async_mode:
+					state = await self._arun_turn(request_id, session_id, user_message)
+				else:
+					# Blocking checkpoint, database and LLM calls run off the loop so concurrent
+					# turns overlap; the copied context keeps the turn usage visible to them
+					state = await asyncio.to_thread(
+						contextvars.copy_context().run,
+						self._run_turn, request_id, session_id, user_message
+					)
+			self._publish_turn_usage(usage)
+			return state
+
+		state = await self._turns.run(session_id, user_message, turn)
 
 		logger.info(f"Final state for session {session_id}:")
 		logger.info(f"  - current_node: {state.get('current_node')}")
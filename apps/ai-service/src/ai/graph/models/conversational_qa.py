@@ -156,6 +156,21 @@ class ConversationIntentModel(BaseModel):
     raw_query: str = Field(description="The original user query")
 
 
+class BatchIntentItemModel(BaseModel):
+    """Classification of one message inside a batched intent call"""
+    message_id: int = Field(description="The [id] of the message this classification belongs to")
+    user_intent: UserIntentModel
+    verification_info: Optional[VerificationInfoModel] = None
+    appointment_info: Optional[AppointmentInfoModel] = None
+
+
+class BatchIntentModel(BaseModel):
+    """Intent classifications for several independent user messages in one call"""
+    classifications: List[BatchIntentItemModel] = Field(
+        description="Exactly one classification per message, each with its message_id"
+    )
+
+
 class AppointmentConfirmationResponse(BaseModel):
     """
     Structured response for appointment confirmation classification.
@@ -195,4 +210,29 @@ class ClarificationPromptModel(BaseModel):
     clarification_prompt: str = Field(
         ...,
         description="Clarification prompt asking user for more details"
-    )
\ No newline at end of file
+    )
+
+class TurnUnderstandingModel(BaseModel):
+    """
+    Fused single-call understanding of a user turn: intent, extracted entities,
+    the candidate appointment among those already loaded, and a draft
+    clarification for downstream nodes to use instead of their own LLM calls.
+    """
+    user_intent: UserIntentModel
+    verification_info: Optional[VerificationInfoModel] = None
+    appointment_info: Optional[AppointmentInfoModel] = None
+    candidate_appointment_id: Optional[str] = Field(
+        None,
+        description="ID of the listed appointment the user refers to, or null if none is clearly identified"
+    )
+    candidate_confidence: Optional[float] = Field(
+        None,
+        ge=0.0,
+        le=1.0,
+        description="Confidence that candidate_appointment_id is the appointment the user means"
+    )
+    clarification_draft: Optional[str] = Field(
+        None,
+        description="Short message asking for the details still missing to complete the request, or null if nothing is missing"
+    )
+    raw_query: str = Field(description="The original user query")
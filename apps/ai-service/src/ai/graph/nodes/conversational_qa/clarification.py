@@ -1,4 +1,4 @@
-from typing import List, Dict, Optional
+from typing import Any, List, Dict, Optional, Tuple
 
 from ...states.conversational_qa import QAState, StateKeys
 from ...types.conversational_qa import (
@@ -6,16 +6,24 @@ from ...types.conversational_qa import (
 	Routes, 
 	MessageKeys
 )
-from ...models.conversational_qa import VerificationInfoModel, AppointmentInfoModel
+from ...models.conversational_qa import (
+	VerificationInfoModel,
+	AppointmentInfoModel,
+	TurnUnderstandingModel
+)
 from ...services.conversational_qa import ClarificationService
+from infrastructure.metrics import MetricsRegistry
 from utils import Logger
 
 logger = Logger(__name__)
+metrics = MetricsRegistry()
 
 
 class ClarificationNode:
 	"""Node for generating clarification prompts."""
 	
+	DRAFTABLE_REASONS = {"no_info_provided", "incomplete_info"}
+	
 	def __init__(self, clarification_service: ClarificationService):
 		self.clarification_service = clarification_service
 	
@@ -23,61 +31,123 @@ class ClarificationNode:
 		try:
 			logger.info("[NODE] ClarificationNode")
 			
-			current_node = state.get(StateKeys.CURRENT_NODE)
-			route = state.get(StateKeys.ROUTE)
-			user_message = state.get(StateKeys.USER_MESSAGE, "")
-			messages = state.get(StateKeys.MESSAGES, [])
-
-			conversation_context = self._build_conversation_context(messages)
-			if current_node == Nodes.VERIFICATION_PATIENT:
-				verification_info = state.get(StateKeys.USER_INFO)
-				diagnostic_info = state.get(StateKeys.VERIFICATION_DIAGNOSTICS)
-				
-				system_prompt = self.clarification_service.user_run(
-					verification_info=verification_info,
-					diagnostic_info=diagnostic_info,
-					conversation_context=conversation_context
-				)
-
-				state[StateKeys.VERIFICATION_DIAGNOSTICS] = None
-				
-			elif current_node == Nodes.VERIFICATION_APPOINTMENT:
-				appointment_info = state.get(StateKeys.APPOINTMENT_INFO)
-				diagnostic_info = state.get(StateKeys.APPOINTMENT_DIAGNOSTICS)
-				
-				system_prompt = self.clarification_service.appointment_run(
-					appointment_info=appointment_info,
-					diagnostic_info=diagnostic_info,
-					conversation_context=conversation_context
-				)
-
-				state[StateKeys.APPOINTMENT_DIAGNOSTICS] = None
-			
-			elif route == Routes.INTENT_WAIT and current_node == Nodes.ACTION_ROUTER:
-				appointment_info = state.get(StateKeys.APPOINTMENT_INFO)
-				system_prompt = self.clarification_service.appointment_wait(
-					appointment_info=appointment_info
-				)
-			
+			scenario, kwargs = self._select_scenario(state)
+			draft = self._fused_draft(state, kwargs)
+			if draft:
+				system_prompt = draft
+			elif scenario == Nodes.VERIFICATION_PATIENT:
+				system_prompt = self.clarification_service.user_run(**kwargs)
+			elif scenario == Nodes.VERIFICATION_APPOINTMENT:
+				system_prompt = self.clarification_service.appointment_run(**kwargs)
 			else:
-				logger.warning(f"Unhandled clarification scenario: {current_node}, {route}")
-				system_prompt = "Could you please provide more information?"
+				system_prompt = self._static_prompt(state)
+			
+			return self._apply_prompt(state, scenario, system_prompt)
 			
-			state[StateKeys.CURRENT_NODE] = Nodes.CLARIFICATION
-			state[StateKeys.MESSAGES] = messages + [
-				{
-					MessageKeys.USER_MESSAGE: user_message,
-					MessageKeys.SYSTEM_MESSAGE: system_prompt
-				}
-			]
+		except Exception as e:
+			logger.error(f"Error in ClarificationNode: {e}", exc_info=True)
+			raise
+
+	async def acall(self, state: QAState) -> QAState:
+		try:
+			logger.info("[NODE] ClarificationNode (async)")
 			
-			logger.info(" ... Clarification prompt generated")
+			scenario, kwargs = self._select_scenario(state)
+			draft = self._fused_draft(state, kwargs)
+			if draft:
+				system_prompt = draft
+			elif scenario == Nodes.VERIFICATION_PATIENT:
+				system_prompt = await self.clarification_service.auser_run(**kwargs)
+			elif scenario == Nodes.VERIFICATION_APPOINTMENT:
+				system_prompt = await self.clarification_service.aappointment_run(**kwargs)
+			else:
+				system_prompt = self._static_prompt(state)
 			
-			return state
+			return self._apply_prompt(state, scenario, system_prompt)
 			
 		except Exception as e:
 			logger.error(f"Error in ClarificationNode: {e}", exc_info=True)
 			raise
+
+	def _select_scenario(self, state: QAState) -> Tuple[Optional[Nodes], Dict[str, Any]]:
+		"""Pick the clarification scenario and the service arguments for it."""
+		current_node = state.get(StateKeys.CURRENT_NODE)
+		messages = state.get(StateKeys.MESSAGES, [])
+		conversation_context = self._build_conversation_context(messages)
+
+		if current_node == Nodes.VERIFICATION_PATIENT:
+			return current_node, {
+				"verification_info": state.get(StateKeys.USER_INFO),
+				"diagnostic_info": state.get(StateKeys.VERIFICATION_DIAGNOSTICS),
+				"conversation_context": conversation_context
+			}
+		
+		if current_node == Nodes.VERIFICATION_APPOINTMENT:
+			return current_node, {
+				"appointment_info": state.get(StateKeys.APPOINTMENT_INFO),
+				"diagnostic_info": state.get(StateKeys.APPOINTMENT_DIAGNOSTICS),
+				"conversation_context": conversation_context
+			}
+		
+		return None, {}
+
+	def _fused_draft(self, state: QAState, kwargs: Dict[str, Any]) -> Optional[str]:
+		"""
+		Draft written by the fused understanding call, usable only when the
+		verification failed for missing details; the call ran before any
+		database lookup, so it cannot explain mismatches.
+		"""
+		understanding: Optional[TurnUnderstandingModel] = state.get(StateKeys.TURN_UNDERSTANDING)
+		if not understanding or not understanding.clarification_draft or not kwargs:
+			return None
+		
+		diagnostic_info = kwargs.get("diagnostic_info") or {}
+		if diagnostic_info.get("reason", "incomplete_info") not in self.DRAFTABLE_REASONS:
+			metrics.increment("clarification.fused_draft.skipped")
+			return None
+		
+		metrics.increment("clarification.fused_draft.used")
+		logger.info(" ... Using fused clarification draft")
+		return understanding.clarification_draft
+
+	def _static_prompt(self, state: QAState) -> str:
+		current_node = state.get(StateKeys.CURRENT_NODE)
+		route = state.get(StateKeys.ROUTE)
+
+		if route == Routes.INTENT_WAIT and current_node == Nodes.ACTION_ROUTER:
+			appointment_info = state.get(StateKeys.APPOINTMENT_INFO)
+			return self.clarification_service.appointment_wait(
+				appointment_info=appointment_info
+			)
+		
+		logger.warning(f"Unhandled clarification scenario: {current_node}, {route}")
+		return "Could you please provide more information?"
+
+	def _apply_prompt(
+		self,
+		state: QAState,
+		scenario: Optional[Nodes],
+		system_prompt: str
+	) -> QAState:
+		user_message = state.get(StateKeys.USER_MESSAGE, "")
+		messages = state.get(StateKeys.MESSAGES, [])
+
+		if scenario == Nodes.VERIFICATION_PATIENT:
+			state[StateKeys.VERIFICATION_DIAGNOSTICS] = None
+		elif scenario == Nodes.VERIFICATION_APPOINTMENT:
+			state[StateKeys.APPOINTMENT_DIAGNOSTICS] = None
+		
+		state[StateKeys.CURRENT_NODE] = Nodes.CLARIFICATION
+		state[StateKeys.MESSAGES] = messages + [
+			{
+				MessageKeys.USER_MESSAGE: user_message,
+				MessageKeys.SYSTEM_MESSAGE: system_prompt
+			}
+		]
+		
+		logger.info(" ... Clarification prompt generated")
+		
+		return state
 	
 	def _build_conversation_context(self, messages: List[Dict]) -> str:
 		"""
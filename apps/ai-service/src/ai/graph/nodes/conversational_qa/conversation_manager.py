@@ -5,7 +5,12 @@ from typing import (
 )
 
 from ...states.conversational_qa import QAState, StateKeys
-from ...services.conversational_qa import IntentService
+from ...services.conversational_qa import (
+	IntentService,
+	TurnUnderstandingService,
+	SpeculativePrefetcher,
+	LocalIntentService
+)
 from ...types.conversational_qa import (
 	Nodes,
 	Routes, 
@@ -13,6 +18,7 @@ from ...types.conversational_qa import (
 )
 from ...models.conversational_qa import (
 	ConversationIntentModel,
+	TurnUnderstandingModel,
 	VerificationInfoModel,
 	AppointmentInfoModel
 )
@@ -39,19 +45,118 @@ class ConversationManagerNode:
 	
 	def __init__(
 		self,
-		intent_service: IntentService
+		intent_service: IntentService,
+		turn_understanding_service: Optional[TurnUnderstandingService] = None,
+		prefetcher: Optional[SpeculativePrefetcher] = None,
+		local_intent_service: Optional[LocalIntentService] = None
 	) -> None:
+		"""
+		With `turn_understanding_service` set (fused mode) the turn is understood
+		in one call whose candidate appointment and draft clarification are left
+		in state for VerificationAppointmentNode and ClarificationNode; the
+		IntentService is then only used if the fused call fails.
+		
+		With `prefetcher` set, the patient lookup / appointment reload the turn
+		will probably need starts before the intent call and runs alongside it.
+		
+		With `local_intent_service` set, a confident local classification
+		answers the turn before any LLM call is made.
+		"""
 		self.intent_service = intent_service
+		self.turn_understanding_service = turn_understanding_service
+		self.prefetcher = prefetcher
+		self.local_intent_service = local_intent_service
 	
 	def __call__(self, state: QAState) -> QAState:
 		logger.info("[NODE] ConversationManagerNode")
+		self._start_prefetch(state)
+		
+		local_result = self._classify_locally(state)
+		if local_result is not None:
+			state[StateKeys.TURN_UNDERSTANDING] = None
+			return self._apply_intent(state=state, intent_result=local_result)
+		
+		understanding: Optional[TurnUnderstandingModel] = None
+		if self.turn_understanding_service is not None:
+			understanding = self.turn_understanding_service.run(state=state)
+		
+		if understanding is not None:
+			intent_result = self._intent_from_understanding(understanding)
+		else:
+			# Get intent from service
+			intent_result: ConversationIntentModel = self.intent_service.run(state=state)
+		
+		state[StateKeys.TURN_UNDERSTANDING] = understanding
+		return self._apply_intent(state=state, intent_result=intent_result)
+
+	async def acall(self, state: QAState) -> QAState:
+		logger.info("[NODE] ConversationManagerNode (async)")
+		self._start_prefetch(state)
+		
+		local_result = self._classify_locally(state)
+		if local_result is not None:
+			state[StateKeys.TURN_UNDERSTANDING] = None
+			return self._apply_intent(state=state, intent_result=local_result)
+		
+		understanding: Optional[TurnUnderstandingModel] = None
+		if self.turn_understanding_service is not None:
+			understanding = await self.turn_understanding_service.arun(state=state)
+		
+		if understanding is not None:
+			intent_result = self._intent_from_understanding(understanding)
+		else:
+			intent_result: ConversationIntentModel = await self.intent_service.arun(state=state)
+		
+		state[StateKeys.TURN_UNDERSTANDING] = understanding
+		return self._apply_intent(state=state, intent_result=intent_result)
+
+	def _start_prefetch(self, state: QAState) -> None:
+		""" Speculative database reads run on the prefetcher's threads while the intent LLM call is in flight. """
+		if self.prefetcher is None:
+			return
+		try:
+			self.prefetcher.start_turn(
+				session_id=state.get(StateKeys.SESSION_ID),
+				user_message=state.get(StateKeys.USER_MESSAGE, ""),
+				is_verified=state.get(StateKeys.IS_VERIFIED, False),
+				user_info=state.get(StateKeys.USER_INFO),
+				user_record=state.get(StateKeys.USER_RECORD),
+				appointments=state.get(StateKeys.APPOINTMENTS)
+			)
+		except Exception as e:
+			logger.warning(f" ... Speculative prefetch not started: {e}")
+
+	def _classify_locally(self, state: QAState) -> Optional[ConversationIntentModel]:
+		""" Microsecond-scale first tier; None means the LLM has to classify this turn. """
+		if self.local_intent_service is None:
+			return None
+		try:
+			return self.local_intent_service.run(state=state)
+		except Exception as e:
+			logger.warning(f" ... Local intent classifier failed, using the LLM: {e}")
+			return None
+
+	def _intent_from_understanding(
+		self,
+		understanding: TurnUnderstandingModel
+	) -> ConversationIntentModel:
+		return ConversationIntentModel(
+			user_intent=understanding.user_intent,
+			verification_info=understanding.verification_info,
+			appointment_info=understanding.appointment_info,
+			raw_query=understanding.raw_query
+		)
+
+	def _apply_intent(
+		self,
+		state: QAState,
+		intent_result: ConversationIntentModel
+	) -> QAState:
 		is_verified = state.get(StateKeys.IS_VERIFIED, False)
 		user_info = state.get(StateKeys.USER_INFO)
 		appointment_info = state.get(StateKeys.APPOINTMENT_INFO)
 		current_intent = state.get(StateKeys.CURRENT_INTENT)
 		
-		# Get intent from service
-		intent_result: ConversationIntentModel = self.intent_service.run(state=state)
 		user_intent = intent_result.user_intent.intent_type
 		
 		# Update current intent
@@ -1,4 +1,5 @@
-from typing import Dict, Optional
+import asyncio
+from typing import Dict, Optional, Tuple
 
 from ...states.conversational_qa import QAState, StateKeys
 from ...types.conversational_qa import (
@@ -44,54 +45,108 @@ class ProcessConfirmationNode:
 		try:
 			logger.info("[NODE] ProcessConfirmationNode")
 			
-			appointment_record: Optional[AppointmentInfoModel] = state.get(
-				StateKeys.APPOINTMENT_RECORD
-			)
-			user_message: str = state.get(StateKeys.USER_MESSAGE, "")
-			current_intent: Optional[IntentType] = state.get(StateKeys.CURRENT_INTENT)
-			
-			self._validate_state(appointment_record, current_intent)
-			
-			appointment_id = appointment_record.appointment_id
+			appointment_record, user_message, current_intent = self._read_state(state)
 			
 			confirmation_result: AppointmentConfirmationResponse = (
-				self.process_confirmation_service.run(user_message=user_message)
+				self.process_confirmation_service.run(
+					user_message=user_message,
+					pending_action=current_intent
+				)
 			)
-			confirmation_intent = confirmation_result.intent
-			
-			logger.info(f" ... Confirmation intent: {confirmation_intent}")
 			
-			route = self._determine_route(confirmation_intent)
-			
-			if confirmation_intent == ConfirmationIntent.CONFIRM:
+			if confirmation_result.intent == ConfirmationIntent.CONFIRM:
 				self._handle_confirmation(
-					appointment_id=appointment_id,
+					appointment_id=appointment_record.appointment_id,
 					current_intent=current_intent
 				)
-				state[StateKeys.APPOINTMENTS] = []
-				state[StateKeys.APPOINTMENT_INFO] = None
-				state[StateKeys.APPOINTMENT_RECORD] = None
-				
-				logger.info(" ... Cleared appointments from state after confirmation")
-			elif confirmation_intent == ConfirmationIntent.REJECT:
-				self._handle_rejection(appointment_id)
-				state[StateKeys.APPOINTMENT_INFO] = None
-			else:
-				self._handle_unclear_response(confirmation_intent)
 			
-			state[StateKeys.CONFIRMATION_INTENT] = confirmation_result
-			state[StateKeys.ROUTE] = route
-			state[StateKeys.CURRENT_NODE] = Nodes.PROCESS_CONFIRMATION
+			return self._apply_confirmation(
+				state=state,
+				confirmation_result=confirmation_result,
+				appointment_id=appointment_record.appointment_id
+			)
 			
-			state[StateKeys.APPOINTMENT_RECORD] = None
+		except Exception as e:
+			logger.error(f"Error in ProcessConfirmationNode: {e}", exc_info=True)
+			raise
+
+	async def acall(self, state: QAState) -> QAState:
+		try:
+			logger.info("[NODE] ProcessConfirmationNode (async)")
 			
-			logger.info(f" ... Route set to: {route}")
+			appointment_record, user_message, current_intent = self._read_state(state)
+			
+			confirmation_result: AppointmentConfirmationResponse = (
+				await self.process_confirmation_service.arun(
+					user_message=user_message,
+					pending_action=current_intent
+				)
+			)
+			
+			if confirmation_result.intent == ConfirmationIntent.CONFIRM:
+				await asyncio.to_thread(
+					self._handle_confirmation,
+					appointment_id=appointment_record.appointment_id,
+					current_intent=current_intent
+				)
 			
-			return state
+			return self._apply_confirmation(
+				state=state,
+				confirmation_result=confirmation_result,
+				appointment_id=appointment_record.appointment_id
+			)
 			
 		except Exception as e:
 			logger.error(f"Error in ProcessConfirmationNode: {e}", exc_info=True)
 			raise
+
+	def _read_state(
+		self,
+		state: QAState
+	) -> Tuple[AppointmentInfoModel, str, IntentType]:
+		appointment_record: Optional[AppointmentInfoModel] = state.get(
+			StateKeys.APPOINTMENT_RECORD
+		)
+		user_message: str = state.get(StateKeys.USER_MESSAGE, "")
+		current_intent: Optional[IntentType] = state.get(StateKeys.CURRENT_INTENT)
+		
+		self._validate_state(appointment_record, current_intent)
+		
+		return appointment_record, user_message, current_intent
+
+	def _apply_confirmation(
+		self,
+		state: QAState,
+		confirmation_result: AppointmentConfirmationResponse,
+		appointment_id: str
+	) -> QAState:
+		confirmation_intent = confirmation_result.intent
+		
+		logger.info(f" ... Confirmation intent: {confirmation_intent}")
+		
+		route = self._determine_route(confirmation_intent)
+		
+		if confirmation_intent == ConfirmationIntent.CONFIRM:
+			state[StateKeys.APPOINTMENTS] = []
+			state[StateKeys.APPOINTMENT_INFO] = None
+			state[StateKeys.APPOINTMENT_RECORD] = None
+			
+			logger.info(" ... Cleared appointments from state after confirmation")
+		elif confirmation_intent == ConfirmationIntent.REJECT:
+			self._handle_rejection(appointment_id)
+			state[StateKeys.APPOINTMENT_INFO] = None
+		else:
+			self._handle_unclear_response(confirmation_intent)
+		
+		state[StateKeys.CONFIRMATION_INTENT] = confirmation_result
+		state[StateKeys.ROUTE] = route
+		state[StateKeys.CURRENT_NODE] = Nodes.PROCESS_CONFIRMATION
+		
+		state[StateKeys.APPOINTMENT_RECORD] = None
+		
+		logger.info(f" ... Route set to: {route}")
+		
+		return state
 	
 	def _validate_state(
 		self,
@@ -20,23 +20,38 @@ class QAAnswerNode:
 		try:
 			logger.info("[NODE] QAAnswerNode")
 			
-			user_message = state.get(StateKeys.USER_MESSAGE, "")
-			messages = state.get(StateKeys.MESSAGES, [])
-			
 			qa_result: QAAnswerModel = self.qa_service.run(state=state)
 			
-			qa_answer = qa_result.qa_answer
+			return self._apply_answer(state=state, qa_result=qa_result)
+			
+		except Exception as e:
+			logger.error(f"Error in QAAnswerNode: {e}", exc_info=True)
+			raise
 
-			state[StateKeys.MESSAGES] = messages + [
-				{
-					MessageKeys.USER_MESSAGE: user_message,
-					MessageKeys.SYSTEM_MESSAGE: qa_answer
-				}
-			]
-			state[StateKeys.CURRENT_NODE] = Nodes.QA_ANSWER
+	async def acall(self, state: QAState) -> QAState:
+		try:
+			logger.info("[NODE] QAAnswerNode (async)")
+			
+			qa_result: QAAnswerModel = await self.qa_service.arun(state=state)
 			
-			return state
+			return self._apply_answer(state=state, qa_result=qa_result)
 			
 		except Exception as e:
 			logger.error(f"Error in QAAnswerNode: {e}", exc_info=True)
 			raise
+
+	def _apply_answer(self, state: QAState, qa_result: QAAnswerModel) -> QAState:
+		user_message = state.get(StateKeys.USER_MESSAGE, "")
+		messages = state.get(StateKeys.MESSAGES, [])
+		
+		qa_answer = qa_result.qa_answer
+
+		state[StateKeys.MESSAGES] = messages + [
+			{
+				MessageKeys.USER_MESSAGE: user_message,
+				MessageKeys.SYSTEM_MESSAGE: qa_answer
+			}
+		]
+		state[StateKeys.CURRENT_NODE] = Nodes.QA_ANSWER
+		
+		return state
@@ -1,3 +1,4 @@
+import asyncio
 from typing import Dict, List, Optional, Tuple
 
 from ...states.conversational_qa import QAState, StateKeys
@@ -6,12 +7,17 @@ from ...types.conversational_qa import (
 	Nodes,
 	IntentType
 )
-from ...services.conversational_qa import QueryORMService, AppointmentMatchService
+from ...services.conversational_qa import (
+	QueryORMService,
+	AppointmentMatchService,
+	SpeculativePrefetcher
+)
 from ...models.conversational_qa import (
 	VerificationRecordModel, 
 	AppointmentRecordModel,
 	AppointmentInfoModel,
-	AppointmentMatchModel
+	AppointmentMatchModel,
+	TurnUnderstandingModel
 )
 from utils import Logger
 
@@ -27,6 +33,7 @@ class VerificationAppointmentNode:
 	"""
 	
 	MIN_REQUIRED_FIELDS = 1
+	MIN_CANDIDATE_CONFIDENCE = 0.7
 	
 	APPOINTMENT_ACTION_INTENTS = {
 		IntentType.CONFIRM_APPOINTMENT,
@@ -44,7 +51,8 @@ class VerificationAppointmentNode:
 	def __init__(
 		self,
 		query_orm_service: QueryORMService,
-		appointment_match_service: AppointmentMatchService
+		appointment_match_service: AppointmentMatchService,
+		prefetcher: Optional[SpeculativePrefetcher] = None
 	) -> None:
 		"""
 		Initialize VerificationAppointmentNode.
@@ -52,68 +60,173 @@ class VerificationAppointmentNode:
 		Args:
 			query_orm_service: Service for database operations
 			appointment_match_service: Service for intelligent appointment matching
+			prefetcher: Holds appointment reloads started during intent classification
 		"""
 		self.query_orm_service = query_orm_service
 		self.appointment_match_service = appointment_match_service
+		self.prefetcher = prefetcher
 	
 	def __call__(self, state: QAState) -> QAState:
 		""" Verify appointment information and determine appropriate route. """
 		try:
 			logger.info("[NODE] VerificationAppointmentNode")
 			
-			appointment_info: Optional[AppointmentInfoModel] = state.get(
-				StateKeys.APPOINTMENT_INFO
-			)
-			appointment_record: Optional[AppointmentRecordModel] = state.get(
-				StateKeys.APPOINTMENT_RECORD
-			)
-			appointments: List[Dict] = state.get(StateKeys.APPOINTMENTS, [])
-			user_record: Optional[VerificationRecordModel] = state.get(
-				StateKeys.USER_RECORD
+			appointment_info, appointment_record, appointments, user_record, current_intent = (
+				self._read_state(state)
 			)
-			current_intent: Optional[IntentType] = state.get(StateKeys.CURRENT_INTENT)			
-
-			self._validate_state(user_record, current_intent)
 			
 			if not appointments:
 				appointments = self._load_appointments(state, user_record)
 			
-			logger.info(
-				f" ... Current intent: {current_intent}, "
-				f"Appointments count: {len(appointments)}"
-			)
+			match_result: Optional[AppointmentMatchModel] = None
+			if self._requires_match(current_intent, appointment_info, appointment_record, appointments):
+				match_result = self.appointment_match_service.run(
+					appointments=appointments,
+					appointment_info=appointment_info,
+					candidate_id=self._fused_candidate_id(state)
+				)
 			
-			route, diagnostic_info = self._determine_route_with_diagnostics(
+			return self._apply_verification(
+				state=state,
 				current_intent=current_intent,
 				appointment_info=appointment_info,
 				appointment_record=appointment_record,
 				appointments=appointments,
-				state=state
+				match_result=match_result
 			)
 			
-			if route == Routes.VERIFIED:
-				logger.info(" ... Appointment verified successfully")
-			else:
-				if diagnostic_info:
-					state[StateKeys.APPOINTMENT_DIAGNOSTICS] = diagnostic_info
-					logger.info(
-						f" ... Verification failed: {diagnostic_info.get('reason')} - "
-						f"{diagnostic_info.get('message')}"
-					)
-					
-					self._update_state_by_diagnostics(state, diagnostic_info)
+		except Exception as e:
+			logger.error(f"Error in VerificationAppointmentNode: {e}", exc_info=True)
+			raise
+
+	async def acall(self, state: QAState) -> QAState:
+		""" Async variant: database work runs off the loop, matching uses the async LLM path. """
+		try:
+			logger.info("[NODE] VerificationAppointmentNode (async)")
 			
-			state[StateKeys.CURRENT_NODE] = Nodes.VERIFICATION_APPOINTMENT
-			state[StateKeys.ROUTE] = route
+			appointment_info, appointment_record, appointments, user_record, current_intent = (
+				self._read_state(state)
+			)
 			
-			logger.info(f" ... Route set to: {route}")
+			if not appointments:
+				appointments = await asyncio.to_thread(
+					self._load_appointments, state, user_record
+				)
 			
-			return state
+			match_result: Optional[AppointmentMatchModel] = None
+			if self._requires_match(current_intent, appointment_info, appointment_record, appointments):
+				match_result = await self.appointment_match_service.arun(
+					appointments=appointments,
+					appointment_info=appointment_info,
+					candidate_id=self._fused_candidate_id(state)
+				)
+			
+			return self._apply_verification(
+				state=state,
+				current_intent=current_intent,
+				appointment_info=appointment_info,
+				appointment_record=appointment_record,
+				appointments=appointments,
+				match_result=match_result
+			)
 			
 		except Exception as e:
 			logger.error(f"Error in VerificationAppointmentNode: {e}", exc_info=True)
 			raise
 
+	def _read_state(
+		self,
+		state: QAState
+	) -> Tuple[
+		Optional[AppointmentInfoModel],
+		Optional[AppointmentRecordModel],
+		List[Dict],
+		VerificationRecordModel,
+		IntentType
+	]:
+		appointment_info: Optional[AppointmentInfoModel] = state.get(
+			StateKeys.APPOINTMENT_INFO
+		)
+		appointment_record: Optional[AppointmentRecordModel] = state.get(
+			StateKeys.APPOINTMENT_RECORD
+		)
+		appointments: List[Dict] = state.get(StateKeys.APPOINTMENTS, [])
+		user_record: Optional[VerificationRecordModel] = state.get(
+			StateKeys.USER_RECORD
+		)
+		current_intent: Optional[IntentType] = state.get(StateKeys.CURRENT_INTENT)			
+
+		self._validate_state(user_record, current_intent)
+
+		return appointment_info, appointment_record, appointments, user_record, current_intent
+
+	def _fused_candidate_id(self, state: QAState) -> Optional[str]:
+		""" Appointment id picked by the fused understanding call this turn, if confident enough. """
+		understanding: Optional[TurnUnderstandingModel] = state.get(StateKeys.TURN_UNDERSTANDING)
+		if not understanding or not understanding.candidate_appointment_id:
+			return None
+		if (understanding.candidate_confidence or 0.0) < self.MIN_CANDIDATE_CONFIDENCE:
+			logger.info(" ... Fused candidate appointment below confidence threshold, ignoring it")
+			return None
+		return understanding.candidate_appointment_id
+
+	def _requires_match(
+		self,
+		current_intent: IntentType,
+		appointment_info: Optional[AppointmentInfoModel],
+		appointment_record: Optional[AppointmentRecordModel],
+		appointments: List[Dict]
+	) -> bool:
+		""" Mirror the gates of _verify_appointment_with_diagnostics that lead to matching. """
+		if current_intent not in self.APPOINTMENT_ACTION_INTENTS:
+			return False
+		if not appointments or not appointment_info or appointment_record:
+			return False
+		filled = len(self.APPOINTMENT_FIELDS) - len(self._get_incomplete_fields(appointment_info))
+		return filled >= self.MIN_REQUIRED_FIELDS
+
+	def _apply_verification(
+		self,
+		state: QAState,
+		current_intent: IntentType,
+		appointment_info: Optional[AppointmentInfoModel],
+		appointment_record: Optional[AppointmentRecordModel],
+		appointments: List[Dict],
+		match_result: Optional[AppointmentMatchModel]
+	) -> QAState:
+		logger.info(
+			f" ... Current intent: {current_intent}, "
+			f"Appointments count: {len(appointments)}"
+		)
+		
+		route, diagnostic_info = self._determine_route_with_diagnostics(
+			current_intent=current_intent,
+			appointment_info=appointment_info,
+			appointment_record=appointment_record,
+			appointments=appointments,
+			state=state,
+			match_result=match_result
+		)
+		
+		if route == Routes.VERIFIED:
+			logger.info(" ... Appointment verified successfully")
+		else:
+			if diagnostic_info:
+				state[StateKeys.APPOINTMENT_DIAGNOSTICS] = diagnostic_info
+				logger.info(
+					f" ... Verification failed: {diagnostic_info.get('reason')} - "
+					f"{diagnostic_info.get('message')}"
+				)
+				
+				self._update_state_by_diagnostics(state, diagnostic_info)
+		
+		state[StateKeys.CURRENT_NODE] = Nodes.VERIFICATION_APPOINTMENT
+		state[StateKeys.ROUTE] = route
+		
+		logger.info(f" ... Route set to: {route}")
+		
+		return state
+
 	def _validate_state(
 		self,
 		user_record: Optional[VerificationRecordModel],
@@ -135,11 +248,17 @@ class VerificationAppointmentNode:
 		user_record: VerificationRecordModel
 	) -> List[Dict]:
 		""" Load appointments from database for the user. """
-		logger.info(f" ... Loading appointments for patient ID: {user_record.user_id}")
+		found, appointments = False, None
+		if self.prefetcher is not None:
+			found, appointments = self.prefetcher.take_appointments(
+				state.get(StateKeys.SESSION_ID), user_record.user_id
+			)
 		
-		appointments = self.query_orm_service.find_appointments_by_patient_id(
-			patient_id=user_record.user_id
-		)
+		if not found:
+			logger.info(f" ... Loading appointments for patient ID: {user_record.user_id}")
+			appointments = self.query_orm_service.find_appointments_by_patient_id(
+				patient_id=user_record.user_id
+			)
 		
 		if not appointments:
 			logger.warning(" ... No appointments found for patient")
@@ -156,7 +275,8 @@ class VerificationAppointmentNode:
 		appointment_info: Optional[AppointmentInfoModel],
 		appointment_record: Optional[AppointmentRecordModel],
 		appointments: List[Dict],
-		state: QAState
+		state: QAState,
+		match_result: Optional[AppointmentMatchModel] = None
 	) -> Tuple[Routes, Optional[Dict]]:
 		""" Determine route with diagnostic feedback. """
 		if current_intent == IntentType.LIST_APPOINTMENTS:
@@ -170,7 +290,8 @@ class VerificationAppointmentNode:
 				appointment_info=appointment_info,
 				appointment_record=appointment_record,
 				appointments=appointments,
-				state=state
+				state=state,
+				match_result=match_result
 			)
 		
 		else:
@@ -185,7 +306,8 @@ class VerificationAppointmentNode:
 		appointment_info: Optional[AppointmentInfoModel],
 		appointment_record: Optional[AppointmentRecordModel],
 		appointments: List[Dict],
-		state: QAState
+		state: QAState,
+		match_result: Optional[AppointmentMatchModel] = None
 	) -> Tuple[Routes, Optional[Dict]]:
 		"""Verify appointment details with comprehensive diagnostics. """
 		if not appointments or len(appointments) == 0:
@@ -228,7 +350,8 @@ class VerificationAppointmentNode:
 		return self._match_appointment_with_diagnostics(
 			appointment_info=appointment_info,
 			appointments=appointments,
-			state=state
+			state=state,
+			match_result=match_result
 		)
 
 	def _get_incomplete_fields(
@@ -299,7 +422,8 @@ class VerificationAppointmentNode:
 		self,
 		appointment_info: AppointmentInfoModel,
 		appointments: List[Dict],
-		state: QAState
+		state: QAState,
+		match_result: Optional[AppointmentMatchModel] = None
 	) -> Tuple[Routes, Optional[Dict]]:
 		"""
 		Attempt to match appointment with diagnostic feedback.
@@ -308,6 +432,7 @@ class VerificationAppointmentNode:
 			appointment_info: Appointment information to match
 			appointments: List of user's appointments
 			state: Current conversation state
+			match_result: Match already resolved by the caller, if any
 			
 		Returns:
 			Tuple of (route, diagnostic_info)
@@ -315,10 +440,12 @@ class VerificationAppointmentNode:
 		logger.info(" ... Attempting to match appointment")
 		
 		# Use matching service
-		match_result: AppointmentMatchModel = self.appointment_match_service.run(
-			appointments=appointments,
-			appointment_info=appointment_info
-		)
+		if match_result is None:
+			match_result = self.appointment_match_service.run(
+				appointments=appointments,
+				appointment_info=appointment_info,
+				candidate_id=self._fused_candidate_id(state)
+			)
 		
 		if not match_result.match_found or not match_result.matched_appointment_id:
 			logger.info(" ... No matching appointment found")
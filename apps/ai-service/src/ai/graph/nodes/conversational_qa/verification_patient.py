@@ -1,3 +1,4 @@
+import asyncio
 from typing import Dict, List, Optional, Tuple
 
 from ...states.conversational_qa import QAState, StateKeys
@@ -6,7 +7,7 @@ from ...types.conversational_qa import (
 	Routes, 
 	IntentType
 )
-from ...services.conversational_qa import QueryORMService
+from ...services.conversational_qa import QueryORMService, SpeculativePrefetcher
 from ...models.conversational_qa import VerificationRecordModel, VerificationInfoModel
 from utils import Logger
 
@@ -14,8 +15,13 @@ logger = Logger(__name__)
 
 
 class VerificationPatientNode:
-	def __init__(self, query_orm_service: QueryORMService) -> None:
+	def __init__(
+		self,
+		query_orm_service: QueryORMService,
+		prefetcher: Optional[SpeculativePrefetcher] = None
+	) -> None:
 		self.query_orm_service = query_orm_service
+		self.prefetcher = prefetcher
 	
 	def __call__(self, state: QAState) -> QAState:
 
@@ -26,7 +32,10 @@ class VerificationPatientNode:
 				StateKeys.USER_INFO
 			)
 			
-			route, user_record, diagnostic_info = self._verify_user(verification_info)
+			route, user_record, diagnostic_info = self._verify_user(
+				verification_info,
+				session_id=state.get(StateKeys.SESSION_ID)
+			)
 
 			if route == Routes.VERIFIED:
 				state[StateKeys.USER_RECORD] = user_record
@@ -51,9 +60,14 @@ class VerificationPatientNode:
 			logger.error(f"Error in VerificationPatientNode: {e}", exc_info=True)
 			raise
 	
+	async def acall(self, state: QAState) -> QAState:
+		"""Run the database-bound verification off the event loop."""
+		return await asyncio.to_thread(self, state)
+
 	def _verify_user(
 		self,
-		verification_info: Optional[VerificationInfoModel]
+		verification_info: Optional[VerificationInfoModel],
+		session_id: Optional[str] = None
 	) -> Tuple[Routes, Optional[VerificationRecordModel], Optional[Dict]]:
 
 		if not verification_info:
@@ -73,10 +87,7 @@ class VerificationPatientNode:
 				"message": f"Please provide your {self._format_field_list(incomplete_fields)}."
 			}
 		
-		logger.info(" ... Querying database for user")
-		user_records: List[Dict] = self.query_orm_service.find_user(
-			user_info=verification_info
-		)
+		user_records: List[Dict] = self._find_user(verification_info, session_id)
 		
 		if not user_records or len(user_records) == 0:
 			logger.info(" ... No matching user found in database")
@@ -98,6 +109,20 @@ class VerificationPatientNode:
 			"message": "User verified successfully"
 		}
 	
+	def _find_user(
+		self,
+		verification_info: VerificationInfoModel,
+		session_id: Optional[str]
+	) -> List[Dict]:
+		""" Use the lookup ConversationManagerNode started speculatively when it was for these exact details. """
+		if self.prefetcher is not None:
+			found, user_records = self.prefetcher.take_user(session_id, verification_info)
+			if found:
+				return user_records
+		
+		logger.info(" ... Querying database for user")
+		return self.query_orm_service.find_user(user_info=verification_info)
+	
 	def _get_incomplete_fields(
 		self, 
 		verification_info: VerificationInfoModel
@@ -3,15 +3,28 @@ from pydantic import BaseModel
 
 from langchain.output_parsers.pydantic import PydanticOutputParser
 from langchain.output_parsers.fix import OutputFixingParser
+from langchain_core.exceptions import OutputParserException
 
+from infrastructure.metrics import MetricsRegistry
+from utils import Logger
 
 from ..services.llm import LLMService
+from .repair import local_repair
+
+logger = Logger(__name__)
+metrics = MetricsRegistry()
 
 
 class FixingParser(LLMService):
 	"""
 	Factory/manager for OutputFixingParser that can use either OpenAI
 	as the 'fixing LLM' to repair malformed JSON into a Pydantic model.
+	
+	Repair is tiered: output that fails to parse first goes through
+	`local_repair` (code fences, trailing commas, unbalanced brackets/quotes,
+	schema coercion) and only reaches the fixing LLM if that fails.
+	Counters: parser.parsed, parser.repair.local, parser.repair.llm and
+	parser.repair.failed; gauge parser.repair.local_share.
 	"""
 
 	def __init__(
@@ -34,7 +47,24 @@ class FixingParser(LLMService):
 		auto-repairing malformed outputs via the chosen LLM if needed.
 		"""
 		parser = self._get_or_build_parser(schema_class)
-		parsed = parser.parse(raw_text)  # returns an instance of schema_class
+		try:
+			parsed = parser.parser.parse(raw_text)
+			metrics.increment("parser.parsed")
+			return parsed
+		except OutputParserException as e:
+			logger.info(f"[PARSER] {schema_class.__name__} output malformed, trying local repair: {e}")
+		
+		repaired = local_repair(raw_text, schema_class)
+		if repaired is not None:
+			self._record_repair("local", schema_class)
+			return repaired
+		
+		try:
+			parsed = parser.parse(raw_text)  # returns an instance of schema_class
+		except Exception:
+			metrics.increment("parser.repair.failed")
+			raise
+		self._record_repair("llm", schema_class)
 		return parsed
 
 	def parse_to_dict(self, raw_text: str, schema_class: Type[BaseModel]) -> Dict[str, Any]:
@@ -44,6 +74,14 @@ class FixingParser(LLMService):
 		model_obj = self.parse_to_model(raw_text, schema_class)
 		return model_obj.model_dump()
 
+	def _record_repair(self, tier: str, schema_class: Type[BaseModel]) -> None:
+		metrics.increment(f"parser.repair.{tier}")
+		metrics.increment(f"parser.repair.{tier}.{schema_class.__name__}")
+		local = metrics.get_counter("parser.repair.local")
+		total = local + metrics.get_counter("parser.repair.llm")
+		metrics.set_gauge("parser.repair.local_share", local / total)
+		logger.info(f"[PARSER] {schema_class.__name__} repaired by {tier} tier")
+
 	def _get_or_build_parser(self, schema_class: Type[BaseModel]) -> OutputFixingParser:
 		if schema_class not in self._parsers:
 			base_parser = PydanticOutputParser(pydantic_object=schema_class)
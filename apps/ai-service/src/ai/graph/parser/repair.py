@@ -0,0 +1,205 @@
+import json
+import re
+import types
+from enum import Enum
+from typing import (
+	Any,
+	Dict,
+	List,
+	Optional,
+	Type,
+	Union,
+	get_args,
+	get_origin
+)
+
+from pydantic import BaseModel, ValidationError
+
+from utils import Logger
+
+logger = Logger(__name__)
+
+_CODE_FENCE = re.compile(r"```[a-zA-Z0-9_-]*\s*(.*?)(?:```|$)", re.DOTALL)
+_PYTHON_LITERALS = {"True": "true", "False": "false", "None": "null"}
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+def strip_code_fences(text: str) -> str:
+	""" Contents of the first ``` fenced block, or the text unchanged. """
+	match = _CODE_FENCE.search(text)
+	return match.group(1).strip() if match else text.strip()
+
+
+def extract_json_candidate(text: str) -> Optional[str]:
+	"""
+	The first JSON object (or array) in `text`: from its opening bracket to
+	the matching close, or to the end of the text when it was cut off.
+	"""
+	starts = [index for index in (text.find("{"), text.find("[")) if index != -1]
+	if not starts:
+		return None
+	start = min(starts)
+
+	depth, in_string, escaped = 0, False, False
+	for index in range(start, len(text)):
+		char = text[index]
+		if in_string:
+			if escaped:
+				escaped = False
+			elif char == "\\":
+				escaped = True
+			elif char == '"':
+				in_string = False
+		elif char == '"':
+			in_string = True
+		elif char in "{[":
+			depth += 1
+		elif char in "}]":
+			depth -= 1
+			if depth == 0:
+				return text[start:index + 1]
+	return text[start:]
+
+
+def balance_json(text: str) -> str:
+	"""
+	Single pass over a JSON-ish string that drops trailing commas, maps
+	Python literals (True/False/None) to JSON, closes an unterminated string
+	and appends the missing closing brackets in nesting order.
+	"""
+	out: List[str] = []
+	stack: List[str] = []
+	in_string, escaped = False, False
+	index = 0
+
+	while index < len(text):
+		char = text[index]
+		if in_string:
+			out.append(char)
+			if escaped:
+				escaped = False
+			elif char == "\\":
+				escaped = True
+			elif char == '"':
+				in_string = False
+			index += 1
+			continue
+
+		if char == '"':
+			in_string = True
+		elif char in _CLOSERS:
+			stack.append(_CLOSERS[char])
+		elif char in "}]":
+			if stack and stack[-1] == char:
+				stack.pop()
+			else:
+				# Stray closer: skip it rather than end the document early
+				index += 1
+				continue
+		elif char == ",":
+			following = text[index + 1:].lstrip()
+			if not following or following[0] in "}]":
+				index += 1
+				continue
+		elif char.isalpha():
+			word = re.match(r"[^\W\d_]+", text[index:]).group(0)
+			out.append(_PYTHON_LITERALS.get(word, word))
+			index += len(word)
+			continue
+		out.append(char)
+		index += 1
+
+	if in_string:
+		if escaped:
+			out.pop()
+		out.append('"')
+
+	repaired = "".join(out).rstrip()
+	if repaired.endswith(","):
+		repaired = repaired[:-1]
+	if repaired.endswith(":"):
+		repaired += " null"
+	return repaired + "".join(reversed(stack))
+
+
+def coerce_to_schema(data: Any, schema_class: Type[BaseModel]) -> Any:
+	"""
+	Nudge decoded JSON towards `schema_class` where pydantic's lax mode won't:
+	unwrap single-item lists and single-key wrapper objects, match keys
+	case/separator-insensitively, stringify scalars for str fields, wrap
+	scalars for list fields and match enum values case-insensitively.
+	"""
+	if isinstance(data, list) and len(data) == 1:
+		data = data[0]
+	if not isinstance(data, dict):
+		return data
+
+	fields = schema_class.model_fields
+	if len(data) == 1 and not any(_field_key(key, fields) for key in data):
+		inner = next(iter(data.values()))
+		if isinstance(inner, dict):
+			data = inner
+
+	coerced: Dict[str, Any] = {}
+	for key, value in data.items():
+		name = _field_key(key, fields) or key
+		field = fields.get(name)
+		coerced[name] = _coerce_value(value, field.annotation) if field is not None else value
+	return coerced
+
+
+def local_repair(raw_text: str, schema_class: Type[BaseModel]) -> Optional[BaseModel]:
+	""" Deterministic repair of a malformed model output; None when it can't be fixed locally. """
+	candidate = extract_json_candidate(strip_code_fences(raw_text or ""))
+	if candidate is None:
+		return None
+
+	for text in (candidate, balance_json(candidate)):
+		try:
+			data = json.loads(text)
+		except ValueError:
+			continue
+		try:
+			return schema_class.model_validate(coerce_to_schema(data, schema_class))
+		except ValidationError as e:
+			logger.debug(f"[PARSER] Local repair decoded JSON but validation failed: {e}")
+			return None
+	return None
+
+
+def _normalize_key(key: str) -> str:
+	return re.sub(r"[\s\-]+", "_", str(key).strip()).lower()
+
+
+def _field_key(key: str, fields: Dict[str, Any]) -> Optional[str]:
+	normalized = _normalize_key(key)
+	for name, field in fields.items():
+		if normalized in (name.lower(), _normalize_key(field.alias or name)):
+			return name
+	return None
+
+
+def _coerce_value(value: Any, annotation: Any) -> Any:
+	origin = get_origin(annotation)
+	if origin in (Union, types.UnionType):
+		options = [arg for arg in get_args(annotation) if arg is not type(None)]
+		if value is None or len(options) != 1:
+			return value
+		return _coerce_value(value, options[0])
+
+	if origin in (list, List):
+		(item_type,) = get_args(annotation) or (Any,)
+		items = value if isinstance(value, list) else [value]
+		return [_coerce_value(item, item_type) for item in items]
+
+	if isinstance(annotation, type):
+		if issubclass(annotation, BaseModel):
+			return coerce_to_schema(value, annotation)
+		if issubclass(annotation, Enum) and isinstance(value, str):
+			for member in annotation:
+				if str(member.value).lower() == value.strip().lower():
+					return member.value
+			return value
+		if annotation is str and isinstance(value, (int, float, bool)):
+			return str(value).lower() if isinstance(value, bool) else str(value)
+	return value
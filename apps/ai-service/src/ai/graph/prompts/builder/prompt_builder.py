@@ -102,7 +102,7 @@ class ChatPromptTemplateBuilder:
 		"""
 		prompt_template = ChatPromptTemplate(
 			input_variables=input_variables,
-			messages=self.messages,
+			messages=list(self.messages),
 			metadata=self.metadata
 		)
 	
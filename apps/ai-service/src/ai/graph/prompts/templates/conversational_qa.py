@@ -30,6 +30,46 @@ class ConversationalQAMessages:
 		"{user_message}"
 	)
 
+	batch_intent_instructions_system: str = (
+		"\n"
+		"**Batch:** The user message lists several messages, one per line as [id] text."
+		" They come from different, unrelated users: classify and extract each one on its own."
+		" Return exactly one classification per message with message_id set to its id."
+	)
+
+	batch_intent_human: str = (
+		"{user_messages}"
+	)
+
+	##########################################
+
+	##################### TURN UNDERSTANDING TEMPLATES #####################
+	turn_understanding_system: str = (
+		"You are the understanding step of a medical appointment assistant."
+		"In a single pass, classify the user's intent, extract any details they provide,"
+		" identify which of their listed appointments they mean, and draft a follow-up question"
+		" if something is still missing."
+		"\n"
+		"**Intent Types:**"
+		"{intent_list}"
+		"\n"
+		"**Already known:**"
+		"{known_info}"
+		"\n"
+		"**Patient appointments:**"
+		"{appointments_text}"
+	)
+	turn_understanding_instructions_system: str = (
+		"\n"
+		"**Instructions:**"
+		" - Classify the primary intent"
+		" - Extract appointment details (doctor, clinic, date, specialty) if provided"
+		" - Set candidate_appointment_id only to an ID from the list above that the user clearly refers to;"
+		" otherwise leave it null"
+		" - If the request cannot be completed with the known and extracted details, write clarification_draft:"
+		" a concise, friendly question asking only for what is missing; otherwise leave it null"
+	)
+
 	##########################################
 
 	##################### QA ANSWER TEMPLATES #####################
@@ -128,6 +168,9 @@ class ConversationalQAMessages:
 
 		"What information is needed:"
 		"{diagnostic_summary}"
+		"\n"
+		"User's scheduled appointments:"
+		"{existing_appointments_summary}"
 	)
 
 	clarification_user_system: str = (
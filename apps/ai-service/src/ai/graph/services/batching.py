@@ -0,0 +1,131 @@
+import asyncio
+import contextvars
+from time import perf_counter
+from typing import (
+    Awaitable,
+    Callable,
+    Dict,
+    Generic,
+    Hashable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+    Union
+)
+
+from infrastructure.metrics import MetricsRegistry
+from utils import Logger
+
+logger = Logger(__name__)
+metrics = MetricsRegistry()
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# Per-item outcome of a batch flush: the result, or the exception that item's caller should see
+BatchOutcome = Union[R, BaseException]
+
+
+class _Batch(Generic[T]):
+    def __init__(self, loop: asyncio.AbstractEventLoop) -> None:
+        self.loop = loop
+        self.items: List[T] = []
+        self.futures: List[asyncio.Future] = []
+        self.submitted: List[float] = []
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+
+class MicroBatcher(Generic[T, R]):
+    """
+    Collects concurrent async requests that share a key for up to `window`
+    seconds (or until `max_batch` arrive) and hands them to `flush` as one
+    list; `flush` returns one outcome per item, in order, and each waiting
+    coroutine gets its own. An exception raised by `flush` fails every item.
+
+    Batches are per event loop and per key (e.g. a prompt variant); all
+    bookkeeping happens on the loop, so no locks are needed. `flush` runs in
+    a fresh contextvars context rather than the first submitter's, so nothing
+    it records (e.g. turn usage) lands on one arbitrary caller; attributing
+    per-item costs is up to `flush` and its callers.
+
+    Metrics (llm.batch.<name>.*): batches / items / flush.full / flush.window
+    counters, size and fill (size / max_batch) summaries, the last fill as a
+    gauge, and wait (submit to flush) and latency (flush) timers.
+    """
+    def __init__(
+        self,
+        name: str,
+        flush: Callable[[Hashable, Sequence[T]], Awaitable[Sequence[BatchOutcome]]],
+        max_batch: int = 16,
+        window: float = 0.015
+    ) -> None:
+        self.name = name
+        self.flush = flush
+        self.max_batch = max(1, max_batch)
+        self.window = max(0.0, window)
+        self._pending: Dict[Tuple[int, Hashable], _Batch[T]] = {}
+        self._tasks: set = set()
+
+    async def submit(self, key: Hashable, item: T) -> R:
+        loop = asyncio.get_running_loop()
+        slot = (id(loop), key)
+        batch = self._pending.get(slot)
+        if batch is None:
+            batch = _Batch(loop)
+            self._pending[slot] = batch
+            batch.timer = loop.call_later(self.window, self._dispatch, slot, batch, "window")
+
+        future = loop.create_future()
+        batch.items.append(item)
+        batch.futures.append(future)
+        batch.submitted.append(perf_counter())
+        if len(batch.items) >= self.max_batch:
+            self._dispatch(slot, batch, "full")
+        return await future
+
+    def _dispatch(self, slot: Tuple[int, Hashable], batch: _Batch[T], reason: str) -> None:
+        if self._pending.get(slot) is not batch:
+            return
+        del self._pending[slot]
+        if batch.timer is not None:
+            batch.timer.cancel()
+
+        size = len(batch.items)
+        now = perf_counter()
+        metrics.increment(self._metric("batches"))
+        metrics.increment(self._metric("items"), size)
+        metrics.increment(self._metric(f"flush.{reason}"))
+        metrics.observe(self._metric("size"), size)
+        metrics.observe(self._metric("fill"), size / self.max_batch)
+        metrics.set_gauge(self._metric("last_fill"), size / self.max_batch)
+        for submitted in batch.submitted:
+            metrics.observe(self._metric("wait"), now - submitted)
+
+        task = batch.loop.create_task(self._run(slot[1], batch), context=contextvars.Context())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, key: Hashable, batch: _Batch[T]) -> None:
+        started = perf_counter()
+        try:
+            outcomes = list(await self.flush(key, batch.items))
+            if len(outcomes) != len(batch.items):
+                raise RuntimeError(f"{self.name} batch returned {len(outcomes)} results for {len(batch.items)} items")
+        except Exception as e:
+            logger.warning(f"[BATCH] {self.name} batch of {len(batch.items)} failed: {e}")
+            outcomes = [e] * len(batch.items)
+        finally:
+            metrics.observe(self._metric("latency"), perf_counter() - started)
+
+        for future, outcome in zip(batch.futures, outcomes):
+            if future.done():
+                continue
+            if isinstance(outcome, BaseException):
+                future.set_exception(outcome)
+            else:
+                future.set_result(outcome)
+
+    def _metric(self, name: str) -> str:
+        return f"llm.batch.{self.name}.{name}"
@@ -0,0 +1,28 @@
+from .cassette import (
+    Cassette,
+    CassetteIndex,
+    CassetteMiss
+)
+from .chain import (
+    ChainKey,
+    CompiledChain,
+    ChainCache
+)
+from .response import (
+    InMemoryResponseBackend,
+    PostgresResponseBackend,
+    ResponseCache
+)
+
+
+__all__ = [
+    "Cassette",
+    "CassetteIndex",
+    "CassetteMiss",
+    "ChainKey",
+    "CompiledChain",
+    "ChainCache",
+    "InMemoryResponseBackend",
+    "PostgresResponseBackend",
+    "ResponseCache"
+]
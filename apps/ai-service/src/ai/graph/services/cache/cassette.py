@@ -0,0 +1,245 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+import threading
+from datetime import datetime, timezone
+from typing import (
+    Any,
+    Dict,
+    Optional,
+    Tuple,
+    Type
+)
+
+from pydantic import BaseModel
+
+from infrastructure.config import EnvConfig
+from infrastructure.metrics import MetricsRegistry
+from utils import Logger
+
+from .chain import CompiledChain
+
+logger = Logger(__name__)
+metrics = MetricsRegistry()
+
+
+class CassetteMiss(LookupError):
+    """ Replay mode found no recorded response for a prompt. """
+
+
+class CassetteIndex:
+    """
+    Sorted, memory-mapped index of a cassette: fixed-size records of a 16-byte
+    key digest and the 8-byte offset of its line, looked up by binary search.
+
+    The header stores the cassette size it was built from, so an index is
+    rebuilt when the cassette has grown. Later lines win for duplicate keys.
+    """
+    MAGIC = b"LLMCIDX1"
+    HEADER = struct.Struct("<8sQQ")    # magic, cassette size, record count
+    RECORD = struct.Struct("<16sQ")    # key digest, line offset
+    DIGEST_BYTES = 16
+
+    def __init__(self, path: str, cassette_path: str) -> None:
+        self.path = path
+        self.cassette_path = cassette_path
+        self._file = None
+        self._map: Optional[mmap.mmap] = None
+        self.count = 0
+
+    @classmethod
+    def digest(cls, key: str) -> bytes:
+        return bytes.fromhex(key)[:cls.DIGEST_BYTES]
+
+    def open(self) -> "CassetteIndex":
+        size = os.path.getsize(self.cassette_path)
+        if not self._is_current(size):
+            self.build(size)
+        self._file = open(self.path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        _, _, self.count = self.HEADER.unpack_from(self._map, 0)
+        return self
+
+    def close(self) -> None:
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def lookup(self, key: str) -> Optional[int]:
+        """ Offset of the latest line recorded for `key`, or None. """
+        target = self.digest(key)
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            digest, offset = self.RECORD.unpack_from(self._map, self.HEADER.size + middle * self.RECORD.size)
+            if digest < target:
+                low = middle + 1
+            elif digest > target:
+                high = middle
+            else:
+                return offset
+        return None
+
+    def build(self, cassette_size: int) -> None:
+        """ Scan the cassette once and write a fresh index next to it. """
+        offsets: Dict[bytes, int] = {}
+        with open(self.cassette_path, "rb") as cassette:
+            offset = 0
+            for line in cassette:
+                if offset + len(line) > cassette_size:
+                    break
+                if line.endswith(b"\n"):
+                    try:
+                        offsets[self.digest(json.loads(line)["key"])] = offset
+                    except (ValueError, KeyError):
+                        logger.warning(f"[CASSETTE] Skipping malformed line at offset {offset}")
+                offset += len(line)
+
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "wb") as index:
+            index.write(self.HEADER.pack(self.MAGIC, cassette_size, len(offsets)))
+            for digest in sorted(offsets):
+                index.write(self.RECORD.pack(digest, offsets[digest]))
+        os.replace(tmp_path, self.path)
+        metrics.increment("llm.cassette.index_builds")
+        logger.info(f"[CASSETTE] Indexed {len(offsets)} responses from {self.cassette_path}")
+
+    def _is_current(self, cassette_size: int) -> bool:
+        try:
+            with open(self.path, "rb") as index:
+                magic, indexed_size, _ = self.HEADER.unpack(index.read(self.HEADER.size))
+        except (OSError, struct.error):
+            return False
+        return magic == self.MAGIC and indexed_size == cassette_size
+
+
+class Cassette:
+    """
+    Record/replay store for structured LLM responses.
+
+    Record mode appends one JSON line per provider response (key, service,
+    rendered prompt, response) to an append-only file. Replay mode serves
+    responses by prompt hash through a memory-mapped CassetteIndex and never
+    calls the provider; prompts that were not recorded raise CassetteMiss,
+    which the services' fallbacks handle like any other LLM failure.
+
+    Keys hash the rendered prompt messages and output schema only, so a
+    cassette recorded against one model can be replayed under another.
+
+    Configured with LLM_CASSETTE_MODE (off | record | replay) and
+    LLM_CASSETTE_PATH; process-wide, use `Cassette.shared()`.
+    """
+    _instance: Optional["Cassette"] = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, path: str, mode: str) -> None:
+        self.path = path
+        self.mode = mode
+        self._lock = threading.Lock()
+        self._index: Optional[CassetteIndex] = None
+        self._file = None
+        self._map: Optional[mmap.mmap] = None
+        if mode == "replay":
+            self._open_replay()
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == "record"
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    @classmethod
+    def shared(cls) -> Optional["Cassette"]:
+        """ The configured cassette, or None when LLM_CASSETTE_MODE is off. """
+        with cls._instance_lock:
+            if cls._instance is None:
+                mode = (EnvConfig.get_str("LLM_CASSETTE_MODE", "off") or "off").lower()
+                if mode not in ("record", "replay"):
+                    return None
+                cls._instance = cls(EnvConfig.get_str("LLM_CASSETTE_PATH", "llm_cassette.jsonl"), mode)
+            return cls._instance
+
+    @classmethod
+    def reset_shared(cls) -> None:
+        with cls._instance_lock:
+            if cls._instance is not None:
+                cls._instance.close()
+            cls._instance = None
+
+    @staticmethod
+    def make_key(chain: CompiledChain, inputs: Dict[str, Any]) -> Tuple[str, list]:
+        messages = [
+            (message.type, message.content)
+            for message in chain.template.format_messages(**inputs)
+        ]
+        payload = json.dumps(
+            {"messages": messages, "schema": chain.schema.model_json_schema() if chain.schema else None},
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest(), messages
+
+    def record(self, chain: CompiledChain, inputs: Dict[str, Any], result: Any) -> None:
+        if not isinstance(result, BaseModel):
+            return
+        key, messages = self.make_key(chain, inputs)
+        line = json.dumps({
+            "key": key,
+            "service": chain.key.service,
+            "variant": chain.key.variant,
+            "schema": type(result).__name__,
+            "model": chain.key.model,
+            "recorded_at": datetime.now(timezone.utc).isoformat(),
+            "messages": messages,
+            "response": result.model_dump(mode="json"),
+        }, default=str)
+        # One unbuffered write per line on an O_APPEND file keeps concurrent writers from interleaving
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, "ab", buffering=0)
+            self._file.write((line + "\n").encode("utf-8"))
+        metrics.increment("llm.cassette.recorded")
+
+    def replay(self, chain: CompiledChain, inputs: Dict[str, Any], schema: Type[BaseModel]) -> BaseModel:
+        key, _ = self.make_key(chain, inputs)
+        offset = self._index.lookup(key) if self._index is not None else None
+        entry = self._read_line(offset) if offset is not None else None
+        if entry is None or entry.get("key") != key:
+            metrics.increment("llm.cassette.misses")
+            metrics.increment(f"llm.cassette.misses.{chain.key.service}")
+            raise CassetteMiss(f"No recorded response for {chain.key.service} prompt {key[:12]}")
+        metrics.increment("llm.cassette.hits")
+        return schema.model_validate(entry["response"])
+
+    def close(self) -> None:
+        if self._index is not None:
+            self._index.close()
+            self._index = None
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _open_replay(self) -> None:
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            logger.warning(f"[CASSETTE] Replay cassette {self.path} is missing or empty; every call will miss")
+            return
+        self._index = CassetteIndex(f"{self.path}.idx", self.path).open()
+        self._file = open(self.path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _read_line(self, offset: int) -> Optional[Dict[str, Any]]:
+        end = self._map.find(b"\n", offset)
+        try:
+            return json.loads(self._map[offset:end if end != -1 else len(self._map)])
+        except ValueError:
+            return None
@@ -0,0 +1,98 @@
+import threading
+from dataclasses import dataclass, field
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Mapping,
+    Optional,
+    Type
+)
+
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.runnables import Runnable, RunnableConfig
+from pydantic import BaseModel
+
+from infrastructure.metrics import MetricsRegistry
+
+metrics = MetricsRegistry()
+
+
+@dataclass(frozen=True)
+class ChainKey:
+    """ Identity of a compiled chain: which prompt variant, output schema and model settings. """
+    service: str
+    variant: str
+    schema: str
+    model: str
+    temp: float
+
+
+@dataclass(frozen=True)
+class CompiledChain:
+    """
+    An immutable prompt + structured-output chain, safe to share between
+    concurrent sync and async invocations. `runnable` targets the primary
+    backend; `routes` holds the same chain bound to each routable backend.
+    """
+    key: ChainKey
+    template: ChatPromptTemplate
+    runnable: Runnable
+    schema: Optional[Type[BaseModel]] = None
+    routes: Mapping[str, Runnable] = field(default_factory=dict)
+
+    def invoke(
+        self,
+        inputs: Dict[str, Any],
+        config: Optional[RunnableConfig] = None,
+        backend: Optional[str] = None
+    ) -> Any:
+        return self._runnable_for(backend).invoke(inputs, config=config)
+
+    async def ainvoke(
+        self,
+        inputs: Dict[str, Any],
+        config: Optional[RunnableConfig] = None,
+        backend: Optional[str] = None
+    ) -> Any:
+        return await self._runnable_for(backend).ainvoke(inputs, config=config)
+
+    def _runnable_for(self, backend: Optional[str]) -> Runnable:
+        if backend is None:
+            return self.runnable
+        return self.routes.get(backend, self.runnable)
+
+
+class ChainCache:
+    """ Build-once cache of CompiledChains; building happens at most once per key. """
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._chains: Dict[ChainKey, CompiledChain] = {}
+
+    def get_or_build(
+        self,
+        key: ChainKey,
+        build: Callable[[], CompiledChain]
+    ) -> CompiledChain:
+        chain = self._chains.get(key)
+        if chain is not None:
+            metrics.increment("llm.chain_cache.hits")
+            return chain
+
+        with self._lock:
+            chain = self._chains.get(key)
+            if chain is None:
+                with metrics.timer("llm.chain_cache.build"):
+                    chain = build()
+                self._chains[key] = chain
+                metrics.increment("llm.chain_cache.misses")
+            else:
+                metrics.increment("llm.chain_cache.hits")
+        return chain
+
+    def keys(self) -> List[ChainKey]:
+        return list(self._chains)
+
+    def __len__(self) -> int:
+        return len(self._chains)
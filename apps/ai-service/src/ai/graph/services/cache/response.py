@@ -0,0 +1,258 @@
+import asyncio
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from itertools import count
+from time import monotonic
+from typing import (
+    Any,
+    Dict,
+    Optional,
+    Tuple,
+    Type
+)
+
+from pydantic import BaseModel
+from sqlalchemy import text
+
+from infrastructure.config import EnvConfig
+from infrastructure.database.orm import DatabaseEngine
+from infrastructure.metrics import MetricsRegistry
+from utils import Logger
+
+from .chain import CompiledChain
+
+logger = Logger(__name__)
+metrics = MetricsRegistry()
+
+
+class InMemoryResponseBackend:
+    """ Process-local LRU with a TTL, storing serialized responses. """
+    def __init__(self, max_entries: int, ttl_seconds: float) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if monotonic() > expires_at:
+                del self._entries[key]
+                metrics.increment("llm.response_cache.expired")
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str) -> None:
+        with self._lock:
+            self._entries[key] = (monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                metrics.increment("llm.response_cache.evictions")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class PostgresResponseBackend(DatabaseEngine):
+    """
+    Cross-worker cache in an UNLOGGED table: no WAL, so writes are cheap and
+    the table is emptied after a crash, which is fine for a cache.
+    """
+    TABLE = "llm_response_cache"
+    PRUNE_EVERY = 500
+
+    def __init__(self, ttl_seconds: float) -> None:
+        super().__init__()
+        self.ttl_seconds = ttl_seconds
+        self._writes = count(1)
+        self._ensure_table()
+
+    def _ensure_table(self) -> None:
+        with self.engine.begin() as conn:
+            conn.execute(text(
+                f"""
+                CREATE UNLOGGED TABLE IF NOT EXISTS {self.TABLE} (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    expires_at TIMESTAMPTZ NOT NULL
+                )
+                """
+            ))
+
+    def get(self, key: str) -> Optional[str]:
+        with self.engine.connect() as conn:
+            row = conn.execute(
+                text(f"SELECT value FROM {self.TABLE} WHERE key = :key AND expires_at > now()"),
+                {"key": key},
+            ).first()
+        return row[0] if row else None
+
+    def set(self, key: str, value: str) -> None:
+        with self.engine.begin() as conn:
+            conn.execute(
+                text(
+                    f"INSERT INTO {self.TABLE} (key, value, expires_at) "
+                    "VALUES (:key, :value, now() + make_interval(secs => :ttl)) "
+                    "ON CONFLICT (key) DO UPDATE SET value = EXCLUDED.value, expires_at = EXCLUDED.expires_at"
+                ),
+                {"key": key, "value": value, "ttl": self.ttl_seconds},
+            )
+            if next(self._writes) % self.PRUNE_EVERY == 0:
+                conn.execute(text(f"DELETE FROM {self.TABLE} WHERE expires_at <= now()"))
+
+
+class ResponseCache:
+    """
+    Cache of structured LLM responses for deterministic (temperature 0) chains.
+
+    Keys hash the model, temperature, fully rendered prompt messages and the
+    output schema, so any change to the prompt, inputs or schema is a miss.
+    Lookups go to the in-process LRU first and then, when
+    LLM_RESPONSE_CACHE_BACKEND=postgres, to a shared UNLOGGED table.
+    LLM_RESPONSE_CACHE_BACKEND=off disables caching entirely.
+
+    Process-wide, following the shared class-level state pattern of
+    DatabaseEngine; use `ResponseCache.shared()`.
+    """
+    _instance: Optional["ResponseCache"] = None
+    _instance_lock = threading.Lock()
+
+    def __init__(
+        self,
+        memory: Optional[InMemoryResponseBackend] = None,
+        persistent: Optional[Any] = None,
+        enabled: bool = True
+    ) -> None:
+        self.enabled = enabled
+        self.memory = memory
+        self.persistent = persistent
+
+    @classmethod
+    def shared(cls) -> "ResponseCache":
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls.from_env()
+            return cls._instance
+
+    @classmethod
+    def reset_shared(cls) -> None:
+        with cls._instance_lock:
+            cls._instance = None
+
+    @classmethod
+    def from_env(cls) -> "ResponseCache":
+        backend = (EnvConfig.get_str("LLM_RESPONSE_CACHE_BACKEND", "memory") or "memory").lower()
+        if backend == "off":
+            return cls(enabled=False)
+
+        ttl = EnvConfig.get_float("LLM_RESPONSE_CACHE_TTL_SECONDS", 3600.0)
+        memory = InMemoryResponseBackend(
+            max_entries=EnvConfig.get_int("LLM_RESPONSE_CACHE_MAX_ENTRIES", 5000),
+            ttl_seconds=ttl,
+        )
+        persistent = None
+        if backend == "postgres":
+            try:
+                persistent = PostgresResponseBackend(ttl_seconds=ttl)
+            except Exception as e:
+                logger.warning(f"[CACHE] Postgres response cache unavailable, using memory only: {e}")
+        return cls(memory=memory, persistent=persistent)
+
+    @staticmethod
+    def make_key(chain: CompiledChain, inputs: Dict[str, Any]) -> Optional[str]:
+        """ Content hash of everything that determines the response; None if not cacheable. """
+        if chain.schema is None:
+            return None
+        messages = [
+            (message.type, message.content)
+            for message in chain.template.format_messages(**inputs)
+        ]
+        payload = json.dumps(
+            {
+                "model": chain.key.model,
+                "temp": chain.key.temp,
+                "messages": messages,
+                "schema": chain.schema.model_json_schema(),
+            },
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str, schema: Type[BaseModel], service: str) -> Optional[BaseModel]:
+        value = self.memory.get(key)
+        tier = "memory"
+        if value is None and self.persistent is not None:
+            value = self._persistent_get(key)
+            tier = "persistent"
+        return self._decode(key, value, tier, schema, service)
+
+    async def aget(self, key: str, schema: Type[BaseModel], service: str) -> Optional[BaseModel]:
+        value = self.memory.get(key)
+        tier = "memory"
+        if value is None and self.persistent is not None:
+            value = await asyncio.to_thread(self._persistent_get, key)
+            tier = "persistent"
+        return self._decode(key, value, tier, schema, service)
+
+    def set(self, key: str, result: BaseModel) -> None:
+        value = result.model_dump_json()
+        self.memory.set(key, value)
+        if self.persistent is not None:
+            self._persistent_set(key, value)
+
+    async def aset(self, key: str, result: BaseModel) -> None:
+        value = result.model_dump_json()
+        self.memory.set(key, value)
+        if self.persistent is not None:
+            await asyncio.to_thread(self._persistent_set, key, value)
+
+    def _decode(
+        self,
+        key: str,
+        value: Optional[str],
+        tier: str,
+        schema: Type[BaseModel],
+        service: str
+    ) -> Optional[BaseModel]:
+        if value is None:
+            metrics.increment("llm.response_cache.misses")
+            metrics.increment(f"llm.response_cache.misses.{service}")
+            return None
+        try:
+            result = schema.model_validate_json(value)
+        except Exception as e:
+            logger.warning(f"[CACHE] Dropping undecodable cached response for {service}: {e}")
+            metrics.increment("llm.response_cache.misses")
+            metrics.increment(f"llm.response_cache.misses.{service}")
+            return None
+        if tier == "persistent":
+            self.memory.set(key, value)
+        metrics.increment("llm.response_cache.hits")
+        metrics.increment(f"llm.response_cache.hits.{tier}")
+        metrics.increment(f"llm.response_cache.hits.{service}")
+        return result
+
+    def _persistent_get(self, key: str) -> Optional[str]:
+        try:
+            return self.persistent.get(key)
+        except Exception as e:
+            logger.warning(f"[CACHE] Postgres response cache read failed: {e}")
+            return None
+
+    def _persistent_set(self, key: str, value: str) -> None:
+        try:
+            self.persistent.set(key, value)
+        except Exception as e:
+            logger.warning(f"[CACHE] Postgres response cache write failed: {e}")
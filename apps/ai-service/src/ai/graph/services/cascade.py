@@ -0,0 +1,159 @@
+from dataclasses import dataclass
+from time import perf_counter
+from typing import (
+    Awaitable,
+    Callable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar
+)
+
+from infrastructure.metrics import MetricsRegistry
+from utils import Logger
+
+from .providers import LLMBackend
+from .resilience import CircuitOpenError
+
+logger = Logger(__name__)
+metrics = MetricsRegistry()
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class CascadeTier:
+    """ One step of a model cascade: a name for metrics and the backends it may be routed to. """
+    name: str
+    backends: Tuple[LLMBackend, ...]
+
+
+def split_tiers(
+    backends: Sequence[LLMBackend],
+    strong_backend: Optional[LLMBackend] = None
+) -> List[CascadeTier]:
+    """
+    With `strong_backend`, every other backend is the fast tier and it alone
+    is the strong tier. Otherwise the fast tier is the lowest-quality
+    backends configured and the strong tier all the higher ones. A single
+    tier means there is nothing to cascade between.
+    """
+    if strong_backend is not None:
+        fast = tuple(backend for backend in backends if backend.name != strong_backend.name)
+        strong: Tuple[LLMBackend, ...] = (strong_backend,)
+    else:
+        lowest = min(backend.tier for backend in backends)
+        fast = tuple(backend for backend in backends if backend.tier == lowest)
+        strong = tuple(backend for backend in backends if backend.tier > lowest)
+    if not fast:
+        return [CascadeTier("strong", strong)]
+    if not strong:
+        return [CascadeTier("fast", fast)]
+    return [CascadeTier("fast", fast), CascadeTier("strong", strong)]
+
+
+class ModelCascade:
+    """
+    Runs a call on the cheapest tier first and escalates to the next tier only
+    when `check` rejects the result (it returns a reason, e.g. low confidence)
+    or the call fails. The last tier's answer is final; if it fails, the best
+    rejected answer from a cheaper tier is returned instead of the error.
+    An open circuit is never escalated around.
+
+    Metrics (per service):
+        llm.cascade.calls / .escalations / .escalations.<reason>   counters
+        llm.cascade.escalation_rate                                 gauge
+        llm.cascade.latency.<tier> / .answered.<tier>               timer / counter
+    """
+    def __init__(self, service_name: str, tiers: Sequence[CascadeTier]) -> None:
+        self.service_name = service_name
+        self.tiers = list(tiers)
+
+    @property
+    def enabled(self) -> bool:
+        return len(self.tiers) > 1
+
+    def run(
+        self,
+        call: Callable[[CascadeTier], T],
+        check: Callable[[T], Optional[str]]
+    ) -> T:
+        metrics.increment(self._metric("llm.cascade.calls"))
+        rejected: Optional[T] = None
+        for position, tier in enumerate(self.tiers):
+            last = position == len(self.tiers) - 1
+            started = perf_counter()
+            try:
+                result = call(tier)
+            except CircuitOpenError:
+                raise
+            except Exception as e:
+                if last and rejected is None:
+                    raise
+                if last:
+                    logger.warning(f"[CASCADE] {self.service_name} {tier.name} tier failed, keeping cheaper answer: {e}")
+                    return rejected
+                self._escalate(tier, "error", e)
+                continue
+            metrics.observe(self._metric(f"llm.cascade.latency.{tier.name}"), perf_counter() - started)
+
+            reason = None if last else check(result)
+            if reason is None:
+                self._answered(tier)
+                return result
+            rejected = result
+            self._escalate(tier, reason)
+        return rejected
+
+    async def arun(
+        self,
+        call: Callable[[CascadeTier], Awaitable[T]],
+        check: Callable[[T], Optional[str]]
+    ) -> T:
+        metrics.increment(self._metric("llm.cascade.calls"))
+        rejected: Optional[T] = None
+        for position, tier in enumerate(self.tiers):
+            last = position == len(self.tiers) - 1
+            started = perf_counter()
+            try:
+                result = await call(tier)
+            except CircuitOpenError:
+                raise
+            except Exception as e:
+                if last and rejected is None:
+                    raise
+                if last:
+                    logger.warning(f"[CASCADE] {self.service_name} {tier.name} tier failed, keeping cheaper answer: {e}")
+                    return rejected
+                self._escalate(tier, "error", e)
+                continue
+            metrics.observe(self._metric(f"llm.cascade.latency.{tier.name}"), perf_counter() - started)
+
+            reason = None if last else check(result)
+            if reason is None:
+                self._answered(tier)
+                return result
+            rejected = result
+            self._escalate(tier, reason)
+        return rejected
+
+    def _answered(self, tier: CascadeTier) -> None:
+        metrics.increment(self._metric(f"llm.cascade.answered.{tier.name}"))
+        self._publish_rate()
+
+    def _escalate(self, tier: CascadeTier, reason: str, error: Optional[BaseException] = None) -> None:
+        metrics.increment(self._metric("llm.cascade.escalations"))
+        metrics.increment(self._metric(f"llm.cascade.escalations.{reason}"))
+        self._publish_rate()
+        detail = f": {error}" if error is not None else ""
+        logger.info(f"[CASCADE] {self.service_name} escalating past {tier.name} tier ({reason}{detail})")
+
+    def _publish_rate(self) -> None:
+        calls = metrics.get_counter(self._metric("llm.cascade.calls"))
+        escalations = metrics.get_counter(self._metric("llm.cascade.escalations"))
+        if calls:
+            metrics.set_gauge(self._metric("llm.cascade.escalation_rate"), escalations / calls)
+
+    def _metric(self, name: str) -> str:
+        return f"{name}.{self.service_name}"
@@ -4,7 +4,11 @@ from .query_orm import QueryORMService
 from .qa_answer import QAAnswerService
 from .appointment_match import AppointmentMatchService
 from .process_confirmation import ProcessConfirmationService
+from .confirmation_rules import ConfirmationRuleClassifier
 from .clarification import ClarificationService
+from .turn_understanding import TurnUnderstandingService
+from .prefetch import SpeculativePrefetcher
+from .local_intent import LocalIntentService
 
 
 __all__ = [
@@ -13,6 +17,10 @@ __all__ = [
     "QAAnswerService"
     "AppointmentMatchService",
     "ProcessConfirmationService",
+    "ConfirmationRuleClassifier",
     "ClarificationService",
+    "TurnUnderstandingService",
+    "SpeculativePrefetcher",
+    "LocalIntentService",
 ]
 
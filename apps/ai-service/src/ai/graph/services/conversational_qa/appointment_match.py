@@ -10,14 +10,22 @@ from ...types.conversational_qa import (
 )
 from ...prompts.templates.conversational_qa import ConversationalQAMessages
 from ...models.conversational_qa import AppointmentInfoModel, AppointmentMatchModel
+from ..cache import CompiledChain
 from ..llm import LLMService
 from .query_orm import QueryORMService
+from infrastructure.metrics import MetricsRegistry
 from utils import Logger
 
 logger = Logger(__name__)
+metrics = MetricsRegistry()
 
 
 class AppointmentMatchService(LLMService):
+    cache_responses = True
+    max_output_tokens = 300
+    input_token_budget = 3000
+    trimmable_inputs = ("appointments_text",)
+
     def __init__(
         self,
         query_orm_service: QueryORMService,
@@ -26,48 +34,115 @@ class AppointmentMatchService(LLMService):
     ) -> None:
         super().__init__(model=model, temp=temp)
         self.query_orm_service = query_orm_service
+
+    def prewarm(self) -> None:
+        self._get_chain()
     
     def run(
         self, 
         appointments: List[Dict[str, Any]],
-        appointment_info: AppointmentInfoModel
+        appointment_info: AppointmentInfoModel,
+        candidate_id: Optional[str] = None
     ) -> AppointmentMatchModel:
         try:
             logger.info("[SERVICE] AppointmentMatchService")
             
-            self._validate_inputs(appointments, appointment_info)
+            direct_result = self._match_directly(appointments, appointment_info)
+            if direct_result is not None:
+                return direct_result
             
-            logger.info(f" ... Matching against {len(appointments)} appointment(s)")
+            candidate_result = self._match_candidate(appointments, candidate_id)
+            if candidate_result is not None:
+                return candidate_result
             
-            direct_matches = self._find_direct_matches(appointments, appointment_info)
+            result = self._match_with_llm(appointments, appointment_info)
             
-            if len(direct_matches) == 1:
-                matched_appt = direct_matches[0]
-                logger.info(
-                    f" ... Direct match found: Appointment ID {matched_appt['id']}"
-                )
-                return AppointmentMatchModel(
-                    match_found=True,
-                    confidence=1.0,
-                    matched_appointment_id=str(matched_appt['id']),
-                    reasoning="Direct match found based on provided criteria"
-                )
+            return result
             
-            elif len(direct_matches) == 0:
-                logger.info(" ... No direct matches found, using LLM for intelligent matching")
-            else:
-                logger.info(
-                    f" ... {len(direct_matches)} direct matches found, "
-                    "using LLM to disambiguate"
-                )
+        except Exception as e:
+            logger.error(f"[SERVICE] AppointmentMatchService ERROR: {e}", exc_info=True)
+            return self._get_fallback_response()
+
+    async def arun(
+        self, 
+        appointments: List[Dict[str, Any]],
+        appointment_info: AppointmentInfoModel,
+        candidate_id: Optional[str] = None
+    ) -> AppointmentMatchModel:
+        try:
+            logger.info("[SERVICE] AppointmentMatchService (async)")
             
-            result = self._match_with_llm(appointments, appointment_info)
+            direct_result = self._match_directly(appointments, appointment_info)
+            if direct_result is not None:
+                return direct_result
+            
+            candidate_result = self._match_candidate(appointments, candidate_id)
+            if candidate_result is not None:
+                return candidate_result
+            
+            result = await self._amatch_with_llm(appointments, appointment_info)
             
             return result
             
         except Exception as e:
             logger.error(f"[SERVICE] AppointmentMatchService ERROR: {e}", exc_info=True)
             return self._get_fallback_response()
+
+    def _match_directly(
+        self, 
+        appointments: List[Dict[str, Any]],
+        appointment_info: AppointmentInfoModel
+    ) -> Optional[AppointmentMatchModel]:
+        """ Return a match without the LLM when exactly one appointment matches. """
+        self._validate_inputs(appointments, appointment_info)
+        
+        logger.info(f" ... Matching against {len(appointments)} appointment(s)")
+        
+        direct_matches = self._find_direct_matches(appointments, appointment_info)
+        
+        if len(direct_matches) == 1:
+            matched_appt = direct_matches[0]
+            logger.info(
+                f" ... Direct match found: Appointment ID {matched_appt['id']}"
+            )
+            return AppointmentMatchModel(
+                match_found=True,
+                confidence=1.0,
+                matched_appointment_id=str(matched_appt['id']),
+                reasoning="Direct match found based on provided criteria"
+            )
+        
+        elif len(direct_matches) == 0:
+            logger.info(" ... No direct matches found, using LLM for intelligent matching")
+        else:
+            logger.info(
+                f" ... {len(direct_matches)} direct matches found, "
+                "using LLM to disambiguate"
+            )
+        return None
+    
+    def _match_candidate(
+        self,
+        appointments: List[Dict[str, Any]],
+        candidate_id: Optional[str]
+    ) -> Optional[AppointmentMatchModel]:
+        """ Accept an appointment id already picked upstream (fused understanding) if it is in the list. """
+        if not candidate_id:
+            return None
+        
+        if not any(str(appt.get('id')) == str(candidate_id) for appt in appointments):
+            logger.info(f" ... Candidate appointment {candidate_id} not in list, ignoring it")
+            metrics.increment("appointment_match.candidate_rejected")
+            return None
+        
+        logger.info(f" ... Using upstream candidate appointment ID {candidate_id}")
+        metrics.increment("appointment_match.candidate_used")
+        return AppointmentMatchModel(
+            match_found=True,
+            confidence=1.0,
+            matched_appointment_id=str(candidate_id),
+            reasoning="Candidate identified by turn understanding"
+        )
     
     def _find_direct_matches(
         self,
@@ -132,29 +207,51 @@ class AppointmentMatchService(LLMService):
         appointments: List[Dict[str, Any]],
         appointment_info: AppointmentInfoModel
     ) -> AppointmentMatchModel:
-        doctor_full_name = appointment_info.doctor_full_name or ""
-        clinic_name = appointment_info.clinic_name or ""
-        appointment_date = appointment_info.appointment_date or ""
-        specialty = appointment_info.specialty or ""
+        chain, inputs = self._build_chain_inputs(appointments, appointment_info)
+        
+        result: AppointmentMatchModel = self.invoke_chain(chain, inputs)
         
+        return self._log_result(result)
+
+    async def _amatch_with_llm(
+        self,
+        appointments: List[Dict[str, Any]],
+        appointment_info: AppointmentInfoModel
+    ) -> AppointmentMatchModel:
+        chain, inputs = self._build_chain_inputs(appointments, appointment_info)
+        
+        result: AppointmentMatchModel = await self.ainvoke_chain(chain, inputs)
+        
+        return self._log_result(result)
+
+    def _build_chain_inputs(
+        self,
+        appointments: List[Dict[str, Any]],
+        appointment_info: AppointmentInfoModel
+    ) -> Tuple[CompiledChain, Dict[str, Any]]:
         criteria_text = self._format_criteria(appointment_info)
         appointments_text = self._format_appointments(appointments)
         
-        template = self._build_prompt_template()
-        chain = self.build_structured_chain(
-            template=template,
-            schema=AppointmentMatchModel
-        )
+        chain = self._get_chain()
         
-        result: AppointmentMatchModel = chain.invoke({
+        inputs = {
             "criteria_text": criteria_text,
             "appointments_text": appointments_text,
-            "doctor_full_name": doctor_full_name,
-            "clinic_name": clinic_name,
-            "appointment_date": appointment_date,
-            "specialty": specialty
-        })
-        
+            "doctor_full_name": appointment_info.doctor_full_name or "",
+            "clinic_name": appointment_info.clinic_name or "",
+            "appointment_date": appointment_info.appointment_date or "",
+            "specialty": appointment_info.specialty or ""
+        }
+        return chain, inputs
+
+    def _get_chain(self) -> CompiledChain:
+        return self.get_structured_chain(
+            variant="default",
+            schema=AppointmentMatchModel,
+            build_template=self._build_prompt_template
+        )
+
+    def _log_result(self, result: AppointmentMatchModel) -> AppointmentMatchModel:
         if result.match_found:
             logger.info(
                 f" ... LLM match found: Appointment ID {result.matched_appointment_id} "
@@ -1,5 +1,11 @@
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
 from langchain.prompts import PromptTemplate 
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Sequence, Tuple
+
+from infrastructure.config import EnvConfig
+from infrastructure.metrics import MetricsRegistry
 
 from ...models.conversational_qa import (
     VerificationInfoModel, 
@@ -8,14 +14,121 @@ from ...models.conversational_qa import (
 )
 from ...prompts.templates.conversational_qa import ConversationalQAMessages
 from ...states.conversational_qa import QAState, StateKeys
+from ..cache import CompiledChain
+from ..limiter import CallPriority
 from ..llm import LLMService
 
 from utils import Logger
 
 logger = Logger(__name__)
+metrics = MetricsRegistry()
+
+
+@dataclass(frozen=True)
+class ClarificationSignature:
+    """ The discrete part of a verification failure that decides how to ask for clarification. """
+    kind: str                          # "user" | "appointment"
+    reason: str
+    missing_fields: Tuple[str, ...]
+    likely_incorrect: Tuple[str, ...]
 
 
 class ClarificationService(LLMService):
+    """
+    Clarification prompts after a failed patient or appointment verification.
+
+    LLM_CLARIFICATION_MODE selects how they are worded:
+    - template (default): deterministic text per diagnostic reason, filled
+      with the missing / likely incorrect fields. No LLM call.
+    - cached: the LLM words each distinct ClarificationSignature once, from
+      field names only (no patient values), and the wording is reused for
+      every later failure with the same signature.
+    - rich: the LLM writes every prompt from the full context, including
+      the provided values and the patient's appointments.
+    When an LLM call fails, the diagnostic's own message is used, as before.
+    """
+    max_output_tokens = 300
+    input_token_budget = 2000
+    call_priority = CallPriority.GENERATION
+    trimmable_inputs = ("existing_appointments_summary",)
+
+    TEMPLATE = "template"
+    CACHED = "cached"
+    RICH = "rich"
+    MODES = (TEMPLATE, CACHED, RICH)
+    mode: str = TEMPLATE
+    # Distinct signatures are few (reason x field subsets); the bound only guards against odd diagnostics
+    phrasing_cache_size: int = 512
+
+    USER_FIELDS: Tuple[str, ...] = ("full_name", "phone_number", "date_of_birth")
+    APPOINTMENT_FIELDS: Tuple[str, ...] = ("doctor_full_name", "clinic_name", "appointment_date", "specialty")
+
+    # {missing} / {missing_any} (joined with "or"), {incorrect} and {correct} take friendly field names
+    USER_TEMPLATES: Dict[str, str] = {
+        "no_info_provided": (
+            "To verify your identity, please share your full name, phone number, and date of birth."
+        ),
+        "incomplete_info": (
+            "Thanks! To finish verifying your identity, please also share your {missing}."
+        ),
+        "user_not_found": (
+            "I couldn't find a patient record with those details. Please double-check your full name, "
+            "phone number, and date of birth. If you're a new patient, you may need to register first."
+        ),
+        "multiple_fields_incorrect": (
+            "I found a record matching your {correct}, but not your {incorrect}. "
+            "Could you double-check your {incorrect}?"
+        ),
+        "single_field_incorrect": (
+            "Most of your details match our records, but your {incorrect} doesn't. "
+            "Could you double-check your {incorrect}?"
+        ),
+        "no_complete_match": (
+            "Some of your details match our records, but not all together. "
+            "Please double-check your full name, phone number, and date of birth."
+        ),
+    }
+    USER_DEFAULT_TEMPLATE = (
+        "I couldn't verify your identity yet. Please confirm your full name, phone number, and date of birth."
+    )
+    APPOINTMENT_TEMPLATES: Dict[str, str] = {
+        "no_appointments": (
+            "I don't see any scheduled appointments for you. Would you like to book a new one?"
+        ),
+        "no_info_provided": (
+            "Which appointment do you mean? Please tell me the doctor's name, clinic, date, or specialty."
+        ),
+        "incomplete_info": (
+            "Could you tell me a bit more about the appointment, such as the {missing_any}?"
+        ),
+        "no_matches": (
+            "I couldn't find an appointment matching those details. Could you double-check the {incorrect}?"
+        ),
+        "single_field_mismatch": (
+            "I found an appointment matching almost everything, but the {incorrect} doesn't match. "
+            "Could you double-check the {incorrect}?"
+        ),
+        "partial_match": (
+            "Some of those details match one of your appointments, but not the {incorrect}. "
+            "Could you double-check them?"
+        ),
+        "no_complete_match": (
+            "I couldn't match that to one of your appointments. "
+            "Could you describe it differently, for example by the doctor's name and date?"
+        ),
+        "match_not_found_in_list": (
+            "I couldn't pin down that appointment. "
+            "Could you describe it again, for example by the doctor's name and date?"
+        ),
+        "unknown_intent": (
+            "Sorry, I couldn't tell what you'd like to do with your appointment. "
+            "Would you like to confirm it or cancel it?"
+        ),
+    }
+    APPOINTMENT_DEFAULT_TEMPLATE = (
+        "Could you share more about your appointment, such as the doctor's name, clinic, date, or specialty?"
+    )
+
     FIELD_LABELS = {
         "full_name": "full name",
         "phone_number": "phone number",
@@ -33,6 +146,15 @@ class ClarificationService(LLMService):
     ):
 
         super().__init__(model=model, temp=temp)
+        self.mode = self._mode_from_env()
+        self._phrasings: "OrderedDict[ClarificationSignature, str]" = OrderedDict()
+        self._phrasings_lock = threading.Lock()
+
+    def prewarm(self) -> None:
+        if self.mode == self.TEMPLATE:
+            return
+        self._get_user_chain()
+        self._get_appointment_chain()
     
     def user_run(
         self,
@@ -40,10 +162,20 @@ class ClarificationService(LLMService):
         diagnostic_info: Optional[Dict] = None,
         conversation_context: Optional[str] = None
     ) -> str:
-        """ Generate clarification prompt for user verification using LLM. """
+        """ Clarification prompt for a failed patient verification, worded according to `mode`. """
         try:
             logger.info("[SERVICE] ClarificationService.user_run")
             
+            signature = self._user_signature(verification_info, diagnostic_info)
+            if self.mode == self.TEMPLATE:
+                return self._from_template(signature)
+            if self.mode == self.CACHED:
+                cached = self._cached_phrasing(signature)
+                if cached is not None:
+                    return cached
+                chain, inputs = self._build_user_chain_inputs(self._signature_context(signature))
+                return self._store_phrasing(signature, self.invoke_chain(chain, inputs).clarification_prompt)
+            
             context = self._build_user_context(
                 verification_info,
                 diagnostic_info
@@ -67,10 +199,20 @@ class ClarificationService(LLMService):
         diagnostic_info: Optional[Dict] = None,
         conversation_context: Optional[str] = None
     ) -> str:
-        """ Generate clarification prompt for appointment information using LLM. """
+        """ Clarification prompt for a failed appointment verification, worded according to `mode`. """
         try:
             logger.info("[SERVICE] ClarificationService.appointment_run")
             
+            signature = self._appointment_signature(appointment_info, diagnostic_info)
+            if self.mode == self.TEMPLATE:
+                return self._from_template(signature)
+            if self.mode == self.CACHED:
+                cached = self._cached_phrasing(signature)
+                if cached is not None:
+                    return cached
+                chain, inputs = self._build_appointment_chain_inputs(self._signature_context(signature))
+                return self._store_phrasing(signature, self.invoke_chain(chain, inputs).clarification_prompt)
+            
             context = self._build_appointment_context(
                 appointment_info,
                 diagnostic_info
@@ -94,6 +236,83 @@ class ClarificationService(LLMService):
             )
             return self._get_fallback_appointment_prompt(appointment_info, diagnostic_info)
     
+    async def auser_run(
+        self,
+        verification_info: Optional[VerificationInfoModel] = None,
+        diagnostic_info: Optional[Dict] = None,
+        conversation_context: Optional[str] = None
+    ) -> str:
+        """ Async variant of user_run. """
+        try:
+            logger.info("[SERVICE] ClarificationService.auser_run")
+            
+            signature = self._user_signature(verification_info, diagnostic_info)
+            if self.mode == self.TEMPLATE:
+                return self._from_template(signature)
+            if self.mode == self.CACHED:
+                cached = self._cached_phrasing(signature)
+                if cached is not None:
+                    return cached
+                chain, inputs = self._build_user_chain_inputs(self._signature_context(signature))
+                result = await self.ainvoke_chain(chain, inputs)
+                return self._store_phrasing(signature, result.clarification_prompt)
+            
+            context = self._build_user_context(
+                verification_info,
+                diagnostic_info
+            )
+            
+            chain, inputs = self._build_user_chain_inputs(context)
+            result = await self.ainvoke_chain(chain, inputs)
+            clarification = result.clarification_prompt
+            
+            logger.info(f" ... Generated clarification ({len(clarification)} chars)")
+            return clarification
+            
+        except Exception as e:
+            logger.error(f"[SERVICE] ClarificationService.auser_run ERROR: {e}", exc_info=True)
+            return self._get_fallback_user_prompt(verification_info, diagnostic_info)
+    
+    async def aappointment_run(
+        self,
+        appointment_info: Optional[AppointmentInfoModel] = None,
+        diagnostic_info: Optional[Dict] = None,
+        conversation_context: Optional[str] = None
+    ) -> str:
+        """ Async variant of appointment_run. """
+        try:
+            logger.info("[SERVICE] ClarificationService.aappointment_run")
+            
+            signature = self._appointment_signature(appointment_info, diagnostic_info)
+            if self.mode == self.TEMPLATE:
+                return self._from_template(signature)
+            if self.mode == self.CACHED:
+                cached = self._cached_phrasing(signature)
+                if cached is not None:
+                    return cached
+                chain, inputs = self._build_appointment_chain_inputs(self._signature_context(signature))
+                result = await self.ainvoke_chain(chain, inputs)
+                return self._store_phrasing(signature, result.clarification_prompt)
+            
+            context = self._build_appointment_context(
+                appointment_info,
+                diagnostic_info
+            )
+            
+            chain, inputs = self._build_appointment_chain_inputs(context)
+            result = await self.ainvoke_chain(chain, inputs)
+            clarification = result.clarification_prompt
+            
+            logger.info(f" ... Generated clarification ({len(clarification)} chars)")
+            return clarification
+            
+        except Exception as e:
+            logger.error(
+                f"[SERVICE] ClarificationService.aappointment_run ERROR: {e}",
+                exc_info=True
+            )
+            return self._get_fallback_appointment_prompt(appointment_info, diagnostic_info)
+    
     def appointment_wait(
         self,
         appointment_info: Optional[AppointmentInfoModel] = None
@@ -102,6 +321,131 @@ class ClarificationService(LLMService):
         logger.info("[SERVICE] ClarificationService.appointment_wait")
         return ConversationalQAMessages.base_clarification_appointment_wait_system
 
+    def _mode_from_env(self) -> str:
+        mode = (EnvConfig.get_str(f"LLM_{self.config_name}_MODE", self.mode) or self.mode).lower()
+        if mode not in self.MODES:
+            logger.warning(f"Unknown LLM_{self.config_name}_MODE '{mode}', using {self.TEMPLATE}")
+            return self.TEMPLATE
+        return mode
+
+    def _user_signature(
+        self,
+        verification_info: Optional[VerificationInfoModel],
+        diagnostic_info: Optional[Dict]
+    ) -> ClarificationSignature:
+        return self._signature("user", self.USER_FIELDS, verification_info, diagnostic_info)
+
+    def _appointment_signature(
+        self,
+        appointment_info: Optional[AppointmentInfoModel],
+        diagnostic_info: Optional[Dict]
+    ) -> ClarificationSignature:
+        return self._signature("appointment", self.APPOINTMENT_FIELDS, appointment_info, diagnostic_info)
+
+    def _signature(
+        self,
+        kind: str,
+        fields: Sequence[str],
+        info: Optional[Any],
+        diagnostic_info: Optional[Dict]
+    ) -> ClarificationSignature:
+        """ Without diagnostics (should not happen after a verification node) the gaps in `info` stand in. """
+        if diagnostic_info:
+            reason = diagnostic_info.get("reason") or "unknown"
+            missing = diagnostic_info.get("missing_fields") or []
+        else:
+            missing = [field for field in fields if info is None or not getattr(info, field, None)]
+            reason = "no_info_provided" if info is None else "incomplete_info" if missing else "unknown"
+        incorrect = (diagnostic_info or {}).get("likely_incorrect") or []
+        return ClarificationSignature(
+            kind=kind,
+            reason=reason,
+            missing_fields=self._ordered(missing, fields),
+            likely_incorrect=self._ordered(incorrect, fields)
+        )
+
+    def _ordered(self, names: Sequence[str], fields: Sequence[str]) -> Tuple[str, ...]:
+        """ Known fields in form order, then any others; de-duplicated so equal failures share a signature. """
+        unique = set(names)
+        return tuple(field for field in fields if field in unique) + tuple(sorted(unique - set(fields)))
+
+    def _from_template(self, signature: ClarificationSignature) -> str:
+        if signature.kind == "user":
+            templates, default, fields = self.USER_TEMPLATES, self.USER_DEFAULT_TEMPLATE, self.USER_FIELDS
+        else:
+            templates, default, fields = self.APPOINTMENT_TEMPLATES, self.APPOINTMENT_DEFAULT_TEMPLATE, self.APPOINTMENT_FIELDS
+        
+        missing = [self.FIELD_LABELS.get(field, field) for field in signature.missing_fields]
+        incorrect = [self.FIELD_LABELS.get(field, field) for field in signature.likely_incorrect]
+        correct = [
+            self.FIELD_LABELS.get(field, field) for field in fields
+            if field not in signature.likely_incorrect and field not in signature.missing_fields
+        ]
+        values = {
+            "missing": self._format_list_with_grammar(missing),
+            "missing_any": self._format_list_with_grammar(missing, conjunction="or"),
+            "incorrect": self._format_list_with_grammar(incorrect),
+            "correct": self._format_list_with_grammar(correct),
+        }
+        
+        template = templates.get(signature.reason, default)
+        # A template whose fields the diagnostic did not name would read "your ?": use the generic one
+        if any(f"{{{name}}}" in template and not value for name, value in values.items()):
+            template = default
+        
+        self._count_source(signature, "template")
+        return template.format(**values)
+
+    def _cached_phrasing(self, signature: ClarificationSignature) -> Optional[str]:
+        with self._phrasings_lock:
+            phrasing = self._phrasings.get(signature)
+            if phrasing is not None:
+                self._phrasings.move_to_end(signature)
+        if phrasing is not None:
+            self._count_source(signature, "cache")
+        return phrasing
+
+    def _store_phrasing(self, signature: ClarificationSignature, phrasing: str) -> str:
+        self._count_source(signature, "llm")
+        with self._phrasings_lock:
+            self._phrasings[signature] = phrasing
+            self._phrasings.move_to_end(signature)
+            while len(self._phrasings) > self.phrasing_cache_size:
+                self._phrasings.popitem(last=False)
+        logger.info(f" ... Cached clarification phrasing for {signature.kind}/{signature.reason}")
+        return phrasing
+
+    def _signature_context(self, signature: ClarificationSignature) -> Dict[str, Any]:
+        """
+        Prompt context built from the signature alone, so the wording the LLM
+        returns holds no patient values and can be reused for anyone.
+        """
+        fields = self.USER_FIELDS if signature.kind == "user" else self.APPOINTMENT_FIELDS
+        # The appointment prompt calls the doctor field doctor_name
+        keys = {"doctor_full_name": "doctor_name"}
+        current_info = {
+            keys.get(field, field): "not provided" if field in signature.missing_fields else "provided"
+            for field in fields
+        }
+        correct = [
+            field for field in fields
+            if field not in signature.likely_incorrect and field not in signature.missing_fields
+        ]
+        return {
+            "has_diagnostics": True,
+            "current_info": current_info,
+            "diagnostic": {
+                "reason": signature.reason,
+                "missing_fields": list(signature.missing_fields),
+                "likely_incorrect": list(signature.likely_incorrect),
+                "possibly_correct": correct if signature.likely_incorrect else [],
+            },
+        }
+
+    def _count_source(self, signature: ClarificationSignature, source: str) -> None:
+        metrics.increment(f"clarification.source.{source}")
+        metrics.increment(f"clarification.source.{source}.{signature.kind}.{signature.reason}")
+
     def _build_user_context(
         self,
         verification_info: Optional[VerificationInfoModel],
@@ -186,39 +530,32 @@ class ClarificationService(LLMService):
         conversation_context: Optional[str] = None
     ) -> str:
         """Generate user clarification prompt using LLM. """
-        system_prompt = ConversationalQAMessages.clarification_user_system
-        human_prompt = ConversationalQAMessages.clarification_user_prompt
+        chain, inputs = self._build_user_chain_inputs(context)
+        
+        result = self.invoke_chain(chain, inputs)
+        
+        return result.clarification_prompt
 
+    def _build_user_chain_inputs(
+        self,
+        context: Dict[str, Any]
+    ) -> Tuple[CompiledChain, Dict[str, Any]]:
         diagnostic_summary = self._format_user_diagnostic_for_prompt(
             context.get("diagnostic")
         )
         
         current_info = context.get("current_info", {})
         
-        template = self.build_prompt_template(
-            system_prompt=system_prompt,
-            human_prompt=human_prompt,
-            system_input_variables=["context"],
-            human_input_variables=[
-                "full_name", "phone_number", 
-                "date_of_birth", "diagnostic_summary"
-            ]
-        )
-        
-        chain = self.build_structured_chain(
-            template=template,
-            schema=ClarificationPromptModel
-        )
+        chain = self._get_user_chain()
         
-        result = chain.invoke({
+        inputs = {
             "context": str(context),
             "full_name": current_info.get("full_name", "not provided"),
             "phone_number": current_info.get("phone_number", "not provided"),
             "date_of_birth": current_info.get("date_of_birth", "not provided"),
             "diagnostic_summary": diagnostic_summary
-        })
-        
-        return result.clarification_prompt
+        }
+        return chain, inputs
     
     def _generate_appointment_clarification(
         self,
@@ -226,18 +563,79 @@ class ClarificationService(LLMService):
         conversation_context: Optional[str] = None
     ) -> str:
         """ Generate appointment clarification prompt using LLM. """
+        chain, inputs = self._build_appointment_chain_inputs(context)
+        
+        result = self.invoke_chain(chain, inputs)
         
+        return result.clarification_prompt
+
+    def _build_appointment_chain_inputs(
+        self,
+        context: Dict[str, Any]
+    ) -> Tuple[CompiledChain, Dict[str, Any]]:
         diagnostic_summary = self._format_appointment_diagnostic_for_prompt(
             context.get("diagnostic")
         )
 
         logger.info(f"... (_generate_appointment_clarification) diagnostic_summary = {diagnostic_summary}")
 
-        system_prompt = ConversationalQAMessages.clarification_appointment_system
-        human_prompt = ConversationalQAMessages.clarification_appointment_prompt
-        
         current_info = context.get("current_info", {})
         
+        chain = self._get_appointment_chain()
+        
+        inputs = {
+            "context": str(self._without_appointments_summary(context)),
+            "doctor_name": current_info.get("doctor_name", "not provided"),
+            "clinic_name": current_info.get("clinic_name", "not provided"),
+            "appointment_date": current_info.get("appointment_date", "not provided"),
+            "specialty": current_info.get("specialty", "not provided"),
+            "diagnostic_summary": diagnostic_summary,
+            "existing_appointments_summary": (
+                (context.get("diagnostic") or {}).get("existing_appointments_summary") or "Not available."
+            )
+        }
+        return chain, inputs
+
+    def _without_appointments_summary(self, context: Dict[str, Any]) -> Dict[str, Any]:
+        """ The summary is sent once as its own (trimmable) prompt section, not inside the context dump. """
+        diagnostic = context.get("diagnostic")
+        if not diagnostic or "existing_appointments_summary" not in diagnostic:
+            return context
+        diagnostic = {k: v for k, v in diagnostic.items() if k != "existing_appointments_summary"}
+        return {**context, "diagnostic": diagnostic}
+
+    def _get_user_chain(self) -> CompiledChain:
+        return self.get_structured_chain(
+            variant="user",
+            schema=ClarificationPromptModel,
+            build_template=self._build_user_prompt_template
+        )
+
+    def _get_appointment_chain(self) -> CompiledChain:
+        return self.get_structured_chain(
+            variant="appointment",
+            schema=ClarificationPromptModel,
+            build_template=self._build_appointment_prompt_template
+        )
+
+    def _build_user_prompt_template(self) -> PromptTemplate:
+        system_prompt = ConversationalQAMessages.clarification_user_system
+        human_prompt = ConversationalQAMessages.clarification_user_prompt
+
+        return self.build_prompt_template(
+            system_prompt=system_prompt,
+            human_prompt=human_prompt,
+            system_input_variables=["context"],
+            human_input_variables=[
+                "full_name", "phone_number", 
+                "date_of_birth", "diagnostic_summary"
+            ]
+        )
+
+    def _build_appointment_prompt_template(self) -> PromptTemplate:
+        system_prompt = ConversationalQAMessages.clarification_appointment_system
+        human_prompt = ConversationalQAMessages.clarification_appointment_prompt
+
         template = self.build_prompt_template(
             system_prompt=system_prompt,
             human_prompt=human_prompt,
@@ -245,27 +643,11 @@ class ClarificationService(LLMService):
             human_input_variables=[
                 "doctor_name", "clinic_name", 
                 "appointment_date", "specialty",
-                "diagnostic_summary"
+                "diagnostic_summary", "existing_appointments_summary"
             ]
         )
-
         logger.info(f" ... Appointment clarification template: {template}")
-        
-        chain = self.build_structured_chain(
-            template=template,
-            schema=ClarificationPromptModel
-        )
-        
-        result = chain.invoke({
-            "context": str(context),
-            "doctor_name": current_info.get("doctor_name", "not provided"),
-            "clinic_name": current_info.get("clinic_name", "not provided"),
-            "appointment_date": current_info.get("appointment_date", "not provided"),
-            "specialty": current_info.get("specialty", "not provided"),
-            "diagnostic_summary": diagnostic_summary
-        })
-        
-        return result.clarification_prompt
+        return template
 
     def _format_user_diagnostic_for_prompt(self, diagnostic: Optional[Dict]) -> str:
         """ Format diagnostic information into readable text for LLM prompt. """
@@ -359,11 +741,6 @@ class ClarificationService(LLMService):
             parts.append(f"  Date: {closest_match.get('appointment_date', 'N/A')}")
             parts.append(f"  Specialty: {closest_match.get('specialty', 'N/A')}")
         
-        # Existing appointments summary (for appointments)
-        existing_summary = diagnostic.get("existing_appointments_summary")
-        if existing_summary:
-            parts.append(f"\nUser's scheduled appointments:\n{existing_summary}")
-        
         # Diagnostic message
         message = diagnostic.get("message")
         if message:
@@ -430,12 +807,12 @@ class ClarificationService(LLMService):
         
         return "We need more information to identify your appointment."
     
-    def _format_list_with_grammar(self, items: List[str]) -> str:
+    def _format_list_with_grammar(self, items: List[str], conjunction: str = "and") -> str:
         """ Format a list of strings into a grammatically correct phrase."""
         if not items:
             return ""
         if len(items) == 1:
             return items[0]
         if len(items) == 2:
-            return f"{items[0]} and {items[1]}"
-        return ", ".join(items[:-1]) + f", and {items[-1]}"
\ No newline at end of file
+            return f"{items[0]} {conjunction} {items[1]}"
+        return ", ".join(items[:-1]) + f", {conjunction} {items[-1]}"
\ No newline at end of file
@@ -0,0 +1,168 @@
+import re
+import unicodedata
+from typing import (
+    Dict,
+    FrozenSet,
+    List,
+    Optional,
+    Union
+)
+
+from ...types.conversational_qa import ConfirmationIntent, IntentType
+from ...models.conversational_qa import AppointmentConfirmationResponse
+
+Label = Optional[Union[ConfirmationIntent, IntentType]]
+
+# Phrases are stored normalized: lowercase, accents stripped, punctuation as spaces.
+CONFIRM_PHRASES: FrozenSet[str] = frozenset({
+    # en
+    "y", "yes", "yeah", "yea", "yep", "yup", "ya", "sure", "ok", "okay", "k", "kk",
+    "correct", "right", "affirmative", "absolutely", "definitely", "of course",
+    "go ahead", "do it", "please do", "sounds good", "that s right", "thats right",
+    "that is right", "confirmed", "i confirm", "agreed", "proceed", "yes please",
+    "alright", "all right", "perfect", "great",
+    # pt
+    "sim", "s", "claro", "com certeza", "pode", "pode ser", "isso", "isso mesmo",
+    "certo", "exato", "exatamente", "confirmado", "confirmo", "pode sim", "beleza",
+    "fechado", "perfeito",
+    # es
+    "si", "por supuesto", "de acuerdo", "vale", "correcto", "adelante", "dale",
+    "confirmo", "perfecto", "hazlo",
+    # fr / de
+    "oui", "d accord", "bien sur", "ja", "genau", "jawohl",
+    # emoji
+    "+1",
+})
+
+REJECT_PHRASES: FrozenSet[str] = frozenset({
+    # en
+    "n", "no", "nope", "nah", "no thanks", "not now", "never mind", "nevermind",
+    "don t", "dont", "do not", "don t do it", "do not do it", "no way", "negative",
+    "keep it", "leave it", "stop", "abort", "forget it", "not really",
+    # pt
+    "nao", "nao quero", "melhor nao", "de jeito nenhum", "agora nao",
+    "deixa pra la", "esquece", "negativo",
+    # es
+    "no gracias", "ahora no", "mejor no", "para nada", "dejalo", "olvidalo",
+    # fr / de
+    "non", "pas maintenant", "nein",
+    # emoji
+    "-1",
+})
+
+# Menu commands name an action; they only confirm when they match the pending one.
+ACTION_PHRASES: Dict[str, IntentType] = {
+    **{phrase: IntentType.CANCEL_APPOINTMENT for phrase in (
+        "cancel", "cancel it", "cancel appointment", "cancel the appointment",
+        "cancelar", "cancela", "cancelar consulta", "pode cancelar", "cancele",
+        "annuler", "stornieren",
+    )},
+    **{phrase: IntentType.CONFIRM_APPOINTMENT for phrase in (
+        "confirm", "confirm it", "confirm appointment", "confirm the appointment",
+        "confirmar", "confirma", "confirmar consulta", "pode confirmar", "confirme",
+        "confirmer", "bestatigen",
+    )},
+}
+
+# Politeness that carries no polarity; matched as phrases so "por favor" does not eat "por supuesto".
+FILLER_PHRASES: FrozenSet[str] = frozenset({
+    "please", "pls", "plz", "thanks", "thx", "ty", "thank you", "thank you so much",
+    "por favor", "obrigado", "obrigada", "valeu", "gracias", "merci", "s il vous plait",
+    "danke", "bitte",
+})
+
+EMOJI_TOKENS: Dict[str, str] = {
+    "\U0001F44D": " +1 ",
+    "\U0001F44E": " -1 ",
+    "✅": " +1 ",
+    "❌": " -1 ",
+}
+
+_NON_WORD = re.compile(r"[^a-z0-9+\-]+")
+
+
+class ConfirmationRuleClassifier:
+    """
+    Deterministic lexicon classifier for replies to an ASK_CONFIRMATION prompt.
+
+    The whole reply (minus politeness fillers) must segment into known phrases
+    of a single polarity; anything else, including mixed or long replies, is
+    left to the LLM by returning None. "cancel"/"confirm" style commands only
+    count as a confirmation when they name the pending action.
+    """
+    MAX_TOKENS: int = 10
+    MAX_PHRASE_TOKENS: int = 4
+    CONFIDENCE: float = 0.99
+
+    def __init__(self) -> None:
+        self._lexicon: Dict[str, Label] = {
+            **{phrase: ConfirmationIntent.CONFIRM for phrase in CONFIRM_PHRASES},
+            **{phrase: ConfirmationIntent.REJECT for phrase in REJECT_PHRASES},
+            **ACTION_PHRASES,
+            **{phrase: None for phrase in FILLER_PHRASES},
+        }
+
+    def classify(
+        self,
+        user_message: str,
+        pending_action: Optional[IntentType] = None
+    ) -> Optional[AppointmentConfirmationResponse]:
+        tokens = self._tokenize(user_message)
+        if not tokens or len(tokens) > self.MAX_TOKENS:
+            return None
+
+        labels = self._segment(tokens)
+        if not labels:
+            return None
+
+        intents = {self._resolve(label, pending_action) for label in labels}
+        if len(intents) != 1:
+            return None
+
+        intent = intents.pop()
+        if intent is None:
+            return None
+
+        return AppointmentConfirmationResponse(
+            intent=intent,
+            confidence=self.CONFIDENCE,
+            reasoning=f"Matched rule-based lexicon: '{' '.join(tokens)}'",
+            extracted_concerns=""
+        )
+
+    def _tokenize(self, user_message: str) -> List[str]:
+        text = user_message or ""
+        for emoji, replacement in EMOJI_TOKENS.items():
+            text = text.replace(emoji, replacement)
+
+        text = unicodedata.normalize("NFKD", text.lower())
+        text = "".join(ch for ch in text if not unicodedata.combining(ch))
+        return _NON_WORD.sub(" ", text).split()
+
+    def _segment(self, tokens: List[str]) -> Optional[List[Label]]:
+        """ Greedy longest-match split of `tokens` into lexicon phrases; None if any token is unknown. """
+        labels: List[Label] = []
+        i = 0
+        while i < len(tokens):
+            for length in range(min(self.MAX_PHRASE_TOKENS, len(tokens) - i), 0, -1):
+                phrase = " ".join(tokens[i:i + length])
+                if phrase in self._lexicon:
+                    if self._lexicon[phrase] is not None:
+                        labels.append(self._lexicon[phrase])
+                    i += length
+                    break
+            else:
+                return None
+        return labels
+
+    def _resolve(
+        self,
+        label: Union[ConfirmationIntent, IntentType],
+        pending_action: Optional[IntentType]
+    ) -> Optional[ConfirmationIntent]:
+        if isinstance(label, ConfirmationIntent):
+            return label
+        # "cancel" while confirming (or vice versa) could be a change of mind; let the LLM decide.
+        if pending_action is not None and label == pending_action:
+            return ConfirmationIntent.CONFIRM
+        return None
@@ -1,17 +1,46 @@
+import asyncio
 from langchain.prompts import PromptTemplate 
-from typing import Dict, Optional
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
 
-from ...models.conversational_qa import ConversationIntentModel, UserIntentModel
+from infrastructure.config import EnvConfig
+from infrastructure.metrics import MetricsRegistry
+
+from ...models.conversational_qa import BatchIntentModel, ConversationIntentModel, UserIntentModel
 from ...types.conversational_qa import IntentType
 from ...states.conversational_qa import QAState, StateKeys
 from ...prompts.templates.conversational_qa import ConversationalQAMessages
+from ..batching import MicroBatcher
+from ..cache import CompiledChain
+from ..cascade import CascadeTier, ModelCascade, split_tiers
+from ..limiter import CallPriority
 from ..llm import LLMService
+from ..providers import MAX_TIER, LLMBackend
+from ..resilience import CallPolicy
+from ..usage import track_turn_usage, TurnUsage
+from .prefetch import detect_date_of_birth, detect_phone
 from utils import Logger
 
 logger = Logger(__name__)
+metrics = MetricsRegistry()
 
 
 class IntentService(LLMService):
+	cache_responses = True
+	max_output_tokens = 400
+	# Idempotent classification: short deadline, hedged after the p95
+	call_policy = CallPolicy(timeout_seconds=10.0, deadline_seconds=20.0, hedge=True)
+	call_priority = CallPriority.CLASSIFICATION
+	# Cascade mode (LLM_INTENT_CASCADE=true): classify on the fast tier and only escalate to the
+	# strong one (LLM_INTENT_CASCADE_MODEL, or the higher LLM_BACKENDS tiers) when confidence is
+	# under LLM_INTENT_CASCADE_THRESHOLD or the extracted fields don't fit the intent
+	cascade_threshold: float = 0.75
+	# Batch mode (LLM_INTENT_BATCH=true, async only): messages arriving from different sessions
+	# within LLM_INTENT_BATCH_WINDOW_MS, up to LLM_INTENT_BATCH_MAX of them, share one LLM call.
+	# Identity details never cross sessions: unverified messages with a phone number or date of
+	# birth are classified alone, and verification_info is never taken from a batched answer
+	batch_window_ms: float = 15.0
+	batch_max_size: int = 16
+
 	INTENT_DESCRIPTIONS: Dict[IntentType, str] = {
 		IntentType.GENERAL_QA: "General questions about the clinic, hours, services, etc.",
 		IntentType.LIST_APPOINTMENTS: "User wants to see their appointments",
@@ -27,6 +56,17 @@ class IntentService(LLMService):
 		temp: float = 0.0,
 	) -> None:
 		super().__init__(model=model, temp=temp)
+		self.cascade_threshold = EnvConfig.get_float("LLM_INTENT_CASCADE_THRESHOLD", self.cascade_threshold)
+		self.cascade: Optional[ModelCascade] = self._build_cascade()
+		self.batcher: Optional[MicroBatcher[str, Tuple[ConversationIntentModel, TurnUsage]]] = self._build_batcher()
+
+	def prewarm(self) -> None:
+		tiers = self.cascade.tiers if self.cascade is not None else [None]
+		for is_verified in (True, False):
+			for tier in tiers:
+				self._get_chain(is_verified=is_verified, tier=tier)
+			if self.batcher is not None:
+				self._get_batch_chain(is_verified=is_verified)
 	
 	def run(
 		self, 
@@ -41,40 +81,258 @@ class IntentService(LLMService):
 				logger.warning("Empty user message, returning fallback intent")
 				return self._get_fallback_intent(user_message)
 			
-			template = self._build_prompt_template(state=state)
+			if self.cascade is not None:
+				result: ConversationIntentModel = self.cascade.run(
+					lambda tier: self.invoke_chain(*self._build_chain_inputs(state=state, tier=tier)),
+					self._escalation_reason
+				)
+			else:
+				chain, inputs = self._build_chain_inputs(state=state)
+				result: ConversationIntentModel = self.invoke_chain(chain, inputs)
+
+			return self._log_result(result)
 			
-			chain = self.build_structured_chain(
-				template=template,
-				schema=ConversationIntentModel
-			)
+		except Exception as e:
+			logger.error(f"[SERVICE] IntentService ERROR: {e}", exc_info=True)
+			user_message = state.get(StateKeys.USER_MESSAGE, "")
+			return self._get_fallback_intent(user_message)
+
+	async def arun(
+		self, 
+		state: QAState,
+	) -> ConversationIntentModel:
+		try:
+			logger.info("[SERVICE] IntentService (async)")
 			
-			intent_list = self._format_intent_list()
+			user_message = state.get(StateKeys.USER_MESSAGE, "")
 			
-			result: ConversationIntentModel = chain.invoke({
-				"intent_list": intent_list,
-				"user_message": user_message
-			})
-
-			intent_type = result.user_intent.intent_type
-			confidence = result.user_intent.confidence
-			logger.info(
-				f" ... Classified intent: {intent_type} "
-				f"(confidence: {confidence:.2f})"
-			)
+			if not user_message or not user_message.strip():
+				logger.warning("Empty user message, returning fallback intent")
+				return self._get_fallback_intent(user_message)
 			
-			return result
+			if self.batcher is not None and self._batchable(state):
+				result, usage = await self.batcher.submit(
+					state.get(StateKeys.IS_VERIFIED, False),
+					user_message
+				)
+				self._record_shared_usage(usage)
+			elif self.cascade is not None:
+				result: ConversationIntentModel = await self.cascade.arun(
+					lambda tier: self.ainvoke_chain(*self._build_chain_inputs(state=state, tier=tier)),
+					self._escalation_reason
+				)
+			else:
+				chain, inputs = self._build_chain_inputs(state=state)
+				result: ConversationIntentModel = await self.ainvoke_chain(chain, inputs)
+
+			return self._log_result(result)
 			
 		except Exception as e:
 			logger.error(f"[SERVICE] IntentService ERROR: {e}", exc_info=True)
 			user_message = state.get(StateKeys.USER_MESSAGE, "")
 			return self._get_fallback_intent(user_message)
+
+	def _build_chain_inputs(
+		self,
+		state: QAState,
+		tier: Optional[CascadeTier] = None
+	) -> Tuple[CompiledChain, Dict[str, Any]]:
+		chain = self._get_chain(is_verified=state.get(StateKeys.IS_VERIFIED, False), tier=tier)
+		
+		inputs = {
+			"intent_list": self._format_intent_list(),
+			"user_message": state.get(StateKeys.USER_MESSAGE, "")
+		}
+		return chain, inputs
+
+	def _log_result(
+		self,
+		result: ConversationIntentModel
+	) -> ConversationIntentModel:
+		intent_type = result.user_intent.intent_type
+		confidence = result.user_intent.confidence
+		logger.info(
+			f" ... Classified intent: {intent_type} "
+			f"(confidence: {confidence:.2f})"
+		)
+		return result
 	
-	def _build_prompt_template(self, state: QAState) -> PromptTemplate:
+	def _get_chain(self, is_verified: bool, tier: Optional[CascadeTier] = None) -> CompiledChain:
+		variant = "verified" if is_verified else "unverified"
+		return self.get_structured_chain(
+			variant=variant if tier is None else f"{variant}:{tier.name}",
+			schema=ConversationIntentModel,
+			build_template=lambda: self._build_prompt_template(is_verified=is_verified),
+			backends=tier.backends if tier is not None else None
+		)
+
+	def _build_cascade(self) -> Optional[ModelCascade]:
+		if not EnvConfig.get_bool(f"LLM_{self.config_name}_CASCADE", False):
+			return None
+		
+		strong_model = EnvConfig.get_str(f"LLM_{self.config_name}_CASCADE_MODEL")
+		strong = LLMBackend(
+			provider="openai",
+			model=strong_model,
+			tier=MAX_TIER,
+			base_url=EnvConfig.get_str("LLM_BASE_URL")
+		) if strong_model else None
+		
+		cascade = ModelCascade(self.service_name, split_tiers(self.backends, strong))
+		if not cascade.enabled:
+			logger.warning(
+				f"{self.service_name} cascade needs a stronger backend "
+				f"(LLM_{self.config_name}_CASCADE_MODEL or a higher LLM_BACKENDS tier); running single-tier"
+			)
+			return None
+		
+		if strong is not None and strong.name not in self.llms:
+			self.backends.append(strong)
+			self.llms[strong.name] = self._build_chat_model(strong)
+		logger.info(
+			f"{self.service_name} cascade: "
+			+ " -> ".join(f"{tier.name}[{', '.join(b.name for b in tier.backends)}]" for tier in cascade.tiers)
+		)
+		return cascade
+
+	def _build_batcher(self) -> Optional[MicroBatcher[str, Tuple[ConversationIntentModel, TurnUsage]]]:
+		if not EnvConfig.get_bool(f"LLM_{self.config_name}_BATCH", False):
+			return None
+		if self.cascade is not None:
+			logger.warning(f"{self.service_name} batching is not combined with the cascade; running unbatched")
+			return None
+		
+		max_size = EnvConfig.get_int(f"LLM_{self.config_name}_BATCH_MAX", self.batch_max_size)
+		window_ms = EnvConfig.get_float(f"LLM_{self.config_name}_BATCH_WINDOW_MS", self.batch_window_ms)
+		logger.info(f"{self.service_name} batching up to {max_size} messages per {window_ms:g}ms window")
+		return MicroBatcher("intent", self._classify_batch, max_batch=max_size, window=window_ms / 1000.0)
+
+	def _batchable(self, state: QAState) -> bool:
+		""" Whether the message may share a prompt with other sessions' messages. """
+		if state.get(StateKeys.IS_VERIFIED, False):
+			return True
+		user_message = state.get(StateKeys.USER_MESSAGE, "")
+		if detect_phone(user_message) or detect_date_of_birth(user_message):
+			metrics.increment("llm.batch.intent.skipped.personal_details")
+			return False
+		return True
+
+	async def _classify_batch(
+		self,
+		is_verified: bool,
+		user_messages: Sequence[str]
+	) -> List[Union[Tuple[ConversationIntentModel, TurnUsage], BaseException]]:
+		"""
+		One structured call for every message in the batch. A lone message
+		uses the normal prompt; messages the batch answer leaves out, or
+		attributes identity fields to, or every message if the batch call
+		fails, are classified one by one.
+		
+		Each result comes with the usage to charge its turn: an even share of
+		the batch call plus its own single call, if any.
+		"""
+		if len(user_messages) == 1:
+			return [await self._classify_single(is_verified, user_messages[0])]
+		
+		chain = self._get_batch_chain(is_verified=is_verified)
+		inputs = {
+			"intent_list": self._format_intent_list(),
+			"user_messages": self._format_batch(user_messages)
+		}
+		with track_turn_usage() as batch_usage:
+			try:
+				batch: BatchIntentModel = await self.ainvoke_chain(chain, inputs)
+				by_id = {item.message_id: item for item in batch.classifications}
+			except Exception as e:
+				logger.warning(f"[SERVICE] IntentService batch of {len(user_messages)} failed, classifying one by one: {e}")
+				metrics.increment("llm.batch.intent.fallbacks")
+				by_id = {}
+		share = batch_usage.share(len(user_messages))
+		
+		results: List[Any] = [None] * len(user_messages)
+		missing: List[int] = []
+		for index, user_message in enumerate(user_messages):
+			item = by_id.get(index)
+			if item is None:
+				missing.append(index)
+				continue
+			if self._has_values(item.verification_info):
+				# Identity fields only ever come from the message's own call: a
+				# misattributed answer would verify one session as another
+				metrics.increment("llm.batch.intent.identity_rechecks")
+				missing.append(index)
+				continue
+			results[index] = (
+				ConversationIntentModel(
+					user_intent=item.user_intent,
+					appointment_info=item.appointment_info,
+					raw_query=user_message
+				),
+				share
+			)
+		
+		if missing:
+			metrics.increment("llm.batch.intent.unbatched", len(missing))
+			singles = await asyncio.gather(
+				*(self._classify_single(is_verified, user_messages[index]) for index in missing),
+				return_exceptions=True
+			)
+			for index, outcome in zip(missing, singles):
+				if not isinstance(outcome, BaseException):
+					result, usage = outcome
+					usage.merge(share)
+					outcome = (result, usage)
+				results[index] = outcome
+		return results
+
+	async def _classify_single(
+		self,
+		is_verified: bool,
+		user_message: str
+	) -> Tuple[ConversationIntentModel, TurnUsage]:
+		with track_turn_usage() as usage:
+			result = await self.ainvoke_chain(
+				self._get_chain(is_verified=is_verified),
+				{"intent_list": self._format_intent_list(), "user_message": user_message}
+			)
+		return result, usage
+
+	def _format_batch(self, user_messages: Sequence[str]) -> str:
+		# One line per message so ids stay unambiguous
+		return "\n".join(
+			f"[{index}] {' '.join(user_message.split())}"
+			for index, user_message in enumerate(user_messages)
+		)
+
+	def _escalation_reason(self, result: ConversationIntentModel) -> Optional[str]:
+		""" Why a fast-tier answer is not good enough, or None to accept it. """
+		if result.user_intent.confidence < self.cascade_threshold:
+			return "low_confidence"
+		
+		intent_type = result.user_intent.intent_type
+		has_user_info = self._has_values(result.verification_info)
+		has_appointment_info = self._has_values(result.appointment_info)
+		if intent_type == IntentType.USER_INFORMATION and not (has_user_info or has_appointment_info):
+			return "missing_fields"
+		if intent_type == IntentType.APPOINTMENT_INFORMATION and not has_appointment_info:
+			return "missing_fields"
+		return None
+
+	def _has_values(self, info: Optional[Any]) -> bool:
+		return info is not None and any(value for value in info.model_dump().values())
+
+	def _get_batch_chain(self, is_verified: bool) -> CompiledChain:
+		return self.get_structured_chain(
+			variant=f"{'verified' if is_verified else 'unverified'}:batch",
+			schema=BatchIntentModel,
+			build_template=lambda: self._build_prompt_template(is_verified=is_verified, batch=True)
+		)
+
+	def _build_prompt_template(self, is_verified: bool, batch: bool = False) -> PromptTemplate:
 		system_prompt = ConversationalQAMessages.base_intent_system
 		instructions_system = ConversationalQAMessages.base_intent_instructions_system
 		human_prompt = ConversationalQAMessages.base_intent_human
-		
-		is_verified = state.get(StateKeys.IS_VERIFIED, False)
+		human_input = "user_message"
 		
 		if not is_verified:
 			logger.info(" ... Adding verification context to intent prompt")
@@ -82,12 +340,16 @@ class IntentService(LLMService):
 			instructions_system += ConversationalQAMessages.verification_instruction_system
 
 		system_prompt += instructions_system
+		if batch:
+			system_prompt += ConversationalQAMessages.batch_intent_instructions_system
+			human_prompt = ConversationalQAMessages.batch_intent_human
+			human_input = "user_messages"
 
 		template = self.build_prompt_template(
 			system_prompt=system_prompt,
 			human_prompt=human_prompt,
 			system_input_variables=["intent_list"],
-			human_input_variables=["user_message"]
+			human_input_variables=[human_input]
 		)
 		
 		return template
@@ -0,0 +1,94 @@
+from time import perf_counter
+from typing import (
+    FrozenSet,
+    Optional
+)
+
+from infrastructure.config import EnvConfig
+from infrastructure.metrics import MetricsRegistry
+from utils import Logger
+
+from ...classifier import IntentClassifier
+from ...models.conversational_qa import ConversationIntentModel, UserIntentModel
+from ...states.conversational_qa import QAState, StateKeys
+from ...types.conversational_qa import IntentType
+from .prefetch import detect_date_of_birth, detect_phone
+
+logger = Logger(__name__)
+metrics = MetricsRegistry()
+
+
+class LocalIntentService:
+    """
+    First intent tier: an offline-trained n-gram classifier (see
+    `python -m ai.graph.classifier`) that answers without an LLM call when
+    its calibrated probability reaches the threshold.
+
+    Only intents whose handling needs no extracted fields are answered
+    locally, and never for a message that carries a phone number or date of
+    birth, since those have to go through IntentService's extraction.
+    Everything else returns None and falls through to the LLM.
+
+    Configured with GRAPH_INTENT_CLASSIFIER_PATH (off when unset) and
+    GRAPH_INTENT_CLASSIFIER_THRESHOLD. Metrics: graph.local_intent.hits /
+    misses.<reason> counters and the graph.local_intent.latency timer.
+    """
+    SHORT_CIRCUIT_INTENTS: FrozenSet[IntentType] = frozenset({
+        IntentType.GENERAL_QA,
+        IntentType.LIST_APPOINTMENTS,
+    })
+
+    def __init__(self, classifier: IntentClassifier, threshold: float = 0.9) -> None:
+        self.classifier = classifier
+        self.threshold = threshold
+
+    @classmethod
+    def from_env(cls) -> Optional["LocalIntentService"]:
+        """ The configured classifier, or None when unset or unreadable (the LLM then handles every turn). """
+        path = EnvConfig.get_str("GRAPH_INTENT_CLASSIFIER_PATH")
+        if not path:
+            return None
+        try:
+            classifier = IntentClassifier.load(path)
+        except Exception as e:
+            logger.error(f"[SERVICE] Local intent classifier {path} not loaded: {e}")
+            return None
+        threshold = EnvConfig.get_float("GRAPH_INTENT_CLASSIFIER_THRESHOLD", 0.9)
+        logger.info(
+            f"[SERVICE] Local intent classifier loaded from {path} "
+            f"({len(classifier.weights)} features, threshold {threshold})"
+        )
+        return cls(classifier, threshold)
+
+    def run(self, state: QAState) -> Optional[ConversationIntentModel]:
+        user_message = state.get(StateKeys.USER_MESSAGE, "") or ""
+        if not user_message.strip():
+            return None
+        if detect_phone(user_message) or detect_date_of_birth(user_message):
+            return self._miss("personal_details")
+
+        started = perf_counter()
+        label, probability = self.classifier.predict(user_message, state.get(StateKeys.IS_VERIFIED, False))
+        metrics.observe("graph.local_intent.latency", perf_counter() - started)
+
+        if probability < self.threshold:
+            return self._miss("low_confidence")
+        try:
+            intent_type = IntentType(label)
+        except ValueError:
+            return self._miss("unknown_label")
+        if intent_type not in self.SHORT_CIRCUIT_INTENTS:
+            return self._miss("needs_extraction")
+
+        metrics.increment("graph.local_intent.hits")
+        metrics.increment(f"graph.local_intent.hits.{intent_type.value}")
+        logger.info(f" ... Local intent: {intent_type} (probability: {probability:.3f})")
+        return ConversationIntentModel(
+            user_intent=UserIntentModel(intent_type=intent_type, confidence=round(probability, 4)),
+            raw_query=user_message,
+        )
+
+    def _miss(self, reason: str) -> None:
+        metrics.increment("graph.local_intent.misses")
+        metrics.increment(f"graph.local_intent.misses.{reason}")
+        return None
@@ -0,0 +1,255 @@
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from time import perf_counter
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    List,
+    Optional,
+    Tuple
+)
+
+from infrastructure.config import EnvConfig
+from infrastructure.metrics import MetricsRegistry
+from utils import Logger
+
+from ...models.conversational_qa import VerificationInfoModel, VerificationRecordModel
+from .query_orm import QueryORMService
+
+logger = Logger(__name__)
+metrics = MetricsRegistry()
+
+_PHONE = re.compile(r"(?<![\d+])(\+?\d[\d\s().-]{8,18}\d)(?!\d)")
+_ISO_DATE = re.compile(r"\b(\d{4})-(\d{1,2})-(\d{1,2})\b")
+_US_DATE = re.compile(r"\b(\d{1,2})/(\d{1,2})/(\d{4})\b")
+
+PrefetchKey = Tuple[str, str]
+
+
+def detect_phone(text: str) -> Optional[str]:
+    """ Phone number in the +<country><number> form the intent prompt asks the LLM for. """
+    for match in _PHONE.finditer(text or ""):
+        candidate = match.group(1)
+        digits = re.sub(r"\D", "", candidate)
+        if candidate.startswith("+") and 10 <= len(digits) <= 15:
+            return f"+{digits}"
+        if len(digits) == 10:
+            return f"+1{digits}"
+        if len(digits) == 11 and digits.startswith("1"):
+            return f"+{digits}"
+    return None
+
+
+def detect_date_of_birth(text: str) -> Optional[str]:
+    """ Date in the YYYY-MM-DD form the intent prompt asks the LLM for. """
+    for pattern, order in ((_ISO_DATE, (0, 1, 2)), (_US_DATE, (2, 0, 1))):
+        for match in pattern.finditer(text or ""):
+            year, month, day = (int(match.group(i + 1)) for i in order)
+            try:
+                value = datetime(year, month, day)
+            except ValueError:
+                continue
+            if 1900 <= value.year <= datetime.now().year:
+                return value.strftime("%Y-%m-%d")
+    return None
+
+
+class _Pending:
+    def __init__(self, kind: str, key: Hashable, future: Future) -> None:
+        self.kind = kind
+        self.key = key
+        self.future = future
+        self.started = perf_counter()
+
+
+class SpeculativePrefetcher:
+    """
+    Starts the database reads a turn will probably need while the intent LLM
+    call is still running, and hands them to the verification nodes if the
+    turn does need them.
+
+    - Unverified sessions: when the raw message contains a phone number or a
+      date of birth, the full patient lookup starts with the details known so
+      far plus the regex-detected ones. VerificationPatientNode uses the result
+      only if the LLM extracted exactly the same name, phone and date of birth.
+    - Verified sessions without loaded appointments: the appointment reload
+      starts immediately and VerificationAppointmentNode uses it for the same
+      patient id.
+
+    Anything not taken (another intent, different details) is discarded when
+    the session's next turn starts or when MAX_PENDING is exceeded.
+    Disable with GRAPH_SPECULATIVE_PREFETCH=false.
+    """
+    MAX_PENDING: int = 1000
+    USER = "user"
+    APPOINTMENTS = "appointments"
+    INFO_FIELDS: Tuple[str, ...] = ("full_name", "phone_number", "date_of_birth")
+
+    def __init__(
+        self,
+        query_orm_service: QueryORMService,
+        max_workers: Optional[int] = None
+    ) -> None:
+        self.query_orm_service = query_orm_service
+        self.enabled = EnvConfig.get_bool("GRAPH_SPECULATIVE_PREFETCH", True)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or EnvConfig.get_int("GRAPH_PREFETCH_THREADS", 8),
+            thread_name_prefix="graph-prefetch"
+        )
+        self._lock = threading.Lock()
+        self._pending: "OrderedDict[PrefetchKey, _Pending]" = OrderedDict()
+
+    def start_turn(
+        self,
+        session_id: Optional[str],
+        user_message: str,
+        is_verified: bool,
+        user_info: Any,
+        user_record: Optional[VerificationRecordModel],
+        appointments: Optional[List[Dict[str, Any]]]
+    ) -> None:
+        """ Drop the session's leftovers and start whatever this turn is likely to need. """
+        if not self.enabled or not session_id:
+            return
+        self._discard_session(session_id)
+
+        if is_verified and user_record is not None and user_record.user_id:
+            if not appointments:
+                self._submit(
+                    session_id, self.APPOINTMENTS, str(user_record.user_id),
+                    self.query_orm_service.find_appointments_by_patient_id,
+                    patient_id=user_record.user_id
+                )
+            return
+
+        predicted = self.predict_user_info(user_message, user_info)
+        if predicted is not None:
+            self._submit(
+                session_id, self.USER, self._info_key(predicted),
+                self.query_orm_service.find_user,
+                user_info=predicted
+            )
+
+    def predict_user_info(self, user_message: str, user_info: Any) -> Optional[VerificationInfoModel]:
+        """ Known details merged with a phone/date of birth found in the message, if that completes them. """
+        phone = detect_phone(user_message)
+        date_of_birth = detect_date_of_birth(user_message)
+        if not phone and not date_of_birth:
+            return None
+
+        known = self._as_dict(user_info)
+        predicted = VerificationInfoModel(
+            full_name=known.get("full_name"),
+            phone_number=known.get("phone_number") or phone,
+            date_of_birth=known.get("date_of_birth") or date_of_birth,
+        )
+        if not all(getattr(predicted, field) for field in self.INFO_FIELDS):
+            return None
+        return predicted
+
+    def take_user(
+        self,
+        session_id: Optional[str],
+        user_info: VerificationInfoModel
+    ) -> Tuple[bool, Optional[List[Dict[str, Any]]]]:
+        """ (True, rows) when a prefetched lookup for exactly `user_info` exists; (False, None) otherwise. """
+        return self._take(session_id, self.USER, self._info_key(user_info))
+
+    def take_appointments(
+        self,
+        session_id: Optional[str],
+        patient_id: Any
+    ) -> Tuple[bool, Optional[List[Dict[str, Any]]]]:
+        return self._take(session_id, self.APPOINTMENTS, str(patient_id))
+
+    def close(self) -> None:
+        """ Stop the workers, cancelling queued lookups; later turns simply run without prefetching. """
+        self.enabled = False
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        with self._lock:
+            pending, self._pending = list(self._pending.values()), OrderedDict()
+        for entry in pending:
+            self._wasted(entry)
+
+    def _submit(
+        self,
+        session_id: str,
+        kind: str,
+        key: Hashable,
+        fn: Callable[..., Any],
+        **kwargs: Any
+    ) -> None:
+        try:
+            future = self._executor.submit(fn, **kwargs)
+        except RuntimeError:
+            # Closed concurrently with this turn
+            return
+        with self._lock:
+            self._pending[(session_id, kind)] = _Pending(kind, key, future)
+            while len(self._pending) > self.MAX_PENDING:
+                _, evicted = self._pending.popitem(last=False)
+                self._wasted(evicted)
+        metrics.increment(f"graph.prefetch.{kind}.started")
+        logger.info(f"[PREFETCH] Started speculative {kind} lookup")
+
+    def _take(
+        self,
+        session_id: Optional[str],
+        kind: str,
+        key: Hashable
+    ) -> Tuple[bool, Optional[Any]]:
+        if not self.enabled or not session_id:
+            return False, None
+        with self._lock:
+            pending = self._pending.pop((session_id, kind), None)
+        if pending is None:
+            return False, None
+        if pending.key != key:
+            self._wasted(pending)
+            return False, None
+
+        ready = pending.future.done()
+        waited = perf_counter()
+        try:
+            result = pending.future.result()
+        except Exception as e:
+            logger.warning(f"[PREFETCH] Speculative {kind} lookup failed, querying again: {e}")
+            metrics.increment(f"graph.prefetch.{kind}.failed")
+            return False, None
+        waited = perf_counter() - waited
+
+        metrics.increment(f"graph.prefetch.{kind}.used")
+        metrics.increment(f"graph.prefetch.{kind}.{'ready' if ready else 'waited'}")
+        metrics.observe(f"graph.prefetch.{kind}.wait", waited)
+        logger.info(f"[PREFETCH] Using speculative {kind} lookup ({'ready' if ready else f'waited {waited:.3f}s'})")
+        return True, result
+
+    def _discard_session(self, session_id: str) -> None:
+        with self._lock:
+            stale = [key for key in self._pending if key[0] == session_id]
+            discarded = [self._pending.pop(key) for key in stale]
+        for pending in discarded:
+            self._wasted(pending)
+
+    def _wasted(self, pending: _Pending) -> None:
+        pending.future.cancel()
+        metrics.increment(f"graph.prefetch.{pending.kind}.wasted")
+
+    def _info_key(self, info: Any) -> Tuple[Optional[str], ...]:
+        values = self._as_dict(info)
+        return tuple(
+            (str(values.get(field)).strip().lower() if values.get(field) else None)
+            for field in self.INFO_FIELDS
+        )
+
+    def _as_dict(self, info: Any) -> Dict[str, Any]:
+        if info is None:
+            return {}
+        if isinstance(info, dict):
+            return info
+        return info.model_dump()
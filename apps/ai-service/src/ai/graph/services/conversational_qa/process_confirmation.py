@@ -1,26 +1,49 @@
 from langchain.prompts import PromptTemplate
-from typing import Optional
+from time import perf_counter
+from typing import Any, Dict, Optional, Tuple
 
-from ...types.conversational_qa import ConfirmationIntent
+from ...types.conversational_qa import ConfirmationIntent, IntentType
 from ...models.conversational_qa import AppointmentConfirmationResponse
 from ...prompts.templates.conversational_qa import ConversationalQAMessages
+from ..cache import CompiledChain
+from ..limiter import CallPriority
 from ..llm import LLMService
+from ..resilience import CallPolicy
+from .confirmation_rules import ConfirmationRuleClassifier
+from infrastructure.config import EnvConfig
+from infrastructure.metrics import MetricsRegistry
 from utils import Logger
 
 logger = Logger(__name__)
+metrics = MetricsRegistry()
 
 
 class ProcessConfirmationService(LLMService):
+    cache_responses = True
+    max_output_tokens = 200
+    # Idempotent yes/no classification: short deadline, hedged after the p95
+    call_policy = CallPolicy(timeout_seconds=10.0, deadline_seconds=20.0, hedge=True)
+    call_priority = CallPriority.CLASSIFICATION
+
     def __init__(
         self,
         model: str = "gpt-4o-mini",
         temp: float = 0.0,
     ) -> None:
         super().__init__(model=model, temp=temp)
+        self.rule_classifier: Optional[ConfirmationRuleClassifier] = (
+            ConfirmationRuleClassifier()
+            if EnvConfig.get_bool("CONFIRMATION_FAST_PATH_ENABLED", True)
+            else None
+        )
+
+    def prewarm(self) -> None:
+        self._get_chain()
 
     def run(
         self,
         user_message: str,
+        pending_action: Optional[IntentType] = None,
     ) -> AppointmentConfirmationResponse:
         try:
             logger.info("[SERVICE] ProcessConfirmationService")
@@ -29,26 +52,44 @@ class ProcessConfirmationService(LLMService):
                 logger.warning("Empty user message, returning fallback")
                 return self._get_fallback_response(user_message)
 
-            template = self._build_prompt_template()
+            fast_result = self._classify_by_rules(user_message, pending_action)
+            if fast_result is not None:
+                return self._log_result(fast_result)
 
-            chain = self.build_structured_chain(
-                template=template,
-                schema=AppointmentConfirmationResponse
-            )
+            chain, inputs = self._build_chain_inputs(user_message=user_message)
+
+            result: AppointmentConfirmationResponse = self.invoke_chain(chain, inputs)
 
-            result: AppointmentConfirmationResponse = chain.invoke({
-                "user_message": user_message
-            })
+            return self._log_result(result)
 
-            logger.info(
-                f" ... Confirmation intent: {result.intent} "
-                f"(confidence: {result.confidence:.2f})"
+        except Exception as e:
+            logger.error(
+                f"[SERVICE] ProcessConfirmationService ERROR: {e}",
+                exc_info=True
             )
+            return self._get_fallback_response(user_message)
 
-            if result.extracted_concerns:
-                logger.info(f" ... Extracted concerns: {result.extracted_concerns}")
+    async def arun(
+        self,
+        user_message: str,
+        pending_action: Optional[IntentType] = None,
+    ) -> AppointmentConfirmationResponse:
+        try:
+            logger.info("[SERVICE] ProcessConfirmationService (async)")
 
-            return result
+            if not user_message or not user_message.strip():
+                logger.warning("Empty user message, returning fallback")
+                return self._get_fallback_response(user_message)
+
+            fast_result = self._classify_by_rules(user_message, pending_action)
+            if fast_result is not None:
+                return self._log_result(fast_result)
+
+            chain, inputs = self._build_chain_inputs(user_message=user_message)
+
+            result: AppointmentConfirmationResponse = await self.ainvoke_chain(chain, inputs)
+
+            return self._log_result(result)
 
         except Exception as e:
             logger.error(
@@ -57,6 +98,71 @@ class ProcessConfirmationService(LLMService):
             )
             return self._get_fallback_response(user_message)
 
+    def _classify_by_rules(
+        self,
+        user_message: str,
+        pending_action: Optional[IntentType]
+    ) -> Optional[AppointmentConfirmationResponse]:
+        """
+        Answer unambiguous replies ("yes", "não", "cancel it") without an LLM call.
+
+        Returns None when the rules cannot decide, so the caller falls through to
+        the LLM. Saved latency is estimated from the observed LLM p50 for this
+        service, which is only known once at least one call has gone out.
+        """
+        if self.rule_classifier is None:
+            return None
+
+        start = perf_counter()
+        result = self.rule_classifier.classify(user_message, pending_action=pending_action)
+        elapsed = perf_counter() - start
+        metrics.observe("confirmation.fast_path.latency", elapsed)
+
+        if result is None:
+            metrics.increment("confirmation.fast_path.misses")
+        else:
+            metrics.increment("confirmation.fast_path.hits")
+            llm_latency = metrics.get_timer(f"llm.latency.{self.service_name}")
+            if llm_latency and llm_latency.get("p50") is not None:
+                metrics.increment(
+                    "confirmation.fast_path.latency_saved_seconds",
+                    max(0.0, llm_latency["p50"] - elapsed)
+                )
+            logger.info(" ... Confirmation resolved by rule-based fast path")
+
+        hits = metrics.get_counter("confirmation.fast_path.hits")
+        total = hits + metrics.get_counter("confirmation.fast_path.misses")
+        metrics.set_gauge("confirmation.fast_path.hit_rate", hits / total)
+
+        return result
+
+    def _build_chain_inputs(
+        self,
+        user_message: str
+    ) -> Tuple[CompiledChain, Dict[str, Any]]:
+        return self._get_chain(), {"user_message": user_message}
+
+    def _get_chain(self) -> CompiledChain:
+        return self.get_structured_chain(
+            variant="default",
+            schema=AppointmentConfirmationResponse,
+            build_template=self._build_prompt_template
+        )
+
+    def _log_result(
+        self,
+        result: AppointmentConfirmationResponse
+    ) -> AppointmentConfirmationResponse:
+        logger.info(
+            f" ... Confirmation intent: {result.intent} "
+            f"(confidence: {result.confidence:.2f})"
+        )
+
+        if result.extracted_concerns:
+            logger.info(f" ... Extracted concerns: {result.extracted_concerns}")
+
+        return result
+
     def _build_prompt_template(self) -> PromptTemplate:
         system_prompt = ConversationalQAMessages.process_confirmation_system
         human_prompt = ConversationalQAMessages.process_confirmation_human
@@ -1,10 +1,14 @@
 from langchain.prompts import PromptTemplate 
+from typing import Any, Dict, Tuple
 
 from ...types.conversational_qa import IntentType, Routes
 from ...states.conversational_qa import QAState	
 from ...models.conversational_qa import QAAnswerModel
 from ...prompts.templates.conversational_qa import ConversationalQAMessages
+from ..cache import CompiledChain
+from ..limiter import CallPriority
 from ..llm import LLMService
+from ..resilience import CallPolicy
 
 from utils import Logger
 
@@ -12,6 +16,10 @@ logger = Logger(__name__)
 
 
 class QAAnswerService(LLMService):
+	max_output_tokens = 800
+	call_policy = CallPolicy(timeout_seconds=30.0, deadline_seconds=45.0, max_retries=1)
+	quality_tier = 2
+	call_priority = CallPriority.GENERATION
 
 	def __init__(
 		self, 
@@ -20,6 +28,9 @@ class QAAnswerService(LLMService):
 	) -> None:
 		super().__init__(model=model, temp=temp)
 
+	def prewarm(self) -> None:
+		self._get_chain()
+
 	def run(
 		self, 
 		state: QAState,
@@ -27,33 +38,57 @@ class QAAnswerService(LLMService):
 		logger.info("[SERVICE] QAAnswerService")
 
 		user_message = state.get("user_message")
-		system_prompt = ConversationalQAMessages.qa_system
-		human_prompt = ConversationalQAMessages.qa_human
+		chain, inputs = self._build_chain_inputs(user_message=user_message)
+		
+		try:
+			result: QAAnswerModel = self.invoke_chain(chain, inputs)
+			return result
+		
+		except Exception as e:
+			logger.error(f"[Service] Intent ERROR: {e}")
+			return self._get_fallback(user_message=user_message)
 
-		template = self.build_prompt_template(
-			system_prompt=system_prompt,
-			human_prompt=human_prompt,
-			system_input_variables=[],
-			human_input_variables=['user_message']
-		)
+	async def arun(
+		self, 
+		state: QAState,
+	) -> QAAnswerModel:
+		logger.info("[SERVICE] QAAnswerService (async)")
 
-		chain = self.build_structured_chain(
-			template=template,
-			schema=QAAnswerModel
-		)
+		user_message = state.get("user_message")
+		chain, inputs = self._build_chain_inputs(user_message=user_message)
 		
 		try:
-			result: QAAnswerModel = chain.invoke(
-				{
-					"user_message": user_message
-				}
-			)
+			result: QAAnswerModel = await self.ainvoke_chain(chain, inputs)
 			return result
 		
 		except Exception as e:
 			logger.error(f"[Service] Intent ERROR: {e}")
 			return self._get_fallback(user_message=user_message)
 
+	def _build_chain_inputs(
+		self,
+		user_message: str
+	) -> Tuple[CompiledChain, Dict[str, Any]]:
+		return self._get_chain(), {"user_message": user_message}
+
+	def _get_chain(self) -> CompiledChain:
+		return self.get_structured_chain(
+			variant="default",
+			schema=QAAnswerModel,
+			build_template=self._build_answer_template
+		)
+
+	def _build_answer_template(self) -> PromptTemplate:
+		system_prompt = ConversationalQAMessages.qa_system
+		human_prompt = ConversationalQAMessages.qa_human
+
+		return self.build_prompt_template(
+			system_prompt=system_prompt,
+			human_prompt=human_prompt,
+			system_input_variables=[],
+			human_input_variables=['user_message']
+		)
+
 	def _build_prompt_template(
 		self,
 		state: QAState
@@ -95,5 +130,5 @@ class QAAnswerService(LLMService):
 		logger.warning("Returning fallback: GENERAL_QA")
 		
 		return QAAnswerModel(
-			system_answer="QA failed to generate an answer."
+			qa_answer="QA failed to generate an answer."
 		)
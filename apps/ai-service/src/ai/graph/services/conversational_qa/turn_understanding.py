@@ -0,0 +1,167 @@
+from langchain.prompts import PromptTemplate
+from typing import Any, Dict, List, Optional, Tuple
+
+from ...models.conversational_qa import TurnUnderstandingModel
+from ...states.conversational_qa import QAState, StateKeys
+from ...prompts.templates.conversational_qa import ConversationalQAMessages
+from ..cache import CompiledChain
+from ..limiter import CallPriority
+from ..llm import LLMService
+from .intent import IntentService
+from infrastructure.metrics import MetricsRegistry
+from utils import Logger
+
+logger = Logger(__name__)
+metrics = MetricsRegistry()
+
+
+class TurnUnderstandingService(LLMService):
+	"""
+	Fused alternative to the IntentService -> AppointmentMatchService ->
+	ClarificationService sequence: one structured call returns the intent, the
+	extracted entities, a candidate appointment among those already in state and
+	a draft clarification. Returns None on failure so the caller can fall back
+	to the per-service pipeline.
+	"""
+	cache_responses = True
+	max_output_tokens = 600
+	# One call carries intent, extraction and matching, so it needs a stronger model tier
+	quality_tier = 2
+	# Stands in for the intent call, so it queues with classification
+	call_priority = CallPriority.CLASSIFICATION
+	input_token_budget = 3000
+	trimmable_inputs = ("appointments_text",)
+
+	def __init__(
+		self, 
+		model: str = "gpt-4o-mini",
+		temp: float = 0.0,
+	) -> None:
+		super().__init__(model=model, temp=temp)
+
+	def prewarm(self) -> None:
+		for is_verified in (True, False):
+			self._get_chain(is_verified=is_verified)
+
+	def run(self, state: QAState) -> Optional[TurnUnderstandingModel]:
+		try:
+			logger.info("[SERVICE] TurnUnderstandingService")
+			
+			if not self._has_message(state):
+				return None
+			
+			chain, inputs = self._build_chain_inputs(state=state)
+			
+			result: TurnUnderstandingModel = self.invoke_chain(chain, inputs)
+
+			return self._log_result(result)
+			
+		except Exception as e:
+			logger.error(f"[SERVICE] TurnUnderstandingService ERROR: {e}", exc_info=True)
+			metrics.increment("graph.turn_understanding.fallbacks")
+			return None
+
+	async def arun(self, state: QAState) -> Optional[TurnUnderstandingModel]:
+		try:
+			logger.info("[SERVICE] TurnUnderstandingService (async)")
+			
+			if not self._has_message(state):
+				return None
+			
+			chain, inputs = self._build_chain_inputs(state=state)
+			
+			result: TurnUnderstandingModel = await self.ainvoke_chain(chain, inputs)
+
+			return self._log_result(result)
+			
+		except Exception as e:
+			logger.error(f"[SERVICE] TurnUnderstandingService ERROR: {e}", exc_info=True)
+			metrics.increment("graph.turn_understanding.fallbacks")
+			return None
+
+	def _has_message(self, state: QAState) -> bool:
+		user_message = state.get(StateKeys.USER_MESSAGE, "")
+		if not user_message or not user_message.strip():
+			logger.warning("Empty user message, skipping fused understanding")
+			return False
+		return True
+
+	def _build_chain_inputs(
+		self,
+		state: QAState
+	) -> Tuple[CompiledChain, Dict[str, Any]]:
+		chain = self._get_chain(is_verified=state.get(StateKeys.IS_VERIFIED, False))
+		
+		inputs = {
+			"intent_list": self._format_intent_list(),
+			"known_info": self._format_known_info(state),
+			"appointments_text": self._format_appointments(state.get(StateKeys.APPOINTMENTS) or []),
+			"user_message": state.get(StateKeys.USER_MESSAGE, "")
+		}
+		return chain, inputs
+
+	def _log_result(self, result: TurnUnderstandingModel) -> TurnUnderstandingModel:
+		logger.info(
+			f" ... Fused intent: {result.user_intent.intent_type} "
+			f"(confidence: {result.user_intent.confidence:.2f}), "
+			f"candidate appointment: {result.candidate_appointment_id}, "
+			f"draft clarification: {bool(result.clarification_draft)}"
+		)
+		return result
+
+	def _get_chain(self, is_verified: bool) -> CompiledChain:
+		return self.get_structured_chain(
+			variant="verified" if is_verified else "unverified",
+			schema=TurnUnderstandingModel,
+			build_template=lambda: self._build_prompt_template(is_verified=is_verified)
+		)
+
+	def _build_prompt_template(self, is_verified: bool) -> PromptTemplate:
+		system_prompt = ConversationalQAMessages.turn_understanding_system
+		instructions_system = ConversationalQAMessages.turn_understanding_instructions_system
+		
+		if not is_verified:
+			system_prompt += ConversationalQAMessages.verification_intent_system
+			instructions_system += ConversationalQAMessages.verification_instruction_system
+
+		return self.build_prompt_template(
+			system_prompt=system_prompt + instructions_system,
+			human_prompt=ConversationalQAMessages.base_intent_human,
+			system_input_variables=["intent_list", "known_info", "appointments_text"],
+			human_input_variables=["user_message"]
+		)
+
+	def _format_intent_list(self) -> str:
+		return "\n".join(
+			f"- {intent.value}: {description}"
+			for intent, description in IntentService.INTENT_DESCRIPTIONS.items()
+		)
+
+	def _format_known_info(self, state: QAState) -> str:
+		parts: List[str] = [f"- Verified: {'yes' if state.get(StateKeys.IS_VERIFIED) else 'no'}"]
+		
+		for label, info in (
+			("Patient", state.get(StateKeys.USER_INFO)),
+			("Appointment", state.get(StateKeys.APPOINTMENT_INFO))
+		):
+			if info and hasattr(info, "model_dump"):
+				provided = {k: v for k, v in info.model_dump().items() if v}
+				if provided:
+					parts.append(f"- {label}: {provided}")
+		
+		return "\n".join(parts)
+
+	def _format_appointments(self, appointments: List[Dict[str, Any]]) -> str:
+		if not appointments:
+			return "Not loaded yet."
+		
+		lines = []
+		for appt in appointments:
+			provider = appt.get("provider", {}) or {}
+			clinic = appt.get("clinic", {}) or {}
+			lines.append(
+				f"- ID {appt.get('id')}: {provider.get('full_name', 'N/A')} "
+				f"({provider.get('specialty', 'N/A')}) at {clinic.get('name', 'N/A')} "
+				f"on {appt.get('starts_at', 'N/A')} [{appt.get('status', 'N/A')}]"
+			)
+		return "\n".join(lines)
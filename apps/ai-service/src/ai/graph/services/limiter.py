@@ -0,0 +1,335 @@
+import asyncio
+import contextvars
+import heapq
+import itertools
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from enum import IntEnum
+from typing import (
+    AsyncIterator,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Type
+)
+
+import httpx
+import openai
+
+from infrastructure.config import EnvConfig
+from infrastructure.metrics import MetricsRegistry
+from utils import Logger
+
+logger = Logger(__name__)
+metrics = MetricsRegistry()
+
+# Signs the provider is saturated: back off the limit at once.
+OVERLOAD_ERRORS: Tuple[Type[BaseException], ...] = (
+    TimeoutError,
+    asyncio.TimeoutError,
+    openai.APITimeoutError,
+    openai.RateLimitError,
+    httpx.TimeoutException,
+)
+
+
+class CallPriority(IntEnum):
+    """ Queue order for LLM calls waiting on the limiter; lower goes first. """
+    CLASSIFICATION = 0    # intent, confirmation: every turn waits on these
+    MATCHING = 1
+    GENERATION = 2        # QA answers, clarification wording
+
+
+class ConcurrencyLimitTimeout(TimeoutError):
+    """
+    A call waited longer than its timeout for a concurrency slot. Purely
+    local: it is neither retried nor counted as a provider failure.
+    """
+
+
+class QueueWait:
+    """ Seconds spent waiting for limiter slots by the calls made inside `track()`. """
+    _current: contextvars.ContextVar = contextvars.ContextVar("llm_limiter_queue_wait", default=None)
+
+    def __init__(self) -> None:
+        self.seconds = 0.0
+
+    @classmethod
+    @contextmanager
+    def track(cls) -> Iterator["QueueWait"]:
+        # Tasks and hedge threads copy the context, so they add to the same object
+        waited = cls()
+        token = cls._current.set(waited)
+        try:
+            yield waited
+        finally:
+            cls._current.reset(token)
+
+    @classmethod
+    def add(cls, seconds: float) -> None:
+        waited = cls._current.get()
+        if waited is not None:
+            waited.seconds += seconds
+
+
+class _Waiter:
+    def __init__(self, loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+        self.loop = loop
+        self.future: Optional[asyncio.Future] = loop.create_future() if loop is not None else None
+        self.event: Optional[threading.Event] = None if loop is not None else threading.Event()
+        self.granted = False
+        self.cancelled = False
+
+    def wake(self) -> bool:
+        if self.event is not None:
+            self.event.set()
+            return True
+        try:
+            self.loop.call_soon_threadsafe(self._resolve)
+        except RuntimeError:
+            # The waiter's event loop is gone; nobody will use the slot
+            return False
+        return True
+
+    def _resolve(self) -> None:
+        if not self.future.done():
+            self.future.set_result(None)
+
+
+class AdaptiveLimiter:
+    """
+    Process-wide AIMD limit on concurrent LLM requests, with a priority queue.
+
+    Every LLMService chain invocation holds a slot while it talks to the
+    provider. Calls beyond the limit queue by CallPriority (then arrival), so
+    intent and confirmation classification overtake QA answers and
+    clarification wording during a burst.
+
+    The limit adapts to the provider: a latency sample more than
+    LLM_LIMITER_TOLERANCE times the service's quiet-time baseline, or an
+    overload error (429, timeout), multiplies it by LLM_LIMITER_BACKOFF; a
+    normal sample while the limit is in use adds 1/limit (about +1 per
+    limit's worth of calls). Baselines are kept per service since a QA answer
+    is naturally slower than an intent label.
+
+    Settings: LLM_LIMITER_ENABLED, LLM_LIMITER_INITIAL, LLM_LIMITER_MIN,
+    LLM_LIMITER_MAX, LLM_LIMITER_TOLERANCE, LLM_LIMITER_BACKOFF.
+    Metrics: llm.limiter.limit / in_flight / queue_depth gauges,
+    llm.limiter.queue_wait[.<priority>] timers and llm.limiter.queued /
+    decreases / timeouts counters. Process-wide, use `AdaptiveLimiter.shared()`.
+    """
+    _instance: Optional["AdaptiveLimiter"] = None
+    _instance_lock = threading.Lock()
+
+    # Baselines follow latency down quickly and up slowly so they track an unloaded provider
+    BASELINE_ALPHA_DOWN: float = 0.5
+    BASELINE_ALPHA_UP: float = 0.05
+
+    def __init__(
+        self,
+        initial_limit: float = 16,
+        min_limit: float = 2,
+        max_limit: float = 128,
+        tolerance: float = 2.0,
+        backoff: float = 0.9,
+        enabled: bool = True
+    ) -> None:
+        self.enabled = enabled
+        self.min_limit = float(min_limit)
+        self.max_limit = float(max_limit)
+        self.limit = min(self.max_limit, max(self.min_limit, float(initial_limit)))
+        self.tolerance = tolerance
+        self.backoff = backoff
+        self.in_flight = 0
+        self._lock = threading.Lock()
+        self._queue: List[Tuple[int, int, _Waiter]] = []
+        self._sequence = itertools.count()
+        self._baselines: Dict[str, float] = {}
+        self._publish()
+
+    @classmethod
+    def shared(cls) -> "AdaptiveLimiter":
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls(
+                    initial_limit=EnvConfig.get_float("LLM_LIMITER_INITIAL", 16),
+                    min_limit=EnvConfig.get_float("LLM_LIMITER_MIN", 2),
+                    max_limit=EnvConfig.get_float("LLM_LIMITER_MAX", 128),
+                    tolerance=EnvConfig.get_float("LLM_LIMITER_TOLERANCE", 2.0),
+                    backoff=EnvConfig.get_float("LLM_LIMITER_BACKOFF", 0.9),
+                    enabled=EnvConfig.get_bool("LLM_LIMITER_ENABLED", True),
+                )
+            return cls._instance
+
+    @classmethod
+    def reset_shared(cls) -> None:
+        with cls._instance_lock:
+            cls._instance = None
+
+    @property
+    def queue_depth(self) -> int:
+        with self._lock:
+            return sum(1 for _, _, waiter in self._queue if not waiter.cancelled)
+
+    @contextmanager
+    def slot(
+        self,
+        service_name: str,
+        priority: CallPriority = CallPriority.MATCHING,
+        timeout: Optional[float] = None
+    ) -> Iterator[None]:
+        if not self.enabled:
+            yield
+            return
+        self.acquire(priority, timeout)
+        started = time.perf_counter()
+        try:
+            yield
+        except OVERLOAD_ERRORS:
+            self.release(service_name, overloaded=True)
+            raise
+        except BaseException:
+            self.release(service_name)
+            raise
+        self.release(service_name, latency=time.perf_counter() - started)
+
+    @asynccontextmanager
+    async def aslot(
+        self,
+        service_name: str,
+        priority: CallPriority = CallPriority.MATCHING,
+        timeout: Optional[float] = None
+    ) -> AsyncIterator[None]:
+        if not self.enabled:
+            yield
+            return
+        await self.aacquire(priority, timeout)
+        started = time.perf_counter()
+        try:
+            yield
+        except OVERLOAD_ERRORS:
+            self.release(service_name, overloaded=True)
+            raise
+        except BaseException:
+            self.release(service_name)
+            raise
+        self.release(service_name, latency=time.perf_counter() - started)
+
+    def acquire(self, priority: CallPriority, timeout: Optional[float] = None) -> None:
+        waiter = self._enqueue(priority)
+        if waiter is None:
+            self._observe_wait(priority, 0.0)
+            return
+        started = time.perf_counter()
+        waiter.event.wait(timeout)
+        if not self._settle(waiter):
+            self._timed_out(priority, timeout)
+        self._observe_wait(priority, time.perf_counter() - started)
+
+    async def aacquire(self, priority: CallPriority, timeout: Optional[float] = None) -> None:
+        waiter = self._enqueue(priority, asyncio.get_running_loop())
+        if waiter is None:
+            self._observe_wait(priority, 0.0)
+            return
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), timeout)
+        except asyncio.TimeoutError:
+            if not self._settle(waiter):
+                self._timed_out(priority, timeout)
+        except asyncio.CancelledError:
+            if self._settle(waiter):
+                self.release(None)
+            raise
+        self._observe_wait(priority, time.perf_counter() - started)
+
+    def release(
+        self,
+        service_name: Optional[str],
+        latency: Optional[float] = None,
+        overloaded: bool = False
+    ) -> None:
+        with self._lock:
+            was_saturated = self.in_flight >= int(self.limit) or bool(self._queue)
+            self.in_flight = max(0, self.in_flight - 1)
+            if overloaded:
+                self._decrease("overload")
+            elif latency is not None and service_name is not None:
+                baseline = self._baselines.get(service_name)
+                self._update_baseline(service_name, latency)
+                if baseline is not None and latency > baseline * self.tolerance:
+                    self._decrease("latency")
+                elif was_saturated:
+                    self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+            self._dispatch()
+            self._publish()
+
+    def _enqueue(
+        self,
+        priority: CallPriority,
+        loop: Optional[asyncio.AbstractEventLoop] = None
+    ) -> Optional[_Waiter]:
+        """ Take a free slot (returns None) or join the queue and return the waiter. """
+        with self._lock:
+            if self.in_flight < int(self.limit) and not self._queue:
+                self.in_flight += 1
+                self._publish()
+                return None
+            waiter = _Waiter(loop)
+            heapq.heappush(self._queue, (int(priority), next(self._sequence), waiter))
+            self._publish()
+        metrics.increment("llm.limiter.queued")
+        return waiter
+
+    def _settle(self, waiter: _Waiter) -> bool:
+        """ After a wait ends: True if the slot was granted, else withdraw from the queue. """
+        with self._lock:
+            if waiter.granted:
+                return True
+            waiter.cancelled = True
+            self._queue = [entry for entry in self._queue if entry[2] is not waiter]
+            heapq.heapify(self._queue)
+            self._publish()
+            return False
+
+    def _dispatch(self) -> None:
+        while self._queue and self.in_flight < int(self.limit):
+            _, _, waiter = heapq.heappop(self._queue)
+            if waiter.cancelled:
+                continue
+            waiter.granted = True
+            if waiter.wake():
+                self.in_flight += 1
+
+    def _decrease(self, reason: str) -> None:
+        self.limit = max(self.min_limit, self.limit * self.backoff)
+        metrics.increment("llm.limiter.decreases")
+        metrics.increment(f"llm.limiter.decreases.{reason}")
+
+    def _update_baseline(self, service_name: str, latency: float) -> None:
+        baseline = self._baselines.get(service_name)
+        if baseline is None:
+            self._baselines[service_name] = latency
+            return
+        alpha = self.BASELINE_ALPHA_DOWN if latency < baseline else self.BASELINE_ALPHA_UP
+        self._baselines[service_name] = baseline + alpha * (latency - baseline)
+
+    def _timed_out(self, priority: CallPriority, timeout: Optional[float]) -> None:
+        metrics.increment("llm.limiter.timeouts")
+        metrics.increment(f"llm.limiter.timeouts.{priority.name.lower()}")
+        raise ConcurrencyLimitTimeout(
+            f"No LLM concurrency slot within {timeout}s (limit {int(self.limit)}, priority {priority.name})"
+        )
+
+    def _observe_wait(self, priority: CallPriority, seconds: float) -> None:
+        QueueWait.add(seconds)
+        metrics.observe("llm.limiter.queue_wait", seconds)
+        metrics.observe(f"llm.limiter.queue_wait.{priority.name.lower()}", seconds)
+
+    def _publish(self) -> None:
+        metrics.set_gauge("llm.limiter.limit", round(self.limit, 2))
+        metrics.set_gauge("llm.limiter.in_flight", self.in_flight)
+        metrics.set_gauge("llm.limiter.queue_depth", sum(1 for _, _, waiter in self._queue if not waiter.cancelled))
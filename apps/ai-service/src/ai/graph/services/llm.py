@@ -1,37 +1,436 @@
 
+import re
+import threading
 from langchain_openai import ChatOpenAI
+from langchain_core.language_models import BaseChatModel
 from langchain.prompts import PromptTemplate 
 from langchain_core.runnables import Runnable
 from langchain.tools import Tool
+from langgraph.config import get_config
 from pydantic import BaseModel
 from typing import (
+    Any,
+    Callable,
+    Dict,
     List, 
-    Sequence
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    Union
 )
 
+from infrastructure.config import EnvConfig
+from infrastructure.http import SharedHTTPClient
+from infrastructure.metrics import MetricsRegistry
 from ..prompts.builder.prompt_builder import (
     ChatPromptTemplateBuilder, 
     MessageTypes
 )
+from .cache import (
+    Cassette,
+    ChainCache,
+    ChainKey,
+    CompiledChain,
+    ResponseCache
+)
+from .providers import (
+    LLMBackend,
+    ProviderRouter,
+    build_chat_model,
+    eligible_backends,
+    load_backends
+)
+from .limiter import AdaptiveLimiter, CallPriority
+from .resilience import CallPolicy, CircuitBreaker, ResilientCaller
+from .tokens import TokenCounter, UsageCallback, trim_to_tokens
+from .usage import TurnUsage, current_turn_usage
+from utils import Logger
+
+logger = Logger(__name__)
+metrics = MetricsRegistry()
 
 
 class LLMService:
     """Thin wrapper over ChatOpenAI to manage two temperatures and structured outputs."""
+    # Opt-in: serve repeated structured calls from ResponseCache (only honoured at temp 0)
+    cache_responses: bool = False
+    # Output cap and prompt budget in tokens; LLM_<NAME>_MAX_TOKENS / LLM_<NAME>_INPUT_BUDGET
+    # override them, where <NAME> is the service name without "Service" (e.g. APPOINTMENT_MATCH)
+    max_output_tokens: Optional[int] = None
+    input_token_budget: Optional[int] = None
+    # Inputs that may be shortened, largest first, when a prompt exceeds input_token_budget
+    trimmable_inputs: Tuple[str, ...] = ()
+    # Per-attempt timeout, overall deadline, retries and hedging; see CallPolicy for env overrides
+    call_policy: CallPolicy = CallPolicy()
+    # Minimum backend quality tier (1-3) this service may be routed to; LLM_<NAME>_QUALITY_TIER overrides
+    quality_tier: int = 1
+    # Queue position when the shared AdaptiveLimiter is saturated; classification goes first
+    call_priority: CallPriority = CallPriority.MATCHING
+
     def __init__(
         self, 
         model: str = "gpt-4o-mini", 
         temp: float = 0.2, 
     ):
-        self.llm = ChatOpenAI(model=model, temperature=temp)
+        self.model = model
+        self.temp = temp
+        self.max_output_tokens = self._limit_from_env("MAX_TOKENS", self.max_output_tokens)
+        self.input_token_budget = self._limit_from_env("INPUT_BUDGET", self.input_token_budget)
+        self.token_counter = TokenCounter(model)
+        self.call_policy = CallPolicy.from_env(self.config_name, self.call_policy)
+        self.caller = ResilientCaller(self.service_name, self.call_policy)
+        self.breaker = CircuitBreaker()
+        self.limiter = AdaptiveLimiter.shared()
+        self.quality_tier = EnvConfig.get_int(f"LLM_{self.config_name}_QUALITY_TIER", self.quality_tier)
+        self.backends = eligible_backends(load_backends(model), self.quality_tier)
+        self.llms: Dict[str, BaseChatModel] = {
+            backend.name: self._build_chat_model(backend) for backend in self.backends
+        }
+        # Primary backend, used by callers that bypass routing (bind_tools, build_chain)
+        self.llm = self.llms[self.backends[0].name]
+        self.router = ProviderRouter()
         self.prompt_builder = ChatPromptTemplateBuilder()
+        self._prompt_lock = threading.Lock()
+        self.chain_cache = ChainCache()
+        self.response_cache = self._resolve_response_cache()
+        self.cassette = Cassette.shared()
+
+    @property
+    def service_name(self) -> str:
+        return type(self).__name__
+
+    @property
+    def config_name(self) -> str:
+        """ Upper snake-case service name used in environment overrides, e.g. APPOINTMENT_MATCH. """
+        name = re.sub(r"Service$", "", self.service_name) or self.service_name
+        return re.sub(r"(?<!^)(?=[A-Z])", "_", name).upper()
+
+    def invoke_chain(
+        self,
+        chain: Union[Runnable, CompiledChain],
+        inputs: Dict[str, Any]
+    ) -> Any:
+        """Single entry point for synchronous chain invocations."""
+        inputs, prompt_tokens = self._fit_input_budget(chain, inputs)
+        if self._replaying(chain):
+            return self.cassette.replay(chain, inputs, chain.schema)
+        cache_key = self._response_cache_key(chain, inputs)
+        if cache_key is not None:
+            cached = self.response_cache.get(cache_key, chain.schema, self.service_name)
+            if cached is not None:
+                return cached
+
+        usage = UsageCallback()
+        # An open circuit raises CircuitOpenError here, before any provider work or timing
+        result = self.breaker.call(self.service_name, lambda: self._call_provider(chain, inputs, usage))
+        self._record_call(prompt_tokens, usage, result)
+        if self.cassette is not None and self.cassette.recording and isinstance(chain, CompiledChain):
+            self.cassette.record(chain, inputs, result)
+
+        if cache_key is not None and isinstance(result, BaseModel):
+            self.response_cache.set(cache_key, result)
+        return result
+
+    async def ainvoke_chain(
+        self,
+        chain: Union[Runnable, CompiledChain],
+        inputs: Dict[str, Any]
+    ) -> Any:
+        """Single entry point for asynchronous chain invocations."""
+        inputs, prompt_tokens = self._fit_input_budget(chain, inputs)
+        if self._replaying(chain):
+            return self.cassette.replay(chain, inputs, chain.schema)
+        cache_key = self._response_cache_key(chain, inputs)
+        if cache_key is not None:
+            cached = await self.response_cache.aget(cache_key, chain.schema, self.service_name)
+            if cached is not None:
+                return cached
+
+        usage = UsageCallback()
+        result = await self.breaker.acall(self.service_name, lambda: self._acall_provider(chain, inputs, usage))
+        self._record_call(prompt_tokens, usage, result)
+        if self.cassette is not None and self.cassette.recording and isinstance(chain, CompiledChain):
+            self.cassette.record(chain, inputs, result)
+
+        if cache_key is not None and isinstance(result, BaseModel):
+            await self.response_cache.aset(cache_key, result)
+        return result
+
+    def _call_provider(
+        self,
+        chain: Union[Runnable, CompiledChain],
+        inputs: Dict[str, Any],
+        usage: UsageCallback
+    ) -> Any:
+        with metrics.timer(f"llm.latency.{self.service_name}"):
+            return self.caller.call(lambda: self._invoke_routed(chain, inputs, {"callbacks": [usage]}))
+
+    async def _acall_provider(
+        self,
+        chain: Union[Runnable, CompiledChain],
+        inputs: Dict[str, Any],
+        usage: UsageCallback
+    ) -> Any:
+        with metrics.timer(f"llm.latency.{self.service_name}"):
+            return await self.caller.acall(lambda: self._ainvoke_routed(chain, inputs, {"callbacks": [usage]}))
+
+    def _replaying(self, chain: Union[Runnable, CompiledChain]) -> bool:
+        return (
+            self.cassette is not None
+            and self.cassette.replaying
+            and isinstance(chain, CompiledChain)
+            and chain.schema is not None
+        )
+
+    def _build_chat_model(self, backend: LLMBackend) -> BaseChatModel:
+        if backend.provider != "openai":
+            return build_chat_model(
+                backend,
+                temperature=self.temp,
+                max_tokens=self.max_output_tokens,
+                timeout=self.call_policy.timeout_seconds
+            )
+        kwargs: Dict[str, Any] = {}
+        if backend.base_url:
+            kwargs["base_url"] = backend.base_url
+        if backend.api_key:
+            kwargs["api_key"] = backend.api_key
+        return ChatOpenAI(
+            model=backend.model,
+            temperature=self.temp,
+            max_tokens=self.max_output_tokens,
+            # Retries are owned by self.caller so backoff and the deadline apply once
+            timeout=self.call_policy.timeout_seconds,
+            max_retries=0,
+            http_client=SharedHTTPClient.get_sync(),
+            http_async_client=SharedHTTPClient.get_async(),
+            **kwargs,
+        )
+
+    def _invoke_routed(
+        self,
+        chain: Union[Runnable, CompiledChain],
+        inputs: Dict[str, Any],
+        config: Dict[str, Any]
+    ) -> Any:
+        with self.limiter.slot(self.service_name, self.call_priority, self.call_policy.timeout_seconds):
+            if not isinstance(chain, CompiledChain):
+                return chain.invoke(inputs, config=config)
+            return self.router.invoke(
+                self.service_name,
+                self._chain_backends(chain),
+                lambda backend: chain.invoke(inputs, config=config, backend=backend.name)
+            )
+
+    async def _ainvoke_routed(
+        self,
+        chain: Union[Runnable, CompiledChain],
+        inputs: Dict[str, Any],
+        config: Dict[str, Any]
+    ) -> Any:
+        async with self.limiter.aslot(self.service_name, self.call_priority, self.call_policy.timeout_seconds):
+            if not isinstance(chain, CompiledChain):
+                return await chain.ainvoke(inputs, config=config)
+            return await self.router.ainvoke(
+                self.service_name,
+                self._chain_backends(chain),
+                lambda backend: chain.ainvoke(inputs, config=config, backend=backend.name)
+            )
+
+    def _chain_backends(self, chain: CompiledChain) -> List[LLMBackend]:
+        """ The backends `chain` was compiled for (all of the service's unless it was built for a subset). """
+        if not chain.routes:
+            return self.backends
+        return [backend for backend in self.backends if backend.name in chain.routes] or self.backends
+
+    def _limit_from_env(self, setting: str, default: Optional[int]) -> Optional[int]:
+        value = EnvConfig.get_int(f"LLM_{self.config_name}_{setting}", default or 0)
+        return value if value > 0 else None
+
+    def _count_prompt(self, chain: CompiledChain, inputs: Dict[str, Any]) -> int:
+        return self.token_counter.count_messages(chain.template.format_messages(**inputs))
+
+    def _fit_input_budget(
+        self,
+        chain: Union[Runnable, CompiledChain],
+        inputs: Dict[str, Any]
+    ) -> Tuple[Dict[str, Any], Optional[int]]:
+        """
+        Count the rendered prompt and, if it exceeds input_token_budget, shorten
+        the trimmable inputs (largest first) until it fits. Returns the inputs to
+        send and their prompt size; the caller's dict is never modified.
+        """
+        if not isinstance(chain, CompiledChain):
+            return inputs, None
+        try:
+            tokens = self._count_prompt(chain, inputs)
+        except Exception as e:
+            logger.warning(f"[TOKENS] Could not count prompt for {self.service_name}: {e}")
+            return inputs, None
+
+        budget = self.input_token_budget
+        if budget is None or tokens <= budget:
+            return inputs, tokens
+
+        trimmed = dict(inputs)
+        sections = sorted(
+            (key for key in self.trimmable_inputs if isinstance(trimmed.get(key), str)),
+            key=lambda key: self.token_counter.count(trimmed[key]),
+            reverse=True
+        )
+        for key in sections:
+            overflow = tokens - budget
+            if overflow <= 0:
+                break
+            section_tokens = self.token_counter.count(trimmed[key])
+            trimmed[key] = trim_to_tokens(trimmed[key], max(0, section_tokens - overflow), self.token_counter)
+            tokens = self._count_prompt(chain, trimmed)
+
+        metrics.increment(f"llm.input_budget.trimmed.{self.service_name}")
+        if tokens > budget:
+            logger.warning(f"[TOKENS] {self.service_name} prompt still {tokens} tokens after trimming (budget {budget})")
+        else:
+            logger.info(f"[TOKENS] {self.service_name} prompt trimmed to {tokens} tokens (budget {budget})")
+        return trimmed, tokens
+
+    def _record_call(
+        self,
+        prompt_tokens: Optional[int],
+        usage: UsageCallback,
+        result: Any
+    ) -> None:
+        """
+        Account one provider round trip (cache hits excluded): provider-reported
+        usage when present, offline counts otherwise, attributed to this service,
+        the running graph node and the running turn (session).
+        """
+        provider_reported = usage.input_tokens is not None
+        input_tokens = usage.input_tokens if provider_reported else (prompt_tokens or 0)
+        output_tokens = usage.output_tokens if usage.output_tokens is not None else self._estimate_output(result)
+        node = self._current_node()
+
+        metrics.increment(f"llm.tokens.source.{'provider' if provider_reported else 'estimate'}")
+        metrics.increment(f"llm.tokens.input.{self.service_name}", input_tokens)
+        metrics.increment(f"llm.tokens.output.{self.service_name}", output_tokens)
+        if prompt_tokens is not None:
+            metrics.observe(f"llm.prompt_tokens.{self.service_name}", prompt_tokens)
+        if node:
+            metrics.increment(f"llm.tokens.input.node.{node}", input_tokens)
+            metrics.increment(f"llm.tokens.output.node.{node}", output_tokens)
+
+        turn = current_turn_usage()
+        if turn is not None:
+            turn.record_call(
+                self.service_name,
+                node=node,
+                input_tokens=input_tokens,
+                output_tokens=output_tokens
+            )
+
+    def _record_shared_usage(self, usage: TurnUsage) -> None:
+        """
+        Charge the running turn and node with usage recorded in another context
+        (e.g. its share of a batched call); service totals were counted when it ran.
+        """
+        node = self._current_node()
+        if node:
+            metrics.increment(f"llm.tokens.input.node.{node}", usage.input_tokens)
+            metrics.increment(f"llm.tokens.output.node.{node}", usage.output_tokens)
+        turn = current_turn_usage()
+        if turn is not None:
+            turn.merge(usage, node=node)
+
+    def _estimate_output(self, result: Any) -> int:
+        if isinstance(result, BaseModel):
+            return self.token_counter.count(result.model_dump_json())
+        content = getattr(result, "content", None)
+        return self.token_counter.count(content if isinstance(content, str) else "")
+
+    def _current_node(self) -> Optional[str]:
+        try:
+            return get_config().get("metadata", {}).get("langgraph_node")
+        except Exception:
+            return None
+
+    def _resolve_response_cache(self) -> Optional[ResponseCache]:
+        if not self.cache_responses:
+            return None
+        if self.temp != 0:
+            logger.warning(
+                f"{self.service_name} opted into response caching at temp={self.temp}; "
+                "caching is only applied to deterministic (temp 0) services"
+            )
+            return None
+        cache = ResponseCache.shared()
+        return cache if cache.enabled else None
+
+    def _response_cache_key(
+        self,
+        chain: Union[Runnable, CompiledChain],
+        inputs: Dict[str, Any]
+    ) -> Optional[str]:
+        if self.response_cache is None or not isinstance(chain, CompiledChain):
+            return None
+        try:
+            return ResponseCache.make_key(chain, inputs)
+        except Exception as e:
+            logger.warning(f"[CACHE] Could not build response cache key for {self.service_name}: {e}")
+            return None
+
+    def get_structured_chain(
+        self,
+        variant: str,
+        schema: Type[BaseModel],
+        build_template: Callable[[], PromptTemplate],
+        backends: Optional[Sequence[LLMBackend]] = None
+    ) -> CompiledChain:
+        """
+        Compiled chain for a prompt variant, built on first use and reused after.
+        `variant` must identify everything that changes the template text.
+        `backends` restricts routing to a subset of self.backends (e.g. one
+        cascade tier); the chain key then names their models so response
+        caching keeps the subsets apart.
+        """
+        targets = list(backends or self.backends)
+        key = ChainKey(
+            service=self.service_name,
+            variant=variant,
+            schema=schema.__name__,
+            model=self.model if backends is None else "+".join(backend.model for backend in targets),
+            temp=self.temp
+        )
+
+        def build() -> CompiledChain:
+            template = build_template()
+            routes = {
+                backend.name: self.build_structured_chain(
+                    template=template, schema=schema, llm=self.llms[backend.name]
+                )
+                for backend in targets
+            }
+            return CompiledChain(
+                key=key,
+                template=template,
+                runnable=routes[targets[0].name],
+                schema=schema,
+                routes=routes
+            )
+
+        return self.chain_cache.get_or_build(key, build)
+
+    def prewarm(self) -> None:
+        """Build this service's chains ahead of the first request; no-op by default."""
+        return None
 
     def build_structured_chain(
         self, 
         template: PromptTemplate,
         schema: BaseModel,
-        use_extract: bool = True
+        use_extract: bool = True,
+        llm: Optional[BaseChatModel] = None
     ) -> Runnable:
-        return template | self.llm.with_structured_output(
+        return template | (llm or self.llm).with_structured_output(
             schema=schema
         )
 
@@ -52,20 +451,23 @@ class LLMService:
         human_input_variables: List[str] = []
     ) -> PromptTemplate:
         
-        self.prompt_builder.add_message(
-            message_type=MessageTypes.SYSTEM,
-            template=system_prompt,
-            input_variables=system_input_variables,
-        )
-        self.prompt_builder.add_message(
-            message_type=MessageTypes.HUMAN,
-            template=human_prompt,
-            input_variables=human_input_variables,
-        )
-
         input_variables = list(set(system_input_variables + human_input_variables))
 
-        prompt = self.prompt_builder.build(input_variables=input_variables)
+        # The builder accumulates messages between add_message and build, so
+        # concurrent builds on the same service must not interleave.
+        with self._prompt_lock:
+            self.prompt_builder.add_message(
+                message_type=MessageTypes.SYSTEM,
+                template=system_prompt,
+                input_variables=system_input_variables,
+            )
+            self.prompt_builder.add_message(
+                message_type=MessageTypes.HUMAN,
+                template=human_prompt,
+                input_variables=human_input_variables,
+            )
+
+            prompt = self.prompt_builder.build(input_variables=input_variables)
 
         return prompt
 
@@ -0,0 +1,24 @@
+from .backend import (
+    MAX_TIER,
+    LLMBackend,
+    build_chat_model,
+    eligible_backends,
+    load_backends,
+    register_provider
+)
+from .router import (
+    BackendStats,
+    ProviderRouter
+)
+
+
+__all__ = [
+    "MAX_TIER",
+    "LLMBackend",
+    "build_chat_model",
+    "eligible_backends",
+    "load_backends",
+    "register_provider",
+    "BackendStats",
+    "ProviderRouter"
+]
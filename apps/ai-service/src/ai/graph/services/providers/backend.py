@@ -0,0 +1,147 @@
+import json
+import os
+from dataclasses import dataclass
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Optional
+)
+
+from langchain_core.language_models import BaseChatModel
+
+from infrastructure.config import EnvConfig
+from utils import Logger
+
+logger = Logger(__name__)
+
+# Quality tiers: 1 = small/fast models, 2 = general purpose, 3 = most capable.
+MAX_TIER: int = 3
+
+
+@dataclass(frozen=True)
+class LLMBackend:
+    """
+    One provider + model a service can be routed to.
+
+    `tier` is the quality level the model is trusted with; a service only
+    routes to backends whose tier is at least its `quality_tier`.
+    `base_url` / `api_key_env` point OpenAI-compatible providers at other
+    endpoints (gateways, local servers) without code changes.
+    """
+    provider: str
+    model: str
+    tier: int = 1
+    name: str = ""
+    base_url: Optional[str] = None
+    api_key_env: Optional[str] = None
+
+    def __post_init__(self) -> None:
+        if not self.name:
+            object.__setattr__(self, "name", f"{self.provider}:{self.model}")
+
+    @property
+    def api_key(self) -> Optional[str]:
+        return os.getenv(self.api_key_env) if self.api_key_env else None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LLMBackend":
+        return cls(
+            provider=data["provider"],
+            model=data["model"],
+            tier=int(data.get("tier", 1)),
+            name=data.get("name", ""),
+            base_url=data.get("base_url"),
+            api_key_env=data.get("api_key_env"),
+        )
+
+
+ChatModelFactory = Callable[..., BaseChatModel]
+_PROVIDERS: Dict[str, ChatModelFactory] = {}
+
+
+def register_provider(provider: str, factory: ChatModelFactory) -> None:
+    """
+    Register a chat model factory for `provider`. Factories are called as
+    factory(backend, temperature=..., max_tokens=..., timeout=...).
+    """
+    _PROVIDERS[provider] = factory
+
+
+def build_chat_model(
+    backend: LLMBackend,
+    temperature: float,
+    max_tokens: Optional[int],
+    timeout: float
+) -> BaseChatModel:
+    factory = _PROVIDERS.get(backend.provider)
+    if factory is None:
+        raise ValueError(f"Unknown LLM provider '{backend.provider}' for backend {backend.name}")
+    return factory(backend, temperature=temperature, max_tokens=max_tokens, timeout=timeout)
+
+
+def _anthropic_chat_model(
+    backend: LLMBackend,
+    temperature: float,
+    max_tokens: Optional[int],
+    timeout: float
+) -> BaseChatModel:
+    try:
+        from langchain_anthropic import ChatAnthropic
+    except ImportError as e:
+        raise ImportError(
+            f"Backend {backend.name} needs the langchain-anthropic package (pip install langchain-anthropic)"
+        ) from e
+
+    kwargs: Dict[str, Any] = {
+        "model": backend.model,
+        "temperature": temperature,
+        "timeout": timeout,
+        "max_retries": 0,
+    }
+    if max_tokens:
+        kwargs["max_tokens"] = max_tokens
+    if backend.base_url:
+        kwargs["base_url"] = backend.base_url
+    if backend.api_key:
+        kwargs["api_key"] = backend.api_key
+    return ChatAnthropic(**kwargs)
+
+
+register_provider("anthropic", _anthropic_chat_model)
+
+
+def load_backends(default_model: str) -> List[LLMBackend]:
+    """
+    Backends from LLM_BACKENDS, a JSON list of objects with provider, model and
+    optionally tier, name, base_url and api_key_env. Without it, the service's
+    own OpenAI model is the only backend and is trusted for every tier;
+    LLM_BASE_URL points it at another OpenAI-compatible endpoint (e.g. the
+    ai.stub_llm server for offline load tests).
+    """
+    default = [LLMBackend(
+        provider="openai",
+        model=default_model,
+        tier=MAX_TIER,
+        base_url=EnvConfig.get_str("LLM_BASE_URL")
+    )]
+    raw = EnvConfig.get_str("LLM_BACKENDS")
+    if not raw:
+        return default
+    try:
+        backends = [LLMBackend.from_dict(item) for item in json.loads(raw)]
+    except (ValueError, KeyError, TypeError) as e:
+        logger.error(f"[ROUTER] Invalid LLM_BACKENDS, using {default_model} only: {e}")
+        return default
+    return backends or default
+
+
+def eligible_backends(backends: List[LLMBackend], min_tier: int) -> List[LLMBackend]:
+    """ Backends good enough for `min_tier`; the highest available tier if none qualify. """
+    eligible = [backend for backend in backends if backend.tier >= min_tier]
+    if eligible:
+        return eligible
+    best = max(backend.tier for backend in backends)
+    logger.warning(f"[ROUTER] No backend meets tier {min_tier}; using tier {best}")
+    return [backend for backend in backends if backend.tier == best]
@@ -0,0 +1,214 @@
+import asyncio
+import random
+import threading
+from collections import deque
+from time import monotonic, perf_counter
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type
+)
+
+from langchain_core.exceptions import OutputParserException
+from pydantic import ValidationError
+
+from infrastructure.config import EnvConfig
+from infrastructure.metrics import MetricsRegistry
+from utils import Logger
+from .backend import LLMBackend
+
+logger = Logger(__name__)
+metrics = MetricsRegistry()
+
+# The backend answered but the output did not fit the schema; switching provider will not help.
+SCHEMA_ERRORS: Tuple[Type[BaseException], ...] = (OutputParserException, ValidationError)
+
+
+class BackendStats:
+    """ Rolling latency (EWMA) and recent outcomes of one backend. """
+    def __init__(self, window: int) -> None:
+        self.latency: Optional[float] = None
+        self.outcomes: Deque[bool] = deque(maxlen=window)
+        self.consecutive_failures: int = 0
+        self.cooldown_until: float = 0.0
+
+    @property
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return self.outcomes.count(False) / len(self.outcomes)
+
+    def observe_latency(self, seconds: float, alpha: float) -> None:
+        self.latency = seconds if self.latency is None else alpha * seconds + (1 - alpha) * self.latency
+
+
+class ProviderRouter:
+    """
+    Sends each call to the fastest healthy backend and fails over down the list.
+
+    Backends are ordered by their rolling latency (unmeasured ones first, so
+    they get sampled); a small LLM_ROUTER_EXPLORE_RATE share of calls tries a
+    slower healthy backend to keep its estimate fresh. A backend that fails
+    LLM_ROUTER_FAILURE_THRESHOLD times in a row, or whose error rate over the
+    last LLM_ROUTER_ERROR_WINDOW calls exceeds LLM_ROUTER_MAX_ERROR_RATE, is
+    cooled down for LLM_ROUTER_COOLDOWN_SECONDS and only used as a last resort.
+
+    Follows the same shared class-level state pattern as MetricsRegistry, so
+    every service sees the same view of every backend.
+    """
+    _lock = threading.Lock()
+    _stats: Dict[str, BackendStats] = {}
+
+    def __init__(self) -> None:
+        self.alpha = EnvConfig.get_float("LLM_ROUTER_EWMA_ALPHA", 0.2)
+        self.window = EnvConfig.get_int("LLM_ROUTER_ERROR_WINDOW", 20)
+        self.min_samples = EnvConfig.get_int("LLM_ROUTER_MIN_SAMPLES", 5)
+        self.max_error_rate = EnvConfig.get_float("LLM_ROUTER_MAX_ERROR_RATE", 0.5)
+        self.failure_threshold = EnvConfig.get_int("LLM_ROUTER_FAILURE_THRESHOLD", 3)
+        self.cooldown_seconds = EnvConfig.get_float("LLM_ROUTER_COOLDOWN_SECONDS", 30.0)
+        self.explore_rate = EnvConfig.get_float("LLM_ROUTER_EXPLORE_RATE", 0.05)
+
+    def plan(self, backends: Sequence[LLMBackend]) -> List[LLMBackend]:
+        """ Backends in the order they should be tried for one call. """
+        now = monotonic()
+        with self._lock:
+            stats = {backend.name: self._get_stats(backend.name) for backend in backends}
+            healthy = [backend for backend in backends if stats[backend.name].cooldown_until <= now]
+            cooling = [backend for backend in backends if stats[backend.name].cooldown_until > now]
+            healthy.sort(key=lambda backend: stats[backend.name].latency or 0.0)
+            cooling.sort(key=lambda backend: stats[backend.name].cooldown_until)
+
+        if len(healthy) > 1 and random.random() < self.explore_rate:
+            healthy.insert(0, healthy.pop(random.randrange(1, len(healthy))))
+            metrics.increment("llm.router.explored")
+        return healthy + cooling
+
+    def is_healthy(self, backend: LLMBackend) -> bool:
+        with self._lock:
+            return self._get_stats(backend.name).cooldown_until <= monotonic()
+
+    def invoke(
+        self,
+        service_name: str,
+        backends: Sequence[LLMBackend],
+        call: Callable[[LLMBackend], Any]
+    ) -> Any:
+        error: Optional[BaseException] = None
+        for position, backend in enumerate(self.plan(backends)):
+            self._on_attempt(service_name, backend, position)
+            started = perf_counter()
+            try:
+                result = call(backend)
+            except SCHEMA_ERRORS:
+                raise
+            except Exception as e:
+                self.record_failure(backend, e)
+                error = e
+                continue
+            self.record_success(backend, perf_counter() - started)
+            return result
+        raise error
+
+    async def ainvoke(
+        self,
+        service_name: str,
+        backends: Sequence[LLMBackend],
+        call: Callable[[LLMBackend], Awaitable[Any]]
+    ) -> Any:
+        error: Optional[BaseException] = None
+        for position, backend in enumerate(self.plan(backends)):
+            self._on_attempt(service_name, backend, position)
+            started = perf_counter()
+            try:
+                result = await call(backend)
+            except SCHEMA_ERRORS:
+                raise
+            except asyncio.CancelledError:
+                # Timed out or lost a hedge: at least this slow, so count it toward latency.
+                self.record_latency(backend, perf_counter() - started)
+                raise
+            except Exception as e:
+                self.record_failure(backend, e)
+                error = e
+                continue
+            self.record_success(backend, perf_counter() - started)
+            return result
+        raise error
+
+    def record_success(self, backend: LLMBackend, seconds: float) -> None:
+        with self._lock:
+            stats = self._get_stats(backend.name)
+            stats.observe_latency(seconds, self.alpha)
+            stats.outcomes.append(True)
+            stats.consecutive_failures = 0
+        self._publish(backend.name, stats)
+
+    def record_latency(self, backend: LLMBackend, seconds: float) -> None:
+        with self._lock:
+            stats = self._get_stats(backend.name)
+            stats.observe_latency(max(seconds, stats.latency or 0.0), self.alpha)
+        self._publish(backend.name, stats)
+
+    def record_failure(self, backend: LLMBackend, error: BaseException) -> None:
+        with self._lock:
+            stats = self._get_stats(backend.name)
+            stats.outcomes.append(False)
+            stats.consecutive_failures += 1
+            tripped = (
+                stats.consecutive_failures >= self.failure_threshold
+                or (len(stats.outcomes) >= self.min_samples and stats.error_rate > self.max_error_rate)
+            )
+            if tripped:
+                stats.cooldown_until = monotonic() + self.cooldown_seconds
+                stats.outcomes.clear()
+                stats.consecutive_failures = 0
+        metrics.increment(f"llm.router.errors.{backend.name}")
+        if tripped:
+            metrics.increment(f"llm.router.cooldowns.{backend.name}")
+            logger.warning(
+                f"[ROUTER] {backend.name} cooling down for {self.cooldown_seconds}s after {type(error).__name__}: {error}"
+            )
+        self._publish(backend.name, stats)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        now = monotonic()
+        with self._lock:
+            return {
+                name: {
+                    "healthy": stats.cooldown_until <= now,
+                    "latency": stats.latency,
+                    "error_rate": stats.error_rate,
+                    "cooldown_remaining": max(0.0, stats.cooldown_until - now),
+                }
+                for name, stats in self._stats.items()
+            }
+
+    def _on_attempt(self, service_name: str, backend: LLMBackend, position: int) -> None:
+        metrics.increment(f"llm.router.selected.{service_name}.{backend.name}")
+        if position > 0:
+            metrics.increment(f"llm.router.failover.{service_name}")
+            logger.warning(f"[ROUTER] {service_name} failing over to {backend.name}")
+
+    def _publish(self, name: str, stats: BackendStats) -> None:
+        if stats.latency is not None:
+            metrics.set_gauge(f"llm.router.latency.{name}", stats.latency)
+        metrics.set_gauge(f"llm.router.error_rate.{name}", stats.error_rate)
+        metrics.set_gauge(f"llm.router.healthy.{name}", 1.0 if stats.cooldown_until <= monotonic() else 0.0)
+
+    def _get_stats(self, name: str) -> BackendStats:
+        stats = self._stats.get(name)
+        if stats is None:
+            stats = self._stats[name] = BackendStats(self.window)
+        return stats
+
+    @classmethod
+    def reset(cls) -> None:
+        with cls._lock:
+            cls._stats.clear()
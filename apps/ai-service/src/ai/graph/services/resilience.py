@@ -0,0 +1,512 @@
+import asyncio
+import contextvars
+import random
+import threading
+import time
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ThreadPoolExecutor,
+    wait
+)
+from collections import deque
+from dataclasses import dataclass
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    Optional,
+    Set,
+    Tuple,
+    Type
+)
+
+import httpx
+import openai
+
+from infrastructure.config import EnvConfig
+from infrastructure.metrics import MetricsRegistry
+from utils import Logger
+from .limiter import ConcurrencyLimitTimeout, QueueWait
+from .providers.router import SCHEMA_ERRORS
+
+logger = Logger(__name__)
+metrics = MetricsRegistry()
+
+# Transient failures worth another attempt; 4xx (bad request, auth) and schema errors are not.
+# A ConcurrencyLimitTimeout is a TimeoutError but is never retried (see ResilientCaller).
+RETRYABLE_ERRORS: Tuple[Type[BaseException], ...] = (
+    TimeoutError,
+    asyncio.TimeoutError,
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    openai.RateLimitError,
+    openai.InternalServerError,
+    httpx.TimeoutException,
+    httpx.TransportError,
+)
+
+
+# Failures that say nothing about the provider's health: it answered (schema), or was never asked.
+LOCAL_ERRORS: Tuple[Type[BaseException], ...] = SCHEMA_ERRORS + (ConcurrencyLimitTimeout,)
+
+
+class DeadlineExceeded(TimeoutError):
+    """ The call's overall deadline passed before any attempt succeeded. """
+
+
+class CircuitOpenError(RuntimeError):
+    """ The shared LLM circuit is open; the call was not attempted and the service should fall back. """
+
+
+@dataclass(frozen=True)
+class CallPolicy:
+    """
+    Deadline, retry and hedging settings for one service's LLM calls.
+
+    `timeout_seconds` bounds each attempt and `deadline_seconds` the whole call
+    including backoff. Retries use capped exponential backoff with full jitter.
+    When `hedge` is set a second identical request is sent once the first has
+    run longer than the service's observed p95 attempt latency (or
+    `hedge_after_seconds` until enough samples exist), and the first answer
+    wins; only enable it for idempotent calls.
+    """
+    timeout_seconds: float = 30.0
+    deadline_seconds: float = 60.0
+    max_retries: int = 2
+    backoff_base_seconds: float = 0.25
+    backoff_max_seconds: float = 4.0
+    hedge: bool = False
+    hedge_after_seconds: Optional[float] = None
+    hedge_min_samples: int = 20
+
+    @classmethod
+    def from_env(cls, config_name: str, default: "CallPolicy") -> "CallPolicy":
+        """ Apply LLM_<NAME>_TIMEOUT_SECONDS / _DEADLINE_SECONDS / _MAX_RETRIES / _HEDGE overrides. """
+        prefix = f"LLM_{config_name}"
+        return cls(
+            timeout_seconds=EnvConfig.get_float(f"{prefix}_TIMEOUT_SECONDS", default.timeout_seconds),
+            deadline_seconds=EnvConfig.get_float(f"{prefix}_DEADLINE_SECONDS", default.deadline_seconds),
+            max_retries=max(0, EnvConfig.get_int(f"{prefix}_MAX_RETRIES", default.max_retries)),
+            backoff_base_seconds=default.backoff_base_seconds,
+            backoff_max_seconds=default.backoff_max_seconds,
+            hedge=EnvConfig.get_bool(f"{prefix}_HEDGE", default.hedge),
+            hedge_after_seconds=EnvConfig.get_float(
+                f"{prefix}_HEDGE_AFTER_SECONDS", default.hedge_after_seconds or 0.0
+            ) or None,
+            hedge_min_samples=default.hedge_min_samples,
+        )
+
+    def backoff(self, retry: int) -> float:
+        """ Full-jitter delay before retry number `retry` (0-based). """
+        return random.uniform(0.0, min(self.backoff_max_seconds, self.backoff_base_seconds * (2 ** retry)))
+
+
+class ResilientCaller:
+    """
+    Runs one service's chain invocations under its CallPolicy.
+
+    Metrics (per service name):
+        llm.attempts / llm.retries / llm.deadline_exceeded   counters
+        llm.attempt_latency                                  timer of successful attempts (drives the hedge delay)
+        llm.hedge.eligible / .sent / .wins                   counters
+        llm.hedge.rate / .win_rate                           gauges (sent/eligible, wins/sent)
+    """
+    # Losing sync hedges cannot be cancelled; they finish on this shared pool.
+    _executor: Optional[ThreadPoolExecutor] = None
+    _executor_lock = threading.Lock()
+
+    def __init__(self, service_name: str, policy: CallPolicy) -> None:
+        self.service_name = service_name
+        self.policy = policy
+
+    def call(self, attempt: Callable[[], Any]) -> Any:
+        start = time.monotonic()
+        retry = 0
+        while True:
+            try:
+                return self._hedged(attempt, start)
+            except ConcurrencyLimitTimeout:
+                # Retrying would only queue the call again behind the same burst
+                raise
+            except RETRYABLE_ERRORS as e:
+                delay = self._next_delay(retry, start, e)
+                retry += 1
+                time.sleep(delay)
+
+    async def acall(self, attempt: Callable[[], Awaitable[Any]]) -> Any:
+        start = time.monotonic()
+        retry = 0
+        while True:
+            try:
+                return await self._ahedged(attempt, start)
+            except ConcurrencyLimitTimeout:
+                raise
+            except RETRYABLE_ERRORS as e:
+                delay = self._next_delay(retry, start, e)
+                retry += 1
+                await asyncio.sleep(delay)
+
+    def hedge_delay(self) -> Optional[float]:
+        """ Seconds to wait before hedging, or None when this call should not be hedged. """
+        if not self.policy.hedge:
+            return None
+        timer = metrics.get_timer(self._metric("llm.attempt_latency"))
+        if timer and timer["count"] >= self.policy.hedge_min_samples and timer["p95"]:
+            return timer["p95"]
+        return self.policy.hedge_after_seconds
+
+    def _next_delay(self, retry: int, start: float, error: BaseException) -> float:
+        """ Backoff before the next retry; re-raises when retries or the deadline are exhausted. """
+        if isinstance(error, DeadlineExceeded):
+            raise error
+        remaining = self._remaining(start)
+        if remaining <= 0:
+            metrics.increment(self._metric("llm.deadline_exceeded"))
+            raise DeadlineExceeded(
+                f"{self.service_name} gave up after {retry + 1} attempt(s): "
+                f"deadline of {self.policy.deadline_seconds}s exceeded"
+            ) from error
+        if retry >= self.policy.max_retries:
+            raise error
+
+        delay = min(self.policy.backoff(retry), remaining)
+        metrics.increment(self._metric("llm.retries"))
+        logger.warning(
+            f"[SERVICE] {self.service_name} attempt {retry + 1} failed ({type(error).__name__}); "
+            f"retrying in {delay:.2f}s"
+        )
+        return delay
+
+    def _remaining(self, start: float) -> float:
+        return self.policy.deadline_seconds - (time.monotonic() - start)
+
+    def _attempt_timeout(self, start: float) -> float:
+        remaining = self._remaining(start)
+        if remaining <= 0:
+            metrics.increment(self._metric("llm.deadline_exceeded"))
+            raise DeadlineExceeded(f"{self.service_name} deadline of {self.policy.deadline_seconds}s exceeded")
+        return min(self.policy.timeout_seconds, remaining)
+
+    # Only successful attempts are timed, so cancelled hedges and timeouts do not skew the p95.
+    def _timed(self, attempt: Callable[[], Any]) -> Any:
+        metrics.increment(self._metric("llm.attempts"))
+        started = time.perf_counter()
+        result = attempt()
+        metrics.observe(self._metric("llm.attempt_latency"), time.perf_counter() - started)
+        return result
+
+    async def _atimed(self, attempt: Callable[[], Awaitable[Any]], timeout: float) -> Any:
+        metrics.increment(self._metric("llm.attempts"))
+        started = time.perf_counter()
+        result = await asyncio.wait_for(attempt(), timeout=timeout)
+        metrics.observe(self._metric("llm.attempt_latency"), time.perf_counter() - started)
+        return result
+
+    async def _ahedged(self, attempt: Callable[[], Awaitable[Any]], start: float) -> Any:
+        timeout = self._attempt_timeout(start)
+        delay = self.hedge_delay()
+        if delay is None or delay >= timeout:
+            return await self._atimed(attempt, timeout)
+
+        metrics.increment(self._metric("llm.hedge.eligible"))
+        primary = asyncio.create_task(self._atimed(attempt, timeout))
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        if done:
+            self._publish_hedge_rates()
+            return primary.result()
+
+        hedge = asyncio.create_task(self._atimed(attempt, max(0.0, timeout - delay)))
+        metrics.increment(self._metric("llm.hedge.sent"))
+        pending: Set[asyncio.Task] = {primary, hedge}
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            metrics.increment(self._metric("llm.hedge.wins"))
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+            self._publish_hedge_rates()
+
+    def _hedged(self, attempt: Callable[[], Any], start: float) -> Any:
+        # Sync attempts are bounded by the HTTP client timeout; only the deadline is checked here.
+        timeout = self._attempt_timeout(start)
+        delay = self.hedge_delay()
+        if delay is None or delay >= timeout:
+            return self._timed(attempt)
+
+        metrics.increment(self._metric("llm.hedge.eligible"))
+        executor = self._get_executor()
+        primary = executor.submit(contextvars.copy_context().run, self._timed, attempt)
+        done, _ = wait({primary}, timeout=delay)
+        if done:
+            self._publish_hedge_rates()
+            return primary.result()
+
+        hedge = executor.submit(contextvars.copy_context().run, self._timed, attempt)
+        metrics.increment(self._metric("llm.hedge.sent"))
+        pending: Set[Future] = {primary, hedge}
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future.exception() is None:
+                        if future is hedge:
+                            metrics.increment(self._metric("llm.hedge.wins"))
+                        return future.result()
+                    error = future.exception()
+            raise error
+        finally:
+            self._publish_hedge_rates()
+
+    def _publish_hedge_rates(self) -> None:
+        eligible = metrics.get_counter(self._metric("llm.hedge.eligible"))
+        sent = metrics.get_counter(self._metric("llm.hedge.sent"))
+        wins = metrics.get_counter(self._metric("llm.hedge.wins"))
+        if eligible:
+            metrics.set_gauge(self._metric("llm.hedge.rate"), sent / eligible)
+        if sent:
+            metrics.set_gauge(self._metric("llm.hedge.win_rate"), wins / sent)
+
+    def _metric(self, name: str) -> str:
+        return f"{name}.{self.service_name}"
+
+    @classmethod
+    def _get_executor(cls) -> ThreadPoolExecutor:
+        with cls._executor_lock:
+            if cls._executor is None:
+                cls._executor = ThreadPoolExecutor(
+                    max_workers=EnvConfig.get_int("LLM_HEDGE_THREADS", 8),
+                    thread_name_prefix="llm-hedge"
+                )
+        return cls._executor
+
+
+class _Circuit:
+    """ Mutable state of one named circuit; only touched under CircuitBreaker._lock. """
+    def __init__(self, window: int) -> None:
+        self.state: str = CircuitBreaker.CLOSED
+        self.outcomes: Deque[Tuple[bool, bool]] = deque(maxlen=window)    # (failed, slow)
+        self.opened_at: float = 0.0
+        self.probes_in_flight: int = 0
+        self.probe_successes: int = 0
+        self.times_opened: int = 0
+        self.last_error: Optional[str] = None
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker shared by every LLMService in the process.
+
+    Closed: calls go through and their outcomes are kept over the last
+    LLM_BREAKER_WINDOW calls. Once at least LLM_BREAKER_MIN_CALLS are
+    recorded and the share of failures reaches LLM_BREAKER_ERROR_RATE, or the
+    share of calls slower than LLM_BREAKER_SLOW_SECONDS reaches
+    LLM_BREAKER_SLOW_RATE, the circuit opens.
+    Open: calls raise CircuitOpenError at once, so services return their
+    deterministic fallbacks instead of waiting out timeouts and retries.
+    Half-open: after LLM_BREAKER_OPEN_SECONDS up to LLM_BREAKER_HALF_OPEN_PROBES
+    calls are let through as probes; that many fast successes close the
+    circuit, a failed or slow probe opens it again.
+
+    Schema errors do not count: the provider answered. Neither do limiter
+    queue timeouts or time spent queued for a limiter slot, which are local
+    congestion rather than provider trouble. Follows the shared
+    class-level state pattern of ProviderRouter; disable with
+    LLM_BREAKER_ENABLED=false.
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+    STATE_GAUGE = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+    _lock = threading.Lock()
+    _circuits: Dict[str, _Circuit] = {}
+
+    def __init__(self, name: str = "llm") -> None:
+        self.name = name
+        self.enabled = EnvConfig.get_bool("LLM_BREAKER_ENABLED", True)
+        self.window = EnvConfig.get_int("LLM_BREAKER_WINDOW", 20)
+        self.min_calls = EnvConfig.get_int("LLM_BREAKER_MIN_CALLS", 10)
+        self.max_error_rate = EnvConfig.get_float("LLM_BREAKER_ERROR_RATE", 0.5)
+        self.slow_call_seconds = EnvConfig.get_float("LLM_BREAKER_SLOW_SECONDS", 15.0)
+        self.max_slow_rate = EnvConfig.get_float("LLM_BREAKER_SLOW_RATE", 0.8)
+        self.open_seconds = EnvConfig.get_float("LLM_BREAKER_OPEN_SECONDS", 30.0)
+        self.half_open_probes = max(1, EnvConfig.get_int("LLM_BREAKER_HALF_OPEN_PROBES", 2))
+
+    def call(self, service_name: str, fn: Callable[[], Any]) -> Any:
+        if not self.enabled:
+            return fn()
+        probe = self._admit(service_name)
+        started = time.monotonic()
+        with QueueWait.track() as waited:
+            try:
+                result = fn()
+            except LOCAL_ERRORS:
+                self._release(probe)
+                raise
+            except Exception as e:
+                self._record(probe, failed=True, seconds=self._elapsed(started, waited), error=e)
+                raise
+            except BaseException:
+                self._release(probe)
+                raise
+        self._record(probe, failed=False, seconds=self._elapsed(started, waited))
+        return result
+
+    async def acall(self, service_name: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        if not self.enabled:
+            return await fn()
+        probe = self._admit(service_name)
+        started = time.monotonic()
+        with QueueWait.track() as waited:
+            try:
+                result = await fn()
+            except LOCAL_ERRORS:
+                self._release(probe)
+                raise
+            except Exception as e:
+                self._record(probe, failed=True, seconds=self._elapsed(started, waited), error=e)
+                raise
+            except BaseException:
+                # Cancelled by the caller; says nothing about the provider
+                self._release(probe)
+                raise
+        self._record(probe, failed=False, seconds=self._elapsed(started, waited))
+        return result
+
+    @staticmethod
+    def _elapsed(started: float, waited: QueueWait) -> float:
+        """ Call time without the time spent queued on the local concurrency limiter. """
+        return max(0.0, time.monotonic() - started - waited.seconds)
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            circuit = self._get_circuit()
+            self._maybe_half_open(circuit)
+            return circuit.state
+
+    def _admit(self, service_name: str) -> bool:
+        """ True when the call is a half-open probe; raises CircuitOpenError when it may not run. """
+        with self._lock:
+            circuit = self._get_circuit()
+            self._maybe_half_open(circuit)
+            if circuit.state == self.CLOSED:
+                return False
+            if circuit.state == self.HALF_OPEN and circuit.probes_in_flight < self.half_open_probes:
+                circuit.probes_in_flight += 1
+                metrics.increment(self._metric("probes"))
+                return True
+            retry_in = max(0.0, circuit.opened_at + self.open_seconds - time.monotonic())
+
+        metrics.increment(self._metric("rejected"))
+        metrics.increment(self._metric(f"rejected.{service_name}"))
+        raise CircuitOpenError(f"LLM circuit '{self.name}' is open; retry in {retry_in:.0f}s")
+
+    def _record(self, probe: bool, failed: bool, seconds: float, error: Optional[BaseException] = None) -> None:
+        slow = seconds >= self.slow_call_seconds
+        with self._lock:
+            circuit = self._get_circuit()
+            if error is not None:
+                circuit.last_error = f"{type(error).__name__}: {error}"[:200]
+            if probe:
+                circuit.probes_in_flight = max(0, circuit.probes_in_flight - 1)
+                if circuit.state != self.HALF_OPEN:
+                    return
+                if failed or slow:
+                    self._open(circuit, "probe failed" if failed else f"probe took {seconds:.1f}s")
+                    return
+                circuit.probe_successes += 1
+                if circuit.probe_successes >= self.half_open_probes:
+                    self._close(circuit)
+                return
+
+            # Calls admitted before the circuit opened do not move it any further
+            if circuit.state != self.CLOSED:
+                return
+            circuit.outcomes.append((failed, slow))
+            if len(circuit.outcomes) < self.min_calls:
+                return
+            error_rate = sum(1 for outcome in circuit.outcomes if outcome[0]) / len(circuit.outcomes)
+            slow_rate = sum(1 for outcome in circuit.outcomes if outcome[1]) / len(circuit.outcomes)
+            if error_rate >= self.max_error_rate:
+                self._open(circuit, f"error rate {error_rate:.0%}")
+            elif slow_rate >= self.max_slow_rate:
+                self._open(circuit, f"slow call rate {slow_rate:.0%}")
+
+    def _release(self, probe: bool) -> None:
+        if not probe:
+            return
+        with self._lock:
+            circuit = self._get_circuit()
+            circuit.probes_in_flight = max(0, circuit.probes_in_flight - 1)
+
+    def _maybe_half_open(self, circuit: _Circuit) -> None:
+        if circuit.state == self.OPEN and time.monotonic() - circuit.opened_at >= self.open_seconds:
+            circuit.state = self.HALF_OPEN
+            circuit.probes_in_flight = 0
+            circuit.probe_successes = 0
+            self._publish(circuit)
+            logger.info(f"[BREAKER] Circuit '{self.name}' half-open, probing the provider")
+
+    def _open(self, circuit: _Circuit, reason: str) -> None:
+        circuit.state = self.OPEN
+        circuit.opened_at = time.monotonic()
+        circuit.times_opened += 1
+        circuit.outcomes.clear()
+        metrics.increment(self._metric("opened"))
+        self._publish(circuit)
+        logger.warning(f"[BREAKER] Circuit '{self.name}' opened ({reason}); serving fallbacks for {self.open_seconds:.0f}s")
+
+    def _close(self, circuit: _Circuit) -> None:
+        circuit.state = self.CLOSED
+        circuit.outcomes.clear()
+        metrics.increment(self._metric("closed"))
+        self._publish(circuit)
+        logger.info(f"[BREAKER] Circuit '{self.name}' closed, provider recovered")
+
+    def _publish(self, circuit: _Circuit) -> None:
+        metrics.set_gauge(self._metric("state"), self.STATE_GAUGE[circuit.state])
+
+    def _get_circuit(self) -> _Circuit:
+        circuit = self._circuits.get(self.name)
+        if circuit is None:
+            circuit = self._circuits[self.name] = _Circuit(self.window)
+        return circuit
+
+    def _metric(self, name: str) -> str:
+        return f"llm.breaker.{self.name}.{name}"
+
+    @classmethod
+    def snapshot(cls) -> Dict[str, Dict[str, Any]]:
+        """ State of every circuit, for the health endpoint. """
+        now = time.monotonic()
+        with cls._lock:
+            circuits = dict(cls._circuits)
+            return {
+                name: {
+                    "state": circuit.state,
+                    "times_opened": circuit.times_opened,
+                    "recent_calls": len(circuit.outcomes),
+                    "recent_failures": sum(1 for outcome in circuit.outcomes if outcome[0]),
+                    "open_for_seconds": round(now - circuit.opened_at, 1) if circuit.state != cls.CLOSED else 0.0,
+                    "last_error": circuit.last_error,
+                }
+                for name, circuit in circuits.items()
+            }
+
+    @classmethod
+    def reset(cls) -> None:
+        with cls._lock:
+            cls._circuits.clear()
@@ -0,0 +1,135 @@
+import re
+import threading
+from typing import (
+    Any,
+    Dict,
+    List,
+    Optional,
+    Sequence
+)
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import LLMResult
+
+from infrastructure.config import EnvConfig
+from utils import Logger
+
+logger = Logger(__name__)
+
+
+class TokenCounter:
+    """
+    Offline token counts for prompts.
+
+    Uses the model's tiktoken encoding when it can be loaded (tiktoken fetches
+    encodings on first use; point TIKTOKEN_CACHE_DIR at a pre-seeded directory
+    for air-gapped hosts) and falls back to a ~4 characters per token estimate
+    otherwise. Set LLM_TOKENIZER=estimate to skip tiktoken entirely. Encodings
+    are loaded once per process and shared.
+    """
+    CHARS_PER_TOKEN: float = 4.0
+    # Chat framing overhead per message (role, separators), as in OpenAI's guidance
+    TOKENS_PER_MESSAGE: int = 4
+    FALLBACK_ENCODING: str = "o200k_base"
+
+    _lock = threading.Lock()
+    _encodings: Dict[str, Any] = {}
+
+    def __init__(self, model: str) -> None:
+        self.model = model
+
+    @property
+    def exact(self) -> bool:
+        return self._encoding() is not None
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        encoding = self._encoding()
+        if encoding is None:
+            return max(1, round(len(text) / self.CHARS_PER_TOKEN))
+        return len(encoding.encode(text, disallowed_special=()))
+
+    def count_messages(self, messages: Sequence[BaseMessage]) -> int:
+        return sum(
+            self.count(message.content if isinstance(message.content, str) else str(message.content))
+            + self.TOKENS_PER_MESSAGE
+            for message in messages
+        )
+
+    def _encoding(self) -> Optional[Any]:
+        if self.model in self._encodings:
+            return self._encodings[self.model]
+        with self._lock:
+            if self.model not in self._encodings:
+                self._encodings[self.model] = self._load_encoding()
+        return self._encodings[self.model]
+
+    def _load_encoding(self) -> Optional[Any]:
+        if EnvConfig.get_str("LLM_TOKENIZER", "tiktoken") != "tiktoken":
+            return None
+        try:
+            import tiktoken
+        except ImportError:
+            logger.warning("[TOKENS] tiktoken not installed, estimating token counts")
+            return None
+        try:
+            try:
+                return tiktoken.encoding_for_model(self.model)
+            except KeyError:
+                return tiktoken.get_encoding(self.FALLBACK_ENCODING)
+        except Exception as e:
+            logger.warning(f"[TOKENS] tiktoken encoding unavailable for {self.model}, estimating token counts: {e}")
+            return None
+
+
+class UsageCallback(BaseCallbackHandler):
+    """ Captures provider-reported token usage from the LLM run of one chain invocation. """
+    def __init__(self) -> None:
+        self.input_tokens: Optional[int] = None
+        self.output_tokens: Optional[int] = None
+
+    def on_llm_end(self, response: LLMResult, **kwargs: Any) -> None:
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                if usage:
+                    self._add(usage.get("input_tokens"), usage.get("output_tokens"))
+                    return
+
+        token_usage = (response.llm_output or {}).get("token_usage") or {}
+        if token_usage:
+            self._add(token_usage.get("prompt_tokens"), token_usage.get("completion_tokens"))
+
+    def _add(self, input_tokens: Optional[int], output_tokens: Optional[int]) -> None:
+        if input_tokens is not None:
+            self.input_tokens = (self.input_tokens or 0) + input_tokens
+        if output_tokens is not None:
+            self.output_tokens = (self.output_tokens or 0) + output_tokens
+
+
+_BLOCK_END = re.compile(r"(?<=---)\n")
+
+
+def trim_to_tokens(text: str, max_tokens: int, counter: TokenCounter) -> str:
+    """
+    Shorten `text` to roughly `max_tokens` by dropping whole trailing units
+    (appointment blocks ending in '---', otherwise lines) and noting how many
+    were omitted.
+    """
+    if counter.count(text) <= max_tokens:
+        return text
+
+    units: List[str] = _BLOCK_END.split(text) if "---\n" in text else text.split("\n")
+    kept: List[str] = []
+    used = 0
+    for unit in units:
+        cost = counter.count(unit) + 1
+        if used + cost > max_tokens:
+            break
+        kept.append(unit)
+        used += cost
+
+    omitted = len(units) - len(kept)
+    return "\n".join(kept + [f"... ({omitted} more omitted to fit the prompt budget)"])
@@ -0,0 +1,106 @@
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import (
+    Dict,
+    Iterator,
+    Optional
+)
+
+
+class TurnUsage:
+    """
+    LLM usage accumulated while one graph turn runs.
+
+    Held in a context variable so every node and service executed for the turn
+    (on the loop, in LangGraph worker threads, or through the streaming bridge)
+    records into the same object.
+    """
+    def __init__(self, session_id: Optional[str] = None) -> None:
+        self._lock = threading.Lock()
+        self.session_id = session_id
+        self.llm_calls: int = 0
+        self.input_tokens: int = 0
+        self.output_tokens: int = 0
+        self.calls_by_service: Dict[str, int] = {}
+        self.tokens_by_service: Dict[str, Dict[str, int]] = {}
+        self.tokens_by_node: Dict[str, Dict[str, int]] = {}
+
+    def record_call(
+        self,
+        service_name: str,
+        node: Optional[str] = None,
+        input_tokens: int = 0,
+        output_tokens: int = 0
+    ) -> None:
+        with self._lock:
+            self.llm_calls += 1
+            self.input_tokens += input_tokens
+            self.output_tokens += output_tokens
+            self.calls_by_service[service_name] = self.calls_by_service.get(service_name, 0) + 1
+            self._add(self.tokens_by_service, service_name, input_tokens, output_tokens)
+            if node:
+                self._add(self.tokens_by_node, node, input_tokens, output_tokens)
+
+    def share(self, parts: int) -> "TurnUsage":
+        """ This usage as seen by one of `parts` turns sharing it: every call counts, tokens are split evenly. """
+        parts = max(1, parts)
+        shared = TurnUsage(session_id=self.session_id)
+        with self._lock:
+            shared.llm_calls = self.llm_calls
+            shared.input_tokens = self.input_tokens // parts
+            shared.output_tokens = self.output_tokens // parts
+            shared.calls_by_service = dict(self.calls_by_service)
+            for source, target in (
+                (self.tokens_by_service, shared.tokens_by_service),
+                (self.tokens_by_node, shared.tokens_by_node)
+            ):
+                for name, tokens in source.items():
+                    target[name] = {"input": tokens["input"] // parts, "output": tokens["output"] // parts}
+        return shared
+
+    def merge(self, other: "TurnUsage", node: Optional[str] = None) -> None:
+        """
+        Fold in usage recorded outside this turn's context (e.g. a batched call).
+        Its tokens go to `node` when it has no node attribution of its own.
+        """
+        with self._lock:
+            self.llm_calls += other.llm_calls
+            self.input_tokens += other.input_tokens
+            self.output_tokens += other.output_tokens
+            for service_name, calls in other.calls_by_service.items():
+                self.calls_by_service[service_name] = self.calls_by_service.get(service_name, 0) + calls
+            for service_name, tokens in other.tokens_by_service.items():
+                self._add(self.tokens_by_service, service_name, tokens["input"], tokens["output"])
+            for name, tokens in other.tokens_by_node.items():
+                self._add(self.tokens_by_node, name, tokens["input"], tokens["output"])
+            if node and not other.tokens_by_node:
+                self._add(self.tokens_by_node, node, other.input_tokens, other.output_tokens)
+
+    def _add(
+        self,
+        totals: Dict[str, Dict[str, int]],
+        name: str,
+        input_tokens: int,
+        output_tokens: int
+    ) -> None:
+        entry = totals.setdefault(name, {"input": 0, "output": 0})
+        entry["input"] += input_tokens
+        entry["output"] += output_tokens
+
+
+_current_turn: ContextVar[Optional[TurnUsage]] = ContextVar("graph_turn_usage", default=None)
+
+
+@contextmanager
+def track_turn_usage(session_id: Optional[str] = None) -> Iterator[TurnUsage]:
+    usage = TurnUsage(session_id=session_id)
+    token = _current_turn.set(usage)
+    try:
+        yield usage
+    finally:
+        _current_turn.reset(token)
+
+
+def current_turn_usage() -> Optional[TurnUsage]:
+    return _current_turn.get()
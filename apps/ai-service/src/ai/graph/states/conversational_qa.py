@@ -17,7 +17,8 @@ from ..models.conversational_qa import (
     AppointmentRecordModel,
     VerificationInfoModel,
     VerificationRecordModel,
-    AppointmentConfirmationResponse
+    AppointmentConfirmationResponse,
+    TurnUnderstandingModel
 )
 
 class MenuState(TypedDict):
@@ -59,6 +60,7 @@ class QAState(TypedDict):
     appointment_diagnostics: Optional[Dict[str, Any]] = None
     
     confirmation_intent: Union[AppointmentConfirmationResponse, None] = None
+    turn_understanding: Union[TurnUnderstandingModel, None] = None
     
     verification_step: str  # "name", "phone", "dob", "complete", "verify"
     user_verified: bool
@@ -98,4 +100,5 @@ class StateKeys:
     APPOINTMENT_RECORD: Final[str] = "appointment_record"
     APPOINTMENT_REQUEST_COUNTER: Final[str] = "appointment_request_counter"
     CONFIRMATION_INTENT: Final[str] = "confirmation_intent"
-    APPOINTMENT_DIAGNOSTICS: Final[str] = "appointment_diagnostics"
\ No newline at end of file
+    APPOINTMENT_DIAGNOSTICS: Final[str] = "appointment_diagnostics"
+    TURN_UNDERSTANDING: Final[str] = "turn_understanding"
\ No newline at end of file
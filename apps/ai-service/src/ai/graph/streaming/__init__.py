@@ -0,0 +1,14 @@
+from .events import (
+	StreamEventTypes,
+	PartialFieldReader,
+	GraphEventTranslator
+)
+from .bridge import aiter_in_thread
+
+
+__all__ = [
+	"StreamEventTypes",
+	"PartialFieldReader",
+	"GraphEventTranslator",
+	"aiter_in_thread"
+]
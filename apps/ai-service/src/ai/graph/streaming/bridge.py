@@ -0,0 +1,45 @@
+import asyncio
+import contextvars
+from typing import (
+	AsyncIterator,
+	Callable,
+	Iterator,
+	TypeVar
+)
+
+T = TypeVar("T")
+
+_DONE = object()
+
+
+async def aiter_in_thread(factory: Callable[[], Iterator[T]]) -> AsyncIterator[T]:
+	"""
+	Drive a blocking iterator in a worker thread and yield its items on the event loop.
+
+	Used to stream the sync-mode graph (sync checkpointer) without blocking the loop.
+	Exceptions raised by the iterator are re-raised in the consumer.
+	"""
+	loop = asyncio.get_running_loop()
+	queue: asyncio.Queue = asyncio.Queue()
+
+	def produce() -> None:
+		try:
+			for item in factory():
+				loop.call_soon_threadsafe(queue.put_nowait, item)
+		except BaseException as e:
+			loop.call_soon_threadsafe(queue.put_nowait, e)
+		finally:
+			loop.call_soon_threadsafe(queue.put_nowait, _DONE)
+
+	# Run in a copy of the caller's context so turn-scoped context variables reach the graph.
+	producer = loop.run_in_executor(None, contextvars.copy_context().run, produce)
+	try:
+		while True:
+			item = await queue.get()
+			if item is _DONE:
+				break
+			if isinstance(item, BaseException):
+				raise item
+			yield item
+	finally:
+		await producer
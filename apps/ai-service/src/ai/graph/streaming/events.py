@@ -0,0 +1,102 @@
+from enum import Enum
+from typing import (
+	Any,
+	Dict,
+	Iterator,
+	Optional,
+	Tuple
+)
+
+from langchain_core.utils.json import parse_partial_json
+
+from ..types.conversational_qa import Nodes
+
+
+class StreamEventTypes(str, Enum):
+	NODE_START: str = "node_start"
+	NODE_END: str = "node_end"
+	TOKEN: str = "token"
+	FINAL: str = "final"
+	ERROR: str = "error"
+
+
+# Nodes whose LLM output is user-facing text, and the structured field holding it
+STREAMED_TEXT_FIELDS: Dict[str, str] = {
+	Nodes.QA_ANSWER.value: "qa_answer",
+	Nodes.CLARIFICATION.value: "clarification_prompt",
+}
+
+# LangGraph stream modes consumed by the translator
+STREAM_MODES = ["tasks", "messages"]
+
+
+class PartialFieldReader:
+	"""
+	Incrementally reads one string field out of a streamed JSON object.
+
+	Structured outputs arrive as JSON fragments (`{"qa_answer": "We a`), so
+	each chunk is appended to a buffer, parsed leniently and only the newly
+	revealed suffix of the field is returned.
+	"""
+	def __init__(self, field: str) -> None:
+		self.field = field
+		self._buffer = ""
+		self._emitted = ""
+
+	def feed(self, fragment: str) -> str:
+		self._buffer += fragment
+		parsed = parse_partial_json(self._buffer)
+		if not isinstance(parsed, dict):
+			return ""
+
+		value = parsed.get(self.field)
+		if not isinstance(value, str) or not value.startswith(self._emitted):
+			return ""
+
+		delta = value[len(self._emitted):]
+		self._emitted = value
+		return delta
+
+
+class GraphEventTranslator:
+	"""Turns raw LangGraph (mode, payload) stream items into client-facing events."""
+	def __init__(self) -> None:
+		self._readers: Dict[str, PartialFieldReader] = {}
+
+	def translate(self, item: Tuple[str, Any]) -> Iterator[Dict[str, Any]]:
+		mode, payload = item
+		if mode == "tasks":
+			yield from self._translate_task(payload)
+		elif mode == "messages":
+			yield from self._translate_message(payload)
+
+	def _translate_task(self, payload: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+		node = payload.get("name")
+		if not node or node.startswith("__"):
+			return
+		if "result" in payload or "error" in payload:
+			event = {"type": StreamEventTypes.NODE_END.value, "node": node}
+			if payload.get("error"):
+				event["error"] = str(payload["error"])
+			yield event
+		else:
+			yield {"type": StreamEventTypes.NODE_START.value, "node": node}
+
+	def _translate_message(self, payload: Tuple[Any, Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+		chunk, metadata = payload
+		node = metadata.get("langgraph_node")
+		field = STREAMED_TEXT_FIELDS.get(node)
+		content = getattr(chunk, "content", None)
+		if field is None or not isinstance(content, str) or not content:
+			return
+
+		reader = self._reader_for(getattr(chunk, "id", None) or node, field)
+		delta = reader.feed(content)
+		if delta:
+			yield {"type": StreamEventTypes.TOKEN.value, "node": node, "text": delta}
+
+	def _reader_for(self, key: str, field: str) -> PartialFieldReader:
+		reader: Optional[PartialFieldReader] = self._readers.get(key)
+		if reader is None:
+			reader = self._readers[key] = PartialFieldReader(field)
+		return reader
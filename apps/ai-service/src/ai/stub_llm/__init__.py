@@ -0,0 +1,12 @@
+from .latency import LatencyModel
+from .responses import StubResponder, example_from_schema
+from .server import StubConfig, create_app
+
+
+__all__ = [
+    "LatencyModel",
+    "StubResponder",
+    "example_from_schema",
+    "StubConfig",
+    "create_app"
+]
@@ -0,0 +1,57 @@
+"""
+Run the stub LLM server (from apps/ai-service/src):
+
+    python -m ai.stub_llm --port 8100 --latency lognormal:0.4,0.5 --error-rate 0.02
+
+then start the AI service with LLM_BASE_URL=http://localhost:8100/v1.
+"""
+import argparse
+
+import uvicorn
+
+from .latency import LatencyModel
+from .server import StubConfig, create_app
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="OpenAI-compatible stub LLM server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument(
+        "--latency", default="fixed:0.2",
+        help="fixed:<s> | lognormal:<median>,<sigma> | pareto:<min>,<alpha>"
+    )
+    parser.add_argument(
+        "--schema-latency", action="append", default=[], metavar="SCHEMA=SPEC",
+        help="Latency override for one schema, e.g. QAAnswerModel=lognormal:1.2,0.4"
+    )
+    parser.add_argument("--max-latency", type=float, default=60.0, help="Cap on sampled latency (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests failing with an HTTP error")
+    parser.add_argument("--error-statuses", type=int, nargs="+", default=[429, 500, 503])
+    parser.add_argument("--hang-rate", type=float, default=0.0, help="Share of requests that stall")
+    parser.add_argument("--hang-seconds", type=float, default=120.0)
+    parser.add_argument("--seed", type=int, default=None)
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    overrides = {}
+    for item in args.schema_latency:
+        schema, _, spec = item.partition("=")
+        overrides[schema] = LatencyModel.parse(spec, args.max_latency)
+
+    config = StubConfig(
+        latency=LatencyModel.parse(args.latency, args.max_latency),
+        latency_by_schema=overrides,
+        error_rate=args.error_rate,
+        error_statuses=tuple(args.error_statuses),
+        hang_rate=args.hang_rate,
+        hang_seconds=args.hang_seconds,
+        seed=args.seed,
+    )
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
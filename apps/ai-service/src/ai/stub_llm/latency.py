@@ -0,0 +1,52 @@
+import math
+import random
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass(frozen=True)
+class LatencyModel:
+    """
+    Response latency distribution, in seconds.
+
+        fixed:<seconds>                 always the same delay
+        lognormal:<median>,<sigma>      typical provider latency with a moderate tail
+        pareto:<minimum>,<alpha>        heavy tail; smaller alpha means longer stalls
+
+    Samples are capped at `max_seconds` so a heavy tail cannot stall a run forever.
+    """
+    kind: str = "fixed"
+    a: float = 0.0
+    b: float = 0.0
+    max_seconds: float = 60.0
+
+    @classmethod
+    def parse(cls, spec: str, max_seconds: Optional[float] = None) -> "LatencyModel":
+        kind, _, params = spec.partition(":")
+        values = [float(value) for value in params.split(",") if value.strip()]
+        kind = kind.strip().lower()
+        cap = {"max_seconds": max_seconds} if max_seconds is not None else {}
+
+        if kind == "fixed" and len(values) == 1:
+            return cls(kind, values[0], **cap)
+        if kind == "lognormal" and len(values) == 2:
+            return cls(kind, values[0], values[1], **cap)
+        if kind in ("pareto", "heavy_tail") and len(values) == 2:
+            return cls("pareto", values[0], values[1], **cap)
+        raise ValueError(
+            f"Invalid latency spec '{spec}'; expected fixed:<s>, lognormal:<median>,<sigma> or pareto:<min>,<alpha>"
+        )
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "lognormal":
+            value = rng.lognormvariate(math.log(self.a), self.b) if self.a > 0 else 0.0
+        elif self.kind == "pareto":
+            value = self.a * rng.paretovariate(self.b)
+        else:
+            value = self.a
+        return max(0.0, min(value, self.max_seconds))
+
+    def __str__(self) -> str:
+        if self.kind == "fixed":
+            return f"fixed:{self.a}"
+        return f"{self.kind}:{self.a},{self.b}"
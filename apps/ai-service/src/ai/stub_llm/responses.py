@@ -0,0 +1,238 @@
+import re
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Optional
+)
+
+from pydantic import BaseModel
+
+from ..graph.models.conversational_qa import (
+    AppointmentConfirmationResponse,
+    AppointmentInfoModel,
+    AppointmentMatchModel,
+    BatchIntentItemModel,
+    BatchIntentModel,
+    ClarificationPromptModel,
+    ConversationIntentModel,
+    QAAnswerModel,
+    TurnUnderstandingModel,
+    UserIntentModel,
+    VerificationInfoModel
+)
+from ..graph.services.conversational_qa.confirmation_rules import ConfirmationRuleClassifier
+from ..graph.types.conversational_qa import ConfirmationIntent, IntentType
+
+Messages = List[Dict[str, Any]]
+
+_PHONE = re.compile(r"\+\d{10,15}")
+_DATE = re.compile(r"\b\d{4}-\d{2}-\d{2}\b")
+_NAME = re.compile(r"\bmy name is ([a-z][a-z' -]+?)(?:[,.!]|\band\b|$)", re.IGNORECASE)
+_DOCTOR = re.compile(r"\bdr\.?\s+([a-z]+(?:\s+[a-z]+)?)", re.IGNORECASE)
+_APPOINTMENT_ID = re.compile(r"-\s*ID:\s*(\S+)")
+_BATCH_LINE = re.compile(r"^\[(\d+)\]\s?(.*)$", re.MULTILINE)
+_CRITERION = re.compile(r"(Doctor name|Clinic|Date|Specialty):\s*(.*?)(?=(?:Doctor name|Clinic|Date|Specialty):|$)", re.DOTALL)
+
+_INTENT_KEYWORDS = (
+    (IntentType.CANCEL_APPOINTMENT, ("cancel",)),
+    (IntentType.CONFIRM_APPOINTMENT, ("confirm",)),
+    (IntentType.LIST_APPOINTMENTS, ("my appointments", "list", "show me", "upcoming")),
+)
+
+
+def message_text(message: Dict[str, Any]) -> str:
+    content = message.get("content") or ""
+    if isinstance(content, list):
+        return " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return str(content)
+
+
+def last_message(messages: Messages, role: str) -> str:
+    for message in reversed(messages):
+        if message.get("role") == role:
+            return message_text(message)
+    return ""
+
+
+class StubResponder:
+    """
+    Schema-valid answers for the structured-output calls the graph makes.
+
+    Known schemas (by the json_schema / tool name the client sends) get
+    rule-based answers derived from the prompt, so multi-turn flows behave
+    plausibly; any other schema gets a minimal instance built from its JSON
+    schema. Replies are deterministic for a given prompt.
+    """
+    def __init__(self) -> None:
+        self.confirmation_rules = ConfirmationRuleClassifier()
+        self._rules: Dict[str, Callable[[Messages], BaseModel]] = {
+            "ConversationIntentModel": self._intent,
+            "BatchIntentModel": self._batch_intent,
+            "TurnUnderstandingModel": self._turn_understanding,
+            "AppointmentConfirmationResponse": self._confirmation,
+            "AppointmentMatchModel": self._appointment_match,
+            "QAAnswerModel": self._qa_answer,
+            "ClarificationPromptModel": self._clarification,
+        }
+
+    def structured(self, name: str, schema: Dict[str, Any], messages: Messages) -> Dict[str, Any]:
+        rule = self._rules.get(name)
+        if rule is not None:
+            return rule(messages).model_dump(mode="json")
+        return example_from_schema(schema, schema)
+
+    def text(self, messages: Messages) -> str:
+        return f"(stub) You said: {last_message(messages, 'user')[:200]}"
+
+    def _user_intent(self, user_message: str) -> UserIntentModel:
+        lowered = user_message.lower()
+        for intent_type, keywords in _INTENT_KEYWORDS:
+            if any(keyword in lowered for keyword in keywords):
+                return UserIntentModel(intent_type=intent_type, confidence=0.9)
+        if _PHONE.search(user_message) or _NAME.search(user_message):
+            return UserIntentModel(intent_type=IntentType.USER_INFORMATION, confidence=0.9)
+        if _DOCTOR.search(user_message) or _DATE.search(user_message):
+            return UserIntentModel(intent_type=IntentType.APPOINTMENT_INFORMATION, confidence=0.85)
+        return UserIntentModel(intent_type=IntentType.GENERAL_QA, confidence=0.8)
+
+    def _verification_info(self, user_message: str) -> Optional[VerificationInfoModel]:
+        phone = _PHONE.search(user_message)
+        date = _DATE.search(user_message)
+        name = _NAME.search(user_message)
+        if not (phone or date or name):
+            return None
+        return VerificationInfoModel(
+            full_name=name.group(1).strip() if name else None,
+            phone_number=phone.group(0) if phone else None,
+            date_of_birth=date.group(0) if date else None,
+        )
+
+    def _appointment_info(self, user_message: str) -> Optional[AppointmentInfoModel]:
+        doctor = _DOCTOR.search(user_message)
+        if not doctor:
+            return None
+        date = _DATE.search(user_message)
+        return AppointmentInfoModel(
+            doctor_full_name=f"Dr. {doctor.group(1).title()}",
+            appointment_date=date.group(0) if date else None,
+        )
+
+    def _intent(self, messages: Messages) -> ConversationIntentModel:
+        user_message = last_message(messages, "user")
+        return ConversationIntentModel(
+            user_intent=self._user_intent(user_message),
+            verification_info=self._verification_info(user_message),
+            appointment_info=self._appointment_info(user_message),
+            raw_query=user_message,
+        )
+
+    def _batch_intent(self, messages: Messages) -> BatchIntentModel:
+        classifications = []
+        for message_id, user_message in _BATCH_LINE.findall(last_message(messages, "user")):
+            classifications.append(BatchIntentItemModel(
+                message_id=int(message_id),
+                user_intent=self._user_intent(user_message),
+                verification_info=self._verification_info(user_message),
+                appointment_info=self._appointment_info(user_message),
+            ))
+        return BatchIntentModel(classifications=classifications)
+
+    def _turn_understanding(self, messages: Messages) -> TurnUnderstandingModel:
+        intent = self._intent(messages)
+        return TurnUnderstandingModel(**intent.model_dump())
+
+    def _confirmation(self, messages: Messages) -> AppointmentConfirmationResponse:
+        user_message = last_message(messages, "user")
+        classified = self.confirmation_rules.classify(user_message)
+        if classified is not None:
+            return classified
+        return AppointmentConfirmationResponse(
+            intent=ConfirmationIntent.UNCLEAR,
+            confidence=0.5,
+            reasoning="Stub could not classify the reply",
+            extracted_concerns="",
+        )
+
+    def _appointment_match(self, messages: Messages) -> AppointmentMatchModel:
+        appointments = last_message(messages, "system")
+        criteria = [
+            value.strip().lower()
+            for _, value in _CRITERION.findall(last_message(messages, "user"))
+            if value.strip() and value.strip().lower() != "none"
+        ]
+        best_id, best_score = None, 0
+        for block in appointments.split("---"):
+            match = _APPOINTMENT_ID.search(block)
+            if not match:
+                continue
+            lowered = block.lower()
+            score = sum(1 for criterion in criteria if criterion in lowered)
+            if score > best_score:
+                best_id, best_score = match.group(1), score
+
+        if best_id is None:
+            return AppointmentMatchModel(
+                match_found=False, confidence=0.2, reasoning="No appointment matches the criteria"
+            )
+        return AppointmentMatchModel(
+            match_found=True,
+            confidence=min(0.95, 0.5 + 0.2 * best_score),
+            matched_appointment_id=best_id,
+            reasoning=f"Matched {best_score} of {len(criteria)} criteria",
+        )
+
+    def _qa_answer(self, messages: Messages) -> QAAnswerModel:
+        return QAAnswerModel(
+            qa_answer="Our clinics are open Monday to Friday, 8am to 6pm. How else can I help you?"
+        )
+
+    def _clarification(self, messages: Messages) -> ClarificationPromptModel:
+        return ClarificationPromptModel(
+            clarification_prompt="Could you share a bit more detail, such as the doctor's name or the appointment date?"
+        )
+
+
+def example_from_schema(node: Dict[str, Any], root: Dict[str, Any]) -> Any:
+    """ Smallest value that satisfies a JSON schema node (required fields only). """
+    if "$ref" in node:
+        target: Any = root
+        for part in node["$ref"].lstrip("#/").split("/"):
+            target = target[part]
+        return example_from_schema(target, root)
+    if "const" in node:
+        return node["const"]
+    if "enum" in node:
+        return node["enum"][0]
+    for key in ("anyOf", "oneOf"):
+        if key in node:
+            options = [option for option in node[key] if option.get("type") != "null"]
+            return example_from_schema(options[0], root) if options else None
+    if "allOf" in node:
+        return example_from_schema(node["allOf"][0], root)
+    if "default" in node:
+        return node["default"]
+
+    kind = node.get("type")
+    if isinstance(kind, list):
+        kind = next((item for item in kind if item != "null"), None)
+    if kind == "object":
+        properties = node.get("properties", {})
+        return {
+            name: example_from_schema(properties[name], root)
+            for name in node.get("required", list(properties))
+            if name in properties
+        }
+    if kind == "array":
+        return []
+    if kind == "boolean":
+        return False
+    if kind in ("number", "integer"):
+        low = node.get("minimum", node.get("exclusiveMinimum", 0))
+        high = node.get("maximum", node.get("exclusiveMaximum", low + 1))
+        value = (low + high) / 2
+        return int(value) if kind == "integer" else value
+    if kind == "string":
+        return "stub"
+    return None
@@ -0,0 +1,195 @@
+import asyncio
+import json
+import random
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import (
+    Any,
+    Dict,
+    Optional,
+    Tuple
+)
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from .latency import LatencyModel
+from .responses import StubResponder, message_text
+
+ERROR_TYPES: Dict[int, str] = {
+    429: "rate_limit_exceeded",
+    500: "server_error",
+    502: "bad_gateway",
+    503: "service_unavailable",
+}
+
+
+@dataclass
+class StubConfig:
+    """
+    Behaviour of the stub server.
+
+    `error_rate` of requests fail with a status drawn from `error_statuses`;
+    `hang_rate` of requests sleep `hang_seconds` before answering, to exercise
+    client timeouts. `latency_by_schema` overrides `latency` for a schema name
+    (e.g. a slower QAAnswerModel). `seed` makes a run reproducible.
+    """
+    latency: LatencyModel = field(default_factory=LatencyModel)
+    latency_by_schema: Dict[str, LatencyModel] = field(default_factory=dict)
+    error_rate: float = 0.0
+    error_statuses: Tuple[int, ...] = (429, 500, 503)
+    hang_rate: float = 0.0
+    hang_seconds: float = 120.0
+    seed: Optional[int] = None
+    model: str = "stub-llm"
+
+
+class StubStats:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.hangs = 0
+        self.by_schema: Dict[str, int] = {}
+        self.latency_total = 0.0
+
+    def record(self, schema: str, latency: float, outcome: str) -> None:
+        with self._lock:
+            self.requests += 1
+            self.latency_total += latency
+            self.by_schema[schema] = self.by_schema.get(schema, 0) + 1
+            if outcome == "error":
+                self.errors += 1
+            elif outcome == "hang":
+                self.hangs += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "errors": self.errors,
+                "hangs": self.hangs,
+                "by_schema": dict(self.by_schema),
+                "mean_latency": self.latency_total / self.requests if self.requests else None,
+            }
+
+
+def _requested_schema(body: Dict[str, Any]) -> Tuple[str, Optional[Dict[str, Any]], bool]:
+    """ (schema name, JSON schema, answer via tool call) for a chat completion request. """
+    response_format = body.get("response_format") or {}
+    if response_format.get("type") == "json_schema":
+        json_schema = response_format.get("json_schema") or {}
+        return json_schema.get("name", "json_schema"), json_schema.get("schema", {}), False
+    tools = body.get("tools") or []
+    if tools:
+        function = tools[0].get("function", {})
+        return function.get("name", "tool"), function.get("parameters", {}), True
+    if response_format.get("type") == "json_object":
+        return "json_object", {"type": "object"}, False
+    return "text", None, False
+
+
+def _estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def create_app(config: Optional[StubConfig] = None) -> FastAPI:
+    """
+    OpenAI-compatible chat completions server with canned, schema-valid
+    answers, configurable latency and fault injection. Point the AI service at
+    it with LLM_BASE_URL=http://<host>:<port>/v1 (any OPENAI_API_KEY works).
+    """
+    config = config or StubConfig()
+    rng = random.Random(config.seed)
+    rng_lock = threading.Lock()
+    responder = StubResponder()
+    stats = StubStats()
+
+    app = FastAPI(title="Stub LLM", version="1.0.0")
+    app.state.config = config
+    app.state.stats = stats
+
+    def draw(schema: str) -> Tuple[float, str]:
+        latency_model = config.latency_by_schema.get(schema, config.latency)
+        with rng_lock:
+            latency = latency_model.sample(rng)
+            roll = rng.random()
+            status = rng.choice(config.error_statuses) if config.error_statuses else 500
+        if roll < config.hang_rate:
+            return config.hang_seconds, "hang"
+        if roll < config.hang_rate + config.error_rate:
+            return latency, f"error:{status}"
+        return latency, "ok"
+
+    @app.get("/health")
+    async def health() -> Dict[str, str]:
+        return {"status": "ok"}
+
+    @app.get("/stats")
+    async def get_stats() -> Dict[str, Any]:
+        return stats.to_dict()
+
+    @app.get("/v1/models")
+    async def models() -> Dict[str, Any]:
+        return {"object": "list", "data": [{"id": config.model, "object": "model", "owned_by": "stub"}]}
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request) -> JSONResponse:
+        body = await request.json()
+        messages = body.get("messages", [])
+        schema_name, schema, as_tool = _requested_schema(body)
+
+        latency, outcome = draw(schema_name)
+        await asyncio.sleep(latency)
+
+        if outcome.startswith("error"):
+            status = int(outcome.split(":")[1])
+            stats.record(schema_name, latency, "error")
+            return JSONResponse(
+                status_code=status,
+                content={"error": {
+                    "message": f"Injected {status} from stub LLM",
+                    "type": ERROR_TYPES.get(status, "server_error"),
+                    "code": ERROR_TYPES.get(status, "server_error"),
+                }},
+            )
+
+        message: Dict[str, Any] = {"role": "assistant", "content": None, "refusal": None}
+        if schema is None:
+            message["content"] = responder.text(messages)
+            output = message["content"]
+        else:
+            output = json.dumps(responder.structured(schema_name, schema, messages))
+            if as_tool:
+                message["tool_calls"] = [{
+                    "id": f"call_{uuid.uuid4().hex[:24]}",
+                    "type": "function",
+                    "function": {"name": schema_name, "arguments": output},
+                }]
+            else:
+                message["content"] = output
+
+        stats.record(schema_name, latency, "hang" if outcome == "hang" else "ok")
+        prompt_tokens = sum(_estimate_tokens(message_text(item)) + 4 for item in messages)
+        completion_tokens = _estimate_tokens(output)
+        return JSONResponse(content={
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", config.model),
+            "choices": [{
+                "index": 0,
+                "message": message,
+                "logprobs": None,
+                "finish_reason": "tool_calls" if as_tool and schema is not None else "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        })
+
+    return app
@@ -1,10 +1,35 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
 from fastapi import Depends, FastAPI, HTTPException, Request
 
 from routers.health import HealthRouter
 from routers.chatbot import ChatbotRouter
+from routers.metrics import MetricsRouter
+from services.chatbot import ChatbotService
+from infrastructure.http import SharedHTTPClient
+from infrastructure.metrics import MetricsRegistry
 from utils import Logger
 
 logger = Logger(__name__)
+metrics = MetricsRegistry()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Build the chatbot service (and its compiled graph) once per process."""
+    with metrics.timer("startup.total"):
+        app.state.chatbot_service = ChatbotService()
+        await app.state.chatbot_service.start()
+    logger.info("Chatbot service initialized")
+
+    try:
+        yield
+    finally:
+        await app.state.chatbot_service.aclose()
+        app.state.chatbot_service = None
+        await SharedHTTPClient.aclose()
+        logger.info("Chatbot service closed")
 
 
 def create_app() -> FastAPI:
@@ -12,15 +37,18 @@ def create_app() -> FastAPI:
         title="Lumahealth QA Appointments",
         version="1.0.0",
         description="QA API",
+        lifespan=lifespan,
     )
 
     qa_router = ChatbotRouter()
     health_router = HealthRouter()
+    metrics_router = MetricsRouter()
     
     app.include_router(qa_router.router)
     app.include_router(health_router.router)
+    app.include_router(metrics_router.router)
 
     return app
 
 
-app = create_app()
\ No newline at end of file
+app = create_app()
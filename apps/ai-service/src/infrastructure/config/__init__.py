@@ -0,0 +1,4 @@
+from .env import EnvConfig
+
+
+__all__ = ["EnvConfig"]
@@ -0,0 +1,41 @@
+import os
+from typing import Optional
+
+
+class EnvConfig:
+	""" Typed accessors for environment-based configuration. """
+	TRUE_VALUES = {"1", "true", "yes", "on"}
+
+	@staticmethod
+	def get_str(name: str, default: Optional[str] = None) -> Optional[str]:
+		value = os.getenv(name)
+		if value is None or value.strip() == "":
+			return default
+		return value.strip()
+
+	@classmethod
+	def get_bool(cls, name: str, default: bool = False) -> bool:
+		value = cls.get_str(name)
+		if value is None:
+			return default
+		return value.lower() in cls.TRUE_VALUES
+
+	@classmethod
+	def get_int(cls, name: str, default: int) -> int:
+		value = cls.get_str(name)
+		if value is None:
+			return default
+		try:
+			return int(value)
+		except ValueError:
+			return default
+
+	@classmethod
+	def get_float(cls, name: str, default: float) -> float:
+		value = cls.get_str(name)
+		if value is None:
+			return default
+		try:
+			return float(value)
+		except ValueError:
+			return default
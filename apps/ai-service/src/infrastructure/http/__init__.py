@@ -0,0 +1,6 @@
+from .client import SharedHTTPClient
+
+
+__all__ = [
+    "SharedHTTPClient"
+]
@@ -0,0 +1,157 @@
+import importlib.util
+import threading
+from typing import (
+    Any,
+    Dict,
+    Optional
+)
+
+import httpx
+
+from infrastructure.config import EnvConfig
+from infrastructure.metrics import MetricsRegistry
+from utils import Logger
+
+logger = Logger(__name__)
+metrics = MetricsRegistry()
+
+
+class SharedHTTPClient:
+    """
+    Process-wide pooled httpx clients (one sync, one async) shared by every
+    LLMService, so all services reuse warm keep-alive connections instead of
+    each ChatOpenAI opening its own pool.
+
+    Follows the same shared class-level state pattern as DatabaseEngine.
+    Pool limits come from LLM_HTTP_MAX_CONNECTIONS, LLM_HTTP_MAX_KEEPALIVE and
+    LLM_HTTP_KEEPALIVE_EXPIRY; HTTP/2 is enabled when LLM_HTTP2 is set (default)
+    and the `h2` package is installed.
+    """
+    _lock = threading.Lock()
+    _sync_client: Optional[httpx.Client] = None
+    _async_client: Optional[httpx.AsyncClient] = None
+    _settings: Optional[Dict[str, Any]] = None
+
+    @classmethod
+    def settings(cls) -> Dict[str, Any]:
+        return {
+            "max_connections": EnvConfig.get_int("LLM_HTTP_MAX_CONNECTIONS", 100),
+            "max_keepalive_connections": EnvConfig.get_int("LLM_HTTP_MAX_KEEPALIVE", 20),
+            "keepalive_expiry": EnvConfig.get_float("LLM_HTTP_KEEPALIVE_EXPIRY", 60.0),
+            "timeout": EnvConfig.get_float("LLM_HTTP_TIMEOUT", 60.0),
+            "connect_timeout": EnvConfig.get_float("LLM_HTTP_CONNECT_TIMEOUT", 5.0),
+            "http2": EnvConfig.get_bool("LLM_HTTP2", True) and cls.http2_available(),
+        }
+
+    @staticmethod
+    def http2_available() -> bool:
+        return importlib.util.find_spec("h2") is not None
+
+    @classmethod
+    def _current_settings(cls) -> Dict[str, Any]:
+        if cls._settings is None:
+            cls._settings = cls.settings()
+        return cls._settings
+
+    @classmethod
+    def _client_kwargs(cls) -> Dict[str, Any]:
+        settings = cls._current_settings()
+        return {
+            "limits": httpx.Limits(
+                max_connections=settings["max_connections"],
+                max_keepalive_connections=settings["max_keepalive_connections"],
+                keepalive_expiry=settings["keepalive_expiry"],
+            ),
+            "timeout": httpx.Timeout(settings["timeout"], connect=settings["connect_timeout"]),
+            "http2": settings["http2"],
+        }
+
+    @classmethod
+    def get_sync(cls) -> httpx.Client:
+        with cls._lock:
+            if cls._sync_client is None or cls._sync_client.is_closed:
+                cls._sync_client = httpx.Client(
+                    **cls._client_kwargs(),
+                    event_hooks={"response": [cls._on_sync_response]},
+                )
+                metrics.increment("llm.http.clients_created")
+                logger.info(f"Shared sync LLM HTTP client created ({cls._describe()})")
+            return cls._sync_client
+
+    @classmethod
+    def get_async(cls) -> httpx.AsyncClient:
+        with cls._lock:
+            if cls._async_client is None or cls._async_client.is_closed:
+                cls._async_client = httpx.AsyncClient(
+                    **cls._client_kwargs(),
+                    event_hooks={"response": [cls._on_async_response]},
+                )
+                metrics.increment("llm.http.clients_created")
+                logger.info(f"Shared async LLM HTTP client created ({cls._describe()})")
+            return cls._async_client
+
+    @classmethod
+    def pool_stats(cls) -> Dict[str, Dict[str, Any]]:
+        """ Connection counts per client, read from the underlying httpcore pools. """
+        settings = cls._current_settings()
+        stats = {}
+        for kind, client in (("sync", cls._sync_client), ("async", cls._async_client)):
+            pool = getattr(getattr(client, "_transport", None), "_pool", None)
+            connections = list(getattr(pool, "connections", []) or [])
+            idle = sum(1 for conn in connections if conn.is_idle())
+            active = len(connections) - idle
+            stats[kind] = {
+                "connections": len(connections),
+                "active": active,
+                "idle": idle,
+                "queued_requests": len(getattr(pool, "_requests", []) or []),
+                "utilisation": round(active / settings["max_connections"], 4) if settings["max_connections"] else None,
+            }
+        return stats
+
+    @classmethod
+    def publish_pool_metrics(cls) -> None:
+        for kind, values in cls.pool_stats().items():
+            for name, value in values.items():
+                if value is not None:
+                    metrics.set_gauge(f"llm.http.{kind}.{name}", value)
+
+    @classmethod
+    def close(cls) -> None:
+        with cls._lock:
+            if cls._sync_client is not None:
+                cls._sync_client.close()
+                cls._sync_client = None
+
+    @classmethod
+    async def aclose(cls) -> None:
+        cls.close()
+        with cls._lock:
+            client, cls._async_client = cls._async_client, None
+            cls._settings = None
+        if client is not None:
+            await client.aclose()
+
+    @classmethod
+    def _on_sync_response(cls, response: httpx.Response) -> None:
+        cls._record(response)
+
+    @classmethod
+    async def _on_async_response(cls, response: httpx.Response) -> None:
+        cls._record(response)
+
+    @classmethod
+    def _record(cls, response: httpx.Response) -> None:
+        metrics.increment("llm.http.requests")
+        metrics.increment(f"llm.http.status.{response.status_code // 100}xx")
+        metrics.increment(f"llm.http.version.{response.http_version}")
+        cls.publish_pool_metrics()
+
+    @classmethod
+    def _describe(cls) -> str:
+        settings = cls._current_settings()
+        return (
+            f"max_connections={settings['max_connections']}, "
+            f"keepalive={settings['max_keepalive_connections']}/{settings['keepalive_expiry']}s, "
+            f"http2={settings['http2']}"
+        )
@@ -0,0 +1,7 @@
+from .registry import MetricsRegistry, TimerSummary
+
+
+__all__ = [
+    "MetricsRegistry",
+    "TimerSummary"
+]
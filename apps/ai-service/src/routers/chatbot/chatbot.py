@@ -1,4 +1,5 @@
 from fastapi import Request, Depends, HTTPException
+from fastapi.responses import JSONResponse, StreamingResponse
 from pathlib import Path
 from typing import (
 	Dict, 
@@ -10,18 +11,36 @@ from routers.base import BaseRouter
 from routers.models import (
 	QAPayload, 
 	QAResponse,
+	QABatchPayload,
+	QABatchResponse,
 	ErrorResponse
 )
 from routers.status import APIStatus
-from services.chatbot import ChatbotService
+from services.chatbot import ChatbotService, AdmissionRejected
+from infrastructure.metrics import MetricsRegistry
 
 from utils import Logger
 
 logger = Logger(__name__)
+metrics = MetricsRegistry()
 
 
-def get_chatbot_service() -> "ChatbotService":
-    return ChatbotService()
+def get_chatbot_service(request: Request) -> "ChatbotService":
+    """Return the process-wide ChatbotService built in the app lifespan."""
+    with metrics.timer("request.chatbot.resolve_service"):
+        service = getattr(request.app.state, "chatbot_service", None)
+        if service is None:
+            raise HTTPException(status_code=503, detail="Chatbot service is not ready")
+    return service
+
+
+def overloaded_response(exc: AdmissionRejected, request_id: Union[str, None] = None) -> JSONResponse:
+    """429 with Retry-After for turns rejected by admission control."""
+    return JSONResponse(
+        status_code=429,
+        content=ErrorResponse(error=str(exc), request_id=request_id).model_dump(),
+        headers={"Retry-After": str(exc.retry_after)},
+    )
 
 
 class ChatbotRouter(BaseRouter):
@@ -40,15 +59,67 @@ class ChatbotRouter(BaseRouter):
 			responses={
 				400: {"model": ErrorResponse, "description": "Bad request"},
 				422: {"model": ErrorResponse, "description": "Validation error"},
+				429: {"model": ErrorResponse, "description": "Overloaded, retry after the Retry-After delay"},
 				500: {"model": ErrorResponse, "description": "Internal server error"},
 				502: {"model": ErrorResponse, "description": "QA error"},
 			},
 		)
+		self.router.add_api_route(
+			"/question/batch",
+			self.question_batch,
+			methods=["POST"],
+			response_model=QABatchResponse,
+			status_code=200,
+			responses={
+				422: {"model": ErrorResponse, "description": "Validation error"},
+				500: {"model": ErrorResponse, "description": "Internal server error"},
+			},
+		)
+		self.router.add_api_route(
+			"/question/stream",
+			self.question_stream,
+			methods=["POST"],
+			response_class=StreamingResponse,
+			status_code=200,
+			responses={
+				200: {
+					"content": {"application/x-ndjson": {}},
+					"description": "NDJSON frames: node_start/node_end/token events, then a final QAResponse frame",
+				},
+				422: {"model": ErrorResponse, "description": "Validation error"},
+				429: {"model": ErrorResponse, "description": "Overloaded, retry after the Retry-After delay"},
+			},
+		)
+
+	async def question_batch(
+		self, 
+		payload: QABatchPayload,
+		chatbot_service: ChatbotService = Depends(get_chatbot_service)
+		) -> QABatchResponse:
+		return await chatbot_service.run_batch(params=payload)
+
+	async def question_stream(
+		self, 
+		payload: QAPayload,
+		chatbot_service: ChatbotService = Depends(get_chatbot_service)
+		) -> StreamingResponse:
+		try:
+			frames = await chatbot_service.open_stream(params=payload)
+		except AdmissionRejected as e:
+			return overloaded_response(e, payload.request_id)
+		return StreamingResponse(
+			frames,
+			media_type="application/x-ndjson",
+			headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+		)
 
 	async def question(
 		self, 
 		payload: QAPayload,
 		chatbot_service: ChatbotService = Depends(get_chatbot_service)
 		) -> Union[QAResponse, ErrorResponse]:
-		return await chatbot_service.run(params=payload)
+		try:
+			return await chatbot_service.run(params=payload)
+		except AdmissionRejected as e:
+			return overloaded_response(e, payload.request_id)
 	
\ No newline at end of file
@@ -1,5 +1,6 @@
 from typing import Dict, Any
 from fastapi import APIRouter, Depends, Request
+from ai.graph.services.resilience import CircuitBreaker
 from utils import TimeHandler
 
 class HealthRouter:
@@ -10,7 +11,10 @@ class HealthRouter:
     async def health_check(
         self,
     ) -> Dict[str, Any]:
+        circuits = CircuitBreaker.snapshot()
+        degraded = any(circuit["state"] != CircuitBreaker.CLOSED for circuit in circuits.values())
         return {
-            "status": "RUNNING",
+            "status": "DEGRADED" if degraded else "RUNNING",
+            "llm_circuits": circuits,
             "timestamp": TimeHandler.get_timestamp()
         }
@@ -0,0 +1,4 @@
+from .metrics import MetricsRouter
+
+
+__all__ = ["MetricsRouter"]
@@ -0,0 +1,48 @@
+from typing import Dict, Any
+from fastapi import APIRouter
+from infrastructure.http import SharedHTTPClient
+from infrastructure.metrics import MetricsRegistry
+from utils import TimeHandler
+
+
+class MetricsRouter:
+    def __init__(self) -> None:
+        self.metrics = MetricsRegistry()
+        self.router = APIRouter(prefix="/api/v1/metrics", tags=["meta"])
+        self.router.add_api_route("", self.get_metrics, methods=["GET"])
+        self.router.add_api_route("/lifecycle", self.get_lifecycle, methods=["GET"])
+        self.router.add_api_route("/http", self.get_http_pool, methods=["GET"])
+
+    async def get_metrics(
+        self,
+    ) -> Dict[str, Any]:
+        SharedHTTPClient.publish_pool_metrics()
+        return {
+            "metrics": self.metrics.snapshot(),
+            "timestamp": TimeHandler.get_timestamp()
+        }
+
+    async def get_lifecycle(
+        self,
+    ) -> Dict[str, Any]:
+        """Startup construction cost versus per-request cost breakdown."""
+        return {
+            "constructions": {
+                "chatbot_service": self.metrics.get_counter("chatbot.constructions"),
+                "qa_graph": self.metrics.get_counter("graph.constructions"),
+            },
+            "startup": self.metrics.snapshot(prefix="startup.")["timers"],
+            "per_request": self.metrics.snapshot(prefix="request.")["timers"],
+            "timestamp": TimeHandler.get_timestamp()
+        }
+
+    async def get_http_pool(
+        self,
+    ) -> Dict[str, Any]:
+        """Shared LLM HTTP client settings and connection pool utilisation."""
+        return {
+            "settings": SharedHTTPClient.settings(),
+            "pools": SharedHTTPClient.pool_stats(),
+            "counters": self.metrics.snapshot(prefix="llm.http.")["counters"],
+            "timestamp": TimeHandler.get_timestamp()
+        }
@@ -1,7 +1,9 @@
-from pydantic import BaseModel, field_validator
+from pydantic import BaseModel, Field, field_validator
 from typing import (
 	Dict,
-	Optional
+	List,
+	Optional,
+	Union
 )
 
 
@@ -22,4 +24,15 @@ class QAResponse(BaseModel):
 
 class ErrorResponse(BaseModel):
 	error: str
+	request_id: Optional[str] = None
+
+
+class QABatchPayload(BaseModel):
+	items: List[QAPayload] = Field(..., min_length=1, max_length=100)
+
+
+class QABatchResponse(BaseModel):
+	results: List[Union[QAResponse, ErrorResponse]]
+	timestamp: Optional[str] = None
+	elapsed_time: Optional[float] = None
 
@@ -1 +1,7 @@
-from .chatbot import ChatbotService
\ No newline at end of file
+from .chatbot import ChatbotService
+from .admission import (
+    AdmissionController,
+    AdmissionRejected,
+    TurnPriority
+)
+from .idempotency import IdempotencyStore
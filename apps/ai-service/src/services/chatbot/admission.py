@@ -0,0 +1,201 @@
+import asyncio
+import itertools
+import math
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from time import perf_counter
+from typing import (
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    List,
+    Optional
+)
+
+from infrastructure.config import EnvConfig
+from infrastructure.metrics import MetricsRegistry
+from utils import Logger
+
+logger = Logger(__name__)
+metrics = MetricsRegistry()
+
+
+class TurnPriority(IntEnum):
+    """ Lower value is admitted first and shed last. """
+    WRITE = 0
+    READ = 1
+
+
+class AdmissionRejected(Exception):
+    """ Raised when a turn cannot be admitted; maps to 429 + Retry-After. """
+    def __init__(self, reason: str, retry_after: int) -> None:
+        super().__init__(f"Service overloaded ({reason}), retry after {retry_after}s")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class _Waiter:
+    __slots__ = ("priority", "seq", "future")
+
+    def __init__(self, priority: TurnPriority, seq: int, future: asyncio.Future) -> None:
+        self.priority = priority
+        self.seq = seq
+        self.future = future
+
+    def sort_key(self):
+        return (self.priority, self.seq)
+
+
+class AdmissionController:
+    """
+    Caps concurrent graph executions with a bounded, priority-ordered wait queue.
+
+    A turn takes a free slot immediately when one is available. Otherwise its
+    priority is resolved (only under contention, since it needs a checkpoint
+    read) and it waits in the queue. Write continuations (answers to a pending
+    ASK_CONFIRMATION) are admitted before read turns and, when the queue is
+    full, displace the newest queued read turn instead of being rejected.
+    Rejections are fast and carry a Retry-After estimate.
+    """
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        queue_timeout: Optional[float] = None,
+        retry_after: Optional[int] = None
+    ) -> None:
+        self.max_concurrency = max(1, max_concurrency or EnvConfig.get_int("CHATBOT_MAX_CONCURRENT_TURNS", 32))
+        self.max_queue = max(0, max_queue if max_queue is not None else EnvConfig.get_int("CHATBOT_MAX_QUEUED_TURNS", 64))
+        self.queue_timeout = queue_timeout or EnvConfig.get_float("CHATBOT_QUEUE_TIMEOUT_SECONDS", 10.0)
+        self.retry_after = retry_after or EnvConfig.get_int("CHATBOT_RETRY_AFTER_SECONDS", 2)
+        self._active = 0
+        self._waiters: List[_Waiter] = []
+        self._seq = itertools.count()
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    @asynccontextmanager
+    async def admit(
+        self,
+        resolve_priority: Callable[[], Awaitable[TurnPriority]]
+    ) -> AsyncIterator[None]:
+        await self.acquire(resolve_priority)
+        try:
+            yield
+        finally:
+            self.release()
+
+    async def acquire(
+        self,
+        resolve_priority: Callable[[], Awaitable[TurnPriority]]
+    ) -> None:
+        """ Take a slot, waiting in the queue if needed; raises AdmissionRejected. """
+        if self._try_take_slot():
+            metrics.observe("request.admission.wait", 0.0)
+            return
+
+        priority = await self._resolve(resolve_priority)
+        if self._try_take_slot():
+            metrics.observe("request.admission.wait", 0.0)
+            return
+
+        if len(self._waiters) >= self.max_queue and not self._shed_for(priority):
+            self._reject("queue_full", priority)
+
+        waiter = _Waiter(priority, next(self._seq), asyncio.get_running_loop().create_future())
+        self._waiters.append(waiter)
+        self._publish()
+
+        start = perf_counter()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._discard(waiter)
+            if waiter.future.done() and not waiter.future.cancelled() and waiter.future.exception() is None:
+                # The slot was handed over just as the timeout fired; keep it.
+                metrics.observe("request.admission.wait", perf_counter() - start)
+                return
+            self._reject("queue_timeout", priority)
+        except asyncio.CancelledError:
+            self._discard(waiter)
+            if waiter.future.done() and not waiter.future.cancelled() and waiter.future.exception() is None:
+                self.release()
+            raise
+        finally:
+            self._publish()
+
+        metrics.observe("request.admission.wait", perf_counter() - start)
+        metrics.observe(f"request.admission.wait.{priority.name.lower()}", perf_counter() - start)
+
+    def release(self) -> None:
+        """ Free a slot, handing it directly to the best queued waiter. """
+        while self._waiters:
+            waiter = min(self._waiters, key=_Waiter.sort_key)
+            self._waiters.remove(waiter)
+            if not waiter.future.done():
+                waiter.future.set_result(None)
+                metrics.increment("admission.admitted")
+                self._publish()
+                return
+        self._active -= 1
+        self._publish()
+
+    def estimate_retry_after(self) -> int:
+        turn = metrics.get_timer("request.chatbot.total")
+        mean = turn["mean"] if turn and turn.get("mean") else 0.0
+        backlog = (len(self._waiters) + 1) / self.max_concurrency
+        return max(self.retry_after, math.ceil(mean * backlog))
+
+    def _try_take_slot(self) -> bool:
+        if self._active < self.max_concurrency and not self._waiters:
+            self._active += 1
+            metrics.increment("admission.admitted")
+            self._publish()
+            return True
+        return False
+
+    async def _resolve(
+        self,
+        resolve_priority: Callable[[], Awaitable[TurnPriority]]
+    ) -> TurnPriority:
+        try:
+            return await resolve_priority()
+        except Exception as e:
+            logger.warning(f"[ADMISSION] priority lookup failed, treating as READ: {e}")
+            return TurnPriority.READ
+
+    def _shed_for(self, priority: TurnPriority) -> bool:
+        """ Reject the newest queued turn of lower priority to make room; False if none. """
+        candidates = [w for w in self._waiters if w.priority > priority and not w.future.done()]
+        if not candidates:
+            return False
+        victim = max(candidates, key=_Waiter.sort_key)
+        self._waiters.remove(victim)
+        victim.future.set_exception(
+            AdmissionRejected("shed", self.estimate_retry_after())
+        )
+        metrics.increment("admission.shed")
+        return True
+
+    def _discard(self, waiter: _Waiter) -> None:
+        if waiter in self._waiters:
+            self._waiters.remove(waiter)
+
+    def _reject(self, reason: str, priority: TurnPriority) -> None:
+        metrics.increment("admission.rejected")
+        metrics.increment(f"admission.rejected.{reason}")
+        logger.warning(
+            f"[ADMISSION] rejected {priority.name} turn ({reason}): "
+            f"active={self._active} queued={len(self._waiters)}"
+        )
+        raise AdmissionRejected(reason, self.estimate_retry_after())
+
+    def _publish(self) -> None:
+        metrics.set_gauge("admission.active", self._active)
+        metrics.set_gauge("admission.queue_depth", len(self._waiters))
@@ -1,21 +1,35 @@
 
 import os
+import json
+import asyncio
 from fastapi import APIRouter
 from typing import (
 	Any,
+	AsyncIterator,
 	List,
 	Dict,
     Optional,
+	Tuple,
 	Union
 )
 from copy import deepcopy
 from pathlib import Path
 from pydantic import ValidationError
 from ai.graph.conversational_qa import QAGraph
+from infrastructure.config import EnvConfig
+from infrastructure.metrics import MetricsRegistry
 from routers.models import (
     QAPayload, 
-    QAResponse
+    QAResponse,
+    QABatchPayload,
+    QABatchResponse,
+    ErrorResponse
 )
+from .admission import (
+    AdmissionController,
+    TurnPriority
+)
+from .idempotency import IdempotencyStore
 from utils import (
 	Logger,
 	TimeHandler,
@@ -31,26 +45,228 @@ from utils import (
 # )
 
 logger = Logger(__name__)
+metrics = MetricsRegistry()
 
 
 class ChatbotService:
+    """
+    Process-wide chatbot service. It is built once in the application
+    lifespan and shared across requests, together with its compiled QAGraph.
+    """
     def __init__(self) -> None:
-        self.qa_graph = QAGraph()
+        metrics.increment("chatbot.constructions")
+        with metrics.timer("startup.chatbot.qa_graph"):
+            self.qa_graph = QAGraph()
+        self.batch_max_concurrency = max(1, EnvConfig.get_int("CHATBOT_BATCH_MAX_CONCURRENCY", 8))
+        self.admission = AdmissionController()
+        self.idempotency = IdempotencyStore()
+
+    async def start(self) -> None:
+        """ Open async resources (async checkpointer pool) when the graph runs in async mode. """
+        if self.qa_graph.async_mode:
+            await self.qa_graph.setup()
+
+    def close(self) -> None:
+        self.qa_graph.close()
+
+    async def aclose(self) -> None:
+        await self.qa_graph.aclose()
     
     async def run(
         self, 
         params: QAPayload
     ) -> QAResponse:
-        start = TimeHandler.get_time()
-
-        state = await self.qa_graph(
-            user_message=params.user_message,
+        """ Run one turn; replays of a known (session_id, request_id) return the stored response. """
+        return await self.idempotency.run(
+            session_id=params.session_id,
             request_id=params.request_id,
-            session_id=params.session_id
+            execute=lambda: self._run_turn(params)
         )
 
+    async def _run_turn(
+        self, 
+        params: QAPayload
+    ) -> QAResponse:
+        async with self.admission.admit(lambda: self._turn_priority(params.session_id)):
+            start = TimeHandler.get_time()
+
+            state = await self.qa_graph(
+                user_message=params.user_message,
+                request_id=params.request_id,
+                session_id=params.session_id
+            )
+
         end = TimeHandler.get_time()
+        metrics.observe("request.chatbot.total", end - start)
+
+        return self._build_response(params, state, end - start)
+
+    async def run_batch(
+        self, 
+        params: QABatchPayload
+    ) -> QABatchResponse:
+        """
+        Run many turns concurrently, at most `batch_max_concurrency` at a time.
+        Turns that share a session_id run sequentially in payload order, and
+        each item gets its own QAResponse or ErrorResponse at its original index.
+        """
+        start = TimeHandler.get_time()
+        items = params.items
+        limit = asyncio.Semaphore(self.batch_max_concurrency)
+        results: List[Optional[Union[QAResponse, ErrorResponse]]] = [None] * len(items)
+
+        sessions: Dict[str, List[int]] = {}
+        for index, item in enumerate(items):
+            sessions.setdefault(item.session_id, []).append(index)
+
+        async def run_session(indices: List[int]) -> None:
+            for index in indices:
+                async with limit:
+                    results[index] = await self._run_batch_item(items[index])
+
+        await asyncio.gather(*(run_session(indices) for indices in sessions.values()))
+
+        end = TimeHandler.get_time()
+        metrics.observe("request.chatbot.batch.total", end - start)
+        metrics.increment("chatbot.batch.items", len(items))
+        logger.info(f"[Batch] {len(items)} items across {len(sessions)} sessions in {end - start:.3f}s")
+
+        return QABatchResponse(
+            results=results,
+            timestamp=TimeHandler.get_timestamp(tz="UTC"),
+            elapsed_time=round(end - start, 4),
+        )
+
+    async def _run_batch_item(
+        self, 
+        params: QAPayload
+    ) -> Union[QAResponse, ErrorResponse]:
+        try:
+            return await self.run(params=params)
+        except Exception as e:
+            logger.error(f"[Batch] session {params.session_id} failed: {e}", exc_info=True)
+            metrics.increment("chatbot.batch.errors")
+            return ErrorResponse(error=str(e), request_id=params.request_id)
+
+    async def open_stream(
+        self, 
+        params: QAPayload
+    ) -> AsyncIterator[str]:
+        """
+        Admit the turn (raising AdmissionRejected before any byte is sent)
+        and return its NDJSON frame stream, which holds the slot until it ends.
+        A replayed request_id streams only the stored final frame, and a
+        duplicate of one still running waits for it and streams its final frame.
+        """
+        key = (params.session_id, params.request_id)
+        pending: Optional[asyncio.Future] = None
+        if params.request_id:
+            stored = await self.idempotency.lookup(key)
+            if stored is not None:
+                return self._replay_stream(stored)
+            # Claim the key before admission can yield, so a duplicate arriving
+            # while this turn waits for a slot joins it instead of running again
+            pending, owner = self.idempotency.begin(key)
+            if not owner:
+                metrics.increment("idempotency.joined")
+                return self._joined_stream(pending)
+
+        try:
+            await self.admission.acquire(lambda: self._turn_priority(params.session_id))
+        except BaseException as e:
+            if pending is not None:
+                self.idempotency.fail(key, pending, e)
+            raise
+        return self._admitted_stream(params, pending)
+
+    async def _admitted_stream(
+        self, 
+        params: QAPayload,
+        pending: Optional[asyncio.Future]
+    ) -> AsyncIterator[str]:
+        key = (params.session_id, params.request_id)
+        response: Optional[QAResponse] = None
+        try:
+            async for frame, final in self._stream_frames(params):
+                if final is not None:
+                    response = final
+                yield frame
+        finally:
+            self.admission.release()
+            if pending is not None:
+                if response is not None:
+                    await self.idempotency.complete(key, pending, response)
+                else:
+                    self.idempotency.fail(key, pending, RuntimeError("Streamed turn did not complete"))
+
+    async def _replay_stream(self, response: QAResponse) -> AsyncIterator[str]:
+        yield json.dumps({"type": "final", **response.model_dump()}) + "\n"
+
+    async def _joined_stream(self, pending: asyncio.Future) -> AsyncIterator[str]:
+        try:
+            response = await asyncio.shield(pending)
+        except Exception as e:
+            yield json.dumps({"type": "error", "error": str(e)}) + "\n"
+            return
+        yield json.dumps({"type": "final", **response.model_dump()}) + "\n"
+
+    async def stream(
+        self, 
+        params: QAPayload
+    ) -> AsyncIterator[str]:
+        """
+        Run one turn and yield NDJSON frames: node transitions and answer
+        tokens while the graph runs, then a final frame with the QAResponse fields.
+        """
+        async for frame, _ in self._stream_frames(params):
+            yield frame
 
+    async def _stream_frames(
+        self, 
+        params: QAPayload
+    ) -> AsyncIterator[Tuple[str, Optional[QAResponse]]]:
+        """ Frames of `stream`, each paired with its QAResponse for the final frame and None otherwise. """
+        start = TimeHandler.get_time()
+        first_event = True
+        first_token = True
+
+        try:
+            async for event in self.qa_graph.astream_turn(
+                user_message=params.user_message,
+                request_id=params.request_id,
+                session_id=params.session_id
+            ):
+                now = TimeHandler.get_time()
+                if first_event:
+                    metrics.observe("request.chatbot.stream.first_event", now - start)
+                    first_event = False
+                if first_token and event["type"] == "token":
+                    metrics.observe("request.chatbot.stream.first_token", now - start)
+                    first_token = False
+
+                response: Optional[QAResponse] = None
+                if event["type"] == "final":
+                    metrics.observe("request.chatbot.total", now - start)
+                    response = self._build_response(params, event["state"], now - start)
+                    event = {"type": "final", **response.model_dump()}
+
+                yield json.dumps(event, default=str) + "\n", response
+
+        except Exception as e:
+            logger.error(f"[Stream] error: {e}", exc_info=True)
+            yield json.dumps({"type": "error", "error": str(e)}) + "\n", None
+
+    async def _turn_priority(self, session_id: str) -> TurnPriority:
+        if await self.qa_graph.ais_write_continuation(session_id):
+            return TurnPriority.WRITE
+        return TurnPriority.READ
+
+    def _build_response(
+        self, 
+        params: QAPayload, 
+        state: Dict[str, Any], 
+        elapsed: float
+    ) -> QAResponse:
         messages = state.get('messages', [])
         if messages:
             last_message = messages[-1]
@@ -64,5 +280,5 @@ class ChatbotService:
             user_id=params.user_id,
             system_answer=system_answer,
             timestamp=TimeHandler.get_timestamp(tz="UTC"),
-            elapsed_time=round(end - start, 4),
+            elapsed_time=round(elapsed, 4),
         )
@@ -0,0 +1,236 @@
+import asyncio
+import json
+import threading
+from collections import OrderedDict
+from time import monotonic
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Optional,
+    Tuple
+)
+
+from sqlalchemy import text
+
+from infrastructure.config import EnvConfig
+from infrastructure.database.orm import DatabaseEngine
+from infrastructure.metrics import MetricsRegistry
+from routers.models import QAResponse
+from utils import Logger
+
+logger = Logger(__name__)
+metrics = MetricsRegistry()
+
+IdempotencyKey = Tuple[str, str]
+
+
+class InMemoryIdempotencyBackend:
+    """ Bounded LRU of stored responses with a TTL. """
+    def __init__(self, max_entries: int, ttl_seconds: float) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[IdempotencyKey, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+
+    def get(self, key: IdempotencyKey) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, value = entry
+            if monotonic() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: IdempotencyKey, value: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[key] = (monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class PostgresIdempotencyBackend(DatabaseEngine):
+    """ Durable store shared by every worker, so replays survive restarts and hit any process. """
+    TABLE = "chatbot_idempotency"
+
+    def __init__(self, ttl_seconds: float) -> None:
+        super().__init__()
+        self.ttl_seconds = ttl_seconds
+        self._ensure_table()
+
+    def _ensure_table(self) -> None:
+        with self.engine.begin() as conn:
+            conn.execute(text(
+                f"""
+                CREATE TABLE IF NOT EXISTS {self.TABLE} (
+                    session_id TEXT NOT NULL,
+                    request_id TEXT NOT NULL,
+                    response JSONB NOT NULL,
+                    created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+                    PRIMARY KEY (session_id, request_id)
+                )
+                """
+            ))
+
+    def get(self, key: IdempotencyKey) -> Optional[Dict[str, Any]]:
+        with self.engine.connect() as conn:
+            row = conn.execute(
+                text(
+                    f"SELECT response FROM {self.TABLE} "
+                    "WHERE session_id = :session_id AND request_id = :request_id "
+                    "AND created_at > now() - make_interval(secs => :ttl)"
+                ),
+                {"session_id": key[0], "request_id": key[1], "ttl": self.ttl_seconds},
+            ).first()
+        if row is None:
+            return None
+        value = row[0]
+        return json.loads(value) if isinstance(value, str) else value
+
+    def put(self, key: IdempotencyKey, value: Dict[str, Any]) -> None:
+        with self.engine.begin() as conn:
+            conn.execute(
+                text(
+                    f"INSERT INTO {self.TABLE} (session_id, request_id, response) "
+                    "VALUES (:session_id, :request_id, CAST(:response AS JSONB)) "
+                    "ON CONFLICT (session_id, request_id) DO NOTHING"
+                ),
+                {"session_id": key[0], "request_id": key[1], "response": json.dumps(value)},
+            )
+
+
+class IdempotencyStore:
+    """
+    Deduplicates turns by (session_id, request_id).
+
+    A replay of a completed request returns the stored QAResponse without
+    touching the graph, and a duplicate that arrives while the first is still
+    running waits for it and shares its response. Only successful responses
+    are stored, so a retry after a failure runs again. Requests without a
+    request_id are never deduplicated.
+
+    Responses live in an in-process LRU; set CHATBOT_IDEMPOTENCY_BACKEND=postgres
+    to also persist them in the `chatbot_idempotency` table.
+    """
+    def __init__(
+        self,
+        memory: Optional[InMemoryIdempotencyBackend] = None,
+        persistent: Optional[Any] = None
+    ) -> None:
+        ttl = EnvConfig.get_float("CHATBOT_IDEMPOTENCY_TTL_SECONDS", 86400.0)
+        self.memory = memory or InMemoryIdempotencyBackend(
+            max_entries=EnvConfig.get_int("CHATBOT_IDEMPOTENCY_MAX_ENTRIES", 10000),
+            ttl_seconds=ttl,
+        )
+        if persistent is None and EnvConfig.get_str("CHATBOT_IDEMPOTENCY_BACKEND", "memory") == "postgres":
+            persistent = PostgresIdempotencyBackend(ttl_seconds=ttl)
+        self.persistent = persistent
+        self._inflight: Dict[IdempotencyKey, asyncio.Future] = {}
+
+    async def run(
+        self,
+        session_id: str,
+        request_id: Optional[str],
+        execute: Callable[[], Awaitable[QAResponse]]
+    ) -> QAResponse:
+        if not request_id:
+            return await execute()
+
+        key = (session_id, request_id)
+        stored = await self.lookup(key)
+        if stored is not None:
+            return stored
+
+        future, owner = self.begin(key)
+        if not owner:
+            metrics.increment("idempotency.joined")
+            return await asyncio.shield(future)
+        try:
+            response = await execute()
+        except BaseException as e:
+            self.fail(key, future, e)
+            raise
+        await self.complete(key, future, response)
+        return response
+
+    async def lookup(self, key: IdempotencyKey) -> Optional[QAResponse]:
+        """ Stored response for `key`, waiting for an in-flight execution if there is one. """
+        value = self.memory.get(key)
+        if value is not None:
+            metrics.increment("idempotency.hits.memory")
+            return QAResponse(**value)
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            metrics.increment("idempotency.joined")
+            return await asyncio.shield(pending)
+
+        if self.persistent is not None:
+            try:
+                value = await asyncio.to_thread(self.persistent.get, key)
+            except Exception as e:
+                logger.warning(f"[IDEMPOTENCY] persistent lookup failed: {e}")
+                value = None
+            if value is not None:
+                metrics.increment("idempotency.hits.persistent")
+                self.memory.put(key, value)
+                return QAResponse(**value)
+
+            # Another duplicate may have started while we were reading the table.
+            pending = self._inflight.get(key)
+            if pending is not None:
+                metrics.increment("idempotency.joined")
+                return await asyncio.shield(pending)
+
+        metrics.increment("idempotency.misses")
+        return None
+
+    async def remember(self, key: IdempotencyKey, response: QAResponse) -> None:
+        """ Store a completed response in memory and, if configured, in Postgres. """
+        value = response.model_dump()
+        self.memory.put(key, value)
+        if self.persistent is not None:
+            try:
+                await asyncio.to_thread(self.persistent.put, key, value)
+            except Exception as e:
+                logger.warning(f"[IDEMPOTENCY] persistent store failed: {e}")
+
+    def begin(self, key: IdempotencyKey) -> Tuple[asyncio.Future, bool]:
+        """
+        Claim `key` so duplicates wait, returning its future and whether this
+        caller owns it. An owner pairs it with complete() or fail(); any other
+        caller must only await the future, since a duplicate already runs.
+        """
+        pending = self._inflight.get(key)
+        if pending is not None:
+            return pending, False
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        return future, True
+
+    async def complete(self, key: IdempotencyKey, future: asyncio.Future, response: QAResponse) -> None:
+        try:
+            await self.remember(key, response)
+        finally:
+            self._inflight.pop(key, None)
+            if not future.done():
+                future.set_result(response)
+
+    def fail(self, key: IdempotencyKey, future: asyncio.Future, error: BaseException) -> None:
+        self._inflight.pop(key, None)
+        if future.done():
+            return
+        if isinstance(error, asyncio.CancelledError):
+            future.cancel()
+        else:
+            future.set_exception(error)
+            # Mark retrieved so an un-joined failure does not log "exception never retrieved"
+            future.exception()
@@ -0,0 +1,144 @@
+import json
+from unittest.mock import Mock
+
+import pytest
+
+GENERAL_QA = [
+    "what time does the clinic open", "are you open on saturday", "where is the clinic located",
+    "do you accept my insurance", "what services do you offer", "how much is a consultation",
+    "is there parking at the clinic", "what are your opening hours", "do you have a pediatrician",
+    "can i pay by card", "what is the clinic address", "do you do blood tests",
+]
+LIST_APPOINTMENTS = [
+    "show my appointments", "list my appointments", "what appointments do i have",
+    "when is my next appointment", "show me my upcoming appointments", "do i have any appointments",
+    "list all my bookings", "what are my scheduled appointments", "see my appointments please",
+    "which appointments do i have next week", "show my bookings", "my appointments",
+]
+CANCEL_APPOINTMENT = [
+    "cancel my appointment", "i want to cancel my appointment", "please cancel the booking",
+    "cancel the appointment with dr smith", "i need to cancel", "can you cancel my visit",
+    "cancel my appointment tomorrow", "i can't make it, cancel it", "cancel my booking please",
+    "please cancel my next appointment", "cancel appointment", "i would like to cancel",
+]
+
+
+def _examples():
+    from ai.graph.classifier import Example
+
+    data = []
+    for label, texts in (
+        ("general_qa", GENERAL_QA),
+        ("list_appointments", LIST_APPOINTMENTS),
+        ("cancel_appointment", CANCEL_APPOINTMENT),
+    ):
+        for text in texts:
+            data.append(Example(text, label, True))
+            data.append(Example(text + "?", label, False))
+    return data
+
+
+@pytest.mark.unit
+class TestIntentClassifier:
+
+    def setup_method(self):
+        from infrastructure.metrics import MetricsRegistry
+        MetricsRegistry().reset()
+
+    def test_trains_saves_and_reloads(self, tmp_path):
+        """Test a model trained on LLM labels predicts them and survives the file round trip."""
+        from ai.graph.classifier import IntentClassifier, evaluate, train
+
+        model = train(_examples(), epochs=15)
+        label, probability = model.predict("when is my next appointment", is_verified=True)
+        assert label == "list_appointments"
+        assert 0.0 < probability <= 1.0
+
+        path = tmp_path / "intent.model.gz"
+        model.save(str(path))
+        loaded = IntentClassifier.load(str(path))
+        assert loaded.labels == model.labels
+        assert loaded.predict("cancel my appointment", is_verified=True)[0] == "cancel_appointment"
+        assert loaded.predict_proba("what time does the clinic open")["general_qa"] == pytest.approx(
+            model.predict_proba("what time does the clinic open")["general_qa"], abs=1e-3
+        )
+
+        report = evaluate(loaded, _examples())
+        assert report["accuracy"] >= 0.95
+        assert set(report["per_class"]) == {"cancel_appointment", "general_qa", "list_appointments"}
+        assert [row["threshold"] for row in report["coverage"]] == sorted(row["threshold"] for row in report["coverage"])
+
+    def test_rejects_foreign_model_files(self, tmp_path):
+        """Test loading refuses a file in another format."""
+        import gzip
+        from ai.graph.classifier import IntentClassifier
+
+        path = tmp_path / "other.gz"
+        with gzip.open(path, "wt") as file:
+            json.dump({"format": "something-else", "version": 1}, file)
+        with pytest.raises(ValueError):
+            IntentClassifier.load(str(path))
+
+    def test_loads_cassette_lines_and_splits_holdout_stably(self, tmp_path):
+        """Test IntentService cassette lines become examples and the holdout split is deterministic."""
+        from ai.graph.classifier import load_examples, split_holdout
+
+        lines = [
+            {
+                "service": "IntentService", "variant": "verified:fast",
+                "messages": [["system", "..."], ["human", "show my appointments"]],
+                "response": {"user_intent": {"intent_type": "list_appointments", "confidence": 0.97},
+                             "raw_query": "show my appointments"},
+            },
+            {
+                "service": "IntentService", "variant": "unverified",
+                "messages": [["human", "hmm"]],
+                "response": {"user_intent": {"intent_type": "general_qa", "confidence": 0.2}, "raw_query": "hmm"},
+            },
+            {"service": "QAAnswerService", "response": {"qa_answer": "8am"}},
+            {"text": "cancel it", "label": "cancel_appointment", "verified": True},
+        ]
+        path = tmp_path / "cassette.jsonl"
+        path.write_text("\n".join(json.dumps(line) for line in lines) + "\nnot json\n")
+
+        examples = load_examples([str(path)], min_confidence=0.5)
+        assert sorted((e.text, e.label, e.is_verified) for e in examples) == [
+            ("cancel it", "cancel_appointment", True),
+            ("show my appointments", "list_appointments", True),
+        ]
+
+        train_a, holdout_a = split_holdout(_examples(), 0.3)
+        train_b, holdout_b = split_holdout(list(reversed(_examples())), 0.3)
+        assert {e.text for e in holdout_a} == {e.text for e in holdout_b}
+        assert len(train_a) + len(holdout_a) == len(_examples())
+
+    def test_node_short_circuits_confident_local_intents(self):
+        """Test a confident local label skips the LLM, while unsafe intents and personal details fall through."""
+        from ai.graph.classifier import train
+        from ai.graph.models.conversational_qa import ConversationIntentModel, UserIntentModel
+        from ai.graph.nodes.conversational_qa import ConversationManagerNode
+        from ai.graph.services.conversational_qa import LocalIntentService
+        from ai.graph.states.conversational_qa import StateKeys
+        from ai.graph.types.conversational_qa import IntentType, Routes
+        from infrastructure.metrics import MetricsRegistry
+
+        local = LocalIntentService(train(_examples(), epochs=15), threshold=0.5)
+        intent_service = Mock()
+        intent_service.run = Mock(return_value=ConversationIntentModel(
+            user_intent=UserIntentModel(intent_type=IntentType.CANCEL_APPOINTMENT, confidence=0.9),
+            raw_query="cancel my appointment"
+        ))
+        manager = ConversationManagerNode(intent_service=intent_service, local_intent_service=local)
+
+        state = manager({StateKeys.USER_MESSAGE: "what are your opening hours", StateKeys.IS_VERIFIED: True})
+        assert state[StateKeys.ROUTE] == Routes.ACTION_QA
+        intent_service.run.assert_not_called()
+
+        manager({StateKeys.USER_MESSAGE: "cancel my appointment", StateKeys.IS_VERIFIED: True})
+        manager({StateKeys.USER_MESSAGE: "show my appointments, my phone is 555 123 4567", StateKeys.IS_VERIFIED: False})
+        assert intent_service.run.call_count == 2
+
+        registry = MetricsRegistry()
+        assert registry.get_counter("graph.local_intent.hits") == 1
+        assert registry.get_counter("graph.local_intent.misses.needs_extraction") == 1
+        assert registry.get_counter("graph.local_intent.misses.personal_details") == 1
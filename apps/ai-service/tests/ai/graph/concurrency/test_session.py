@@ -0,0 +1,119 @@
+"""Tests for per-session turn serialization."""
+import asyncio
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    from infrastructure.metrics import MetricsRegistry
+
+    MetricsRegistry.reset()
+    yield
+    MetricsRegistry.reset()
+
+
+@pytest.mark.unit
+class TestSessionTurnCoordinator:
+    """Test cases for SessionTurnCoordinator."""
+
+    @pytest.mark.asyncio
+    async def test_same_session_turns_do_not_overlap(self):
+        """Test that turns of one session run one at a time while other sessions proceed."""
+        from ai.graph.concurrency import SessionTurnCoordinator
+        from infrastructure.metrics import MetricsRegistry
+
+        coordinator = SessionTurnCoordinator(coalesce=False)
+        active = {"a": 0, "b": 0}
+        peak = {"a": 0, "b": 0}
+
+        def make_turn(session_id):
+            async def turn():
+                active[session_id] += 1
+                peak[session_id] = max(peak[session_id], active[session_id])
+                await asyncio.sleep(0.01)
+                active[session_id] -= 1
+                return session_id
+            return turn
+
+        await asyncio.gather(
+            *(coordinator.run("a", f"m{i}", make_turn("a")) for i in range(3)),
+            coordinator.run("b", "m", make_turn("b"))
+        )
+
+        assert peak["a"] == 1
+        assert coordinator.active_sessions() == 0
+        assert MetricsRegistry().get_timer("request.graph.session_lock_wait")["count"] == 4
+        assert MetricsRegistry().get_counter("graph.session_lock.contended") >= 1
+
+    @pytest.mark.asyncio
+    async def test_identical_pending_messages_are_coalesced(self):
+        """Test that a double-submitted message shares the first turn's result."""
+        from ai.graph.concurrency import SessionTurnCoordinator
+        from infrastructure.metrics import MetricsRegistry
+
+        coordinator = SessionTurnCoordinator(coalesce=True)
+        calls = []
+
+        async def turn():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return {"answer": len(calls)}
+
+        first, second = await asyncio.gather(
+            coordinator.run("a", "Yes, confirm it", turn),
+            coordinator.run("a", "  yes, CONFIRM it ", turn)
+        )
+
+        assert len(calls) == 1
+        assert first is second
+        assert MetricsRegistry().get_counter("graph.turns.coalesced") == 1
+
+    @pytest.mark.asyncio
+    async def test_error_is_shared_and_not_cached(self):
+        """Test that a failed turn fails its duplicates and a later retry runs again."""
+        from ai.graph.concurrency import SessionTurnCoordinator
+
+        coordinator = SessionTurnCoordinator(coalesce=True)
+
+        async def failing():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("boom")
+
+        results = await asyncio.gather(
+            coordinator.run("a", "hi", failing),
+            coordinator.run("a", "hi", failing),
+            return_exceptions=True
+        )
+
+        async def ok():
+            return "ok"
+
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert await coordinator.run("a", "hi", ok) == "ok"
+
+    @pytest.mark.asyncio
+    async def test_only_the_tail_of_the_queue_is_coalesced(self):
+        """Test that a message equal to an earlier pending turn, but not the last one, runs on its own."""
+        from ai.graph.concurrency import SessionTurnCoordinator
+        from infrastructure.metrics import MetricsRegistry
+
+        coordinator = SessionTurnCoordinator(coalesce=True)
+        calls = []
+
+        def make_turn(message):
+            async def turn():
+                calls.append(message)
+                await asyncio.sleep(0.01)
+                return {"answer": len(calls)}
+            return turn
+
+        first, other, second = await asyncio.gather(
+            coordinator.run("a", "yes", make_turn("yes")),
+            coordinator.run("a", "cancel it", make_turn("cancel it")),
+            coordinator.run("a", "yes", make_turn("yes"))
+        )
+
+        assert calls == ["yes", "cancel it", "yes"]
+        assert first is not second
+        assert second == {"answer": 3}
+        assert MetricsRegistry().get_counter("graph.turns.coalesced") == 0
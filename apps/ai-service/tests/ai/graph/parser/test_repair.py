@@ -0,0 +1,91 @@
+"""Tests for the local JSON repair tier of FixingParser."""
+import pytest
+from enum import Enum
+from typing import List, Optional
+from unittest.mock import Mock, patch
+
+from pydantic import BaseModel
+
+
+class Color(str, Enum):
+    RED = "red"
+    BLUE = "blue"
+
+
+class Item(BaseModel):
+    name: str
+    color: Color
+
+
+class Payload(BaseModel):
+    title: str
+    count: int
+    tags: List[str] = []
+    item: Optional[Item] = None
+
+
+@pytest.mark.unit
+class TestLocalRepair:
+
+    @pytest.mark.parametrize("raw", [
+        'Here you go:\n```json\n{"title": "a", "count": 2,}\n```',
+        'Sure! {"title": "a", "count": 2} Let me know if you need more.',
+        '{"title": "a", "count": 2, "tags": ["x", "y"',
+        '{"title": "a", "count": "2", "tags": ["x"], "item": {"name": "n", "color": "RED"}',
+        '{"result": {"Title": "a", "COUNT": 2, "tags": "x"}}',
+        "[{'title': 'a'}]".replace("'", '"')[:-2] + ', "count": 2}]',
+        '{"title": "a", "count": 2, "item": {"name": "n", "color": "blue", }, "tags": ["unterminated',
+    ])
+    def test_repairs_common_model_mistakes(self, raw):
+        """Test fences, prose, trailing commas, truncation, wrappers and type drift are fixed locally."""
+        from ai.graph.parser.repair import local_repair
+
+        repaired = local_repair(raw, Payload)
+
+        assert repaired is not None
+        assert repaired.title == "a"
+        assert repaired.count == 2
+
+    def test_balances_and_coerces(self):
+        """Test the individual repair steps."""
+        from ai.graph.parser.repair import balance_json, coerce_to_schema
+
+        assert balance_json('{"a": [1, 2,], "b": True, "c": "x') == '{"a": [1, 2], "b": true, "c": "x"}'
+        assert balance_json('{"a": {"b":') == '{"a": {"b": null}}'
+        assert coerce_to_schema({"title": 5, "count": 1, "tags": 3}, Payload) == {
+            "title": "5", "count": 1, "tags": ["3"]
+        }
+
+    def test_gives_up_on_unrecoverable_output(self):
+        """Test local repair returns None so the LLM tier can take over."""
+        from ai.graph.parser.repair import local_repair
+
+        assert local_repair("I cannot answer that.", Payload) is None
+        assert local_repair('{"title": "a"}', Payload) is None
+
+    def test_fixing_parser_tiers_and_counters(self):
+        """Test the LLM repair only runs when local repair fails, and both are counted."""
+        from infrastructure.metrics import MetricsRegistry
+
+        with patch("ai.graph.services.llm.ChatOpenAI", return_value=Mock()):
+            from ai.graph.parser.fix import FixingParser
+            parser = FixingParser()
+
+        registry = MetricsRegistry()
+        registry.reset()
+        # Keep the real pydantic parser, stub out the LLM round trip
+        llm_parser = Mock(parser=parser._get_or_build_parser(Payload).parser)
+        llm_parser.parse = Mock(return_value=Payload(title="llm", count=1))
+        parser._parsers[Payload] = llm_parser
+
+        assert parser.parse_to_model('{"title": "a", "count": 1}', Payload).title == "a"
+        assert parser.parse_to_model('```json\n{"title": "a", "count": 1,}\n```', Payload).title == "a"
+        llm_parser.parse.assert_not_called()
+
+        assert parser.parse_to_model("no json here", Payload).title == "llm"
+        llm_parser.parse.assert_called_once()
+
+        assert registry.get_counter("parser.parsed") == 1
+        assert registry.get_counter("parser.repair.local") == 1
+        assert registry.get_counter("parser.repair.llm") == 1
+        assert registry.get_gauge("parser.repair.local_share") == 0.5
@@ -0,0 +1,116 @@
+"""Tests for the LLM record/replay cassette."""
+import json
+
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+
+
+@pytest.fixture(autouse=True)
+def cassette_env(monkeypatch, tmp_path):
+    from ai.graph.services.cache import Cassette, ResponseCache
+
+    monkeypatch.setenv("LLM_RESPONSE_CACHE_BACKEND", "off")
+    monkeypatch.setenv("LLM_CASSETTE_PATH", str(tmp_path / "traffic.jsonl"))
+    Cassette.reset_shared()
+    ResponseCache.reset_shared()
+    yield tmp_path / "traffic.jsonl"
+    Cassette.reset_shared()
+    ResponseCache.reset_shared()
+
+
+def confirmation(intent="confirm"):
+    from ai.graph.models.conversational_qa import AppointmentConfirmationResponse
+
+    return AppointmentConfirmationResponse(
+        intent=intent, confidence=0.9, reasoning="recorded", extracted_concerns=""
+    )
+
+
+def use_mode(monkeypatch, mode):
+    from ai.graph.services.cache import Cassette
+
+    Cassette.reset_shared()
+    monkeypatch.setenv("LLM_CASSETTE_MODE", mode)
+
+
+@pytest.mark.unit
+class TestCassette:
+    """Test cases for Cassette, CassetteIndex and their use in LLMService."""
+
+    @pytest.mark.asyncio
+    async def test_record_then_replay_without_network(self, monkeypatch, mock_openai_llm, cassette_env):
+        """Test that recorded responses are replayed by prompt hash and unknown prompts miss."""
+        from ai.graph.services.conversational_qa import ProcessConfirmationService
+        from ai.graph.types.conversational_qa import ConfirmationIntent
+
+        use_mode(monkeypatch, "record")
+        recorder = ProcessConfirmationService()
+        runnable = Mock()
+        runnable.invoke = Mock(return_value=confirmation("confirm"))
+        runnable.ainvoke = AsyncMock(return_value=confirmation("reject"))
+        with patch.object(recorder, "build_structured_chain", return_value=runnable):
+            recorder.run(user_message="I guess that is fine by me")
+            await recorder.arun(user_message="hmm, I would rather keep it after all")
+
+        lines = [json.loads(line) for line in cassette_env.read_text().splitlines()]
+        assert [line["service"] for line in lines] == ["ProcessConfirmationService"] * 2
+        assert lines[0]["messages"][-1] == ["human", "I guess that is fine by me"]
+
+        use_mode(monkeypatch, "replay")
+        replayer = ProcessConfirmationService()
+        offline = Mock()
+        offline.invoke = Mock(side_effect=AssertionError("network call in replay mode"))
+        offline.ainvoke = AsyncMock(side_effect=AssertionError("network call in replay mode"))
+        with patch.object(replayer, "build_structured_chain", return_value=offline):
+            first = await replayer.arun(user_message="I guess that is fine by me")
+            second = replayer.run(user_message="hmm, I would rather keep it after all")
+            missing = replayer.run(user_message="something never recorded")
+
+        assert (first.intent, second.intent) == (ConfirmationIntent.CONFIRM, ConfirmationIntent.REJECT)
+        assert missing.intent == ConfirmationIntent.UNCLEAR
+        offline.invoke.assert_not_called()
+        offline.ainvoke.assert_not_called()
+
+    def test_replay_raises_on_miss(self, monkeypatch, mock_openai_llm):
+        """Test that a missing prompt raises CassetteMiss from the LLMService chokepoint."""
+        from ai.graph.services.cache import CassetteMiss
+        from ai.graph.services.conversational_qa import IntentService
+        from ai.graph.states.conversational_qa import StateKeys
+
+        use_mode(monkeypatch, "replay")
+        service = IntentService()
+        chain, inputs = service._build_chain_inputs(state={StateKeys.USER_MESSAGE: "hello"})
+
+        with pytest.raises(CassetteMiss):
+            service.invoke_chain(chain, inputs)
+
+    def test_index_lookup_at_scale_and_latest_wins(self, tmp_path):
+        """Test that the mmap index finds every key, prefers the latest line and rebuilds after appends."""
+        import hashlib
+        from ai.graph.services.cache import CassetteIndex
+
+        cassette = tmp_path / "big.jsonl"
+        keys = [hashlib.sha256(str(i).encode()).hexdigest() for i in range(20000)]
+        with open(cassette, "w") as f:
+            for i, key in enumerate(keys):
+                f.write(json.dumps({"key": key, "response": {"n": i}}) + "\n")
+            f.write(json.dumps({"key": keys[7], "response": {"n": "latest"}}) + "\n")
+
+        def read(index, key):
+            with open(cassette, "rb") as f:
+                f.seek(index.lookup(key))
+                return json.loads(f.readline())["response"]["n"]
+
+        index = CassetteIndex(str(cassette) + ".idx", str(cassette)).open()
+        assert index.count == 20000
+        assert all(read(index, key) == i for i, key in list(enumerate(keys))[::997] if i != 7)
+        assert read(index, keys[7]) == "latest"
+        assert index.lookup(hashlib.sha256(b"absent").hexdigest()) is None
+        index.close()
+
+        new_key = hashlib.sha256(b"appended").hexdigest()
+        with open(cassette, "a") as f:
+            f.write(json.dumps({"key": new_key, "response": {"n": "new"}}) + "\n")
+        index = CassetteIndex(str(cassette) + ".idx", str(cassette)).open()
+        assert read(index, new_key) == "new"
+        index.close()
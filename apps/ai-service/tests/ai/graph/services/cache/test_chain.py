@@ -0,0 +1,61 @@
+"""Tests for the compiled chain cache."""
+import threading
+import pytest
+
+
+@pytest.mark.unit
+class TestChainCache:
+    """Test cases for ChainCache and LLMService.get_structured_chain."""
+
+    def test_intent_variants_are_built_once(self, mock_openai_llm):
+        """Test that the verified/unverified intent chains are prebuilt and then reused."""
+        from ai.graph.services.conversational_qa.intent import IntentService
+
+        service = IntentService()
+        service.prewarm()
+        verified = service._get_chain(is_verified=True)
+        unverified = service._get_chain(is_verified=False)
+
+        assert len(service.chain_cache) == 2
+        assert verified is service._get_chain(is_verified=True)
+        assert verified is not unverified
+        assert {key.variant for key in service.chain_cache.keys()} == {"verified", "unverified"}
+
+    def test_variants_render_different_prompts(self, mock_openai_llm):
+        """Test that only the unverified prompt carries the verification instructions."""
+        from ai.graph.services.conversational_qa.intent import IntentService
+        from ai.graph.prompts.templates.conversational_qa import ConversationalQAMessages
+
+        service = IntentService()
+        inputs = {"intent_list": "- GENERAL_QA", "user_message": "hi"}
+
+        verified = service._get_chain(is_verified=True).template.format(**inputs)
+        unverified = service._get_chain(is_verified=False).template.format(**inputs)
+
+        marker = ConversationalQAMessages.verification_instruction_system.strip()[:40]
+        assert marker in unverified
+        assert marker not in verified
+
+    def test_concurrent_prompt_builds_do_not_mix_messages(self, mock_openai_llm):
+        """Test that parallel build_prompt_template calls each get exactly their own two messages."""
+        from ai.graph.services.llm import LLMService
+
+        service = LLMService()
+        results = []
+
+        def build(i):
+            template = service.build_prompt_template(
+                system_prompt=f"system {i}",
+                human_prompt=f"human {i}",
+            )
+            results.append((i, template))
+
+        threads = [threading.Thread(target=build, args=(i,)) for i in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        for i, template in results:
+            rendered = [m.prompt.template for m in template.messages]
+            assert rendered == [f"system {i}", f"human {i}"]
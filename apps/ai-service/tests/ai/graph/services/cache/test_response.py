@@ -0,0 +1,129 @@
+"""Tests for the deterministic LLM response cache."""
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache(monkeypatch):
+    from ai.graph.services.cache import ResponseCache
+
+    monkeypatch.setenv("LLM_RESPONSE_CACHE_BACKEND", "memory")
+    ResponseCache.reset_shared()
+    yield
+    ResponseCache.reset_shared()
+
+
+def make_confirmation():
+    from ai.graph.models.conversational_qa import AppointmentConfirmationResponse
+    from ai.graph.types.conversational_qa import ConfirmationIntent
+
+    return AppointmentConfirmationResponse(
+        intent=ConfirmationIntent.CONFIRM,
+        confidence=0.97,
+        reasoning="User said yes",
+        extracted_concerns=""
+    )
+
+
+def service_with_mock_chain(temp=0.0):
+    from ai.graph.services.conversational_qa.process_confirmation import ProcessConfirmationService
+
+    service = ProcessConfirmationService(temp=temp)
+    runnable = Mock()
+    runnable.invoke = Mock(return_value=make_confirmation())
+    runnable.ainvoke = AsyncMock(return_value=make_confirmation())
+    return service, runnable
+
+
+@pytest.mark.unit
+class TestResponseCache:
+    """Test cases for ResponseCache and its use in LLMService."""
+
+    def test_repeated_input_is_served_from_cache(self, mock_openai_llm):
+        """Test that an identical temp-0 call skips the LLM and a different input does not."""
+        from infrastructure.metrics import MetricsRegistry
+
+        service, runnable = service_with_mock_chain()
+        metrics = MetricsRegistry()
+        hits_before = metrics.get_counter("llm.response_cache.hits.ProcessConfirmationService")
+
+        with patch.object(service, "build_structured_chain", return_value=runnable):
+            first = service.run(user_message="I suppose that works for me")
+            second = service.run(user_message="I suppose that works for me")
+            service.run(user_message="no, cancel it")
+
+        assert second == first
+        assert runnable.invoke.call_count == 2
+        assert metrics.get_counter("llm.response_cache.hits.ProcessConfirmationService") == hits_before + 1
+
+    @pytest.mark.asyncio
+    async def test_async_path_shares_the_cache(self, mock_openai_llm):
+        """Test that a sync-populated entry is served to the async path."""
+        service, runnable = service_with_mock_chain()
+
+        with patch.object(service, "build_structured_chain", return_value=runnable):
+            service.run(user_message="fine by me as long as it is after lunch")
+            result = await service.arun(user_message="fine by me as long as it is after lunch")
+
+        assert result.intent == make_confirmation().intent
+        runnable.ainvoke.assert_not_called()
+
+    def test_non_zero_temperature_is_never_cached(self, mock_openai_llm):
+        """Test that opting in at temp > 0 leaves caching disabled."""
+        service, runnable = service_with_mock_chain(temp=0.3)
+
+        with patch.object(service, "build_structured_chain", return_value=runnable):
+            service.run(user_message="I suppose that works for me")
+            service.run(user_message="I suppose that works for me")
+
+        assert service.response_cache is None
+        assert runnable.invoke.call_count == 2
+
+    def test_generators_do_not_opt_in(self, mock_openai_llm):
+        """Test that QA answers and clarifications are not cached."""
+        from ai.graph.services.conversational_qa import ClarificationService, QAAnswerService
+
+        assert QAAnswerService(temp=0.0).response_cache is None
+        assert ClarificationService().response_cache is None
+
+    def test_memory_backend_lru_and_ttl(self):
+        """Test that the in-process backend evicts least recently used and expired entries."""
+        from ai.graph.services.cache import InMemoryResponseBackend
+
+        backend = InMemoryResponseBackend(max_entries=2, ttl_seconds=60)
+        backend.set("a", "1")
+        backend.set("b", "2")
+        backend.get("a")
+        backend.set("c", "3")
+
+        assert backend.get("b") is None
+        assert backend.get("a") == "1"
+
+        expired = InMemoryResponseBackend(max_entries=2, ttl_seconds=-1)
+        expired.set("a", "1")
+        assert expired.get("a") is None
+
+    def test_persistent_hit_is_promoted_to_memory(self):
+        """Test that a shared-backend hit is decoded and copied into the local LRU."""
+        from ai.graph.services.cache import InMemoryResponseBackend, ResponseCache
+        from ai.graph.models.conversational_qa import AppointmentConfirmationResponse
+
+        persistent = Mock()
+        persistent.get = Mock(return_value=make_confirmation().model_dump_json())
+        memory = InMemoryResponseBackend(max_entries=10, ttl_seconds=60)
+        cache = ResponseCache(memory=memory, persistent=persistent)
+
+        result = cache.get("k", AppointmentConfirmationResponse, "ProcessConfirmationService")
+
+        assert result == make_confirmation()
+        assert memory.get("k") is not None
+
+    def test_backend_off_disables_cache(self, monkeypatch, mock_openai_llm):
+        """Test that LLM_RESPONSE_CACHE_BACKEND=off turns caching off for every service."""
+        from ai.graph.services.cache import ResponseCache
+
+        monkeypatch.setenv("LLM_RESPONSE_CACHE_BACKEND", "off")
+        ResponseCache.reset_shared()
+        service, _ = service_with_mock_chain()
+
+        assert service.response_cache is None
@@ -21,6 +21,19 @@ TEST_PHONE = "555-1234"
 TEST_DOB = "1990-01-01"
 TEST_SESSION_ID = "test-session-789"
 
+@pytest.fixture(autouse=True)
+def reset_shared_llm_state():
+    """Start every test with a closed LLM circuit and a fresh limiter; both are shared process-wide."""
+    from ai.graph.services.limiter import AdaptiveLimiter
+    from ai.graph.services.resilience import CircuitBreaker
+
+    CircuitBreaker.reset()
+    AdaptiveLimiter.reset_shared()
+    yield
+    CircuitBreaker.reset()
+    AdaptiveLimiter.reset_shared()
+
+
 @pytest.fixture
 def mock_openai_llm():
     """Mock ChatOpenAI instance for testing LLM services.
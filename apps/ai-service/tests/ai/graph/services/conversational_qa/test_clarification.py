@@ -0,0 +1,116 @@
+"""Tests for the template-first ClarificationService."""
+import pytest
+from unittest.mock import patch
+
+from ..conftest import DEFAULT_MODEL
+
+USER_REASONS = [
+    ("no_info_provided", ["full_name", "phone_number", "date_of_birth"], []),
+    ("incomplete_info", ["date_of_birth"], []),
+    ("user_not_found", [], ["full_name", "phone_number", "date_of_birth"]),
+    ("multiple_fields_incorrect", [], ["phone_number", "date_of_birth"]),
+    ("single_field_incorrect", [], ["date_of_birth"]),
+    ("no_complete_match", [], []),
+]
+APPOINTMENT_REASONS = [
+    ("no_appointments", ["doctor_full_name", "clinic_name", "appointment_date", "specialty"], []),
+    ("no_info_provided", ["doctor_full_name", "clinic_name", "appointment_date", "specialty"], []),
+    ("incomplete_info", ["clinic_name", "appointment_date", "specialty"], []),
+    ("no_matches", [], ["doctor_full_name", "appointment_date"]),
+    ("single_field_mismatch", [], ["appointment_date"]),
+    ("partial_match", [], ["clinic_name", "specialty"]),
+    ("no_complete_match", [], []),
+    ("match_not_found_in_list", [], []),
+    ("unknown_intent", [], []),
+]
+
+
+@pytest.mark.unit
+class TestClarificationService:
+    """Test cases for the template, cached and rich clarification modes."""
+
+    def setup_method(self):
+        from infrastructure.metrics import MetricsRegistry
+        MetricsRegistry().reset()
+
+    def _diagnostic(self, reason, missing, incorrect):
+        return {"reason": reason, "missing_fields": missing, "likely_incorrect": incorrect, "message": "raw"}
+
+    def test_templates_cover_every_diagnostic_reason(self, mock_openai_llm):
+        """Test that template mode answers every reason the verification nodes produce without the LLM."""
+        from ai.graph.services.conversational_qa import ClarificationService
+        from infrastructure.metrics import MetricsRegistry
+
+        service = ClarificationService(model=DEFAULT_MODEL)
+        assert service.mode == ClarificationService.TEMPLATE
+
+        with patch.object(service, "invoke_chain", side_effect=AssertionError("no LLM in template mode")):
+            for reason, missing, incorrect in USER_REASONS:
+                assert reason in ClarificationService.USER_TEMPLATES
+                text = service.user_run(diagnostic_info=self._diagnostic(reason, missing, incorrect))
+                assert text and "{" not in text and text != "raw"
+            for reason, missing, incorrect in APPOINTMENT_REASONS:
+                assert reason in ClarificationService.APPOINTMENT_TEMPLATES
+                text = service.appointment_run(diagnostic_info=self._diagnostic(reason, missing, incorrect))
+                assert text and "{" not in text and text != "raw"
+
+        assert service.user_run(diagnostic_info=self._diagnostic("single_field_incorrect", [], ["date_of_birth"])) == (
+            "Most of your details match our records, but your date of birth doesn't. "
+            "Could you double-check your date of birth?"
+        )
+        assert service.appointment_run(
+            diagnostic_info=self._diagnostic("incomplete_info", ["clinic_name", "appointment_date"], [])
+        ) == "Could you tell me a bit more about the appointment, such as the clinic name or appointment date?"
+        assert MetricsRegistry().get_counter("clarification.source.template") == len(USER_REASONS) + len(APPOINTMENT_REASONS) + 2
+
+    @pytest.mark.asyncio
+    async def test_cached_mode_words_each_signature_once(self, monkeypatch, mock_openai_llm):
+        """Test that cached mode calls the LLM once per signature, without patient values, across sync and async."""
+        from ai.graph.models.conversational_qa import ClarificationPromptModel, VerificationInfoModel
+        from ai.graph.services.conversational_qa import ClarificationService
+
+        monkeypatch.setenv("LLM_CLARIFICATION_MODE", "cached")
+        service = ClarificationService(model=DEFAULT_MODEL)
+        prompts = []
+
+        def invoke_chain(chain, inputs):
+            prompts.append(inputs)
+            return ClarificationPromptModel(clarification_prompt=f"Please check your {inputs['diagnostic_summary'][:20]}")
+
+        async def ainvoke_chain(chain, inputs):
+            return invoke_chain(chain, inputs)
+
+        diagnostic = self._diagnostic("single_field_incorrect", [], ["date_of_birth"])
+        with patch.object(service, "invoke_chain", side_effect=invoke_chain), \
+                patch.object(service, "ainvoke_chain", side_effect=ainvoke_chain):
+            first = service.user_run(
+                verification_info=VerificationInfoModel(full_name="Jane Roe", phone_number="+15551234567", date_of_birth="1990-01-01"),
+                diagnostic_info=diagnostic
+            )
+            second = await service.auser_run(
+                verification_info=VerificationInfoModel(full_name="John Doe", phone_number="+15557654321", date_of_birth="1980-02-02"),
+                diagnostic_info=dict(diagnostic, likely_incorrect=["date_of_birth", "date_of_birth"])
+            )
+            other = service.user_run(diagnostic_info=self._diagnostic("incomplete_info", ["phone_number"], []))
+
+        assert first == second
+        assert other != first
+        assert len(prompts) == 2
+        assert not any("Jane" in str(value) or "1990" in str(value) for value in prompts[0].values())
+
+    def test_rich_mode_calls_the_llm_every_time(self, monkeypatch, mock_openai_llm):
+        """Test that rich mode keeps the per-turn LLM wording and falls back to the diagnostic message on error."""
+        from ai.graph.models.conversational_qa import ClarificationPromptModel
+        from ai.graph.services.conversational_qa import ClarificationService
+
+        monkeypatch.setenv("LLM_CLARIFICATION_MODE", "rich")
+        service = ClarificationService(model=DEFAULT_MODEL)
+        diagnostic = self._diagnostic("no_matches", [], ["doctor_full_name"])
+
+        with patch.object(service, "invoke_chain", return_value=ClarificationPromptModel(clarification_prompt="LLM")) as invoke:
+            assert service.appointment_run(diagnostic_info=diagnostic) == "LLM"
+            assert service.appointment_run(diagnostic_info=diagnostic) == "LLM"
+        assert invoke.call_count == 2
+
+        with patch.object(service, "invoke_chain", side_effect=RuntimeError("provider down")):
+            assert service.appointment_run(diagnostic_info=diagnostic) == "raw"
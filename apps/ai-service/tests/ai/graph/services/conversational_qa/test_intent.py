@@ -0,0 +1,51 @@
+"""Tests for the conversational IntentService."""
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+
+from ..conftest import DEFAULT_MODEL, LOW_TEMPERATURE
+
+
+@pytest.mark.unit
+class TestConversationalIntentService:
+    """Test cases for the sync and async IntentService entry points."""
+
+    def _intent(self, intent_type):
+        from ai.graph.models.conversational_qa import ConversationIntentModel, UserIntentModel
+
+        return ConversationIntentModel(
+            user_intent=UserIntentModel(intent_type=intent_type, confidence=0.9),
+            raw_query="What are your hours?"
+        )
+
+    @pytest.mark.asyncio
+    async def test_arun_awaits_chain(self, mock_openai_llm):
+        """Test that arun goes through the async chain invocation."""
+        from ai.graph.services.conversational_qa.intent import IntentService
+        from ai.graph.types.conversational_qa import IntentType
+
+        service = IntentService(model=DEFAULT_MODEL, temp=LOW_TEMPERATURE)
+        mock_chain = Mock()
+        mock_chain.ainvoke = AsyncMock(return_value=self._intent(IntentType.GENERAL_QA))
+
+        with patch.object(service, "build_structured_chain", return_value=mock_chain):
+            result = await service.arun({"user_message": "What are your hours?"})
+
+        assert result.user_intent.intent_type == IntentType.GENERAL_QA
+        mock_chain.ainvoke.assert_awaited_once()
+        mock_chain.invoke.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_arun_returns_fallback_on_error(self, mock_openai_llm):
+        """Test that arun falls back to GENERAL_QA when the chain fails."""
+        from ai.graph.services.conversational_qa.intent import IntentService
+        from ai.graph.types.conversational_qa import IntentType
+
+        service = IntentService(model=DEFAULT_MODEL, temp=LOW_TEMPERATURE)
+        mock_chain = Mock()
+        mock_chain.ainvoke = AsyncMock(side_effect=RuntimeError("provider down"))
+
+        with patch.object(service, "build_structured_chain", return_value=mock_chain):
+            result = await service.arun({"user_message": "hello"})
+
+        assert result.user_intent.intent_type == IntentType.GENERAL_QA
+        assert result.user_intent.confidence == 0.0
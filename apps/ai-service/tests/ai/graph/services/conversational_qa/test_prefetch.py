@@ -0,0 +1,131 @@
+import threading
+from unittest.mock import Mock
+
+import pytest
+
+
+@pytest.mark.unit
+class TestSpeculativePrefetch:
+
+    def setup_method(self):
+        from infrastructure.metrics import MetricsRegistry
+        MetricsRegistry().reset()
+
+    def test_detects_phone_and_date_of_birth(self):
+        """Test the regex pass normalises what the intent prompt asks the LLM to extract."""
+        from ai.graph.services.conversational_qa.prefetch import detect_date_of_birth, detect_phone
+
+        assert detect_phone("call me at (555) 123-4567 please") == "+15551234567"
+        assert detect_phone("my number is +44 20 7946 0958") == "+442079460958"
+        assert detect_phone("appointment 12 on 2024-05-01") is None
+        assert detect_date_of_birth("born 03/14/1985") == "1985-03-14"
+        assert detect_date_of_birth("dob 1985-3-14") == "1985-03-14"
+        assert detect_date_of_birth("on 2024-02-30") is None
+        assert detect_date_of_birth("no date here") is None
+
+    def test_patient_lookup_runs_during_intent_call(self):
+        """Test the patient lookup overlaps the intent call and is used by VerificationPatientNode."""
+        from ai.graph.models.conversational_qa import VerificationInfoModel
+        from ai.graph.nodes.conversational_qa import ConversationManagerNode, VerificationPatientNode
+        from ai.graph.services.conversational_qa import SpeculativePrefetcher
+        from ai.graph.states.conversational_qa import StateKeys
+        from ai.graph.types.conversational_qa import IntentType, Routes
+        from infrastructure.metrics import MetricsRegistry
+
+        lookup_started = threading.Event()
+        query_orm = Mock()
+
+        def find_user(user_info):
+            lookup_started.set()
+            return [{
+                "id": "p-1",
+                "full_name": user_info.full_name,
+                "phone_number": user_info.phone_number,
+                "date_of_birth": user_info.date_of_birth,
+            }]
+
+        query_orm.find_user = Mock(side_effect=find_user)
+        prefetcher = SpeculativePrefetcher(query_orm_service=query_orm)
+
+        def classify(state):
+            # The lookup was started before the LLM call and runs while it is in flight
+            assert lookup_started.wait(timeout=2)
+            return Mock(
+                user_intent=Mock(intent_type=IntentType.USER_INFORMATION),
+                verification_info=VerificationInfoModel(phone_number="+15551234567", date_of_birth="1985-03-14"),
+                appointment_info=None
+            )
+
+        manager = ConversationManagerNode(intent_service=Mock(run=Mock(side_effect=classify)), prefetcher=prefetcher)
+        patient_node = VerificationPatientNode(query_orm_service=query_orm, prefetcher=prefetcher)
+
+        state = {
+            StateKeys.SESSION_ID: "s-1",
+            StateKeys.USER_MESSAGE: "it's 555-123-4567, born 03/14/1985",
+            StateKeys.USER_INFO: VerificationInfoModel(full_name="Ana Smith"),
+            StateKeys.CURRENT_INTENT: IntentType.LIST_APPOINTMENTS,
+        }
+        state = patient_node(manager(state))
+
+        assert state[StateKeys.ROUTE] == Routes.VERIFIED
+        assert query_orm.find_user.call_count == 1
+        assert MetricsRegistry().get_counter("graph.prefetch.user.used") == 1
+        prefetcher.close()
+
+    def test_mismatched_or_unneeded_results_are_discarded(self):
+        """Test prefetched results are dropped when the LLM extracted other details or the turn didn't need them."""
+        from ai.graph.models.conversational_qa import VerificationInfoModel
+        from ai.graph.services.conversational_qa import SpeculativePrefetcher
+        from infrastructure.metrics import MetricsRegistry
+
+        query_orm = Mock()
+        query_orm.find_user = Mock(return_value=[])
+        prefetcher = SpeculativePrefetcher(query_orm_service=query_orm)
+        known = VerificationInfoModel(full_name="Ana Smith")
+
+        prefetcher.start_turn("s-1", "555-123-4567 born 1985-03-14", False, known, None, [])
+        extracted = VerificationInfoModel(full_name="Ana Smith", phone_number="+15559999999", date_of_birth="1985-03-14")
+        assert prefetcher.take_user("s-1", extracted) == (False, None)
+
+        prefetcher.start_turn("s-1", "555-123-4567 born 1985-03-14", False, known, None, [])
+        prefetcher.start_turn("s-1", "what are your opening hours?", False, known, None, [])
+
+        # Without a name the lookup can't be complete, so nothing is started
+        prefetcher.start_turn("s-2", "555-123-4567 born 1985-03-14", False, None, None, [])
+
+        registry = MetricsRegistry()
+        assert registry.get_counter("graph.prefetch.user.started") == 2
+        assert registry.get_counter("graph.prefetch.user.wasted") == 2
+        assert registry.get_counter("graph.prefetch.user.used") == 0
+        prefetcher.close()
+
+    @pytest.mark.asyncio
+    async def test_appointment_reload_for_verified_session(self):
+        """Test verified sessions reload appointments alongside the intent call and the node reuses them."""
+        from ai.graph.models.conversational_qa import VerificationRecordModel
+        from ai.graph.nodes.conversational_qa import VerificationAppointmentNode
+        from ai.graph.services.conversational_qa import SpeculativePrefetcher
+        from ai.graph.states.conversational_qa import StateKeys
+
+        appointments = [{"appointment_id": "12"}]
+        query_orm = Mock()
+        query_orm.find_appointments_by_patient_id = Mock(return_value=appointments)
+        prefetcher = SpeculativePrefetcher(query_orm_service=query_orm)
+        record = VerificationRecordModel(user_id="u-1")
+
+        prefetcher.start_turn("s-1", "list my appointments", True, None, record, [])
+        node = VerificationAppointmentNode(
+            query_orm_service=query_orm,
+            appointment_match_service=Mock(),
+            prefetcher=prefetcher
+        )
+        state = {StateKeys.SESSION_ID: "s-1"}
+
+        assert node._load_appointments(state, record) == appointments
+        assert state[StateKeys.APPOINTMENTS] == appointments
+        query_orm.find_appointments_by_patient_id.assert_called_once_with(patient_id="u-1")
+
+        # Already loaded: nothing to reload
+        prefetcher.start_turn("s-1", "list my appointments", True, None, record, appointments)
+        assert query_orm.find_appointments_by_patient_id.call_count == 1
+        prefetcher.close()
@@ -0,0 +1,106 @@
+"""Tests for the rule-based confirmation fast path."""
+import pytest
+from unittest.mock import Mock, patch
+
+
+@pytest.mark.unit
+class TestConfirmationRuleClassifier:
+    """Test cases for ConfirmationRuleClassifier."""
+
+    @pytest.mark.parametrize("message", [
+        "yes", "Y", "Yes, please!", "ok sure", "sim", "Sí, por supuesto", "oui", "\U0001F44D",
+    ])
+    def test_unambiguous_confirmations(self, message):
+        """Test that short affirmative replies in several languages confirm."""
+        from ai.graph.services.conversational_qa import ConfirmationRuleClassifier
+        from ai.graph.types.conversational_qa import ConfirmationIntent
+
+        result = ConfirmationRuleClassifier().classify(message)
+
+        assert result.intent == ConfirmationIntent.CONFIRM
+        assert result.confidence >= 0.95
+
+    @pytest.mark.parametrize("message", ["no", "Nope.", "não", "no gracias", "never mind, thanks"])
+    def test_unambiguous_rejections(self, message):
+        """Test that short negative replies reject."""
+        from ai.graph.services.conversational_qa import ConfirmationRuleClassifier
+        from ai.graph.types.conversational_qa import ConfirmationIntent
+
+        assert ConfirmationRuleClassifier().classify(message).intent == ConfirmationIntent.REJECT
+
+    @pytest.mark.parametrize("message", [
+        "yes but can we move it to Friday?",
+        "yes no",
+        "what time was it again?",
+        "",
+    ])
+    def test_ambiguous_replies_fall_through(self, message):
+        """Test that mixed, conditional or unknown replies are left to the LLM."""
+        from ai.graph.services.conversational_qa import ConfirmationRuleClassifier
+
+        assert ConfirmationRuleClassifier().classify(message) is None
+
+    def test_menu_commands_depend_on_pending_action(self):
+        """Test that "cancel" confirms a pending cancellation but is ambiguous otherwise."""
+        from ai.graph.services.conversational_qa import ConfirmationRuleClassifier
+        from ai.graph.types.conversational_qa import ConfirmationIntent, IntentType
+
+        classifier = ConfirmationRuleClassifier()
+
+        assert classifier.classify("cancel it", IntentType.CANCEL_APPOINTMENT).intent == ConfirmationIntent.CONFIRM
+        assert classifier.classify("Confirmar", IntentType.CONFIRM_APPOINTMENT).intent == ConfirmationIntent.CONFIRM
+        assert classifier.classify("cancel", IntentType.CONFIRM_APPOINTMENT) is None
+        assert classifier.classify("cancel") is None
+
+
+@pytest.mark.unit
+class TestProcessConfirmationFastPath:
+    """Test cases for the fast path inside ProcessConfirmationService."""
+
+    def test_fast_path_skips_llm_and_records_metrics(self, mock_openai_llm):
+        """Test that a rule hit never builds or invokes the chain."""
+        from ai.graph.services.conversational_qa import ProcessConfirmationService
+        from ai.graph.types.conversational_qa import ConfirmationIntent
+        from infrastructure.metrics import MetricsRegistry
+
+        metrics = MetricsRegistry()
+        hits_before = metrics.get_counter("confirmation.fast_path.hits")
+        service = ProcessConfirmationService()
+
+        with patch.object(service, "invoke_chain") as invoke_chain:
+            result = service.run(user_message="yes please")
+
+        invoke_chain.assert_not_called()
+        assert result.intent == ConfirmationIntent.CONFIRM
+        assert metrics.get_counter("confirmation.fast_path.hits") == hits_before + 1
+        assert metrics.get_gauge("confirmation.fast_path.hit_rate") is not None
+
+    @pytest.mark.asyncio
+    async def test_unclear_reply_falls_through_to_llm(self, mock_openai_llm):
+        """Test that a reply the rules cannot decide goes to the LLM."""
+        from ai.graph.services.conversational_qa import ProcessConfirmationService
+        from ai.graph.models.conversational_qa import AppointmentConfirmationResponse
+        from ai.graph.types.conversational_qa import ConfirmationIntent
+
+        llm_result = AppointmentConfirmationResponse(
+            intent=ConfirmationIntent.REJECT, confidence=0.8, reasoning="", extracted_concerns="wants Friday"
+        )
+        service = ProcessConfirmationService()
+
+        with patch.object(service, "ainvoke_chain", return_value=llm_result) as ainvoke_chain:
+            result = await service.arun(user_message="can we do Friday instead?")
+
+        ainvoke_chain.assert_called_once()
+        assert result == llm_result
+
+    def test_fast_path_can_be_disabled(self, monkeypatch, mock_openai_llm):
+        """Test that CONFIRMATION_FAST_PATH_ENABLED=false always calls the LLM."""
+        from ai.graph.services.conversational_qa import ProcessConfirmationService
+
+        monkeypatch.setenv("CONFIRMATION_FAST_PATH_ENABLED", "false")
+        service = ProcessConfirmationService()
+
+        with patch.object(service, "invoke_chain", return_value=Mock()) as invoke_chain:
+            service.run(user_message="yes")
+
+        invoke_chain.assert_called_once()
@@ -0,0 +1,185 @@
+"""Tests for the fused turn understanding mode."""
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+
+from ..conftest import DEFAULT_MODEL, LOW_TEMPERATURE
+
+APPOINTMENTS = [
+    {
+        "id": 11, "starts_at": "2025-10-15 09:00", "status": "scheduled",
+        "provider": {"full_name": "Dr. Ana Smith", "specialty": "Cardiology"},
+        "clinic": {"name": "North Clinic"},
+    },
+    {
+        "id": 12, "starts_at": "2025-10-20 14:00", "status": "scheduled",
+        "provider": {"full_name": "Dr. Ana Smith", "specialty": "Cardiology"},
+        "clinic": {"name": "South Clinic"},
+    },
+]
+
+
+def make_understanding(**overrides):
+    from ai.graph.models.conversational_qa import (
+        AppointmentInfoModel,
+        TurnUnderstandingModel,
+        UserIntentModel,
+    )
+    from ai.graph.types.conversational_qa import IntentType
+
+    values = dict(
+        user_intent=UserIntentModel(intent_type=IntentType.CANCEL_APPOINTMENT, confidence=0.95),
+        appointment_info=AppointmentInfoModel(doctor_full_name="Ana Smith"),
+        candidate_appointment_id="12",
+        candidate_confidence=0.9,
+        clarification_draft="Which date is the appointment you want to cancel?",
+        raw_query="cancel my appointment with Dr Smith next week",
+    )
+    values.update(overrides)
+    return TurnUnderstandingModel(**values)
+
+
+@pytest.fixture(autouse=True)
+def no_response_cache(monkeypatch):
+    from ai.graph.services.cache import ResponseCache
+
+    monkeypatch.setenv("LLM_RESPONSE_CACHE_BACKEND", "off")
+    ResponseCache.reset_shared()
+    yield
+    ResponseCache.reset_shared()
+
+
+@pytest.mark.unit
+class TestTurnUnderstandingService:
+    """Test cases for TurnUnderstandingService and the nodes that consume its result."""
+
+    @pytest.mark.asyncio
+    async def test_prompt_includes_loaded_appointments(self, mock_openai_llm):
+        """Test that one call sees the appointments already in state."""
+        from ai.graph.services.conversational_qa import TurnUnderstandingService
+
+        service = TurnUnderstandingService(model=DEFAULT_MODEL, temp=LOW_TEMPERATURE)
+        mock_chain = Mock()
+        mock_chain.ainvoke = AsyncMock(return_value=make_understanding())
+
+        with patch.object(service, "build_structured_chain", return_value=mock_chain):
+            result = await service.arun({
+                "user_message": "cancel my appointment with Dr Smith next week",
+                "is_verified": True,
+                "appointments": APPOINTMENTS,
+            })
+
+        inputs = mock_chain.ainvoke.call_args.args[0]
+        assert "ID 12" in inputs["appointments_text"]
+        assert result.candidate_appointment_id == "12"
+
+    def test_failure_returns_none(self, mock_openai_llm):
+        """Test that a failed fused call returns None so the pipeline takes over."""
+        from ai.graph.services.conversational_qa import TurnUnderstandingService
+
+        service = TurnUnderstandingService(model=DEFAULT_MODEL, temp=LOW_TEMPERATURE)
+
+        with patch.object(service, "invoke_chain", side_effect=RuntimeError("boom")):
+            assert service.run({"user_message": "hello"}) is None
+
+    def test_manager_uses_fused_result_and_falls_back(self):
+        """Test that ConversationManagerNode skips IntentService unless the fused call fails."""
+        from ai.graph.nodes.conversational_qa import ConversationManagerNode
+        from ai.graph.states.conversational_qa import StateKeys
+        from ai.graph.types.conversational_qa import IntentType, Routes
+
+        intent_service = Mock()
+        fused_service = Mock()
+        fused_service.run = Mock(return_value=make_understanding())
+        node = ConversationManagerNode(
+            intent_service=intent_service,
+            turn_understanding_service=fused_service
+        )
+
+        state = node({"user_message": "cancel my appointment with Dr Smith next week", "is_verified": True})
+
+        intent_service.run.assert_not_called()
+        assert state[StateKeys.CURRENT_INTENT] == IntentType.CANCEL_APPOINTMENT
+        assert state[StateKeys.ROUTE] == Routes.ACTION_APPOINTMENT
+        assert state[StateKeys.APPOINTMENT_INFO].doctor_full_name == "Ana Smith"
+        assert state[StateKeys.TURN_UNDERSTANDING].candidate_appointment_id == "12"
+
+        fused_service.run = Mock(return_value=None)
+        intent_service.run = Mock(return_value=Mock(user_intent=Mock(intent_type=IntentType.GENERAL_QA)))
+        state = node({"user_message": "hi"})
+
+        intent_service.run.assert_called_once()
+        assert state[StateKeys.TURN_UNDERSTANDING] is None
+
+    def test_candidate_replaces_match_llm_call(self, mock_openai_llm):
+        """Test that an ambiguous direct match is resolved by the fused candidate without the LLM."""
+        from ai.graph.models.conversational_qa import AppointmentInfoModel, VerificationRecordModel
+        from ai.graph.nodes.conversational_qa import VerificationAppointmentNode
+        from ai.graph.services.conversational_qa import AppointmentMatchService
+        from ai.graph.states.conversational_qa import StateKeys
+        from ai.graph.types.conversational_qa import IntentType, Routes
+
+        match_service = AppointmentMatchService(query_orm_service=Mock())
+        node = VerificationAppointmentNode(query_orm_service=Mock(), appointment_match_service=match_service)
+        state = {
+            StateKeys.CURRENT_INTENT: IntentType.CANCEL_APPOINTMENT,
+            StateKeys.APPOINTMENT_INFO: AppointmentInfoModel(doctor_full_name="Ana Smith"),
+            StateKeys.APPOINTMENTS: APPOINTMENTS,
+            StateKeys.USER_RECORD: VerificationRecordModel(user_id="u-1"),
+            StateKeys.TURN_UNDERSTANDING: make_understanding(),
+        }
+
+        with patch.object(match_service, "invoke_chain") as invoke_chain:
+            state = node(state)
+
+        invoke_chain.assert_not_called()
+        assert state[StateKeys.ROUTE] == Routes.VERIFIED
+        assert state[StateKeys.APPOINTMENT_RECORD].appointment_id == "12"
+
+    def test_unknown_candidate_falls_back_to_llm(self, mock_openai_llm):
+        """Test that a candidate id outside the loaded list is ignored."""
+        from ai.graph.models.conversational_qa import AppointmentInfoModel, AppointmentMatchModel
+        from ai.graph.services.conversational_qa import AppointmentMatchService
+
+        match_service = AppointmentMatchService(query_orm_service=Mock())
+        llm_match = AppointmentMatchModel(
+            match_found=True, confidence=0.8, matched_appointment_id="11", reasoning="closest"
+        )
+
+        with patch.object(match_service, "invoke_chain", return_value=llm_match) as invoke_chain:
+            result = match_service.run(
+                appointments=APPOINTMENTS,
+                appointment_info=AppointmentInfoModel(doctor_full_name="Ana Smith"),
+                candidate_id="999"
+            )
+
+        invoke_chain.assert_called_once()
+        assert result.matched_appointment_id == "11"
+
+    @pytest.mark.parametrize("reason, uses_draft", [
+        ("incomplete_info", True),
+        ("no_matches", False),
+    ])
+    def test_clarification_draft_only_for_missing_details(self, reason, uses_draft):
+        """Test that the draft replaces the clarification call only when details are missing."""
+        from ai.graph.nodes.conversational_qa import ClarificationNode
+        from ai.graph.states.conversational_qa import StateKeys
+        from ai.graph.types.conversational_qa import Nodes
+
+        clarification_service = Mock()
+        clarification_service.appointment_run = Mock(return_value="LLM clarification")
+        node = ClarificationNode(clarification_service=clarification_service)
+
+        state = node({
+            StateKeys.CURRENT_NODE: Nodes.VERIFICATION_APPOINTMENT,
+            StateKeys.APPOINTMENT_DIAGNOSTICS: {"reason": reason},
+            StateKeys.TURN_UNDERSTANDING: make_understanding(),
+            StateKeys.USER_MESSAGE: "cancel my appointment",
+            StateKeys.MESSAGES: [],
+        })
+
+        reply = state[StateKeys.MESSAGES][-1]["system_message"]
+        if uses_draft:
+            assert reply == make_understanding().clarification_draft
+            clarification_service.appointment_run.assert_not_called()
+        else:
+            assert reply == "LLM clarification"
@@ -0,0 +1,160 @@
+"""Tests for latency-aware provider routing and failover."""
+import asyncio
+import json
+import time
+
+import pytest
+from unittest.mock import Mock, patch
+
+
+@pytest.fixture(autouse=True)
+def router(monkeypatch):
+    from ai.graph.services.cache import ResponseCache
+    from ai.graph.services.providers import ProviderRouter
+
+    monkeypatch.setenv("LLM_ROUTER_EXPLORE_RATE", "0")
+    monkeypatch.setenv("LLM_RESPONSE_CACHE_BACKEND", "off")
+    ProviderRouter.reset()
+    ResponseCache.reset_shared()
+    yield ProviderRouter()
+    ProviderRouter.reset()
+    ResponseCache.reset_shared()
+
+
+class StubBackend:
+    """ Local stand-in for a provider: fixed latency, optionally failing. """
+    def __init__(self, latency, fail=False):
+        self.latency = latency
+        self.fail = fail
+        self.calls = 0
+
+    def __call__(self, *args, **kwargs):
+        self.calls += 1
+        time.sleep(self.latency)
+        if self.fail:
+            raise ConnectionError("backend down")
+        return "ok"
+
+    async def acall(self, *args, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        if self.fail:
+            raise ConnectionError("backend down")
+        return "ok"
+
+
+def stub_backends():
+    from ai.graph.services.providers import LLMBackend
+
+    return LLMBackend("stub", "fast-model", name="fast"), LLMBackend("stub", "slow-model", name="slow")
+
+
+@pytest.mark.unit
+class TestProviderRouter:
+    """Test cases for ProviderRouter and LLMService routing."""
+
+    def test_routes_to_fastest_backend_after_sampling(self, router):
+        """Test that both backends are sampled, then calls go to the lower-latency one."""
+        fast, slow = stub_backends()
+        profiles = {"fast": StubBackend(0.005), "slow": StubBackend(0.03)}
+        call = lambda backend: profiles[backend.name]()
+
+        router.record_success(slow, 0.03)
+        for _ in range(5):
+            router.invoke("Svc", [slow, fast], call)
+
+        assert profiles["fast"].calls == 5
+        assert profiles["slow"].calls == 0
+        assert [backend.name for backend in router.plan([slow, fast])] == ["fast", "slow"]
+
+    def test_unmeasured_backend_is_sampled_first(self, router):
+        """Test that a backend without latency data is tried before measured ones."""
+        fast, slow = stub_backends()
+        router.record_success(fast, 0.001)
+
+        assert router.plan([fast, slow])[0].name == "slow"
+
+    def test_fails_over_and_cools_down_unhealthy_backend(self, router):
+        """Test that errors fail over to the next backend and repeated errors cool the backend down."""
+        from infrastructure.metrics import MetricsRegistry
+
+        fast, slow = stub_backends()
+        router.record_success(fast, 0.001)
+        router.record_success(slow, 0.02)
+        profiles = {"fast": StubBackend(0.0, fail=True), "slow": StubBackend(0.0)}
+        failovers = MetricsRegistry().get_counter("llm.router.failover.Failover")
+
+        results = [router.invoke("Failover", [fast, slow], lambda b: profiles[b.name]()) for _ in range(5)]
+
+        assert results == ["ok"] * 5
+        assert profiles["fast"].calls == router.failure_threshold
+        assert not router.is_healthy(fast)
+        assert router.plan([fast, slow])[0].name == "slow"
+        assert MetricsRegistry().get_counter("llm.router.failover.Failover") == failovers + router.failure_threshold
+        assert router.snapshot()["fast"]["healthy"] is False
+
+    def test_schema_errors_do_not_fail_over(self, router):
+        """Test that an unparseable answer is raised instead of retried on another provider."""
+        from langchain_core.exceptions import OutputParserException
+
+        fast, slow = stub_backends()
+        router.record_success(slow, 0.02)
+        calls = []
+
+        def call(backend):
+            calls.append(backend.name)
+            raise OutputParserException("bad json")
+
+        with pytest.raises(OutputParserException):
+            router.invoke("Schema", [fast, slow], call)
+        assert calls == ["fast"]
+        assert router.is_healthy(fast)
+
+    def test_quality_tier_filters_backends(self, monkeypatch, mock_openai_llm):
+        """Test that services only route to backends meeting their quality tier."""
+        from ai.graph.services.conversational_qa import ProcessConfirmationService, QAAnswerService
+
+        monkeypatch.setenv("LLM_BACKENDS", json.dumps([
+            {"provider": "openai", "model": "gpt-4o-mini", "tier": 1},
+            {"provider": "openai", "model": "gpt-4o", "tier": 2},
+        ]))
+
+        assert [b.name for b in ProcessConfirmationService().backends] == ["openai:gpt-4o-mini", "openai:gpt-4o"]
+        assert [b.name for b in QAAnswerService().backends] == ["openai:gpt-4o"]
+
+        monkeypatch.setenv("LLM_QA_ANSWER_QUALITY_TIER", "3")
+        assert [b.name for b in QAAnswerService().backends] == ["openai:gpt-4o"]
+
+    @pytest.mark.asyncio
+    async def test_service_calls_follow_latency_profiles(self, monkeypatch, mock_openai_llm):
+        """Test end to end that an LLMService sends its calls to the faster of two stub providers."""
+        from langchain_core.runnables import RunnableLambda
+        from ai.graph.models.conversational_qa import AppointmentConfirmationResponse
+        from ai.graph.services.conversational_qa import ProcessConfirmationService
+        from ai.graph.services.providers import backend as providers
+
+        monkeypatch.setitem(providers._PROVIDERS, "stub", lambda backend, **kwargs: Mock(backend=backend))
+        monkeypatch.setenv("LLM_BACKENDS", json.dumps([
+            {"provider": "stub", "model": "slow-model", "name": "slow"},
+            {"provider": "stub", "model": "fast-model", "name": "fast"},
+        ]))
+        profiles = {"fast": StubBackend(0.005), "slow": StubBackend(0.04)}
+        response = AppointmentConfirmationResponse(
+            intent="unclear", confidence=0.5, reasoning="", extracted_concerns=""
+        )
+
+        def build(template, schema, use_extract=True, llm=None):
+            profile = profiles[llm.backend.name]
+
+            async def answer(inputs):
+                await profile.acall()
+                return response
+            return RunnableLambda(lambda inputs: response, afunc=answer)
+
+        service = ProcessConfirmationService()
+        with patch.object(service, "build_structured_chain", side_effect=build):
+            for _ in range(6):
+                await service.arun(user_message="hmm, what time was that again?")
+
+        assert profiles["slow"].calls == 1
+        assert profiles["fast"].calls == 5
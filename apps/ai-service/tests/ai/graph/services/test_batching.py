@@ -0,0 +1,215 @@
+"""Tests for cross-session micro-batching."""
+import asyncio
+
+import pytest
+from unittest.mock import patch
+
+from .conftest import DEFAULT_MODEL, LOW_TEMPERATURE
+
+
+@pytest.mark.unit
+class TestMicroBatcher:
+    """Test cases for MicroBatcher and the IntentService batch mode."""
+
+    def setup_method(self):
+        from infrastructure.metrics import MetricsRegistry
+        MetricsRegistry().reset()
+
+    @pytest.mark.asyncio
+    async def test_flushes_when_full_or_after_window(self):
+        """Test that concurrent submits share a call, split at max_batch, and get their own outcomes."""
+        from ai.graph.services.batching import MicroBatcher
+        from infrastructure.metrics import MetricsRegistry
+
+        calls = []
+
+        async def flush(key, items):
+            calls.append((key, list(items)))
+            return [ValueError(item) if item == "bad" else f"{key}:{item}" for item in items]
+
+        batcher = MicroBatcher("test", flush, max_batch=3, window=0.01)
+        results = await asyncio.gather(
+            *(batcher.submit("k", item) for item in ("a", "b", "bad", "d", "e")),
+            batcher.submit("other", "z"),
+            return_exceptions=True
+        )
+
+        assert results[:2] == ["k:a", "k:b"]
+        assert isinstance(results[2], ValueError)
+        assert results[3:] == ["k:d", "k:e", "other:z"]
+        assert sorted(calls) == [("k", ["a", "b", "bad"]), ("k", ["d", "e"]), ("other", ["z"])]
+
+        registry = MetricsRegistry()
+        assert registry.get_counter("llm.batch.test.batches") == 3
+        assert registry.get_counter("llm.batch.test.items") == 6
+        assert registry.get_counter("llm.batch.test.flush.full") == 1
+        assert registry.get_counter("llm.batch.test.flush.window") == 2
+
+    @pytest.mark.asyncio
+    async def test_flush_error_fails_every_item(self):
+        """Test that a failing flush reaches every waiting caller."""
+        from ai.graph.services.batching import MicroBatcher
+
+        async def flush(key, items):
+            raise RuntimeError("provider down")
+
+        batcher = MicroBatcher("test", flush, max_batch=8, window=0.005)
+        results = await asyncio.gather(batcher.submit(1, "a"), batcher.submit(1, "b"), return_exceptions=True)
+        assert all(isinstance(result, RuntimeError) for result in results)
+
+    @pytest.mark.asyncio
+    async def test_intent_service_batch_mode(self, monkeypatch, mock_openai_llm):
+        """Test that concurrent arun calls share one batch call and omitted messages are classified alone."""
+        from ai.graph.models.conversational_qa import (
+            BatchIntentItemModel,
+            BatchIntentModel,
+            ConversationIntentModel,
+            UserIntentModel
+        )
+        from ai.graph.services.conversational_qa import IntentService
+        from ai.graph.types.conversational_qa import IntentType
+
+        monkeypatch.setenv("LLM_INTENT_BATCH", "true")
+        monkeypatch.setenv("LLM_INTENT_BATCH_WINDOW_MS", "20")
+        service = IntentService(model=DEFAULT_MODEL, temp=LOW_TEMPERATURE)
+        assert service.batcher is not None
+
+        def label(message):
+            return IntentType.CANCEL_APPOINTMENT if "cancel" in message else IntentType.GENERAL_QA
+
+        schemas = []
+
+        async def ainvoke_chain(chain, inputs):
+            schemas.append(chain.schema.__name__)
+            if chain.schema is BatchIntentModel:
+                lines = inputs["user_messages"].splitlines()
+                # Leave the last message out to exercise the one-by-one fallback
+                return BatchIntentModel(classifications=[
+                    BatchIntentItemModel(
+                        message_id=int(line[1:line.index("]")]),
+                        user_intent=UserIntentModel(intent_type=label(line), confidence=0.9)
+                    )
+                    for line in lines[:-1]
+                ])
+            return ConversationIntentModel(
+                user_intent=UserIntentModel(intent_type=label(inputs["user_message"]), confidence=0.8),
+                raw_query=inputs["user_message"]
+            )
+
+        messages = ["cancel my visit", "what are your hours?", "please cancel it", "where are you?"]
+        with patch.object(service, "ainvoke_chain", side_effect=ainvoke_chain):
+            results = await asyncio.gather(
+                *(service.arun({"user_message": message, "is_verified": True}) for message in messages)
+            )
+
+        assert [result.raw_query for result in results] == messages
+        assert [result.user_intent.intent_type for result in results] == [label(message) for message in messages]
+        assert [result.user_intent.confidence for result in results] == [0.9, 0.9, 0.9, 0.8]
+        assert schemas == ["BatchIntentModel", "ConversationIntentModel"]
+
+    @pytest.mark.asyncio
+    async def test_flush_runs_outside_submitter_context(self):
+        """Test that the flush does not inherit the first submitter's context variables."""
+        import contextvars
+        from ai.graph.services.batching import MicroBatcher
+
+        owner = contextvars.ContextVar("owner", default=None)
+        seen = []
+
+        async def flush(key, items):
+            seen.append(owner.get())
+            return list(items)
+
+        batcher = MicroBatcher("test", flush, max_batch=8, window=0.005)
+
+        async def submit(name):
+            owner.set(name)
+            return await batcher.submit(1, name)
+
+        assert await asyncio.gather(submit("a"), submit("b")) == ["a", "b"]
+        assert seen == [None]
+
+    @pytest.mark.asyncio
+    async def test_intent_batch_keeps_identity_details_per_session(self, monkeypatch, mock_openai_llm):
+        """Test that personal details are classified alone and never taken from a batched answer."""
+        from ai.graph.models.conversational_qa import (
+            BatchIntentItemModel,
+            BatchIntentModel,
+            ConversationIntentModel,
+            UserIntentModel,
+            VerificationInfoModel
+        )
+        from ai.graph.services.conversational_qa import IntentService
+        from ai.graph.types.conversational_qa import IntentType
+        from infrastructure.metrics import MetricsRegistry
+
+        monkeypatch.setenv("LLM_INTENT_BATCH", "true")
+        monkeypatch.setenv("LLM_INTENT_BATCH_WINDOW_MS", "20")
+        service = IntentService(model=DEFAULT_MODEL, temp=LOW_TEMPERATURE)
+        batched = []
+        singles = []
+
+        async def ainvoke_chain(chain, inputs):
+            if chain.schema is BatchIntentModel:
+                batched.append(inputs["user_messages"])
+                # The model wrongly attributes identity fields to every message
+                return BatchIntentModel(classifications=[
+                    BatchIntentItemModel(
+                        message_id=index,
+                        user_intent=UserIntentModel(intent_type=IntentType.USER_INFORMATION, confidence=0.9),
+                        verification_info=VerificationInfoModel(full_name="Jane Roe")
+                    )
+                    for index in range(len(inputs["user_messages"].splitlines()))
+                ])
+            singles.append(inputs["user_message"])
+            return ConversationIntentModel(
+                user_intent=UserIntentModel(intent_type=IntentType.GENERAL_QA, confidence=0.8),
+                raw_query=inputs["user_message"]
+            )
+
+        messages = ["I'm Jane Roe, born 1990-01-02", "what are your hours?", "where are you?"]
+        with patch.object(service, "ainvoke_chain", side_effect=ainvoke_chain):
+            results = await asyncio.gather(
+                *(service.arun({"user_message": message, "is_verified": False}) for message in messages)
+            )
+
+        assert len(batched) == 1 and "1990-01-02" not in batched[0]
+        assert sorted(singles) == sorted(messages)
+        assert all(result.verification_info is None for result in results)
+        registry = MetricsRegistry()
+        assert registry.get_counter("llm.batch.intent.skipped.personal_details") == 1
+        assert registry.get_counter("llm.batch.intent.identity_rechecks") == 2
+
+    @pytest.mark.asyncio
+    async def test_intent_batch_usage_is_shared_across_turns(self, monkeypatch, mock_openai_llm):
+        """Test that every batched turn is charged its share of the batch call, not just the first one."""
+        from ai.graph.models.conversational_qa import BatchIntentItemModel, BatchIntentModel, UserIntentModel
+        from ai.graph.services.conversational_qa import IntentService
+        from ai.graph.services.usage import current_turn_usage, track_turn_usage
+        from ai.graph.types.conversational_qa import IntentType
+
+        monkeypatch.setenv("LLM_INTENT_BATCH", "true")
+        monkeypatch.setenv("LLM_INTENT_BATCH_WINDOW_MS", "20")
+        service = IntentService(model=DEFAULT_MODEL, temp=LOW_TEMPERATURE)
+
+        async def ainvoke_chain(chain, inputs):
+            current_turn_usage().record_call(service.service_name, input_tokens=300, output_tokens=60)
+            return BatchIntentModel(classifications=[
+                BatchIntentItemModel(
+                    message_id=index,
+                    user_intent=UserIntentModel(intent_type=IntentType.GENERAL_QA, confidence=0.9)
+                )
+                for index in range(3)
+            ])
+
+        async def turn(message):
+            with track_turn_usage() as usage:
+                await service.arun({"user_message": message, "is_verified": True})
+            return usage
+
+        with patch.object(service, "ainvoke_chain", side_effect=ainvoke_chain):
+            usages = await asyncio.gather(*(turn(f"question {index}") for index in range(3)))
+
+        assert [usage.llm_calls for usage in usages] == [1, 1, 1]
+        assert [(usage.input_tokens, usage.output_tokens) for usage in usages] == [(100, 20)] * 3
+        assert all(usage.calls_by_service == {"IntentService": 1} for usage in usages)
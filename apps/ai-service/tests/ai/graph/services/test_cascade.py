@@ -0,0 +1,118 @@
+"""Tests for the confidence-based model cascade."""
+import pytest
+from unittest.mock import patch
+
+from .conftest import DEFAULT_MODEL, LOW_TEMPERATURE
+
+
+def tiers():
+    from ai.graph.services.cascade import CascadeTier
+    from ai.graph.services.providers import LLMBackend
+
+    return [
+        CascadeTier("fast", (LLMBackend(provider="openai", model="small", tier=1),)),
+        CascadeTier("strong", (LLMBackend(provider="openai", model="large", tier=3),)),
+    ]
+
+
+@pytest.mark.unit
+class TestModelCascade:
+    """Test cases for ModelCascade and the IntentService cascade mode."""
+
+    def test_escalates_only_when_check_rejects(self):
+        """Test that accepted fast answers stop the cascade and rejected ones escalate."""
+        from ai.graph.services.cascade import ModelCascade
+        from infrastructure.metrics import MetricsRegistry
+
+        cascade = ModelCascade("CascadeCheck", tiers())
+        answers = {"small": 0.9, "large": 0.95}
+        called = []
+
+        def call(tier):
+            called.append(tier.name)
+            return answers[tier.backends[0].model]
+
+        def check(confidence):
+            return "low_confidence" if confidence < 0.8 else None
+
+        assert cascade.run(call, check) == 0.9
+        answers["small"] = 0.4
+        assert cascade.run(call, check) == 0.95
+
+        registry = MetricsRegistry()
+        assert called == ["fast", "fast", "strong"]
+        assert registry.get_counter("llm.cascade.escalations.low_confidence.CascadeCheck") == 1
+        assert registry.get_gauge("llm.cascade.escalation_rate.CascadeCheck") == 0.5
+        assert registry.get_timer("llm.cascade.latency.strong.CascadeCheck")["count"] == 1
+
+    @pytest.mark.asyncio
+    async def test_errors_escalate_and_strong_failure_keeps_cheaper_answer(self):
+        """Test that a failing fast tier escalates and a failing strong tier falls back to the fast answer."""
+        from ai.graph.services.cascade import ModelCascade
+        from ai.graph.services.resilience import CircuitOpenError
+
+        cascade = ModelCascade("CascadeErrors", tiers())
+
+        async def fast_fails(tier):
+            if tier.name == "fast":
+                raise ValueError("schema mismatch")
+            return "strong answer"
+
+        async def strong_fails(tier):
+            if tier.name == "strong":
+                raise TimeoutError("slow")
+            return "fast answer"
+
+        async def circuit_open(tier):
+            raise CircuitOpenError("open")
+
+        assert await cascade.arun(fast_fails, lambda result: None) == "strong answer"
+        assert await cascade.arun(strong_fails, lambda result: "low_confidence") == "fast answer"
+        with pytest.raises(CircuitOpenError):
+            await cascade.arun(circuit_open, lambda result: None)
+
+    def test_intent_service_cascade_mode(self, monkeypatch, mock_openai_llm):
+        """Test that IntentService asks the strong model only for low-confidence or incomplete answers."""
+        from ai.graph.models.conversational_qa import ConversationIntentModel, UserIntentModel
+        from ai.graph.services.conversational_qa import IntentService
+        from ai.graph.types.conversational_qa import IntentType
+
+        monkeypatch.setenv("LLM_INTENT_CASCADE", "true")
+        monkeypatch.setenv("LLM_INTENT_CASCADE_MODEL", "gpt-4o")
+        service = IntentService(model=DEFAULT_MODEL, temp=LOW_TEMPERATURE)
+        assert [tier.name for tier in service.cascade.tiers] == ["fast", "strong"]
+
+        answers = {}
+        models = []
+
+        def invoke_chain(chain, inputs):
+            models.append(chain.key.model)
+            intent_type, confidence = answers[chain.key.model]
+            return ConversationIntentModel(
+                user_intent=UserIntentModel(intent_type=intent_type, confidence=confidence),
+                raw_query=inputs["user_message"]
+            )
+
+        with patch.object(service, "invoke_chain", side_effect=invoke_chain):
+            answers[DEFAULT_MODEL] = (IntentType.GENERAL_QA, 0.95)
+            assert service.run({"user_message": "what are your hours?"}).user_intent.confidence == 0.95
+
+            answers[DEFAULT_MODEL] = (IntentType.GENERAL_QA, 0.4)
+            answers["gpt-4o"] = (IntentType.CANCEL_APPOINTMENT, 0.9)
+            result = service.run({"user_message": "I can't make it tomorrow"})
+            assert result.user_intent.intent_type == IntentType.CANCEL_APPOINTMENT
+
+            # Confident, but claims shared info without extracting any
+            answers[DEFAULT_MODEL] = (IntentType.USER_INFORMATION, 0.9)
+            answers["gpt-4o"] = (IntentType.GENERAL_QA, 0.8)
+            assert service.run({"user_message": "here you go"}).user_intent.intent_type == IntentType.GENERAL_QA
+
+        assert models == [DEFAULT_MODEL, DEFAULT_MODEL, "gpt-4o", DEFAULT_MODEL, "gpt-4o"]
+
+    def test_cascade_off_without_a_stronger_tier(self, monkeypatch, mock_openai_llm):
+        """Test that cascade mode needs a second tier and is off by default."""
+        from ai.graph.services.conversational_qa import IntentService
+
+        assert IntentService().cascade is None
+        monkeypatch.setenv("LLM_INTENT_CASCADE", "true")
+        assert IntentService().cascade is None
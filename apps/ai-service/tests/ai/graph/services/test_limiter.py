@@ -0,0 +1,116 @@
+"""Tests for the adaptive LLM concurrency limiter."""
+import asyncio
+
+import pytest
+
+
+@pytest.mark.unit
+class TestAdaptiveLimiter:
+    """Test cases for AdaptiveLimiter."""
+
+    @pytest.mark.asyncio
+    async def test_queues_by_priority(self):
+        """Test that queued classification calls are admitted before generation calls."""
+        from ai.graph.services.limiter import AdaptiveLimiter, CallPriority
+        from infrastructure.metrics import MetricsRegistry
+
+        limiter = AdaptiveLimiter(initial_limit=1, min_limit=1)
+        order = []
+
+        async def call(name, priority):
+            async with limiter.aslot(name, priority):
+                order.append(name)
+                await asyncio.sleep(0)
+
+        await limiter.aacquire(CallPriority.MATCHING)
+        tasks = [
+            asyncio.create_task(call("qa", CallPriority.GENERATION)),
+            asyncio.create_task(call("clarify", CallPriority.GENERATION)),
+            asyncio.create_task(call("intent", CallPriority.CLASSIFICATION)),
+        ]
+        await asyncio.sleep(0.01)
+        assert limiter.queue_depth == 3
+        assert MetricsRegistry().get_gauge("llm.limiter.queue_depth") == 3
+
+        limiter.release("held")
+        await asyncio.gather(*tasks)
+
+        assert order == ["intent", "qa", "clarify"]
+        assert limiter.in_flight == 0
+        assert MetricsRegistry().get_timer("llm.limiter.queue_wait.generation")["count"] == 2
+
+    def test_aimd_limit_follows_latency_and_overload(self):
+        """Test additive increase while saturated and multiplicative decrease on slow calls or 429s."""
+        from ai.graph.services.limiter import AdaptiveLimiter, CallPriority
+
+        limiter = AdaptiveLimiter(initial_limit=2, min_limit=1, backoff=0.5)
+        for _ in range(4):
+            limiter.acquire(CallPriority.MATCHING)
+            limiter.acquire(CallPriority.MATCHING)
+            limiter.release("Svc", latency=0.1)
+            limiter.release("Svc", latency=0.1)
+        assert limiter.limit > 2
+
+        grown = limiter.limit
+        limiter.acquire(CallPriority.MATCHING)
+        limiter.release("Svc", latency=1.0)
+        assert limiter.limit == pytest.approx(grown * 0.5)
+
+        with pytest.raises(TimeoutError):
+            with limiter.slot("Svc", CallPriority.MATCHING):
+                raise TimeoutError("provider timeout")
+        assert limiter.limit == pytest.approx(max(1.0, grown * 0.25))
+
+        # A slow service is judged against its own baseline, not a faster one's
+        limiter.acquire(CallPriority.GENERATION)
+        limiter.release("SlowSvc", latency=2.0)
+        before = limiter.limit
+        limiter.acquire(CallPriority.GENERATION)
+        limiter.release("SlowSvc", latency=2.5)
+        assert limiter.limit >= before
+
+    def test_sync_wait_times_out_and_leaves_queue(self):
+        """Test that a sync call gives up after its timeout without leaking a slot."""
+        from ai.graph.services.limiter import AdaptiveLimiter, CallPriority, ConcurrencyLimitTimeout
+        from infrastructure.metrics import MetricsRegistry
+
+        limiter = AdaptiveLimiter(initial_limit=1, min_limit=1)
+        limiter.acquire(CallPriority.MATCHING)
+
+        with pytest.raises(ConcurrencyLimitTimeout):
+            limiter.acquire(CallPriority.GENERATION, timeout=0.01)
+
+        assert limiter.queue_depth == 0
+        assert MetricsRegistry().get_counter("llm.limiter.timeouts.generation") == 1
+        limiter.release("held")
+        assert limiter.in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_does_not_hold_a_slot(self):
+        """Test that cancelling a queued call neither consumes nor leaks capacity."""
+        from ai.graph.services.limiter import AdaptiveLimiter, CallPriority
+
+        limiter = AdaptiveLimiter(initial_limit=1, min_limit=1)
+        await limiter.aacquire(CallPriority.MATCHING)
+        waiting = asyncio.create_task(limiter.aacquire(CallPriority.CLASSIFICATION))
+        await asyncio.sleep(0.01)
+
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        limiter.release("held")
+
+        assert limiter.in_flight == 0
+        await asyncio.wait_for(limiter.aacquire(CallPriority.GENERATION), timeout=1)
+        assert limiter.in_flight == 1
+
+    def test_services_declare_priorities(self, mock_openai_llm):
+        """Test that classification services outrank generation services and share one limiter."""
+        from ai.graph.services.conversational_qa import IntentService, QAAnswerService
+        from ai.graph.services.limiter import CallPriority
+
+        intent, qa = IntentService(), QAAnswerService()
+
+        assert intent.call_priority == CallPriority.CLASSIFICATION
+        assert qa.call_priority == CallPriority.GENERATION
+        assert intent.limiter is qa.limiter
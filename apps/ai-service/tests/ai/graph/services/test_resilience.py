@@ -0,0 +1,344 @@
+"""Tests for LLM call deadlines, retries and hedging."""
+import asyncio
+import time
+from contextlib import nullcontext
+
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+
+from .conftest import DEFAULT_MODEL, LOW_TEMPERATURE
+
+
+def flaky(results):
+    """ Attempt function returning/raising the next item of `results` on each call. """
+    calls = []
+
+    def attempt():
+        calls.append(1)
+        outcome = results[len(calls) - 1]
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return outcome
+
+    attempt.calls = calls
+    return attempt
+
+
+def prime_latency(service_name, seconds, samples=20):
+    from infrastructure.metrics import MetricsRegistry
+
+    for _ in range(samples):
+        MetricsRegistry().observe(f"llm.attempt_latency.{service_name}", seconds)
+
+
+@pytest.mark.unit
+class TestResilientCaller:
+    """Test cases for ResilientCaller and CallPolicy."""
+
+    def test_retries_transient_errors_then_succeeds(self):
+        """Test that transient failures are retried with backoff until an attempt succeeds."""
+        from ai.graph.services.resilience import CallPolicy, ResilientCaller
+        from infrastructure.metrics import MetricsRegistry
+
+        caller = ResilientCaller("RetrySync", CallPolicy(max_retries=2, backoff_base_seconds=0.0))
+        attempt = flaky([TimeoutError("slow"), TimeoutError("slow again"), "ok"])
+
+        assert caller.call(attempt) == "ok"
+        assert len(attempt.calls) == 3
+        assert MetricsRegistry().get_counter("llm.retries.RetrySync") == 2
+
+    def test_gives_up_after_max_retries(self):
+        """Test that the last transient error is raised once retries are exhausted."""
+        from ai.graph.services.resilience import CallPolicy, ResilientCaller
+
+        caller = ResilientCaller("RetryExhausted", CallPolicy(max_retries=1, backoff_base_seconds=0.0))
+        attempt = flaky([TimeoutError("first"), TimeoutError("second"), "never"])
+
+        with pytest.raises(TimeoutError, match="second"):
+            caller.call(attempt)
+        assert len(attempt.calls) == 2
+
+    def test_does_not_retry_permanent_errors(self):
+        """Test that non-transient errors (bad requests, schema errors) fail immediately."""
+        from ai.graph.services.resilience import CallPolicy, ResilientCaller
+
+        caller = ResilientCaller("RetryPermanent", CallPolicy(max_retries=3, backoff_base_seconds=0.0))
+        attempt = flaky([ValueError("bad schema"), "never"])
+
+        with pytest.raises(ValueError):
+            caller.call(attempt)
+        assert len(attempt.calls) == 1
+
+    def test_backoff_is_jittered_and_capped(self):
+        """Test that backoff delays stay within the exponential, capped window."""
+        from ai.graph.services.resilience import CallPolicy
+
+        policy = CallPolicy(backoff_base_seconds=0.5, backoff_max_seconds=2.0)
+
+        delays = [policy.backoff(retry) for retry in range(6) for _ in range(20)]
+
+        assert all(0.0 <= delay <= 2.0 for delay in delays)
+        assert max(policy.backoff(0) for _ in range(50)) <= 0.5
+        assert len(set(delays)) > 1
+
+    @pytest.mark.asyncio
+    async def test_async_attempt_timeout_and_deadline(self):
+        """Test that slow async attempts are cut at the timeout and the call fails at the deadline."""
+        from ai.graph.services.resilience import CallPolicy, DeadlineExceeded, ResilientCaller
+        from infrastructure.metrics import MetricsRegistry
+
+        caller = ResilientCaller(
+            "DeadlineAsync",
+            CallPolicy(timeout_seconds=0.05, deadline_seconds=0.12, max_retries=10, backoff_base_seconds=0.0)
+        )
+        calls = []
+
+        async def attempt():
+            calls.append(1)
+            await asyncio.sleep(1)
+
+        started = time.monotonic()
+        with pytest.raises(DeadlineExceeded):
+            await caller.acall(attempt)
+
+        assert time.monotonic() - started < 0.5
+        assert 2 <= len(calls) <= 3
+        assert MetricsRegistry().get_counter("llm.deadline_exceeded.DeadlineAsync") == 1
+
+    @pytest.mark.asyncio
+    async def test_async_hedge_wins_over_slow_primary(self):
+        """Test that a hedge is sent after the observed p95 and its faster answer is used."""
+        from ai.graph.services.resilience import CallPolicy, ResilientCaller
+        from infrastructure.metrics import MetricsRegistry
+
+        prime_latency("HedgeAsync", 0.02)
+        caller = ResilientCaller("HedgeAsync", CallPolicy(hedge=True))
+        delays = iter([1.0, 0.0])
+
+        async def attempt():
+            delay = next(delays)
+            await asyncio.sleep(delay)
+            return "hedge" if delay == 0.0 else "primary"
+
+        started = time.monotonic()
+        assert await caller.acall(attempt) == "hedge"
+
+        metrics = MetricsRegistry()
+        assert time.monotonic() - started < 0.5
+        assert metrics.get_counter("llm.hedge.sent.HedgeAsync") == 1
+        assert metrics.get_counter("llm.hedge.wins.HedgeAsync") == 1
+        assert metrics.get_gauge("llm.hedge.rate.HedgeAsync") == 1.0
+        assert metrics.get_gauge("llm.hedge.win_rate.HedgeAsync") == 1.0
+
+    @pytest.mark.asyncio
+    async def test_async_fast_primary_is_not_hedged(self):
+        """Test that no hedge is sent when the primary answers before the p95."""
+        from ai.graph.services.resilience import CallPolicy, ResilientCaller
+        from infrastructure.metrics import MetricsRegistry
+
+        prime_latency("HedgeSkipped", 0.5)
+        caller = ResilientCaller("HedgeSkipped", CallPolicy(hedge=True))
+        calls = []
+
+        async def attempt():
+            calls.append(1)
+            return "primary"
+
+        assert await caller.acall(attempt) == "primary"
+        assert len(calls) == 1
+        assert MetricsRegistry().get_counter("llm.hedge.sent.HedgeSkipped") == 0
+        assert MetricsRegistry().get_gauge("llm.hedge.rate.HedgeSkipped") == 0.0
+
+    def test_hedge_waits_for_enough_samples(self):
+        """Test that hedging stays off until the p95 is based on enough samples."""
+        from ai.graph.services.resilience import CallPolicy, ResilientCaller
+
+        caller = ResilientCaller("HedgeCold", CallPolicy(hedge=True, hedge_min_samples=20))
+        assert caller.hedge_delay() is None
+
+        prime_latency("HedgeCold", 0.3, samples=20)
+        assert caller.hedge_delay() == pytest.approx(0.3)
+        assert ResilientCaller("HedgeCold", CallPolicy(hedge=False)).hedge_delay() is None
+
+    def test_sync_hedge_wins_over_slow_primary(self):
+        """Test that synchronous calls hedge on the shared pool and take the first answer."""
+        from ai.graph.services.resilience import CallPolicy, ResilientCaller
+        from infrastructure.metrics import MetricsRegistry
+
+        prime_latency("HedgeSync", 0.02)
+        caller = ResilientCaller("HedgeSync", CallPolicy(hedge=True))
+        delays = iter([0.5, 0.0])
+
+        def attempt():
+            delay = next(delays)
+            time.sleep(delay)
+            return "hedge" if delay == 0.0 else "primary"
+
+        assert caller.call(attempt) == "hedge"
+        assert MetricsRegistry().get_counter("llm.hedge.wins.HedgeSync") == 1
+
+    def test_service_policy_env_overrides(self, monkeypatch, mock_openai_llm):
+        """Test that hedging is on for classification services and overridable per service."""
+        from ai.graph.services.conversational_qa import (
+            IntentService,
+            ProcessConfirmationService,
+            QAAnswerService
+        )
+
+        assert ProcessConfirmationService().call_policy.hedge is True
+        assert QAAnswerService().call_policy.hedge is False
+
+        monkeypatch.setenv("LLM_INTENT_HEDGE", "false")
+        monkeypatch.setenv("LLM_INTENT_MAX_RETRIES", "0")
+        monkeypatch.setenv("LLM_INTENT_TIMEOUT_SECONDS", "3.5")
+        with patch("ai.graph.services.llm.ChatOpenAI") as chat:
+            policy = IntentService().call_policy
+
+        assert (policy.hedge, policy.max_retries, policy.timeout_seconds) == (False, 0, 3.5)
+        assert chat.call_args.kwargs["timeout"] == 3.5
+        assert chat.call_args.kwargs["max_retries"] == 0
+
+
+def make_breaker(name, **settings):
+    from ai.graph.services.resilience import CircuitBreaker
+
+    breaker = CircuitBreaker(name)
+    breaker.min_calls = 4
+    breaker.open_seconds = 60.0
+    breaker.half_open_probes = 2
+    for key, value in settings.items():
+        setattr(breaker, key, value)
+    return breaker
+
+
+def fail():
+    raise TimeoutError("provider down")
+
+
+@pytest.mark.unit
+class TestCircuitBreaker:
+    """Test cases for the shared LLM CircuitBreaker."""
+
+    def test_opens_on_error_rate_and_rejects_immediately(self):
+        """Test that the circuit opens past the error threshold and then skips the provider."""
+        from ai.graph.services.resilience import CircuitBreaker, CircuitOpenError
+        from infrastructure.metrics import MetricsRegistry
+
+        breaker = make_breaker("errors")
+        for outcome in ["ok", "ok", TimeoutError("down"), TimeoutError("down")]:
+            with pytest.raises(TimeoutError) if isinstance(outcome, Exception) else nullcontext():
+                breaker.call("Svc", flaky([outcome]))
+
+        assert breaker.state == CircuitBreaker.OPEN
+        provider = flaky(["never"])
+        with pytest.raises(CircuitOpenError):
+            breaker.call("Svc", provider)
+        assert provider.calls == []
+        assert MetricsRegistry().get_counter("llm.breaker.errors.rejected.Svc") == 1
+        assert MetricsRegistry().get_gauge("llm.breaker.errors.state") == 2
+
+    def test_shared_across_instances_and_ignores_schema_errors(self):
+        """Test that every instance sees one circuit and schema errors do not trip it."""
+        from pydantic import BaseModel, ValidationError
+        from ai.graph.services.resilience import CircuitBreaker
+
+        class Strict(BaseModel):
+            value: int
+
+        first, second = make_breaker("shared"), make_breaker("shared")
+        for _ in range(4):
+            with pytest.raises(ValidationError):
+                first.call("Svc", lambda: Strict(value="x"))
+        assert second.state == CircuitBreaker.CLOSED
+
+        for _ in range(4):
+            with pytest.raises(TimeoutError):
+                first.call("Svc", fail)
+        assert second.state == CircuitBreaker.OPEN
+
+    def test_half_open_probes_close_or_reopen(self):
+        """Test that probes are limited, successful probes close and a failed probe reopens."""
+        from ai.graph.services.resilience import CircuitBreaker, CircuitOpenError
+
+        breaker = make_breaker("probes", open_seconds=0.0)
+        for _ in range(4):
+            with pytest.raises(TimeoutError):
+                breaker.call("Svc", fail)
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+
+        with pytest.raises(TimeoutError):
+            breaker.call("Svc", fail)
+        breaker.open_seconds = 60.0
+        assert breaker.state == CircuitBreaker.OPEN
+
+        breaker.open_seconds = 0.0
+        assert breaker.call("Svc", lambda: "ok") == "ok"
+        # Both probe slots in use: a concurrent third call is rejected
+        assert breaker._admit("Svc") is True
+        assert breaker._admit("Svc") is True
+        with pytest.raises(CircuitOpenError):
+            breaker._admit("Svc")
+        breaker._record(True, failed=False, seconds=0.1)
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_limiter_queue_timeouts_and_waits_leave_circuit_closed(self):
+        """Test that local slot timeouts are neither retried nor counted, and queue time is not slow time."""
+        import threading
+        from ai.graph.services.limiter import AdaptiveLimiter, CallPriority, ConcurrencyLimitTimeout
+        from ai.graph.services.resilience import CallPolicy, CircuitBreaker, ResilientCaller
+
+        breaker = make_breaker("local", slow_call_seconds=0.05, max_slow_rate=0.5)
+        caller = ResilientCaller("Local", CallPolicy(max_retries=2, backoff_base_seconds=0.0))
+        limiter = AdaptiveLimiter(initial_limit=1, min_limit=1)
+        attempts = []
+
+        def attempt():
+            attempts.append(1)
+            with limiter.slot("Svc", CallPriority.MATCHING, timeout=0.01):
+                return "ok"
+
+        limiter.acquire(CallPriority.MATCHING)
+        for _ in range(4):
+            with pytest.raises(ConcurrencyLimitTimeout):
+                breaker.call("Svc", lambda: caller.call(attempt))
+        assert len(attempts) == 4
+        assert breaker.state == CircuitBreaker.CLOSED
+
+        # Calls that queue past the slow threshold but are quick once admitted
+        def queued():
+            with limiter.slot("Svc", CallPriority.MATCHING):
+                pass
+            # Hold the slot again so the next call has to queue too
+            limiter.acquire(CallPriority.MATCHING)
+            return "ok"
+
+        for _ in range(4):
+            threading.Timer(0.1, limiter.release, args=("held",)).start()
+            assert breaker.call("Svc", queued) == "ok"
+        assert breaker.state == CircuitBreaker.CLOSED
+        assert list(breaker._get_circuit().outcomes) == [(False, False)] * 4
+
+    @pytest.mark.asyncio
+    async def test_open_circuit_serves_service_fallback(self, mock_openai_llm):
+        """Test that an open circuit returns the service fallback at once and shows on the health endpoint."""
+        from ai.graph.services.conversational_qa.intent import IntentService
+        from ai.graph.types.conversational_qa import IntentType
+        from routers.health import HealthRouter
+
+        breaker = make_breaker("llm")
+        for _ in range(4):
+            with pytest.raises(TimeoutError):
+                breaker.call("Svc", fail)
+
+        service = IntentService(model=DEFAULT_MODEL, temp=LOW_TEMPERATURE)
+        mock_chain = Mock()
+        mock_chain.ainvoke = AsyncMock(return_value=None)
+        with patch.object(service, "build_structured_chain", return_value=mock_chain):
+            result = await service.arun({"user_message": "cancel my appointment"})
+
+        assert result.user_intent.intent_type == IntentType.GENERAL_QA
+        mock_chain.ainvoke.assert_not_awaited()
+
+        health = await HealthRouter().health_check()
+        assert health["status"] == "DEGRADED"
+        assert health["llm_circuits"]["llm"]["state"] == "open"
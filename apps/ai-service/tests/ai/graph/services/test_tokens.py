@@ -0,0 +1,139 @@
+"""Tests for token accounting and prompt budgets."""
+import pytest
+from unittest.mock import Mock, patch
+
+
+@pytest.fixture(autouse=True)
+def estimated_tokens(monkeypatch):
+    from ai.graph.services.cache import ResponseCache
+    from ai.graph.services.tokens import TokenCounter
+
+    monkeypatch.setenv("LLM_TOKENIZER", "estimate")
+    monkeypatch.setenv("LLM_RESPONSE_CACHE_BACKEND", "off")
+    TokenCounter._encodings.clear()
+    ResponseCache.reset_shared()
+    yield
+    TokenCounter._encodings.clear()
+    ResponseCache.reset_shared()
+
+
+def make_appointments(count):
+    return [
+        {
+            "id": i, "starts_at": f"2025-10-{i:02d} 09:00", "status": "scheduled",
+            "provider": {"full_name": f"Dr. Doctor {i}", "specialty": "Cardiology"},
+            "clinic": {"name": "North Clinic", "address_line1": "1 Main St", "city": "Springfield", "state": "IL"},
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+@pytest.mark.unit
+class TestTokenAccounting:
+    """Test cases for TokenCounter, UsageCallback and LLMService budgets."""
+
+    def test_trim_keeps_whole_blocks(self):
+        """Test that trimming drops trailing appointment blocks and says how many."""
+        from ai.graph.services.tokens import TokenCounter, trim_to_tokens
+
+        text = "\n".join(f"Appointment {i}:\n- ID: {i}\n---" for i in range(1, 21))
+
+        trimmed = trim_to_tokens(text, 40, TokenCounter("gpt-4o-mini"))
+
+        assert trimmed.startswith("Appointment 1:")
+        assert trimmed.endswith("more omitted to fit the prompt budget)")
+        assert "- ID: 20" not in trimmed
+        assert trimmed.count("Appointment ") == trimmed.count("- ID:") == trimmed.count("---")
+
+    def test_usage_callback_reads_provider_usage(self):
+        """Test that provider-reported usage is taken from the generation message."""
+        from langchain_core.messages import AIMessage
+        from langchain_core.outputs import ChatGeneration, LLMResult
+        from ai.graph.services.tokens import UsageCallback
+
+        message = AIMessage(
+            content="{}",
+            usage_metadata={"input_tokens": 120, "output_tokens": 15, "total_tokens": 135}
+        )
+        callback = UsageCallback()
+        callback.on_llm_end(LLMResult(generations=[[ChatGeneration(message=message)]]))
+
+        assert (callback.input_tokens, callback.output_tokens) == (120, 15)
+
+    def test_max_tokens_cap_and_env_override(self, monkeypatch):
+        """Test that services pass their output cap to the model, overridable per service."""
+        from ai.graph.services.conversational_qa import IntentService, ProcessConfirmationService
+
+        monkeypatch.setenv("LLM_INTENT_MAX_TOKENS", "64")
+        with patch("ai.graph.services.llm.ChatOpenAI") as chat:
+            IntentService()
+            assert chat.call_args.kwargs["max_tokens"] == 64
+            ProcessConfirmationService()
+            assert chat.call_args.kwargs["max_tokens"] == ProcessConfirmationService.max_output_tokens
+
+    def test_oversized_appointments_are_trimmed_to_budget(self, monkeypatch, mock_openai_llm):
+        """Test that appointments_text is shortened when the prompt exceeds the service budget."""
+        from ai.graph.models.conversational_qa import AppointmentInfoModel, AppointmentMatchModel
+        from ai.graph.services.conversational_qa import AppointmentMatchService
+        from infrastructure.metrics import MetricsRegistry
+
+        monkeypatch.setenv("LLM_APPOINTMENT_MATCH_INPUT_BUDGET", "600")
+        metrics = MetricsRegistry()
+        trimmed_before = metrics.get_counter("llm.input_budget.trimmed.AppointmentMatchService")
+        service = AppointmentMatchService(query_orm_service=Mock())
+        runnable = Mock()
+        runnable.invoke = Mock(return_value=AppointmentMatchModel(
+            match_found=False, confidence=0.0, reasoning="none"
+        ))
+
+        with patch.object(service, "build_structured_chain", return_value=runnable):
+            service.run(
+                appointments=make_appointments(40),
+                appointment_info=AppointmentInfoModel(specialty="Dermatology")
+            )
+
+        sent = runnable.invoke.call_args.args[0]
+        chain = service._get_chain()
+        assert service._count_prompt(chain, sent) <= 600
+        assert "more omitted" in sent["appointments_text"]
+        assert metrics.get_counter("llm.input_budget.trimmed.AppointmentMatchService") == trimmed_before + 1
+
+    @pytest.mark.asyncio
+    async def test_tokens_are_attributed_to_node_and_turn(self, mock_openai_llm):
+        """Test that a call inside a graph node is charged to the node, service and turn."""
+        from typing import TypedDict
+        from langgraph.graph import StateGraph
+        from ai.graph.models.conversational_qa import AppointmentConfirmationResponse
+        from ai.graph.services.conversational_qa import ProcessConfirmationService
+        from ai.graph.services.usage import track_turn_usage
+        from infrastructure.metrics import MetricsRegistry
+
+        class State(TypedDict):
+            user_message: str
+
+        service = ProcessConfirmationService()
+        runnable = Mock()
+        runnable.invoke = Mock(return_value=AppointmentConfirmationResponse(
+            intent="unclear", confidence=0.5, reasoning="", extracted_concerns=""
+        ))
+
+        def confirm(state):
+            service.run(user_message=state["user_message"])
+            return state
+
+        graph = StateGraph(State)
+        graph.add_node("PROCESS_CONFIRMATION", confirm)
+        graph.set_entry_point("PROCESS_CONFIRMATION")
+        graph.set_finish_point("PROCESS_CONFIRMATION")
+        metrics = MetricsRegistry()
+        node_before = metrics.get_counter("llm.tokens.input.node.PROCESS_CONFIRMATION")
+
+        with patch.object(service, "build_structured_chain", return_value=runnable), \
+             track_turn_usage("session-1") as usage:
+            graph.compile().invoke({"user_message": "maybe later, what time was it again?"})
+
+        assert usage.session_id == "session-1"
+        assert usage.input_tokens > 0
+        assert usage.tokens_by_node["PROCESS_CONFIRMATION"]["input"] == usage.input_tokens
+        assert usage.tokens_by_service["ProcessConfirmationService"]["output"] > 0
+        assert metrics.get_counter("llm.tokens.input.node.PROCESS_CONFIRMATION") == node_before + usage.input_tokens
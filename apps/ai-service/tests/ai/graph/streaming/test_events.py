@@ -0,0 +1,55 @@
+"""Tests for graph stream event translation."""
+import pytest
+
+
+@pytest.mark.unit
+class TestPartialFieldReader:
+    """Test cases for PartialFieldReader."""
+
+    def test_yields_only_new_text(self):
+        """Test that JSON fragments are turned into text deltas of one field."""
+        from ai.graph.streaming import PartialFieldReader
+
+        reader = PartialFieldReader("qa_answer")
+        fragments = ['{"qa_', 'answer": "We ', 'are open', ' until 6pm', '."}']
+
+        deltas = [reader.feed(fragment) for fragment in fragments]
+
+        assert "".join(deltas) == "We are open until 6pm."
+        assert deltas[0] == ""
+
+
+@pytest.mark.unit
+class TestGraphEventTranslator:
+    """Test cases for GraphEventTranslator."""
+
+    def test_task_events(self):
+        """Test that task start/result payloads become node_start/node_end events."""
+        from ai.graph.streaming import GraphEventTranslator
+
+        translator = GraphEventTranslator()
+
+        start = list(translator.translate(("tasks", {"id": "1", "name": "QA_ANSWER", "input": {}, "triggers": []})))
+        end = list(translator.translate(("tasks", {"id": "1", "name": "QA_ANSWER", "error": None, "result": [], "interrupts": []})))
+
+        assert start == [{"type": "node_start", "node": "QA_ANSWER"}]
+        assert end == [{"type": "node_end", "node": "QA_ANSWER"}]
+
+    def test_tokens_only_for_user_facing_nodes(self):
+        """Test that LLM chunks are streamed for QA_ANSWER but not for intent classification."""
+        from langchain_core.messages import AIMessageChunk
+        from ai.graph.streaming import GraphEventTranslator
+
+        translator = GraphEventTranslator()
+        intent_chunk = AIMessageChunk(content='{"user_intent": {', id="run-intent")
+        answer_chunk = AIMessageChunk(content='{"qa_answer": "Hello', id="run-qa")
+
+        intent_events = list(translator.translate(
+            ("messages", (intent_chunk, {"langgraph_node": "CONVERSATION_MANAGER"}))
+        ))
+        answer_events = list(translator.translate(
+            ("messages", (answer_chunk, {"langgraph_node": "QA_ANSWER"}))
+        ))
+
+        assert intent_events == []
+        assert answer_events == [{"type": "token", "node": "QA_ANSWER", "text": "Hello"}]
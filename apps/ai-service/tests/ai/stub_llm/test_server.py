@@ -0,0 +1,168 @@
+"""Tests for the OpenAI-compatible stub LLM server."""
+import random
+import statistics
+
+import pytest
+
+
+def chat_request(schema_name, schema, user_message, system=""):
+    return {
+        "model": "gpt-4o-mini",
+        "messages": [
+            {"role": "system", "content": system},
+            {"role": "user", "content": user_message},
+        ],
+        "response_format": {
+            "type": "json_schema",
+            "json_schema": {"name": schema_name, "schema": schema, "strict": True},
+        },
+    }
+
+
+@pytest.mark.unit
+class TestStubLLMServer:
+    """Test cases for the stub server, its latency models and responders."""
+
+    def test_latency_models(self):
+        """Test fixed, lognormal and heavy-tail sampling and the latency cap."""
+        from ai.stub_llm import LatencyModel
+
+        rng = random.Random(7)
+        assert LatencyModel.parse("fixed:0.25").sample(rng) == 0.25
+
+        lognormal = [LatencyModel.parse("lognormal:0.4,0.5").sample(rng) for _ in range(2000)]
+        assert statistics.median(lognormal) == pytest.approx(0.4, rel=0.1)
+
+        heavy = LatencyModel.parse("pareto:0.1,1.2", max_seconds=5.0)
+        samples = [heavy.sample(rng) for _ in range(2000)]
+        assert min(samples) >= 0.1
+        assert max(samples) <= 5.0
+        assert sorted(samples)[int(0.99 * len(samples))] > 10 * statistics.median(samples)
+
+        with pytest.raises(ValueError):
+            LatencyModel.parse("uniform:1,2")
+
+    @pytest.mark.parametrize("model_name", [
+        "ConversationIntentModel",
+        "TurnUnderstandingModel",
+        "AppointmentConfirmationResponse",
+        "AppointmentMatchModel",
+        "QAAnswerModel",
+        "ClarificationPromptModel",
+    ])
+    def test_structured_answers_are_schema_valid(self, model_name):
+        """Test that every structured-output call the graph makes gets a valid instance."""
+        import json
+        from fastapi.testclient import TestClient
+        from ai.graph.models import conversational_qa as models
+        from ai.stub_llm import create_app
+
+        model = getattr(models, model_name)
+        client = TestClient(create_app())
+
+        response = client.post(
+            "/v1/chat/completions",
+            json=chat_request(model_name, model.model_json_schema(), "I'd like to cancel, thanks")
+        )
+
+        assert response.status_code == 200
+        body = response.json()
+        model.model_validate(json.loads(body["choices"][0]["message"]["content"]))
+        assert body["usage"]["prompt_tokens"] > 0
+
+    def test_rule_based_answers(self):
+        """Test that answers follow the prompt: intents, extracted details and appointment matches."""
+        from ai.graph.models.conversational_qa import AppointmentMatchModel
+        from ai.stub_llm import StubResponder
+
+        responder = StubResponder()
+        intent = responder.structured("ConversationIntentModel", {}, [
+            {"role": "user", "content": "My name is Jane Roe, phone +15551234567 and dob 1990-01-01"}
+        ])
+        assert intent["user_intent"]["intent_type"] == "user_information"
+        assert intent["verification_info"]["phone_number"] == "+15551234567"
+
+        confirmation = responder.structured("AppointmentConfirmationResponse", {}, [
+            {"role": "user", "content": "yes please"}
+        ])
+        assert confirmation["intent"] == "confirm"
+
+        batch = responder.structured("BatchIntentModel", {}, [
+            {"role": "user", "content": "[0] cancel my appointment\n[1] what are your hours?"}
+        ])
+        assert [(item["message_id"], item["user_intent"]["intent_type"]) for item in batch["classifications"]] == [
+            (0, "cancel_appointment"), (1, "general_qa")
+        ]
+
+        match = AppointmentMatchModel(**responder.structured("AppointmentMatchModel", {}, [
+            {"role": "system", "content": "- ID: a1\n- Doctor: Dr. House\n---\n- ID: b2\n- Doctor: Dr. Grey\n---"},
+            {"role": "user", "content": "Doctor name: Dr. GreyClinic: NoneDate: NoneSpecialty: None"},
+        ]))
+        assert (match.match_found, match.matched_appointment_id) == (True, "b2")
+
+    def test_unknown_schema_and_tool_calls(self):
+        """Test that unknown schemas get a minimal valid instance, via tool calls when tools are sent."""
+        import json
+        from fastapi.testclient import TestClient
+        from pydantic import BaseModel, Field
+        from ai.stub_llm import create_app
+
+        class Other(BaseModel):
+            label: str
+            score: float = Field(ge=0.2, le=0.8)
+            tags: list[str]
+
+        client = TestClient(create_app())
+        response = client.post("/v1/chat/completions", json={
+            "model": "m",
+            "messages": [{"role": "user", "content": "hi"}],
+            "tools": [{"type": "function", "function": {"name": "Other", "parameters": Other.model_json_schema()}}],
+        })
+
+        call = response.json()["choices"][0]["message"]["tool_calls"][0]
+        assert Other.model_validate(json.loads(call["function"]["arguments"])).score == 0.5
+
+    def test_error_injection(self):
+        """Test that injected failures use OpenAI-style error bodies and configured statuses."""
+        from fastapi.testclient import TestClient
+        from ai.stub_llm import StubConfig, create_app
+
+        client = TestClient(create_app(StubConfig(error_rate=1.0, error_statuses=(503,), seed=1)))
+
+        response = client.post("/v1/chat/completions", json=chat_request("QAAnswerModel", {}, "hours?"))
+
+        assert response.status_code == 503
+        assert response.json()["error"]["type"] == "service_unavailable"
+        assert client.get("/stats").json()["errors"] == 1
+
+    @pytest.mark.asyncio
+    async def test_llm_service_points_at_stub(self, monkeypatch):
+        """Test end to end that an LLMService configured with LLM_BASE_URL is answered by the stub."""
+        import httpx
+        from ai.graph.services.cache import ResponseCache
+        from ai.graph.services.conversational_qa import IntentService
+        from ai.graph.services.providers import ProviderRouter
+        from ai.graph.states.conversational_qa import StateKeys
+        from ai.graph.types.conversational_qa import IntentType
+        from ai.stub_llm import StubConfig, create_app
+        from infrastructure.http import SharedHTTPClient
+
+        app = create_app(StubConfig(seed=3))
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app))
+        monkeypatch.setenv("LLM_BASE_URL", "http://stub-llm/v1")
+        monkeypatch.setenv("OPENAI_API_KEY", "sk-stub")
+        monkeypatch.setenv("LLM_RESPONSE_CACHE_BACKEND", "off")
+        monkeypatch.setenv("LLM_TOKENIZER", "estimate")
+        monkeypatch.setattr(SharedHTTPClient, "get_async", classmethod(lambda cls: client))
+        ResponseCache.reset_shared()
+        ProviderRouter.reset()
+
+        service = IntentService(model="gpt-4o-mini", temp=0.0)
+        result = await service.arun(state={StateKeys.USER_MESSAGE: "Please cancel my appointment with Dr. Grey"})
+
+        await client.aclose()
+        ResponseCache.reset_shared()
+        assert service.backends[0].base_url == "http://stub-llm/v1"
+        assert result.user_intent.intent_type == IntentType.CANCEL_APPOINTMENT
+        assert result.appointment_info.doctor_full_name == "Dr. Grey"
+        assert app.state.stats.to_dict()["by_schema"] == {"ConversationIntentModel": 1}
@@ -0,0 +1,66 @@
+"""Tests for the shared LLM HTTP client."""
+import pytest
+from unittest.mock import patch
+
+
+@pytest.fixture(autouse=True)
+def fresh_clients():
+    from infrastructure.http import SharedHTTPClient
+
+    SharedHTTPClient.close()
+    SharedHTTPClient._async_client = None
+    SharedHTTPClient._settings = None
+    yield
+    SharedHTTPClient.close()
+    SharedHTTPClient._async_client = None
+    SharedHTTPClient._settings = None
+
+
+@pytest.mark.unit
+class TestSharedHTTPClient:
+    """Test cases for SharedHTTPClient."""
+
+    def test_clients_are_process_wide(self):
+        """Test that repeated lookups return the same pooled clients."""
+        from infrastructure.http import SharedHTTPClient
+
+        assert SharedHTTPClient.get_sync() is SharedHTTPClient.get_sync()
+        assert SharedHTTPClient.get_async() is SharedHTTPClient.get_async()
+
+    def test_llm_services_share_one_pool(self):
+        """Test that every LLMService hands the same clients to ChatOpenAI."""
+        from ai.graph.services.llm import LLMService
+
+        with patch("ai.graph.services.llm.ChatOpenAI") as mock_openai:
+            LLMService()
+            LLMService(temp=0.0)
+
+        first, second = (call.kwargs for call in mock_openai.call_args_list)
+        assert first["http_client"] is second["http_client"]
+        assert first["http_async_client"] is second["http_async_client"]
+
+    def test_settings_from_env(self, monkeypatch):
+        """Test that pool limits are configurable and HTTP/2 needs the h2 package."""
+        from infrastructure.http import SharedHTTPClient
+
+        monkeypatch.setenv("LLM_HTTP_MAX_CONNECTIONS", "7")
+        monkeypatch.setenv("LLM_HTTP2", "true")
+
+        with patch.object(SharedHTTPClient, "http2_available", return_value=False):
+            settings = SharedHTTPClient.settings()
+
+        assert settings["max_connections"] == 7
+        assert settings["http2"] is False
+
+    def test_pool_stats_and_metrics(self):
+        """Test that pool stats are reported and published as gauges."""
+        from infrastructure.http import SharedHTTPClient
+        from infrastructure.metrics import MetricsRegistry
+
+        SharedHTTPClient.get_sync()
+        SharedHTTPClient.publish_pool_metrics()
+
+        stats = SharedHTTPClient.pool_stats()
+        assert stats["sync"]["connections"] == 0
+        assert stats["sync"]["utilisation"] == 0
+        assert MetricsRegistry().get_gauge("llm.http.sync.connections") == 0
@@ -0,0 +1,52 @@
+"""Tests for MetricsRegistry."""
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    from infrastructure.metrics import MetricsRegistry
+    MetricsRegistry.reset()
+    yield
+    MetricsRegistry.reset()
+
+
+@pytest.mark.unit
+class TestMetricsRegistry:
+    """Test cases for MetricsRegistry."""
+
+    def test_state_is_shared_across_instances(self):
+        """Test that counters written by one instance are visible to another."""
+        from infrastructure.metrics import MetricsRegistry
+
+        MetricsRegistry().increment("graph.constructions")
+        MetricsRegistry().increment("graph.constructions", 2)
+
+        assert MetricsRegistry().get_counter("graph.constructions") == 3
+
+    def test_timer_summary(self):
+        """Test that observed durations are summarised with percentiles."""
+        from infrastructure.metrics import MetricsRegistry
+
+        metrics = MetricsRegistry()
+        for value in [0.1, 0.2, 0.3, 0.4]:
+            metrics.observe("request.chatbot.total", value)
+
+        summary = metrics.get_timer("request.chatbot.total")
+
+        assert summary["count"] == 4
+        assert summary["min"] == 0.1
+        assert summary["max"] == 0.4
+        assert summary["p50"] in (0.2, 0.3)
+
+    def test_snapshot_prefix_filter(self):
+        """Test that snapshots can be filtered by metric prefix."""
+        from infrastructure.metrics import MetricsRegistry
+
+        metrics = MetricsRegistry()
+        with metrics.timer("startup.graph.compile"):
+            pass
+        metrics.observe("request.graph.execute", 0.5)
+
+        snapshot = metrics.snapshot(prefix="startup.")
+
+        assert list(snapshot["timers"].keys()) == ["startup.graph.compile"]
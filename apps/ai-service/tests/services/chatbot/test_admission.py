@@ -0,0 +1,102 @@
+"""Tests for chatbot admission control."""
+import asyncio
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    from infrastructure.metrics import MetricsRegistry
+
+    MetricsRegistry.reset()
+    yield
+    MetricsRegistry.reset()
+
+
+def priority(value):
+    async def resolve():
+        return value
+    return resolve
+
+
+@pytest.mark.unit
+class TestAdmissionController:
+    """Test cases for AdmissionController."""
+
+    @pytest.mark.asyncio
+    async def test_rejects_when_queue_full(self):
+        """Test that turns beyond slots + queue are rejected fast with a Retry-After."""
+        from services.chatbot import AdmissionController, AdmissionRejected, TurnPriority
+
+        controller = AdmissionController(max_concurrency=1, max_queue=1, queue_timeout=1, retry_after=3)
+        await controller.acquire(priority(TurnPriority.READ))
+        queued = asyncio.create_task(controller.acquire(priority(TurnPriority.READ)))
+        await asyncio.sleep(0)
+
+        with pytest.raises(AdmissionRejected) as exc_info:
+            await controller.acquire(priority(TurnPriority.READ))
+
+        assert exc_info.value.retry_after >= 3
+        assert controller.queue_depth == 1
+        controller.release()
+        await queued
+        assert controller.active == 1
+
+    @pytest.mark.asyncio
+    async def test_write_turns_are_admitted_first(self):
+        """Test that a queued write continuation gets the next slot before earlier reads."""
+        from services.chatbot import AdmissionController, TurnPriority
+
+        controller = AdmissionController(max_concurrency=1, max_queue=5, queue_timeout=1)
+        order = []
+
+        async def turn(name, value):
+            await controller.acquire(priority(value))
+            order.append(name)
+
+        await controller.acquire(priority(TurnPriority.READ))
+        read = asyncio.create_task(turn("read", TurnPriority.READ))
+        await asyncio.sleep(0)
+        write = asyncio.create_task(turn("write", TurnPriority.WRITE))
+        await asyncio.sleep(0)
+
+        controller.release()
+        await write
+        controller.release()
+        await read
+
+        assert order == ["write", "read"]
+
+    @pytest.mark.asyncio
+    async def test_write_turn_sheds_queued_read_when_full(self):
+        """Test that a write continuation displaces a queued read instead of being rejected."""
+        from infrastructure.metrics import MetricsRegistry
+        from services.chatbot import AdmissionController, AdmissionRejected, TurnPriority
+
+        controller = AdmissionController(max_concurrency=1, max_queue=1, queue_timeout=1)
+        await controller.acquire(priority(TurnPriority.READ))
+        read = asyncio.create_task(controller.acquire(priority(TurnPriority.READ)))
+        await asyncio.sleep(0)
+        write = asyncio.create_task(controller.acquire(priority(TurnPriority.WRITE)))
+        await asyncio.sleep(0)
+
+        with pytest.raises(AdmissionRejected):
+            await read
+        controller.release()
+        await write
+
+        assert MetricsRegistry().get_counter("admission.shed") == 1
+        assert MetricsRegistry().get_gauge("admission.queue_depth") == 0
+
+    @pytest.mark.asyncio
+    async def test_queue_timeout(self):
+        """Test that a queued turn is rejected once it waits longer than the timeout."""
+        from services.chatbot import AdmissionController, AdmissionRejected, TurnPriority
+
+        controller = AdmissionController(max_concurrency=1, max_queue=1, queue_timeout=0.01)
+        await controller.acquire(priority(TurnPriority.READ))
+
+        with pytest.raises(AdmissionRejected) as exc_info:
+            await controller.acquire(priority(TurnPriority.READ))
+
+        assert exc_info.value.reason == "queue_timeout"
+        assert controller.queue_depth == 0
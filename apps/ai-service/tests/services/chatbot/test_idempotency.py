@@ -0,0 +1,134 @@
+"""Tests for request_id idempotency."""
+import asyncio
+import pytest
+
+
+def make_response(answer="ok", request_id="r-1"):
+    from routers.models import QAResponse
+
+    return QAResponse(request_id=request_id, system_answer=answer, elapsed_time=0.1)
+
+
+class FakePersistentBackend:
+    """In-memory stand-in for the Postgres backend."""
+
+    def __init__(self):
+        self.rows = {}
+
+    def get(self, key):
+        return self.rows.get(key)
+
+    def put(self, key, value):
+        self.rows.setdefault(key, value)
+
+
+@pytest.mark.unit
+class TestIdempotencyStore:
+    """Test cases for IdempotencyStore."""
+
+    @pytest.mark.asyncio
+    async def test_replay_returns_stored_response(self):
+        """Test that a replayed request_id does not execute again."""
+        from services.chatbot import IdempotencyStore
+
+        store = IdempotencyStore()
+        calls = []
+
+        async def execute():
+            calls.append(1)
+            return make_response(answer=f"call {len(calls)}")
+
+        first = await store.run("s-1", "r-1", execute)
+        replay = await store.run("s-1", "r-1", execute)
+        other_session = await store.run("s-2", "r-1", execute)
+
+        assert len(calls) == 2
+        assert replay == first
+        assert other_session.system_answer == "call 2"
+
+    @pytest.mark.asyncio
+    async def test_concurrent_duplicates_wait_for_first(self):
+        """Test that duplicates arriving mid-execution share the first result."""
+        from services.chatbot import IdempotencyStore
+
+        store = IdempotencyStore()
+        calls = []
+
+        async def execute():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return make_response()
+
+        results = await asyncio.gather(*(store.run("s-1", "r-1", execute) for _ in range(5)))
+
+        assert len(calls) == 1
+        assert all(r == results[0] for r in results)
+
+    @pytest.mark.asyncio
+    async def test_failures_are_not_stored(self):
+        """Test that a retry after a failed execution runs again."""
+        from services.chatbot import IdempotencyStore
+
+        store = IdempotencyStore()
+
+        async def failing():
+            raise RuntimeError("boom")
+
+        async def succeeding():
+            return make_response()
+
+        with pytest.raises(RuntimeError):
+            await store.run("s-1", "r-1", failing)
+
+        assert (await store.run("s-1", "r-1", succeeding)).system_answer == "ok"
+
+    @pytest.mark.asyncio
+    async def test_persistent_backend_serves_other_processes(self):
+        """Test that a response persisted by one store is replayed by a fresh store."""
+        from services.chatbot import IdempotencyStore
+
+        backend = FakePersistentBackend()
+
+        async def execute():
+            return make_response(answer="first")
+
+        async def must_not_run():
+            raise AssertionError("should have been replayed")
+
+        await IdempotencyStore(persistent=backend).run("s-1", "r-1", execute)
+        replay = await IdempotencyStore(persistent=backend).run("s-1", "r-1", must_not_run)
+
+        assert replay.system_answer == "first"
+
+    @pytest.mark.asyncio
+    async def test_missing_request_id_is_not_deduplicated(self):
+        """Test that requests without a request_id always execute."""
+        from services.chatbot import IdempotencyStore
+
+        store = IdempotencyStore()
+        calls = []
+
+        async def execute():
+            calls.append(1)
+            return make_response(request_id=None)
+
+        await store.run("s-1", None, execute)
+        await store.run("s-1", None, execute)
+
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_begin_returns_existing_claim(self):
+        """Test that a second begin() for an in-flight key joins it instead of replacing it."""
+        from services.chatbot import IdempotencyStore
+
+        store = IdempotencyStore()
+
+        future, owner = store.begin(("s-1", "r-1"))
+        joined, joined_owner = store.begin(("s-1", "r-1"))
+
+        assert owner and not joined_owner
+        assert joined is future
+
+        await store.complete(("s-1", "r-1"), future, make_response())
+        assert (await joined).system_answer == "ok"